@@ -0,0 +1,41 @@
+"""Add (created_at, id) indexes for keyset pagination of tasks
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add composite indexes matching GET /tasks ordering"""
+
+    # Serves: SELECT ... FROM tasks WHERE (created_at, id) < (:c, :i)
+    #         ORDER BY created_at DESC, id DESC LIMIT :n
+    op.create_index(
+        'ix_tasks_created_at_id',
+        'tasks',
+        ['created_at', 'id'],
+        unique=False
+    )
+
+    # Same ordering with a status filter
+    op.create_index(
+        'ix_tasks_status_created_at_id',
+        'tasks',
+        ['status', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Remove keyset pagination indexes"""
+    op.drop_index('ix_tasks_status_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
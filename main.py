@@ -199,6 +199,14 @@ async def lifespan(app: FastAPI):
         await close_neo4j()
         logger.info("Neo4j connection closed")
 
+        # Close pooled AI provider connections and SDK clients
+        try:
+            from src.amas.ai.provider_transport import close_provider_transport
+            await close_provider_transport()
+            logger.info("AI provider connections closed")
+        except Exception as e:
+            logger.warning(f"Error closing AI provider connections: {e}")
+
         # Stop system monitor
         try:
             from src.amas.services.system_monitor import get_system_monitor
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+AMAS Vector Index Benchmark
+
+Recall-vs-latency comparison of the VectorService index types (flat, IVF,
+IVF+PQ, HNSW) over a synthetic clustered corpus, sweeping nprobe and
+efSearch. Recall is measured against exact (flat) search.
+
+Example:
+    python scripts/benchmark_vector_index.py --docs 1000000 --dim 384
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from amas.services.vector_index import (
+    FAISS_AVAILABLE,
+    VectorIndexConfig,
+    benchmark_indexes,
+    synthetic_corpus,
+)
+
+
+def _variants(args):
+    yield "flat", VectorIndexConfig(), {}
+    ivf = VectorIndexConfig(index_type="ivf", nlist=args.nlist)
+    for nprobe in args.nprobe:
+        yield "ivf", ivf, {"nprobe": nprobe}
+    if args.pq_m:
+        ivfpq = VectorIndexConfig(index_type="ivf", nlist=args.nlist, pq_m=args.pq_m)
+        for nprobe in args.nprobe:
+            yield f"ivfpq{args.pq_m}", ivfpq, {"nprobe": nprobe}
+    hnsw = VectorIndexConfig(index_type="hnsw", hnsw_m=args.hnsw_m, ef_construction=args.ef_construction)
+    for ef_search in args.ef_search:
+        yield "hnsw", hnsw, {"ef_search": ef_search}
+
+
+def main():
+    """Run the benchmark and print a recall/latency table"""
+    parser = argparse.ArgumentParser(description="AMAS vector index recall vs latency")
+    parser.add_argument("--docs", type=int, default=200_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to time")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (recall@k)")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (0: 4*sqrt(docs))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64], help="IVF nprobe sweep")
+    parser.add_argument("--pq-m", type=int, default=48, help="PQ sub-quantizers for IVF+PQ (0 to skip)")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW links per node")
+    parser.add_argument("--ef-construction", type=int, default=200, help="HNSW build candidate list")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256], help="HNSW efSearch sweep")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if not FAISS_AVAILABLE:
+        print("faiss is not installed (pip install faiss-cpu)")
+        sys.exit(1)
+
+    print(f"Building synthetic corpus: {args.docs:,} x {args.dim}")
+    # Queries are held-out draws from the same distribution as the corpus
+    vectors = synthetic_corpus(args.docs + args.queries, args.dim)
+    corpus, queries = vectors[:args.docs], vectors[args.docs:]
+    rows = benchmark_indexes(corpus, queries, _variants(args), k=args.k)
+
+    print("=" * 78)
+    print(f"{'index':10} {'knob':>14} | {'recall@' + str(args.k):>9} | {'ms/query':>9} | {'memory MB':>9} | {'build s':>7}")
+    print("-" * 78)
+    for row in rows:
+        knob = next((f"{name}={row[name]}" for name in ("nprobe", "ef_search") if name in row), "-")
+        print(f"{row['index']:10} {knob:>14} | {row['recall']:9.3f} | {row['latency_ms']:9.3f} | "
+              f"{row['memory_mb']:9.1f} | {row['build_s']:7.1f}")
+    print("=" * 78)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"docs": args.docs, "dim": args.dim, "k": args.k, "results": rows}, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,20 @@
 """
 Event Bus for Agent Communication
 Implements publish-subscribe pattern for asynchronous event handling
+
+Redis persistence is write-behind: publish only enqueues the event, and a
+background flusher writes batches to Redis in one pipelined transaction per
+flush window.
 """
 
 import asyncio
+import itertools
 import json
 import logging
-from collections import defaultdict
+import time
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
 
 from src.amas.agents.communication.message import MessagePriority
 
@@ -68,20 +74,44 @@ class EventBus:
     Implements publish-subscribe pattern with:
     - Multiple subscribers per event type
     - Priority-based event queue
-    - Event history (Redis-backed)
+    - Event history (Redis-backed, batched write-behind persistence)
     - Event filtering
     """
     
-    def __init__(self):
+    # Redis retention per event type
+    REDIS_HISTORY_LENGTH = 100
+    REDIS_HISTORY_TTL = 3600
+    
+    def __init__(
+        self,
+        persist_batch_size: int = 500,
+        persist_max_latency: float = 0.05,
+        persist_max_pending: int = 10000,
+    ):
+        """
+        Args:
+            persist_batch_size: Maximum events written to Redis per flush
+            persist_max_latency: Maximum seconds an event waits before flush
+            persist_max_pending: Events buffered for Redis before publish
+                blocks (backpressure when Redis is slow)
+        """
         # Subscribers: event_type -> set of handlers
         self._subscribers: Dict[str, Set[Callable]] = defaultdict(set)
         
         # Event history (in-memory, limited)
-        self._event_history: List[Event] = []
         self._max_history = 1000
+        self._event_history: Deque[Event] = deque(maxlen=self._max_history)
         
-        # Event queue (priority-based)
+        # Event queue (priority-based); the sequence number keeps FIFO order
+        # within a priority and avoids comparing Event objects
         self._event_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._event_sequence = itertools.count()
+        
+        # Write-behind Redis persistence
+        self._persist_batch_size = persist_batch_size
+        self._persist_max_latency = persist_max_latency
+        self._persist_queue: asyncio.Queue = asyncio.Queue(maxsize=persist_max_pending)
+        self._flush_task: Optional[asyncio.Task] = None
         
         # Processing flag
         self._processing = False
@@ -93,6 +123,9 @@ class EventBus:
         # Statistics
         self._events_published = 0
         self._events_processed = 0
+        self._events_persisted = 0
+        self._persist_batches = 0
+        self._persist_failures = 0
         
         logger.info("EventBus initialized")
     
@@ -167,16 +200,16 @@ class EventBus:
         # Add to event history
         self._add_to_history(event)
         
-        # Store in Redis if available
-        await self._store_in_redis(event)
-        
         # Add to priority queue
         # Lower priority value = higher priority in queue
         priority_value = self._get_priority_value(priority)
-        await self._event_queue.put((priority_value, event))
+        await self._event_queue.put((priority_value, next(self._event_sequence), event))
         
         self._events_published += 1
         
+        # Hand off to the Redis flusher; blocks only when the buffer is full
+        await self._store_in_redis(event)
+        
         # Start processing if not already running
         if not self._processing:
             await self.start_processing()
@@ -195,6 +228,7 @@ class EventBus:
     async def stop_processing(self) -> None:
         """Stop processing events"""
         self._processing = False
+        await self._stop_flusher()
         if self._processing_task:
             self._processing_task.cancel()
             try:
@@ -209,7 +243,7 @@ class EventBus:
             try:
                 # Get event from queue with timeout
                 try:
-                    priority_value, event = await asyncio.wait_for(
+                    _, _, event = await asyncio.wait_for(
                         self._event_queue.get(),
                         timeout=1.0
                     )
@@ -263,31 +297,101 @@ class EventBus:
                     logger.error(f"Handler error for event {event.event_type}: {result}")
     
     def _add_to_history(self, event: Event) -> None:
-        """Add event to history"""
+        """Add event to history (bounded deque drops the oldest event)"""
         self._event_history.append(event)
-        
-        # Trim history if too long
-        if len(self._event_history) > self._max_history:
-            self._event_history = self._event_history[-self._max_history:]
     
     async def _store_in_redis(self, event: Event) -> None:
-        """Store event in Redis"""
+        """Queue event for the background Redis flusher"""
         if not self._redis_client:
             return
         
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        # Bounded queue: waits here when Redis falls behind
+        await self._persist_queue.put(event)
+    
+    async def _flush_loop(self) -> None:
+        """Collect queued events into batches and write each batch to Redis"""
+        batch: List[Event] = []
+        while True:
+            try:
+                batch.append(await self._persist_queue.get())
+                deadline = time.monotonic() + self._persist_max_latency
+                
+                while len(batch) < self._persist_batch_size:
+                    if not self._persist_queue.empty():
+                        batch.append(self._persist_queue.get_nowait())
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(
+                            self._persist_queue.get(), remaining
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(event)
+                
+                await self._write_batch(batch)
+                batch = []
+                
+            except asyncio.CancelledError:
+                # Don't drop events already taken off the queue
+                if batch:
+                    await self._write_batch(batch)
+                break
+            except Exception as e:
+                batch = []
+                logger.error(f"Error in event persistence flusher: {e}")
+    
+    async def _write_batch(self, events: List[Event]) -> None:
+        """Write events to Redis grouped by type in one MULTI/EXEC pipeline"""
+        by_type: Dict[str, List[str]] = defaultdict(list)
+        for event in events:
+            by_type[event.event_type].append(json.dumps(event.to_dict()))
+        
         try:
-            key = f"event_bus:events:{event.event_type}"
-            value = json.dumps(event.to_dict())
-            
-            # Store with TTL (1 hour)
-            await self._redis_client.lpush(key, value)
-            await self._redis_client.expire(key, 3600)
+            async with self._redis_client.pipeline(transaction=True) as pipe:
+                for event_type, values in by_type.items():
+                    key = f"event_bus:events:{event_type}"
+                    # LPUSH pushes values left to right, so the newest event
+                    # ends up at the head as with one LPUSH per event
+                    pipe.lpush(key, *values)
+                    pipe.ltrim(key, 0, self.REDIS_HISTORY_LENGTH - 1)
+                    pipe.expire(key, self.REDIS_HISTORY_TTL)
+                await pipe.execute()
             
-            # Trim list to last 100 events
-            await self._redis_client.ltrim(key, 0, 99)
+            self._events_persisted += len(events)
+            self._persist_batches += 1
             
         except Exception as e:
-            logger.debug(f"Failed to store event in Redis: {e}")
+            self._persist_failures += len(events)
+            logger.debug(f"Failed to store {len(events)} events in Redis: {e}")
+    
+    async def flush(self) -> None:
+        """Write all events still waiting for Redis"""
+        batch: List[Event] = []
+        while not self._persist_queue.empty():
+            batch.append(self._persist_queue.get_nowait())
+            if len(batch) >= self._persist_batch_size:
+                await self._write_batch(batch)
+                batch = []
+        if batch:
+            await self._write_batch(batch)
+    
+    async def _stop_flusher(self) -> None:
+        """Stop the background flusher after draining pending events"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._redis_client:
+            await self.flush()
     
     async def get_event_history(
         self,
@@ -307,7 +411,7 @@ class EventBus:
         if event_type:
             events = [e for e in self._event_history if e.event_type == event_type]
         else:
-            events = self._event_history.copy()
+            events = list(self._event_history)
         
         return events[-limit:]
     
@@ -369,6 +473,10 @@ class EventBus:
             },
             "event_history_size": len(self._event_history),
             "redis_connected": self._redis_client is not None,
+            "events_persisted": self._events_persisted,
+            "events_pending_persistence": self._persist_queue.qsize(),
+            "persist_batches": self._persist_batches,
+            "persist_failures": self._persist_failures,
         }
 
 
@@ -13,6 +13,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List
 
+from .graph_algorithms import CompactGraph, centrality, connected_components
+
 
 class RelationshipType(Enum):
     """Types of relationships between entities"""
@@ -67,6 +69,9 @@ class LinkAnalysis:
             "max_relationship_depth": 3,
             "min_relationship_strength": 0.3,
             "max_entities_per_analysis": 1000,
+            # Components larger than this use sampled betweenness/closeness
+            "betweenness_exact_max_nodes": 1000,
+            "betweenness_sample_size": 128,
             "relationship_types": [rt.value for rt in RelationshipType],
             "centrality_algorithms": [
                 "degree",
@@ -418,131 +423,31 @@ Provide analysis in JSON format:
     ) -> Dict[str, Dict[str, float]]:
         """Calculate centrality measures for network nodes."""
         try:
-            centrality_measures = {}
-
-            for node, data in network.items():
-                # Degree centrality
-                degree_centrality = len(data["connections"])
-
-                # Betweenness centrality (simplified)
-                betweenness_centrality = self._calculate_betweenness_centrality(
-                    node, network
-                )
-
-                # Closeness centrality (simplified)
-                closeness_centrality = self._calculate_closeness_centrality(
-                    node, network
-                )
+            graph = self._compact_graph(network)
+            betweenness, closeness = centrality(
+                graph,
+                exact_max_nodes=self.config["betweenness_exact_max_nodes"],
+                sample_size=self.config["betweenness_sample_size"],
+            )
 
-                centrality_measures[node] = {
-                    "degree": degree_centrality,
-                    "betweenness": betweenness_centrality,
-                    "closeness": closeness_centrality,
+            return {
+                node: {
+                    "degree": graph.degree(i),
+                    "betweenness": betweenness[i],
+                    "closeness": closeness[i],
                 }
-
-            return centrality_measures
+                for i, node in enumerate(graph.nodes)
+            }
 
         except Exception as e:
             self.logger.error(f"Centrality calculation failed: {e}")
             return {}
 
-    def _calculate_betweenness_centrality(
-        self, node: str, network: Dict[str, Any]
-    ) -> float:
-        """Calculate betweenness centrality for a node."""
-        try:
-            # Simplified betweenness centrality calculation
-            total_paths = 0
-            paths_through_node = 0
-
-            # This is a simplified implementation
-            # In practice, you'd use a proper graph algorithm library
-            for source in network:
-                if source != node:
-                    for target in network:
-                        if target != node and target != source:
-                            total_paths += 1
-                            # Check if shortest path goes through node
-                            if self._is_on_shortest_path(source, target, node, network):
-                                paths_through_node += 1
-
-            if total_paths == 0:
-                return 0.0
-
-            return paths_through_node / total_paths
-
-        except Exception as e:
-            self.logger.error(f"Betweenness centrality calculation failed: {e}")
-            return 0.0
-
-    def _calculate_closeness_centrality(
-        self, node: str, network: Dict[str, Any]
-    ) -> float:
-        """Calculate closeness centrality for a node."""
-        try:
-            # Simplified closeness centrality calculation
-            total_distance = 0
-            reachable_nodes = 0
-
-            for target in network:
-                if target != node:
-                    distance = self._calculate_shortest_path_distance(
-                        node, target, network
-                    )
-                    if distance > 0:
-                        total_distance += distance
-                        reachable_nodes += 1
-
-            if reachable_nodes == 0:
-                return 0.0
-
-            return reachable_nodes / total_distance
-
-        except Exception as e:
-            self.logger.error(f"Closeness centrality calculation failed: {e}")
-            return 0.0
-
-    def _is_on_shortest_path(
-        self, source: str, target: str, node: str, network: Dict[str, Any]
-    ) -> bool:
-        """Check if node is on shortest path between source and target."""
-        try:
-            # Simplified shortest path check
-            # In practice, you'd use BFS or Dijkstra's algorithm
-            if (
-                node in network[source]["connections"]
-                and target in network[node]["connections"]
-            ):
-                return True
-
-            return False
-
-        except Exception as e:
-            self.logger.error(f"Shortest path check failed: {e}")
-            return False
-
-    def _calculate_shortest_path_distance(
-        self, source: str, target: str, network: Dict[str, Any]
-    ) -> int:
-        """Calculate shortest path distance between two nodes."""
-        try:
-            # Simplified BFS implementation
-            if source == target:
-                return 0
-
-            if target in network[source]["connections"]:
-                return 1
-
-            # Simple 2-hop check
-            for intermediate in network[source]["connections"]:
-                if target in network[intermediate]["connections"]:
-                    return 2
-
-            return 3  # Default for unreachable nodes
-
-        except Exception as e:
-            self.logger.error(f"Shortest path distance calculation failed: {e}")
-            return 0
+    def _compact_graph(self, network: Dict[str, Any]) -> CompactGraph:
+        """Convert the entity network to an integer-indexed graph."""
+        return CompactGraph.from_adjacency(
+            {node: data["connections"] for node, data in network.items()}
+        )
 
     def _identify_key_nodes(
         self, network: Dict[str, Any], centrality_measures: Dict[str, Dict[str, float]]
@@ -616,46 +521,17 @@ Provide analysis in JSON format:
     def _identify_clusters(self, network: Dict[str, Any]) -> List[List[str]]:
         """Identify clusters in the network."""
         try:
-            clusters = []
-            visited = set()
-
-            for node in network:
-                if node not in visited:
-                    cluster = self._dfs_cluster(node, network, visited)
-                    if len(cluster) > 1:  # Only include clusters with multiple nodes
-                        clusters.append(cluster)
-
-            return clusters
+            graph = self._compact_graph(network)
+            return [
+                [graph.nodes[i] for i in members]
+                for members in connected_components(graph)
+                if len(members) > 1  # Only include clusters with multiple nodes
+            ]
 
         except Exception as e:
             self.logger.error(f"Cluster identification failed: {e}")
             return []
 
-    def _dfs_cluster(
-        self, start_node: str, network: Dict[str, Any], visited: set
-    ) -> List[str]:
-        """DFS to find cluster starting from a node."""
-        try:
-            cluster = []
-            stack = [start_node]
-
-            while stack:
-                node = stack.pop()
-                if node not in visited:
-                    visited.add(node)
-                    cluster.append(node)
-
-                    # Add connected nodes to stack
-                    for connected in network[node]["connections"]:
-                        if connected not in visited:
-                            stack.append(connected)
-
-            return cluster
-
-        except Exception as e:
-            self.logger.error(f"DFS cluster search failed: {e}")
-            return []
-
     def _classify_network_type(self, density: float, average_degree: float) -> str:
         """Classify the type of network based on structure."""
         try:
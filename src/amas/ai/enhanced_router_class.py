@@ -6,7 +6,9 @@ Implements PART_3 requirements with circuit breaker, health monitoring, and stra
 import logging
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.amas.ai.streaming import emit_token, get_token_sink
 
 logger = logging.getLogger(__name__)
 
@@ -234,6 +236,16 @@ class EnhancedAIRouter:
         last_error = None
         attempt_number = 0
         
+        # Count tokens delivered to the caller's sink, so a retry after a
+        # partially streamed attempt can tell the client to discard them
+        sink = get_token_sink()
+        tokens_streamed = 0
+        
+        async def counting_sink(event: Dict[str, Any]):
+            nonlocal tokens_streamed
+            tokens_streamed += 1
+            await emit_token(sink, event)
+        
         # Try each provider
         for provider in healthy_providers:
             attempt_number += 1
@@ -243,14 +255,25 @@ class EnhancedAIRouter:
                 
                 # Call the underlying generate_with_fallback from enhanced_router_v2
                 # This will try all available providers in order, starting with the preferred one
-                result = await generate_with_fallback(
-                    prompt=prompt,
-                    system_prompt=system_prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    timeout=45.0,
-                    session=None  # Let it create its own session
-                )
+                if sink is not None:
+                    if tokens_streamed:
+                        # The client already holds partial output from a failed
+                        # attempt: have it start over before the retry streams
+                        await emit_token(sink, {"provider": provider, "delta": "", "reset": True})
+                        tokens_streamed = 0
+                    # A caller is listening for tokens: stream them as they arrive
+                    result = await self._stream_to_sink(
+                        counting_sink, prompt, system_prompt, max_tokens, temperature
+                    )
+                else:
+                    result = await generate_with_fallback(
+                        prompt=prompt,
+                        system_prompt=system_prompt,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=45.0,
+                        session=None  # Let it create its own session
+                    )
                 
                 # Extract the actual provider used from result
                 actual_provider = result.get("provider", provider)
@@ -332,6 +355,68 @@ class EnhancedAIRouter:
             f"Last error: {last_error}"
         )
     
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an AI response token by token with provider fallback
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0.0-1.0)
+            system_prompt: System prompt (optional)
+        
+        Yields:
+            "token" events with each text delta, then a final "done" or
+            "error" event (see ``enhanced_router_v2.stream_with_fallback``)
+        """
+        from src.amas.ai.enhanced_router_v2 import stream_with_fallback
+        
+        async for event in stream_with_fallback(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=45.0,
+        ):
+            if event["type"] == "done":
+                provider = event["provider"]
+                self.circuit_breakers.setdefault(provider, CircuitBreaker()).record_success()
+                self._record_success(provider, event)
+            yield event
+    
+    async def _stream_to_sink(
+        self,
+        sink,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+    ) -> Dict[str, Any]:
+        """Stream a generation into ``sink`` and return the final result"""
+        from src.amas.ai.enhanced_router_v2 import stream_with_fallback
+        
+        result = {"success": False, "error": "Stream ended without a result"}
+        async for event in stream_with_fallback(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=45.0,
+        ):
+            if event["type"] == "token":
+                await emit_token(
+                    sink, {"provider": event["provider"], "delta": event["content"]}
+                )
+            else:
+                result = event
+        return result
+    
     def _record_success(self, provider_name: str, result: Dict[str, Any]):
         """Record successful API call for analytics"""
         
@@ -5,14 +5,20 @@ Intelligent fallback system with OpenRouter support for all providers
 """
 
 import asyncio
+import json
 import logging
 import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import aiohttp
 
+from .hedging import HEDGE_STRATEGIES, get_latency_tracker, race_providers
+from .provider_scoring import get_provider_scorer
+from .provider_transport import get_provider_transport
+from .streaming import estimate_tokens, iter_ndjson, iter_sse_data
+
 logger = logging.getLogger("amas.ai.enhanced_router")
 
 # OpenAI client for OpenRouter compatibility
@@ -461,10 +467,7 @@ async def call_openrouter_provider(
             }
     else:
         # Use OpenAI-compatible client
-        client = AsyncOpenAI(
-            base_url=config.base_url,
-            api_key=api_key,
-        )
+        client = get_provider_transport().openai_client(config.base_url, api_key)
         
         response = await client.chat.completions.create(
             model=config.model,
@@ -500,7 +503,9 @@ async def call_groq_provider(
     if not GROQ_AVAILABLE:
         raise Exception("Groq SDK not installed")
     
-    client = AsyncGroq(api_key=api_key)
+    client = get_provider_transport().sdk_client(
+        "groq", api_key, lambda **kw: AsyncGroq(api_key=api_key, **kw), base_url=config.base_url
+    )
     
     response = await client.chat.completions.create(
         model=config.model,
@@ -532,9 +537,17 @@ async def call_cerebras_provider(
     if not CEREBRAS_AVAILABLE:
         raise Exception("Cerebras SDK not installed")
     
-    client = Cerebras(api_key=api_key)
+    client = get_provider_transport().sdk_client(
+        "cerebras",
+        api_key,
+        lambda **kw: Cerebras(api_key=api_key, **kw),
+        base_url=config.base_url,
+        asynchronous=False,
+    )
     
-    response = client.chat.completions.create(
+    # The Cerebras SDK client is synchronous; keep it off the event loop
+    response = await asyncio.to_thread(
+        client.chat.completions.create,
         model=config.model,
         messages=messages,
         stream=False,
@@ -551,6 +564,21 @@ async def call_cerebras_provider(
     }
 
 
+def _gemini_model(api_key: str, model_name: str):
+    """Get a cached Gemini model for ``api_key``.
+
+    The SDK has no pluggable HTTP client, but a model keeps the client it
+    creates on first use, so reusing the model reuses its connection.
+    """
+    def build():
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
+
+    return get_provider_transport().sdk_client(
+        f"gemini:{model_name}", api_key, build, pooled_http=False
+    )
+
+
 async def call_gemini_provider(
     provider_id: str,
     messages: List[Dict[str, str]],
@@ -565,8 +593,7 @@ async def call_gemini_provider(
     if not GEMINI_AVAILABLE:
         raise Exception("Google Generative AI SDK not installed")
     
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(config.model)
+    model = _gemini_model(api_key, config.model)
     
     # Convert messages to Gemini format
     user_content = "\n".join([msg["content"] for msg in messages if msg["role"] == "user"])
@@ -650,10 +677,7 @@ async def call_openai_compatible_provider(
                 "tokens_used": tokens,
             }
     else:
-        client = AsyncOpenAI(
-            base_url=config.base_url,
-            api_key=api_key,
-        )
+        client = get_provider_transport().openai_client(config.base_url, api_key)
         
         # NVIDIA-specific parameters
         extra_params = {}
@@ -804,10 +828,16 @@ async def generate_with_fallback(
     temperature: float = 0.7,
     timeout: float = 45.0,
     session: Optional[aiohttp.ClientSession] = None,
+    strategy: str = "sequential",
+    hedge_delay: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Generate AI response with intelligent fallback across all providers.
     
+    strategy="hedged" (or "race") starts the next provider once the current
+    one runs past its observed p95 latency (or ``hedge_delay`` seconds) and
+    keeps the first success; the default tries providers one at a time.
+    
     Returns:
         Dict with:
         - success: bool
@@ -829,18 +859,21 @@ async def generate_with_fallback(
             "attempts": [],
         }
     
+    # Try providers with the best live latency/error record first
+    available_providers = get_provider_scorer().order(available_providers)
+    
     attempts = []
-    last_error = None
     
     if session is None:
-        async with aiohttp.ClientSession() as temp_session:
-            return await _try_providers(
-                available_providers, messages, max_tokens, temperature, timeout, temp_session, attempts
-            )
-    else:
-        return await _try_providers(
-            available_providers, messages, max_tokens, temperature, timeout, session, attempts
+        session = get_provider_transport().session
+    if strategy in HEDGE_STRATEGIES:
+        return await _race_providers(
+            available_providers, messages, max_tokens, temperature, timeout, session, attempts,
+            hedge_delay=hedge_delay,
         )
+    return await _try_providers(
+        available_providers, messages, max_tokens, temperature, timeout, session, attempts
+    )
 
 
 async def call_ollama_provider(
@@ -868,11 +901,11 @@ async def call_ollama_provider(
     # First, try to get list of available models from Ollama
     available_models = []
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            response = await client.get(f"{base_url_clean}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
+        async with session.get(
+            f"{base_url_clean}/api/tags", timeout=aiohttp.ClientTimeout(total=2.0)
+        ) as response:
+            if response.status == 200:
+                data = await response.json()
                 available_models = [model.get("name", "") for model in data.get("models", [])]
                 if available_models:
                     logger.info(f"✅ Found {len(available_models)} Ollama models: {', '.join(available_models[:5])}")
@@ -1026,6 +1059,72 @@ async def call_ollama_provider(
     raise Exception(error_msg)
 
 
+def _record_outcome(
+    provider_id: str,
+    elapsed_ms: float,
+    error: Optional[BaseException] = None,
+    result: Optional[Dict[str, Any]] = None,
+):
+    """Feed one request outcome to the adaptive provider scorer."""
+    message = str(error).lower() if error is not None else ""
+    get_provider_scorer().record(
+        provider_id,
+        success=error is None,
+        latency_ms=elapsed_ms,
+        rate_limited="429" in message or "rate limit" in message,
+        tokens_used=(result or {}).get("tokens_used") or 0,
+    )
+
+
+def _resolve_provider_config(provider_id: str) -> Optional[ProviderConfig]:
+    """Get a provider's config, building Ollama's on demand."""
+    # Handle Ollama specially (may not be in PROVIDER_CONFIGS if not initialized)
+    if provider_id == "ollama" and provider_id not in PROVIDER_CONFIGS:
+        return ProviderConfig(
+            name="Ollama",
+            api_key_env="",
+            model=os.getenv("OLLAMA_MODEL", "llama3.2"),
+            base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
+            provider_type="ollama",
+            priority=100,
+        )
+    if provider_id not in PROVIDER_CONFIGS:
+        logger.warning(f"Provider {provider_id} not found in PROVIDER_CONFIGS, skipping")
+        return None
+    return PROVIDER_CONFIGS[provider_id]
+
+
+async def _call_provider(
+    provider_id: str,
+    config: ProviderConfig,
+    messages: List[Dict[str, str]],
+    session: aiohttp.ClientSession,
+    max_tokens: int,
+    temperature: float,
+) -> Dict[str, Any]:
+    """Dispatch one request to a provider by its type."""
+    if config.provider_type == "ollama":
+        return await call_ollama_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "openrouter":
+        return await call_openrouter_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "groq":
+        return await call_groq_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "cerebras":
+        return await call_cerebras_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "gemini":
+        if not GEMINI_AVAILABLE:
+            raise ImportError("Google Generative AI not available (Python 3.13 OpenSSL compatibility issue). Skipping Gemini provider.")
+        return await call_gemini_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "openai_compatible":
+        return await call_openai_compatible_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "anthropic":
+        return await call_anthropic_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature)
+    elif config.provider_type == "cohere":
+        return await call_cohere_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature)
+    else:
+        raise ValueError(f"Unknown provider type: {config.provider_type}")
+
+
 async def _try_providers(
     providers: List[str],
     messages: List[Dict[str, str]],
@@ -1036,75 +1135,22 @@ async def _try_providers(
     attempts: List[Dict[str, Any]],
 ) -> Dict[str, Any]:
     """Try each provider in priority order."""
+    last_error = None
     for provider_id in providers:
-        # Handle Ollama specially (may not be in PROVIDER_CONFIGS if not initialized)
-        if provider_id == "ollama":
-            if provider_id not in PROVIDER_CONFIGS:
-                # Create temporary config for Ollama
-                config = ProviderConfig(
-                    name="Ollama",
-                    api_key_env="",
-                    model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-                    base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
-                    provider_type="ollama",
-                    priority=100,
-                )
-            else:
-                config = PROVIDER_CONFIGS[provider_id]
-        else:
-            if provider_id not in PROVIDER_CONFIGS:
-                logger.warning(f"Provider {provider_id} not found in PROVIDER_CONFIGS, skipping")
-                continue
-            config = PROVIDER_CONFIGS[provider_id]
+        config = _resolve_provider_config(provider_id)
+        if config is None:
+            continue
         start_time = time.time()
         
         try:
-            if config.provider_type == "ollama":
-                result = await asyncio.wait_for(
-                    call_ollama_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "openrouter":
-                result = await asyncio.wait_for(
-                    call_openrouter_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "groq":
-                result = await asyncio.wait_for(
-                    call_groq_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "cerebras":
-                result = await asyncio.wait_for(
-                    call_cerebras_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "gemini":
-                if not GEMINI_AVAILABLE:
-                    raise ImportError("Google Generative AI not available (Python 3.13 OpenSSL compatibility issue). Skipping Gemini provider.")
-                result = await asyncio.wait_for(
-                    call_gemini_provider(provider_id, messages, config, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "openai_compatible":
-                result = await asyncio.wait_for(
-                    call_openai_compatible_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "anthropic":
-                result = await asyncio.wait_for(
-                    call_anthropic_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            elif config.provider_type == "cohere":
-                result = await asyncio.wait_for(
-                    call_cohere_provider(provider_id, messages, config, session, max_tokens=max_tokens, temperature=temperature),
-                    timeout=timeout,
-                )
-            else:
-                raise ValueError(f"Unknown provider type: {config.provider_type}")
+            result = await asyncio.wait_for(
+                _call_provider(provider_id, config, messages, session, max_tokens, temperature),
+                timeout=timeout,
+            )
             
             elapsed = time.time() - start_time
+            get_latency_tracker().record(provider_id, elapsed * 1000)
+            _record_outcome(provider_id, elapsed * 1000, result=result)
             attempts.append({
                 "provider": provider_id,
                 "status": "success",
@@ -1114,8 +1160,9 @@ async def _try_providers(
             result["attempts"] = attempts
             return result
             
-        except asyncio.TimeoutError:
+        except asyncio.TimeoutError as e:
             elapsed = time.time() - start_time
+            _record_outcome(provider_id, elapsed * 1000, error=e)
             attempts.append({
                 "provider": provider_id,
                 "status": "timeout",
@@ -1126,6 +1173,7 @@ async def _try_providers(
             
         except Exception as e:
             elapsed = time.time() - start_time
+            _record_outcome(provider_id, elapsed * 1000, error=e)
             error_msg = str(e)
             attempts.append({
                 "provider": provider_id,
@@ -1144,6 +1192,494 @@ async def _try_providers(
     }
 
 
+# Provider types whose adapters call a synchronous SDK in a worker thread
+BLOCKING_PROVIDER_TYPES = frozenset({"cerebras"})
+
+
+async def _race_providers(
+    providers: List[str],
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    timeout: float,
+    session: aiohttp.ClientSession,
+    attempts: List[Dict[str, Any]],
+    hedge_delay: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Race providers with hedged requests, cancelling the losers.
+
+    Providers served by a synchronous SDK run in a worker thread, which
+    cancelling cannot stop, so a cancelled hedge would still spend their
+    budget. They are left out of the race and only tried one at a time,
+    after every raced provider has failed.
+    """
+    configs = {}
+    blocking = []
+    for provider_id in providers:
+        config = _resolve_provider_config(provider_id)
+        if config is None:
+            continue
+        if config.provider_type in BLOCKING_PROVIDER_TYPES:
+            blocking.append(provider_id)
+        else:
+            configs[provider_id] = config
+    
+    outcome = await race_providers(
+        list(configs),
+        lambda provider_id: asyncio.wait_for(
+            _call_provider(provider_id, configs[provider_id], messages, session, max_tokens, temperature),
+            timeout=timeout,
+        ),
+        hedge_delay=hedge_delay,
+        timeout=timeout,
+    )
+    
+    for attempt in outcome.attempts:
+        if attempt.status != "cancelled":
+            _record_outcome(
+                attempt.provider,
+                attempt.elapsed_ms,
+                error=attempt.error or (asyncio.TimeoutError() if attempt.status == "timeout" else None),
+                result=outcome.result if attempt.status == "success" else None,
+            )
+        entry = {
+            "provider": attempt.provider,
+            "status": attempt.status,
+            "elapsed_ms": attempt.elapsed_ms,
+            "hedge": attempt.hedge,
+        }
+        if isinstance(attempt.error, asyncio.TimeoutError):
+            entry["status"] = "timeout"
+            entry["error"] = "Request timeout"
+        elif attempt.error is not None:
+            entry["error"] = str(attempt.error)
+            logger.warning(f"Provider {attempt.provider} failed: {attempt.error}")
+        attempts.append(entry)
+    
+    if outcome.winner is None and blocking:
+        result = await _try_providers(
+            blocking, messages, max_tokens, temperature, timeout, session, attempts
+        )
+        result["strategy"] = "hedged"
+        result["hedge"] = outcome.summary()
+        return result
+    
+    if outcome.winner is None:
+        failed = [a for a in attempts if a["status"] != "cancelled"]
+        last_error = failed[-1].get("error") if failed else None
+        return {
+            "success": False,
+            "error": f"All providers failed. Last error: {last_error}",
+            "attempts": attempts,
+            "strategy": "hedged",
+            "hedge": outcome.summary(),
+        }
+    
+    result = outcome.result
+    result["attempts"] = attempts
+    result["strategy"] = "hedged"
+    result["hedge"] = outcome.summary()
+    return result
+
+
+# Streaming adapters: async generators yielding text deltas as they arrive.
+# Errors are raised from the generator, so a stream that fails before its
+# first chunk can still fall back to the next provider. Token counts reported
+# by the provider are written into the optional ``usage`` dict as
+# ``prompt_tokens``/``completion_tokens``/``total_tokens``.
+
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://github.com/over7-maker/Advanced-Multi-Agent-Intelligence-System",
+    "X-Title": "AMAS Project",
+}
+
+
+async def stream_openai_compatible_provider(
+    provider_id: str,
+    messages: List[Dict[str, str]],
+    config: ProviderConfig,
+    session: aiohttp.ClientSession,
+    usage: Optional[Dict[str, int]] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream an OpenAI-compatible (or OpenRouter) chat completion."""
+    api_key = get_api_key(config.api_key_env)
+    if not api_key:
+        raise ValueError(f"{config.api_key_env} not found")
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    if config.provider_type == "openrouter":
+        headers.update(OPENROUTER_HEADERS)
+
+    body = {
+        "model": config.model,
+        "messages": messages,
+        "max_tokens": kwargs.get("max_tokens", 2000),
+        "temperature": kwargs.get("temperature", 0.7),
+        "stream": True,
+        # Ask for a final chunk carrying the token usage
+        "stream_options": {"include_usage": True},
+    }
+
+    url = f"{config.base_url}/chat/completions"
+    async with session.post(url, headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=None, sock_read=45)) as resp:
+        if resp.status >= 400:
+            error_text = await resp.text()
+            raise Exception(f"{provider_id} {resp.status}: {error_text}")
+
+        async for data in iter_sse_data(resp):
+            event = json.loads(data)
+            if event.get("usage") and usage is not None:
+                usage.update({
+                    key: event["usage"][key]
+                    for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+                    if event["usage"].get(key) is not None
+                })
+            choices = event.get("choices") or []
+            if choices:
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+async def stream_anthropic_provider(
+    provider_id: str,
+    messages: List[Dict[str, str]],
+    config: ProviderConfig,
+    session: aiohttp.ClientSession,
+    usage: Optional[Dict[str, int]] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream an Anthropic Claude message."""
+    api_key = get_api_key(config.api_key_env)
+    if not api_key:
+        raise ValueError(f"{config.api_key_env} not found")
+
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "Content-Type": "application/json",
+    }
+
+    system_msg = next((msg["content"] for msg in messages if msg["role"] == "system"), None)
+    user_msgs = [{"role": msg["role"], "content": msg["content"]} for msg in messages if msg["role"] != "system"]
+
+    body = {
+        "model": config.model,
+        "messages": user_msgs,
+        "max_tokens": kwargs.get("max_tokens", 2000),
+        "temperature": kwargs.get("temperature", 0.7),
+        "stream": True,
+    }
+    if system_msg:
+        body["system"] = system_msg
+
+    url = f"{config.base_url or 'https://api.anthropic.com/v1'}/messages"
+    async with session.post(url, headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=None, sock_read=45)) as resp:
+        if resp.status >= 400:
+            error_text = await resp.text()
+            raise Exception(f"Claude {resp.status}: {error_text}")
+
+        async for data in iter_sse_data(resp):
+            event = json.loads(data)
+            if event.get("type") == "content_block_delta":
+                text = (event.get("delta") or {}).get("text")
+                if text:
+                    yield text
+            elif event.get("type") == "message_start" and usage is not None:
+                input_tokens = ((event.get("message") or {}).get("usage") or {}).get("input_tokens")
+                if input_tokens is not None:
+                    usage["prompt_tokens"] = input_tokens
+            elif event.get("type") == "message_delta" and usage is not None:
+                output_tokens = (event.get("usage") or {}).get("output_tokens")
+                if output_tokens is not None:
+                    usage["completion_tokens"] = output_tokens
+            elif event.get("type") == "error":
+                raise Exception(f"Claude stream error: {event.get('error')}")
+
+
+async def stream_gemini_provider(
+    provider_id: str,
+    messages: List[Dict[str, str]],
+    config: ProviderConfig,
+    usage: Optional[Dict[str, int]] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream a Gemini completion through the SDK."""
+    api_key = get_api_key(config.api_key_env)
+    if not api_key:
+        raise ValueError(f"{config.api_key_env} not found")
+
+    if not GEMINI_AVAILABLE:
+        raise ImportError("Google Generative AI not available. Skipping Gemini provider.")
+
+    model = _gemini_model(api_key, config.model)
+
+    user_content = "\n".join([msg["content"] for msg in messages if msg["role"] == "user"])
+    system_content = "\n".join([msg["content"] for msg in messages if msg["role"] == "system"])
+    prompt = f"{system_content}\n\n{user_content}" if system_content else user_content
+
+    response = await model.generate_content_async(
+        prompt,
+        generation_config={
+            "temperature": kwargs.get("temperature", 0.7),
+            "max_output_tokens": kwargs.get("max_tokens", 2000),
+        },
+        stream=True,
+    )
+    async for chunk in response:
+        metadata = getattr(chunk, "usage_metadata", None)
+        if metadata and usage is not None:
+            usage["prompt_tokens"] = getattr(metadata, "prompt_token_count", 0) or 0
+            usage["completion_tokens"] = getattr(metadata, "candidates_token_count", 0) or 0
+            usage["total_tokens"] = getattr(metadata, "total_token_count", 0) or 0
+        if chunk.text:
+            yield chunk.text
+
+
+async def stream_ollama_provider(
+    provider_id: str,
+    messages: List[Dict[str, str]],
+    config: ProviderConfig,
+    session: aiohttp.ClientSession,
+    usage: Optional[Dict[str, int]] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream from Ollama's native /api/chat endpoint (NDJSON)."""
+    base_url = (config.base_url or "http://localhost:11434").replace('/v1', '').rstrip('/')
+    if not base_url.startswith('http'):
+        base_url = f"http://{base_url}"
+
+    body = {
+        "model": config.model,
+        "messages": [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in messages
+            if msg["role"] in ["user", "assistant", "system"]
+        ],
+        "stream": True,
+        "options": {"temperature": kwargs.get("temperature", 0.7)},
+    }
+
+    async with session.post(f"{base_url}/api/chat", json=body, timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as resp:
+        if resp.status >= 400:
+            error_text = await resp.text()
+            raise Exception(f"Ollama {resp.status}: {error_text}")
+
+        async for data in iter_ndjson(resp):
+            if data.get("error"):
+                raise Exception(f"Ollama stream error: {data['error']}")
+            content = (data.get("message") or {}).get("content")
+            if content:
+                yield content
+            if data.get("done"):
+                if usage is not None:
+                    if data.get("prompt_eval_count") is not None:
+                        usage["prompt_tokens"] = data["prompt_eval_count"]
+                    if data.get("eval_count") is not None:
+                        usage["completion_tokens"] = data["eval_count"]
+                return
+
+
+async def _stream_provider(
+    provider_id: str,
+    config: ProviderConfig,
+    messages: List[Dict[str, str]],
+    session: aiohttp.ClientSession,
+    max_tokens: int,
+    temperature: float,
+    usage: Optional[Dict[str, int]] = None,
+) -> AsyncIterator[str]:
+    """Dispatch a streaming request to a provider by its type.
+
+    Providers without a streaming adapter (Groq, Cerebras, Cohere) yield
+    their complete response as a single chunk.
+    """
+    kwargs = {"max_tokens": max_tokens, "temperature": temperature, "usage": usage}
+    if config.provider_type in ("openrouter", "openai_compatible"):
+        stream = stream_openai_compatible_provider(provider_id, messages, config, session, **kwargs)
+    elif config.provider_type == "anthropic":
+        stream = stream_anthropic_provider(provider_id, messages, config, session, **kwargs)
+    elif config.provider_type == "gemini":
+        stream = stream_gemini_provider(provider_id, messages, config, **kwargs)
+    elif config.provider_type == "ollama":
+        stream = stream_ollama_provider(provider_id, messages, config, session, **kwargs)
+    else:
+        result = await _call_provider(provider_id, config, messages, session, max_tokens, temperature)
+        if result.get("tokens_used") and usage is not None:
+            usage["total_tokens"] = result["tokens_used"]
+        if result.get("content"):
+            yield result["content"]
+        return
+
+    async for chunk in stream:
+        yield chunk
+
+
+def _stream_tokens_used(
+    usage: Dict[str, int],
+    messages: List[Dict[str, str]],
+    content: str,
+) -> int:
+    """Total tokens for a finished stream, estimating any count not reported."""
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    prompt_tokens = usage.get("prompt_tokens")
+    if prompt_tokens is None:
+        prompt_tokens = estimate_tokens("\n".join(msg["content"] for msg in messages))
+    completion_tokens = usage.get("completion_tokens")
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(content)
+    return prompt_tokens + completion_tokens
+
+
+async def stream_with_fallback(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 2000,
+    temperature: float = 0.7,
+    timeout: float = 45.0,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream an AI response token by token with provider fallback.
+
+    Providers are tried in the same order as ``generate_with_fallback``. A
+    provider that fails (or times out) or ends without output before its
+    first chunk is skipped; once a chunk has been yielded the stream is
+    committed to that provider. ``tokens_used`` comes from the provider's
+    reported usage, or is estimated from the text when none is reported.
+
+    Yields:
+        Dicts with ``type``:
+        - "token": ``provider`` and ``content`` (the text delta)
+        - "done": the same fields as ``generate_with_fallback``'s result
+        - "error": ``error``, ``attempts`` and any ``content`` received
+    """
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    available_providers = get_available_providers()
+    if not available_providers:
+        yield {
+            "type": "error",
+            "success": False,
+            "error": "No API keys configured. Please add at least one API key to GitHub Secrets.",
+            "attempts": [],
+        }
+        return
+
+    if session is None:
+        session = get_provider_transport().session
+
+    attempts = []
+    last_error = None
+    for provider_id in get_provider_scorer().order(available_providers):
+        config = _resolve_provider_config(provider_id)
+        if config is None:
+            continue
+        start_time = time.time()
+        usage: Dict[str, int] = {}
+        stream = _stream_provider(provider_id, config, messages, session, max_tokens, temperature, usage)
+
+        try:
+            first = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+        except StopAsyncIteration:
+            # A stream with no output is a failed attempt, not an empty answer
+            elapsed = time.time() - start_time
+            error = Exception("stream ended without any content")
+            _record_outcome(provider_id, elapsed * 1000, error=error)
+            attempts.append({
+                "provider": provider_id,
+                "status": "empty",
+                "elapsed_ms": int(elapsed * 1000),
+                "error": str(error),
+            })
+            last_error = f"{provider_id}: {error}"
+            logger.warning(f"Provider {provider_id} stream ended without any content")
+            continue
+        except Exception as e:
+            await stream.aclose()
+            elapsed = time.time() - start_time
+            _record_outcome(provider_id, elapsed * 1000, error=e)
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            attempts.append({
+                "provider": provider_id,
+                "status": "timeout" if timed_out else "error",
+                "elapsed_ms": int(elapsed * 1000),
+                "error": "Request timeout" if timed_out else str(e),
+            })
+            last_error = f"{provider_id} timeout" if timed_out else f"{provider_id}: {e}"
+            logger.warning(f"Provider {provider_id} failed before first chunk: {last_error}")
+            continue
+
+        first_token_ms = int((time.time() - start_time) * 1000)
+        chunks = []
+        try:
+            chunks.append(first)
+            yield {"type": "token", "provider": provider_id, "content": first}
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield {"type": "token", "provider": provider_id, "content": chunk}
+        except Exception as e:
+            elapsed = time.time() - start_time
+            _record_outcome(provider_id, elapsed * 1000, error=e)
+            attempts.append({
+                "provider": provider_id,
+                "status": "error",
+                "elapsed_ms": int(elapsed * 1000),
+                "first_token_ms": first_token_ms,
+                "error": str(e),
+            })
+            logger.warning(f"Provider {provider_id} stream failed mid-response: {e}")
+            yield {
+                "type": "error",
+                "success": False,
+                "provider": provider_id,
+                "content": "".join(chunks),
+                "error": f"{provider_id} stream interrupted: {e}",
+                "attempts": attempts,
+            }
+            return
+        finally:
+            await stream.aclose()
+
+        content = "".join(chunks)
+        tokens_used = _stream_tokens_used(usage, messages, content)
+        elapsed = time.time() - start_time
+        get_latency_tracker().record(provider_id, elapsed * 1000)
+        _record_outcome(provider_id, elapsed * 1000, result={"tokens_used": tokens_used})
+        attempts.append({
+            "provider": provider_id,
+            "status": "success",
+            "elapsed_ms": int(elapsed * 1000),
+            "first_token_ms": first_token_ms,
+        })
+        yield {
+            "type": "done",
+            "success": True,
+            "provider": provider_id,
+            "content": content,
+            "model": config.model,
+            "tokens_used": tokens_used,
+            "attempts": attempts,
+        }
+        return
+
+    yield {
+        "type": "error",
+        "success": False,
+        "error": f"All providers failed. Last error: {last_error}",
+        "attempts": attempts,
+    }
+
+
 # Main function for backward compatibility
 async def generate(
     prompt: str,
@@ -1151,11 +1687,11 @@ async def generate(
     max_tokens: int = 2000,
     temperature: float = 0.7,
     timeout: float = 45.0,
+    strategy: str = "sequential",
 ) -> Dict[str, Any]:
     """Main generate function with fallback."""
-    async with aiohttp.ClientSession() as session:
-        return await generate_with_fallback(
-            prompt, system_prompt, max_tokens, temperature, timeout, session
-        )
+    return await generate_with_fallback(
+        prompt, system_prompt, max_tokens, temperature, timeout, strategy=strategy
+    )
 
 
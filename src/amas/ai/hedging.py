@@ -0,0 +1,207 @@
+"""
+Hedged provider requests for latency-optimized AI generation
+
+Fires the top provider, launches a hedge request to the next provider once
+the primary has been in flight longer than its observed p95 (or a fixed
+delay), takes the first successful response and cancels the losers. Hedge
+delays come from rolling per-provider latency windows shared by all
+routers.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger("amas.ai.hedging")
+
+DEFAULT_HEDGE_DELAY = 2.0  # Seconds, used until a provider has enough samples
+MIN_HEDGE_DELAY = 0.05
+HEDGE_STRATEGIES = ("hedged", "race")
+
+
+class ProviderLatencyTracker:
+    """Rolling per-provider latency windows"""
+
+    def __init__(self, window: int = 200, min_samples: int = 5):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, provider: str, elapsed_ms: float):
+        """Record a successful request's latency"""
+        samples = self._samples.get(provider)
+        if samples is None:
+            samples = self._samples[provider] = deque(maxlen=self.window)
+        samples.append(elapsed_ms)
+
+    def percentile(self, provider: str, percentile: float) -> Optional[float]:
+        """Get a latency percentile in ms, or None without enough samples"""
+        samples = self._samples.get(provider)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+    def hedge_delay(self, provider: str, default: float = DEFAULT_HEDGE_DELAY) -> float:
+        """Seconds to wait on ``provider`` before hedging to the next one"""
+        p95 = self.percentile(provider, 95)
+        if p95 is None:
+            return default
+        return max(MIN_HEDGE_DELAY, p95 / 1000)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-provider latency percentiles"""
+        return {
+            provider: {
+                "samples": len(samples),
+                "p50_ms": self.percentile(provider, 50),
+                "p95_ms": self.percentile(provider, 95),
+            }
+            for provider, samples in self._samples.items()
+        }
+
+
+@dataclass
+class RaceAttempt:
+    """One provider request made during a race"""
+
+    provider: str
+    status: str  # 'success' | 'error' | 'cancelled' | 'timeout'
+    elapsed_ms: int
+    hedge: bool = False
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class RaceOutcome:
+    """Result of racing providers"""
+
+    winner: Optional[str] = None
+    result: Any = None
+    attempts: List[RaceAttempt] = field(default_factory=list)
+    hedges_launched: int = 0
+    # Time spent on losing requests cancelled once the winner returned
+    hedge_spent_ms: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "winner": self.winner,
+            "hedges_launched": self.hedges_launched,
+            "hedge_spent_ms": self.hedge_spent_ms,
+            "cancelled": sum(1 for a in self.attempts if a.status == "cancelled"),
+        }
+
+
+async def race_providers(
+    providers: List[str],
+    call: Callable[[str], Awaitable[Any]],
+    tracker: Optional[ProviderLatencyTracker] = None,
+    hedge_delay: Optional[float] = None,
+    max_parallel: int = 2,
+    timeout: Optional[float] = None,
+) -> RaceOutcome:
+    """Race providers in priority order with hedged requests
+
+    A failed request immediately starts the next provider. A request still
+    running after ``hedge_delay`` (default: that provider's p95) gets a hedge
+    to the next provider, up to ``max_parallel`` requests in flight.
+
+    Args:
+        providers: Provider names in priority order
+        call: Coroutine factory making one request to a provider
+        tracker: Latency windows for hedge delays (default: shared tracker)
+        hedge_delay: Fixed hedge delay in seconds, overriding the p95
+        max_parallel: Maximum concurrent requests
+        timeout: Overall deadline in seconds
+
+    Returns:
+        RaceOutcome with the winner (None if every provider failed)
+    """
+    tracker = tracker or get_latency_tracker()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    queue = list(providers)
+    running: Dict[asyncio.Future, tuple] = {}
+    outcome = RaceOutcome()
+    next_hedge_at = None
+
+    def launch(is_hedge: bool) -> float:
+        provider = queue.pop(0)
+        task = asyncio.ensure_future(call(provider))
+        running[task] = (provider, loop.time(), is_hedge)
+        if is_hedge:
+            outcome.hedges_launched += 1
+            logger.debug(f"Hedging to {provider}")
+        delay = hedge_delay
+        if delay is None:
+            delay = tracker.hedge_delay(provider)
+        return loop.time() + delay
+
+    try:
+        if queue:
+            next_hedge_at = launch(False)
+
+        while running:
+            wake_times = [deadline] if deadline else []
+            if queue and len(running) < max_parallel:
+                wake_times.append(next_hedge_at)
+            wait_timeout = (
+                max(0.0, min(wake_times) - loop.time()) if wake_times else None
+            )
+
+            done, _ = await asyncio.wait(
+                running, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            now = loop.time()
+
+            for task in done:
+                provider, started, is_hedge = running.pop(task)
+                elapsed_ms = int((now - started) * 1000)
+                error = task.exception()
+                if error is None:
+                    tracker.record(provider, elapsed_ms)
+                    outcome.winner = provider
+                    outcome.result = task.result()
+                    outcome.attempts.append(
+                        RaceAttempt(provider, "success", elapsed_ms, is_hedge)
+                    )
+                    return outcome
+                outcome.attempts.append(
+                    RaceAttempt(provider, "error", elapsed_ms, is_hedge, error)
+                )
+
+            if deadline and now >= deadline:
+                break
+            if done and queue and len(running) < max_parallel:
+                next_hedge_at = launch(False)  # Fall back after a failure
+            elif queue and len(running) < max_parallel and now >= next_hedge_at:
+                next_hedge_at = launch(True)
+
+        return outcome
+    finally:
+        now = loop.time()
+        status = "cancelled" if outcome.winner else "timeout"
+        for task, (provider, started, is_hedge) in running.items():
+            task.cancel()
+            elapsed_ms = int((now - started) * 1000)
+            outcome.attempts.append(
+                RaceAttempt(provider, status, elapsed_ms, is_hedge)
+            )
+            if outcome.winner:
+                outcome.hedge_spent_ms += elapsed_ms
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+_latency_tracker: Optional[ProviderLatencyTracker] = None
+
+
+def get_latency_tracker() -> ProviderLatencyTracker:
+    """Get the process-wide provider latency tracker"""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = ProviderLatencyTracker()
+    return _latency_tracker
@@ -0,0 +1,272 @@
+"""
+Adaptive provider ordering from live latency and error statistics
+
+Keeps EWMA latency, error rate, rate-limit (429) signals and cost per
+provider, and reorders providers per request with epsilon-greedy
+exploration so a provider that has been timing out stops being tried first.
+Statistics are persisted to JSON so ordering survives restarts.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("amas.ai.provider_scoring")
+
+DEFAULT_STATS_PATH = "data/provider_stats.json"
+
+
+@dataclass
+class ProviderStats:
+    """Online statistics for one provider"""
+
+    requests: int = 0
+    failures: int = 0
+    rate_limits: int = 0
+    ewma_latency_ms: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    ewma_cost: float = 0.0
+    rate_limited_until: float = 0.0
+    last_updated: float = 0.0
+
+
+class ProviderScorer:
+    """Online provider scorer (epsilon-greedy bandit over expected latency)
+
+    A provider's score is its expected time to a successful answer,
+    ``latency / (1 - error_rate)``, plus a cost penalty; lower is better.
+    Error rates decay back toward zero with ``error_half_life`` so failed
+    providers are retried once they have had time to recover.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        epsilon: float = 0.05,
+        default_latency_ms: float = 2000.0,
+        error_half_life: float = 600.0,
+        rate_limit_cooldown: float = 60.0,
+        cost_weight_ms: float = 1000.0,
+        costs_per_1k_tokens: Optional[Dict[str, float]] = None,
+        stats_path: Optional[str] = None,
+        save_interval: float = 60.0,
+        rng: Optional[random.Random] = None,
+    ):
+        """Initialize the scorer
+
+        Args:
+            alpha: EWMA smoothing factor
+            epsilon: Probability of exploring a non-best provider first
+            default_latency_ms: Assumed latency for providers without data
+            error_half_life: Seconds for the error rate to halve when idle
+            rate_limit_cooldown: Seconds a 429 demotes a provider
+            cost_weight_ms: Latency penalty (ms) per dollar of expected cost
+            costs_per_1k_tokens: USD per 1k tokens by provider
+            stats_path: JSON file for persistence (None disables it)
+            save_interval: Minimum seconds between automatic saves
+            rng: Random source for exploration
+        """
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.default_latency_ms = default_latency_ms
+        self.error_half_life = error_half_life
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.cost_weight_ms = cost_weight_ms
+        self.costs_per_1k_tokens = dict(costs_per_1k_tokens or {})
+        self.stats_path = stats_path
+        self.save_interval = save_interval
+        self._rng = rng or random.Random()
+
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+        self._last_save = time.time()
+
+    def _get(self, provider: str) -> ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats[provider] = ProviderStats()
+        return stats
+
+    def _decayed_error_rate(self, stats: ProviderStats, now: float) -> float:
+        if not stats.requests or self.error_half_life <= 0:
+            return stats.ewma_error_rate
+        idle = max(0.0, now - stats.last_updated)
+        return stats.ewma_error_rate * 0.5 ** (idle / self.error_half_life)
+
+    def record(
+        self,
+        provider: str,
+        success: bool,
+        latency_ms: float,
+        rate_limited: bool = False,
+        tokens_used: int = 0,
+        now: Optional[float] = None,
+    ):
+        """Record the outcome of one request
+
+        Args:
+            provider: Provider name
+            success: Whether the request succeeded
+            latency_ms: Request latency in milliseconds
+            rate_limited: Whether the provider answered 429 / quota exceeded
+            tokens_used: Tokens billed for the request
+            now: Timestamp override (for tests)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            stats = self._get(provider)
+            error_rate = self._decayed_error_rate(stats, now)
+            stats.ewma_error_rate = (
+                self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * error_rate
+            )
+            stats.requests += 1
+            if success:
+                stats.ewma_latency_ms = (
+                    latency_ms
+                    if stats.ewma_latency_ms is None
+                    else self.alpha * latency_ms
+                    + (1 - self.alpha) * stats.ewma_latency_ms
+                )
+                cost = tokens_used / 1000 * self.costs_per_1k_tokens.get(provider, 0.0)
+                stats.ewma_cost = self.alpha * cost + (1 - self.alpha) * stats.ewma_cost
+            else:
+                stats.failures += 1
+                # Timeouts and slow failures also tell us about latency
+                if stats.ewma_latency_ms is not None:
+                    stats.ewma_latency_ms = max(
+                        stats.ewma_latency_ms,
+                        self.alpha * latency_ms
+                        + (1 - self.alpha) * stats.ewma_latency_ms,
+                    )
+            if rate_limited:
+                stats.rate_limits += 1
+                stats.rate_limited_until = now + self.rate_limit_cooldown
+            stats.last_updated = now
+
+        if self.stats_path and now - self._last_save >= self.save_interval:
+            self.save()
+
+    def score(self, provider: str, now: Optional[float] = None) -> float:
+        """Expected milliseconds to a successful answer (lower is better)"""
+        now = time.time() if now is None else now
+        stats = self._stats.get(provider)
+        if stats is None:
+            return self.default_latency_ms
+        latency = (
+            stats.ewma_latency_ms
+            if stats.ewma_latency_ms is not None
+            else self.default_latency_ms
+        )
+        success_rate = max(0.05, 1.0 - self._decayed_error_rate(stats, now))
+        return latency / success_rate + self.cost_weight_ms * stats.ewma_cost
+
+    def order(self, providers: List[str], now: Optional[float] = None) -> List[str]:
+        """Reorder providers for one request
+
+        Rate-limited providers go last; the rest are sorted by score with the
+        static order as tie-breaker. With probability ``epsilon`` a random
+        other provider is moved to the front to keep its statistics fresh.
+
+        Args:
+            providers: Providers in static priority order
+
+        Returns:
+            Providers in the order to try them
+        """
+        now = time.time() if now is None else now
+        static_rank = {provider: i for i, provider in enumerate(providers)}
+        with self._lock:
+            ordered = sorted(
+                providers,
+                key=lambda p: (
+                    self._get(p).rate_limited_until > now,
+                    self.score(p, now),
+                    static_rank[p],
+                ),
+            )
+        healthy = [p for p in ordered if self._stats[p].rate_limited_until <= now]
+        if len(healthy) > 1 and self._rng.random() < self.epsilon:
+            explored = self._rng.choice(healthy[1:])
+            ordered.remove(explored)
+            ordered.insert(0, explored)
+        return ordered
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Get per-provider statistics and current scores"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                provider: {
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "rate_limits": stats.rate_limits,
+                    "ewma_latency_ms": stats.ewma_latency_ms,
+                    "error_rate": round(self._decayed_error_rate(stats, now), 4),
+                    "ewma_cost": stats.ewma_cost,
+                    "rate_limited": stats.rate_limited_until > now,
+                    "score": round(self.score(provider, now), 2),
+                }
+                for provider, stats in self._stats.items()
+            }
+
+    def save(self) -> bool:
+        """Persist statistics to ``stats_path``"""
+        if not self.stats_path:
+            return False
+        with self._lock:
+            payload = {p: asdict(s) for p, s in self._stats.items()}
+            self._last_save = time.time()
+        try:
+            directory = os.path.dirname(self.stats_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.stats_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.stats_path)
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to save provider statistics: {e}")
+            return False
+
+    def load(self) -> int:
+        """Load statistics from ``stats_path``
+
+        Returns:
+            Number of providers restored
+        """
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return 0
+        try:
+            with open(self.stats_path) as f:
+                payload = json.load(f)
+            fields = ProviderStats.__dataclass_fields__
+            with self._lock:
+                for provider, values in payload.items():
+                    self._stats[provider] = ProviderStats(
+                        **{k: v for k, v in values.items() if k in fields}
+                    )
+            logger.info(f"Loaded statistics for {len(payload)} providers")
+            return len(payload)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Failed to load provider statistics: {e}")
+            return 0
+
+
+_provider_scorer: Optional[ProviderScorer] = None
+
+
+def get_provider_scorer() -> ProviderScorer:
+    """Get the process-wide provider scorer, loading persisted statistics"""
+    global _provider_scorer
+    if _provider_scorer is None:
+        _provider_scorer = ProviderScorer(
+            stats_path=os.getenv("AMAS_PROVIDER_STATS_PATH", DEFAULT_STATS_PATH)
+        )
+        _provider_scorer.load()
+    return _provider_scorer
@@ -0,0 +1,343 @@
+"""
+Shared HTTP transport for AI provider calls
+
+Process-wide connection pooling for every router (``amas.ai.router``,
+``amas.ai.enhanced_router_v2`` and ``UltimateFallbackSystem``). Each provider
+host gets one long-lived ``aiohttp.ClientSession`` with keep-alive, a
+per-host connection limit and a DNS cache, so repeated prompts reuse warm
+TCP+TLS connections instead of handshaking on every call.
+
+aiohttp speaks HTTP/1.1 only; SDK clients handed out by ``openai_client``
+and ``sdk_client`` run on pooled httpx clients, which negotiate HTTP/2 when
+the ``h2`` package is installed.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger("amas.ai.provider_transport")
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = HTTPX_AVAILABLE
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from openai import AsyncOpenAI, OpenAI
+
+    OPENAI_AVAILABLE = True
+except ImportError:
+    AsyncOpenAI = None
+    OpenAI = None
+    OPENAI_AVAILABLE = False
+
+
+@dataclass
+class TransportConfig:
+    """Connection pool settings for provider hosts"""
+
+    limit_per_host: int = int(os.getenv("AMAS_PROVIDER_POOL_LIMIT", "32"))
+    keepalive_timeout: float = 60.0
+    dns_cache_ttl: int = 300
+    connect_timeout: float = 10.0
+    # Per-host overrides of limit_per_host, e.g. {"openrouter.ai": 64}
+    host_limits: Dict[str, int] = field(default_factory=dict)
+
+
+class SharedSession:
+    """Session-like facade that routes each request to its host's pool.
+
+    Provider adapters only call ``session.post``/``session.get``, so they can
+    be handed this object in place of a per-call ``aiohttp.ClientSession``.
+    """
+
+    def __init__(self, transport: "ProviderTransport"):
+        self._transport = transport
+
+    @property
+    def closed(self) -> bool:
+        return False
+
+    def request(self, method: str, url: str, **kwargs):
+        return self._transport.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+class ProviderTransport:
+    """One pooled, keep-alive session per provider host"""
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        self.config = config or TransportConfig()
+        self.session = SharedSession(self)
+
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._openai_clients: Dict[Tuple[str, str, bool], Any] = {}
+        self._sdk_clients: Dict[Tuple[str, str, bool], Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._connections_created: Dict[str, int] = defaultdict(int)
+        self._connections_reused: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _trace_config(self, host: str) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self._requests[host] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self._connections_created[host] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._connections_reused[host] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def _bind_loop(self):
+        """Drop pools created on another event loop (sessions are loop-bound)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._sessions:
+                logger.debug("Event loop changed, discarding provider sessions")
+            self._discard_sessions(self._loop)
+            self._sessions = {}
+            # Sync clients are not loop-bound
+            self._openai_clients = {
+                key: client for key, client in self._openai_clients.items() if not key[2]
+            }
+            self._sdk_clients = {
+                key: client for key, client in self._sdk_clients.items() if not key[2]
+            }
+            self._loop = loop
+
+    def _discard_sessions(self, old_loop: Optional[asyncio.AbstractEventLoop]):
+        """Close sessions that belong to ``old_loop``
+
+        A session must be closed on its own loop. If that loop still runs
+        (in another thread) the close is scheduled there; otherwise the
+        connector's sockets are released directly, since there is no loop
+        left to await ``close()`` on.
+        """
+        for session in self._sessions.values():
+            if session.closed:
+                continue
+            if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+                asyncio.run_coroutine_threadsafe(session.close(), old_loop)
+                continue
+            connector = session.connector
+            session.detach()
+            close = getattr(connector, "_close", None)
+            if connector is None or connector.closed or close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Error releasing provider connections: {e}")
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """Get the pooled session for the host serving ``url``
+
+        Args:
+            url: Any URL on the provider host
+
+        Returns:
+            Long-lived ``aiohttp.ClientSession`` for that host
+        """
+        self._bind_loop()
+        host = self._host_key(url)
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            netloc = urlsplit(url).hostname or ""
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self.config.host_limits.get(
+                    netloc, self.config.limit_per_host
+                ),
+                ttl_dns_cache=self.config.dns_cache_ttl,
+                keepalive_timeout=self.config.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, connect=self.config.connect_timeout
+                ),
+                trace_configs=[self._trace_config(host)],
+            )
+            self._sessions[host] = session
+            logger.debug(f"Opened provider connection pool for {host}")
+        return session
+
+    def openai_client(self, base_url: str, api_key: str, asynchronous: bool = True):
+        """Get a cached OpenAI-compatible client backed by a pooled httpx client
+
+        Args:
+            base_url: Provider API base URL
+            api_key: Provider API key
+            asynchronous: Return ``AsyncOpenAI`` instead of ``OpenAI``
+
+        Returns:
+            Client instance reused across calls
+        """
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai package is not installed")
+        if asynchronous:
+            self._bind_loop()
+
+        key = (base_url, api_key, asynchronous)
+        client = self._openai_clients.get(key)
+        if client is None:
+            factory = AsyncOpenAI if asynchronous else OpenAI
+            client = factory(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=self._http_client(base_url, asynchronous),
+            )
+            self._openai_clients[key] = client
+        return client
+
+    def sdk_client(
+        self,
+        provider: str,
+        api_key: str,
+        factory: Callable[..., Any],
+        base_url: Optional[str] = None,
+        asynchronous: bool = True,
+        pooled_http: bool = True,
+    ):
+        """Get a cached provider SDK client, built once per provider and key
+
+        Args:
+            provider: Provider name the client belongs to (cache namespace)
+            api_key: Provider API key
+            factory: Builds the client; called as ``factory(http_client=...)``
+                with a pooled httpx client, or ``factory()`` if not
+                ``pooled_http``
+            base_url: Provider API URL, used to look up ``host_limits``
+            asynchronous: The client is async (bound to the running loop)
+            pooled_http: The SDK accepts an httpx ``http_client``
+
+        Returns:
+            Client instance reused across calls
+        """
+        if asynchronous:
+            self._bind_loop()
+
+        key = (provider, api_key, asynchronous)
+        client = self._sdk_clients.get(key)
+        if client is None:
+            if pooled_http and HTTPX_AVAILABLE:
+                client = factory(http_client=self._http_client(base_url or "", asynchronous))
+            else:
+                client = factory()
+            self._sdk_clients[key] = client
+        return client
+
+    def _http_client(self, base_url: str, asynchronous: bool):
+        """Build a keep-alive httpx client sized for the provider host"""
+        netloc = urlsplit(base_url).hostname or ""
+        limit = self.config.host_limits.get(netloc, self.config.limit_per_host)
+        http_kwargs = {
+            "limits": httpx.Limits(
+                max_connections=limit,
+                max_keepalive_connections=limit,
+                keepalive_expiry=self.config.keepalive_timeout,
+            ),
+            "http2": HTTP2_AVAILABLE,
+        }
+        if asynchronous:
+            return httpx.AsyncClient(**http_kwargs)
+        return httpx.Client(**http_kwargs)
+
+    async def close(self):
+        """Close every pooled session and client"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        for client in [*self._openai_clients.values(), *self._sdk_clients.values()]:
+            close = getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.debug(f"Error closing provider client: {e}")
+        self._sessions = {}
+        self._openai_clients = {}
+        self._sdk_clients = {}
+        self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection reuse statistics"""
+        hosts = sorted(
+            set(self._requests)
+            | set(self._connections_created)
+            | set(self._connections_reused)
+        )
+        return {
+            "open_pools": sum(1 for s in self._sessions.values() if not s.closed),
+            "openai_clients": len(self._openai_clients),
+            "sdk_clients": len(self._sdk_clients),
+            "http2_available": HTTP2_AVAILABLE,
+            "requests": sum(self._requests.values()),
+            "connections_created": sum(self._connections_created.values()),
+            "handshakes_avoided": sum(self._connections_reused.values()),
+            "hosts": {
+                host: {
+                    "requests": self._requests[host],
+                    "connections_created": self._connections_created[host],
+                    "handshakes_avoided": self._connections_reused[host],
+                }
+                for host in hosts
+            },
+        }
+
+
+_provider_transport: Optional[ProviderTransport] = None
+
+
+def get_provider_transport() -> ProviderTransport:
+    """Get the process-wide provider transport"""
+    global _provider_transport
+    if _provider_transport is None:
+        _provider_transport = ProviderTransport()
+    return _provider_transport
+
+
+async def close_provider_transport():
+    """Close the process-wide provider transport"""
+    global _provider_transport
+    if _provider_transport is not None:
+        await _provider_transport.close()
+        _provider_transport = None
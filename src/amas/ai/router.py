@@ -43,6 +43,10 @@ from typing import Any, Dict, List, Optional, Union
 
 import aiohttp
 
+from .hedging import HEDGE_STRATEGIES, get_latency_tracker, race_providers
+from .provider_scoring import get_provider_scorer
+from .provider_transport import get_provider_transport
+
 # Configure logging for router
 logger = logging.getLogger("amas.ai.router")
 
@@ -83,6 +87,7 @@ class ProviderAttempt:
     error: Optional[str] = None
     model: Optional[str] = None
     tokens_used: Optional[int] = None
+    hedge: bool = False
 
 
 class ProviderError(Exception):
@@ -212,7 +217,8 @@ async def call_cerebras(
         max_tokens = kwargs.get("max_tokens", DEFAULT_MAX_TOKENS)
         temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
 
-        response = client.chat.completions.create(
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
             messages=messages,
             model="llama3.1-70b",
             stream=False,
@@ -299,12 +305,15 @@ async def call_nvidia(
         )
 
     try:
-        client = OpenAI(base_url="https://integrate.api.nvidia.com/v1", api_key=key)
+        client = get_provider_transport().openai_client(
+            "https://integrate.api.nvidia.com/v1", key, asynchronous=False
+        )
 
         max_tokens = kwargs.get("max_tokens", DEFAULT_MAX_TOKENS)
         temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
 
-        response = client.chat.completions.create(
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
             model="deepseek-ai/deepseek-r1",
             messages=messages,
             temperature=temperature,
@@ -429,12 +438,15 @@ async def call_codestral(
         )
 
     try:
-        client = OpenAI(base_url="https://codestral.mistral.ai/v1", api_key=key)
+        client = get_provider_transport().openai_client(
+            "https://codestral.mistral.ai/v1", key, asynchronous=False
+        )
 
         max_tokens = kwargs.get("max_tokens", DEFAULT_MAX_TOKENS)
         temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
 
-        response = client.chat.completions.create(
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
             model="codestral-latest",
             messages=messages,
             temperature=temperature,
@@ -615,12 +627,15 @@ async def call_openrouter(
         )
 
     try:
-        client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=selected_key)
+        client = get_provider_transport().openai_client(
+            "https://openrouter.ai/api/v1", selected_key, asynchronous=False
+        )
 
         max_tokens = kwargs.get("max_tokens", DEFAULT_MAX_TOKENS)
         temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
 
-        response = client.chat.completions.create(
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
             model=selected_model,
             messages=messages,
             temperature=temperature,
@@ -722,7 +737,9 @@ async def generate(
         temperature: Generation temperature (0.0-1.0)
         max_tokens: Maximum tokens to generate
         timeout: Overall timeout in seconds (optional)
-        strategy: Generation strategy ("intelligent", "fast", "quality")
+        strategy: Generation strategy ("intelligent", "fast", "quality"), or
+            "hedged"/"race" to hedge slow providers with the next one
+            (tune with ``hedge_delay`` seconds and ``max_parallel``)
         **kwargs: Additional provider-specific parameters
 
     Returns:
@@ -746,8 +763,8 @@ async def generate(
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
 
-    # Get prioritized provider list
-    providers = build_provider_priority()
+    # Get prioritized provider list, reordered by live latency/error statistics
+    providers = get_provider_scorer().order(build_provider_priority())
     if not providers:
         return {
             "success": False,
@@ -764,41 +781,41 @@ async def generate(
 
     attempts = []
 
-    async with aiohttp.ClientSession() as session:
-        for provider_name in providers:
-            provider_func = PROVIDER_FUNCTIONS.get(provider_name)
-            if not provider_func:
-                attempts.append(
-                    ProviderAttempt(
-                        provider=provider_name,
-                        status="unavailable",
-                        elapsed_ms=0,
-                        error="No adapter function available",
-                    )
+    session = get_provider_transport().session
+    if strategy in HEDGE_STRATEGIES:
+        return await _generate_hedged(
+            providers,
+            messages,
+            session,
+            start_time,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    for provider_name in providers:
+        provider_func = PROVIDER_FUNCTIONS.get(provider_name)
+        if not provider_func:
+            attempts.append(
+                ProviderAttempt(
+                    provider=provider_name,
+                    status="unavailable",
+                    elapsed_ms=0,
+                    error="No adapter function available",
                 )
-                continue
+            )
+            continue
 
-            attempt_start = _now_ms()
+        attempt_start = _now_ms()
 
-            try:
-                logger.debug(f"🔄 Attempting provider: {provider_name}")
-
-                # Apply overall timeout if specified
-                if timeout:
-                    result = await asyncio.wait_for(
-                        _with_retries(
-                            lambda: provider_func(
-                                messages,
-                                session,
-                                temperature=temperature,
-                                max_tokens=max_tokens,
-                                **kwargs,
-                            )
-                        ),
-                        timeout=timeout,
-                    )
-                else:
-                    result = await _with_retries(
+        try:
+            logger.debug(f"🔄 Attempting provider: {provider_name}")
+
+            # Apply overall timeout if specified
+            if timeout:
+                result = await asyncio.wait_for(
+                    _with_retries(
                         lambda: provider_func(
                             messages,
                             session,
@@ -806,75 +823,90 @@ async def generate(
                             max_tokens=max_tokens,
                             **kwargs,
                         )
+                    ),
+                    timeout=timeout,
+                )
+            else:
+                result = await _with_retries(
+                    lambda: provider_func(
+                        messages,
+                        session,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **kwargs,
                     )
+                )
 
-                elapsed = _now_ms() - attempt_start
+            elapsed = _now_ms() - attempt_start
+            get_latency_tracker().record(provider_name, elapsed)
 
-                attempts.append(
-                    ProviderAttempt(
-                        provider=provider_name,
-                        status="success",
-                        elapsed_ms=elapsed,
-                        model=result.get("model"),
-                        tokens_used=result.get("tokens_used", 0),
-                    )
+            attempts.append(
+                ProviderAttempt(
+                    provider=provider_name,
+                    status="success",
+                    elapsed_ms=elapsed,
+                    model=result.get("model"),
+                    tokens_used=result.get("tokens_used", 0),
                 )
+            )
 
-                response_time = time.time() - start_time
+            response_time = time.time() - start_time
+            _record_outcomes(attempts)
 
-                logger.info(
-                    f"✅ AI generation successful with {provider_name} in {response_time:.2f}s"
-                )
+            logger.info(
+                f"✅ AI generation successful with {provider_name} in {response_time:.2f}s"
+            )
 
-                return {
-                    "success": True,
-                    "provider": result.get("provider", provider_name),
-                    "content": result.get("content", ""),
-                    "attempts": attempts,
-                    "response_time": response_time,
-                    "provider_name": result.get("provider", provider_name),
-                    "tokens_used": result.get("tokens_used", 0),
-                    "model": result.get("model"),
-                }
-
-            except asyncio.TimeoutError:
-                elapsed = _now_ms() - attempt_start
-                attempts.append(
-                    ProviderAttempt(
-                        provider=provider_name,
-                        status="timeout",
-                        elapsed_ms=elapsed,
-                        error="Request timed out",
-                    )
+            return {
+                "success": True,
+                "provider": result.get("provider", provider_name),
+                "content": result.get("content", ""),
+                "attempts": attempts,
+                "response_time": response_time,
+                "provider_name": result.get("provider", provider_name),
+                "tokens_used": result.get("tokens_used", 0),
+                "model": result.get("model"),
+            }
+
+        except asyncio.TimeoutError:
+            elapsed = _now_ms() - attempt_start
+            attempts.append(
+                ProviderAttempt(
+                    provider=provider_name,
+                    status="timeout",
+                    elapsed_ms=elapsed,
+                    error="Request timed out",
                 )
-                logger.warning(f"⏰ {provider_name} timed out after {elapsed}ms")
-
-            except ProviderError as e:
-                elapsed = _now_ms() - attempt_start
-                attempts.append(
-                    ProviderAttempt(
-                        provider=provider_name,
-                        status=e.error_type,
-                        elapsed_ms=elapsed,
-                        error=str(e),
-                    )
+            )
+            logger.warning(f"⏰ {provider_name} timed out after {elapsed}ms")
+
+        except ProviderError as e:
+            elapsed = _now_ms() - attempt_start
+            attempts.append(
+                ProviderAttempt(
+                    provider=provider_name,
+                    status=e.error_type,
+                    elapsed_ms=elapsed,
+                    error=str(e),
                 )
-                logger.warning(f"⚠️ {provider_name} failed ({e.error_type}): {e}")
-
-            except Exception as e:
-                elapsed = _now_ms() - attempt_start
-                attempts.append(
-                    ProviderAttempt(
-                        provider=provider_name,
-                        status="error",
-                        elapsed_ms=elapsed,
-                        error=str(e),
-                    )
+            )
+            logger.warning(f"⚠️ {provider_name} failed ({e.error_type}): {e}")
+
+        except Exception as e:
+            elapsed = _now_ms() - attempt_start
+            attempts.append(
+                ProviderAttempt(
+                    provider=provider_name,
+                    status="error",
+                    elapsed_ms=elapsed,
+                    error=str(e),
                 )
-                logger.warning(f"❌ {provider_name} failed: {e}")
+            )
+            logger.warning(f"❌ {provider_name} failed: {e}")
 
     # All providers failed
     response_time = time.time() - start_time
+    _record_outcomes(attempts)
     error_summary = f"All {len(providers)} providers failed: " + "; ".join(
         f"{a.provider}({a.status})" for a in attempts
     )
@@ -893,6 +925,126 @@ async def generate(
     }
 
 
+def _record_outcomes(attempts: List[ProviderAttempt]):
+    """Feed attempt outcomes to the adaptive provider scorer."""
+    scorer = get_provider_scorer()
+    for attempt in attempts:
+        if attempt.status in ("unavailable", "cancelled"):
+            continue
+        scorer.record(
+            attempt.provider,
+            success=attempt.status == "success",
+            latency_ms=attempt.elapsed_ms,
+            rate_limited=attempt.status == "quota",
+            tokens_used=attempt.tokens_used or 0,
+        )
+
+
+async def _generate_hedged(
+    providers: List[str],
+    messages: List[Dict[str, str]],
+    session,
+    start_time: float,
+    temperature: float,
+    max_tokens: int,
+    timeout: Optional[float],
+    hedge_delay: Optional[float] = None,
+    max_parallel: int = 2,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Race providers with hedged requests instead of trying them in turn.
+
+    Failures fall through to the next provider immediately, so per-provider
+    retries with backoff are skipped in this mode.
+    """
+    adapters = {
+        name: PROVIDER_FUNCTIONS[name]
+        for name in providers
+        if name in PROVIDER_FUNCTIONS
+    }
+    attempts = [
+        ProviderAttempt(
+            provider=name,
+            status="unavailable",
+            elapsed_ms=0,
+            error="No adapter function available",
+        )
+        for name in providers
+        if name not in adapters
+    ]
+
+    outcome = await race_providers(
+        list(adapters),
+        lambda name: adapters[name](
+            messages,
+            session,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        ),
+        hedge_delay=hedge_delay,
+        max_parallel=max_parallel,
+        timeout=timeout,
+    )
+
+    for attempt in outcome.attempts:
+        status, error = attempt.status, attempt.error
+        if isinstance(error, ProviderError):
+            status = error.error_type
+        elif isinstance(error, asyncio.TimeoutError):
+            status = "timeout"
+        result = outcome.result if attempt.status == "success" else {}
+        attempts.append(
+            ProviderAttempt(
+                provider=attempt.provider,
+                status=status,
+                elapsed_ms=attempt.elapsed_ms,
+                error=str(error) if error else None,
+                model=result.get("model"),
+                tokens_used=result.get("tokens_used"),
+                hedge=attempt.hedge,
+            )
+        )
+
+    response_time = time.time() - start_time
+    _record_outcomes(attempts)
+    if outcome.winner is None:
+        logger.error(
+            f"❌ Hedged AI generation failed across {len(providers)} providers "
+            f"in {response_time:.2f}s"
+        )
+        return {
+            "success": False,
+            "error": f"All {len(providers)} providers failed: "
+            + "; ".join(f"{a.provider}({a.status})" for a in attempts),
+            "attempts": attempts,
+            "response_time": response_time,
+            "provider_name": "failed_all",
+            "tokens_used": 0,
+            "strategy": "hedged",
+            "hedge": outcome.summary(),
+        }
+
+    result = outcome.result
+    provider = result.get("provider", outcome.winner)
+    logger.info(
+        f"✅ Hedged AI generation won by {provider} in {response_time:.2f}s "
+        f"({outcome.hedges_launched} hedges)"
+    )
+    return {
+        "success": True,
+        "provider": provider,
+        "content": result.get("content", ""),
+        "attempts": attempts,
+        "response_time": response_time,
+        "provider_name": provider,
+        "tokens_used": result.get("tokens_used", 0),
+        "model": result.get("model"),
+        "strategy": "hedged",
+        "hedge": outcome.summary(),
+    }
+
+
 # Utility functions
 def get_available_providers() -> List[str]:
     """Get list of currently available providers based on repository secrets.
@@ -903,11 +1055,16 @@ def get_available_providers() -> List[str]:
     return build_provider_priority()
 
 
-def get_provider_status() -> Dict[str, bool]:
+def get_provider_status(include_stats: bool = False) -> Dict[str, Any]:
     """Get status of all supported providers.
 
+    Args:
+        include_stats: Return live routing statistics (EWMA latency, error
+            rate, rate limiting, cost and score) alongside availability
+
     Returns:
-        Dict mapping provider names to availability status
+        Dict mapping provider names to availability status, or to
+        ``{"available": bool, "stats": {...}}`` with ``include_stats``
     """
     all_providers = list(PROVIDER_FUNCTIONS.keys())
     status = {}
@@ -940,6 +1097,12 @@ def get_provider_status() -> Dict[str, bool]:
             key_name = key_mapping.get(provider)
             status[provider] = _enabled(key_name) if key_name else False
 
+    if include_stats:
+        stats = get_provider_scorer().get_stats()
+        return {
+            provider: {"available": available, "stats": stats.get(provider)}
+            for provider, available in status.items()
+        }
     return status
 
 
@@ -0,0 +1,97 @@
+"""
+Token streaming helpers for AI generation
+
+Provides the wire-format parsers used by the streaming provider adapters
+(Server-Sent Events and newline-delimited JSON) and a context-local token
+sink. Setting a sink with ``token_sink()`` makes every AI call made inside
+that context stream its tokens to the callback, so agents do not need to
+thread a callback through their ``execute`` signatures.
+"""
+
+import inspect
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger("amas.ai.streaming")
+
+TokenCallback = Callable[[Dict[str, Any]], Any]
+
+_token_sink: ContextVar[Optional[TokenCallback]] = ContextVar(
+    "amas_token_sink", default=None
+)
+
+
+def get_token_sink() -> Optional[TokenCallback]:
+    """Get the token callback for the current context, if any"""
+    return _token_sink.get()
+
+
+@contextmanager
+def token_sink(callback: Optional[TokenCallback]):
+    """Stream tokens from AI calls made in this context to ``callback``
+
+    The callback receives ``{"provider": str, "delta": str}`` dicts and may be
+    sync or async. If a generation is retried after some of its tokens were
+    delivered, the callback first receives ``{"provider", "delta": "",
+    "reset": True}`` and should discard the text received so far.
+    """
+    token = _token_sink.set(callback)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+async def emit_token(callback: Optional[TokenCallback], event: Dict[str, Any]):
+    """Deliver a token event, never letting a sink failure break generation"""
+    if callback is None:
+        return
+    try:
+        result = callback(event)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.debug(f"Token sink failed: {e}")
+
+
+async def iter_lines(response) -> AsyncIterator[str]:
+    """Yield decoded lines from a streaming aiohttp response"""
+    buffer = b""
+    async for chunk in response.content.iter_any():
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_sse_data(response) -> AsyncIterator[str]:
+    """Yield the ``data:`` payloads of a Server-Sent Events stream"""
+    async for line in iter_lines(response):
+        if line.startswith("data:"):
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            if data:
+                yield data
+
+
+async def iter_ndjson(response) -> AsyncIterator[Dict[str, Any]]:
+    """Yield objects from a newline-delimited JSON stream"""
+    async for line in iter_lines(response):
+        if line.strip():
+            yield json.loads(line)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for text a provider did not report usage for
+
+    Uses the common ~4 characters per token heuristic.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
@@ -447,6 +447,14 @@ async def shutdown_event():
     except Exception as e:
         logger.warning(f"Audit logger shutdown error: {e}")
     
+    # Close pooled AI provider connections and SDK clients
+    try:
+        from src.amas.ai.provider_transport import close_provider_transport
+        await close_provider_transport()
+        logger.info("✅ AI provider connections closed")
+    except Exception as e:
+        logger.warning(f"AI provider transport shutdown error: {e}")
+    
     # Shutdown AMAS system
     if amas_app:
         await amas_app.shutdown()
@@ -6,15 +6,20 @@ with state persistence, priority management, and intelligent execution.
 """
 
 import asyncio
+import functools
+import heapq
+import itertools
 import json
 import logging
 import sqlite3
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 import croniter
 
@@ -52,10 +57,10 @@ class ScheduledTask:
     # Scheduling configuration
     schedule_type: ScheduleType
     schedule_expression: str         # Cron expression or interval specification
-    timezone: str = "UTC"
     
     # Task configuration
     task_request: str               # The actual AI task to execute
+    timezone: str = "UTC"
     task_parameters: Dict[str, Any] = field(default_factory=dict)
     priority: TaskPriority = TaskPriority.NORMAL
     
@@ -184,10 +189,48 @@ class ScheduledTask:
         
         logger.debug(f"Recorded execution for {self.id}: success={success}, duration={duration_seconds:.1f}s")
 
+# Concurrent executions allowed per priority (None = unlimited)
+DEFAULT_PRIORITY_CONCURRENCY: Dict[TaskPriority, Optional[int]] = {
+    TaskPriority.LOW: 2,
+    TaskPriority.NORMAL: 5,
+    TaskPriority.HIGH: 10,
+    TaskPriority.URGENT: 20,
+    TaskPriority.CRITICAL: None,
+}
+
+_UPSERT_TASK_SQL = """
+    INSERT OR REPLACE INTO scheduled_tasks (
+        id, name, description, schedule_type, schedule_expression, timezone,
+        task_request, task_parameters, priority, max_duration_hours, max_retries,
+        timeout_seconds, start_date, end_date, status, next_execution, last_execution,
+        execution_count, success_count, failure_count, last_result,
+        notification_channels, notification_on_failure, notification_on_success,
+        created_at, created_by, tags
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Execution state written by the batched flush
+_UPDATE_TASK_STATE_SQL = """
+    UPDATE scheduled_tasks SET
+        status = ?, next_execution = ?, last_execution = ?,
+        execution_count = ?, success_count = ?, failure_count = ?, last_result = ?
+    WHERE id = ?
+"""
+
 class TaskScheduler:
-    """Background task scheduler for long-term AI automation"""
+    """
+    Background task scheduler for long-term AI automation
     
-    def __init__(self, db_path: str = "data/scheduler.db"):
+    Due times live in a min-heap keyed on next_execution, so the scheduler
+    loop sleeps exactly until the earliest task is due and is woken early
+    when schedules are added, paused, resumed or deleted. Heap entries are
+    invalidated in place rather than removed, and skipped when popped.
+    """
+    
+    def __init__(self,
+                 db_path: str = "data/scheduler.db",
+                 priority_concurrency: Optional[Dict[TaskPriority, Optional[int]]] = None,
+                 persist_interval: float = 1.0):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -195,6 +238,25 @@ class TaskScheduler:
         self.scheduled_tasks: Dict[str, ScheduledTask] = {}
         self.execution_futures: Dict[str, asyncio.Task] = {}
         
+        # Timer heap of [due_timestamp, sequence, task_id]; task_id is set to
+        # None when an entry is superseded
+        self._timer_heap: List[list] = []
+        self._timer_entries: Dict[str, list] = {}
+        self._timer_sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        
+        # Per-priority concurrency limits and tasks waiting for a slot
+        self.priority_concurrency = {**DEFAULT_PRIORITY_CONCURRENCY, **(priority_concurrency or {})}
+        self._running_by_priority: Dict[TaskPriority, int] = {p: 0 for p in TaskPriority}
+        self._waiting: Dict[TaskPriority, Deque[str]] = {p: deque() for p in TaskPriority}
+        self._queued: Set[str] = set()
+        
+        # Tasks whose state changed since the last batched write
+        self.persist_interval = persist_interval
+        self._dirty: Set[str] = set()
+        self._last_flush = 0.0
+        self._flush_future: Optional[asyncio.Future] = None
+        
         # Scheduler state
         self.running = False
         self.scheduler_task: Optional[asyncio.Task] = None
@@ -273,6 +335,11 @@ class TaskScheduler:
             for row in cursor.fetchall():
                 task = self._row_to_scheduled_task(row)
                 self.scheduled_tasks[task.id] = task
+                
+                if not task.next_execution:
+                    task.next_execution = task.calculate_next_execution()
+                    self._mark_dirty(task)
+                self._push_timer(task)
         
         logger.info(f"Loaded {len(self.scheduled_tasks)} active scheduled tasks")
     
@@ -346,39 +413,105 @@ class TaskScheduler:
         
         # Store in memory
         self.scheduled_tasks[task_id] = scheduled_task
+        self._push_timer(scheduled_task)
         
         logger.info(f"Scheduled task created: {task_id} ({name}) - Next: {scheduled_task.next_execution}")
         return task_id
     
     async def _persist_scheduled_task(self, task: ScheduledTask):
         """Persist scheduled task to database"""
+        # Let an in-flight batch land first so it cannot overwrite this row
+        if self._flush_future and not self._flush_future.done():
+            await self._flush_future
+        self._dirty.discard(task.id)
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO scheduled_tasks (
-                    id, name, description, schedule_type, schedule_expression, timezone,
-                    task_request, task_parameters, priority, max_duration_hours, max_retries,
-                    timeout_seconds, start_date, end_date, status, next_execution, last_execution,
-                    execution_count, success_count, failure_count, last_result,
-                    notification_channels, notification_on_failure, notification_on_success,
-                    created_at, created_by, tags
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                task.id, task.name, task.description, task.schedule_type.value,
-                task.schedule_expression, task.timezone, task.task_request,
-                json.dumps(task.task_parameters), task.priority.value,
-                task.max_duration_hours, task.max_retries, task.timeout_seconds,
-                task.start_date.isoformat() if task.start_date else None,
-                task.end_date.isoformat() if task.end_date else None,
-                task.status.value,
-                task.next_execution.isoformat() if task.next_execution else None,
-                task.last_execution.isoformat() if task.last_execution else None,
-                task.execution_count, task.success_count, task.failure_count,
-                json.dumps(task.last_result), json.dumps(task.notification_channels),
-                task.notification_on_failure, task.notification_on_success,
-                task.created_at.isoformat(), task.created_by, json.dumps(list(task.tags))
-            ))
+            conn.execute(_UPSERT_TASK_SQL, self._task_row(task))
             conn.commit()
     
+    def _task_row(self, task: ScheduledTask) -> Tuple:
+        """Column values for a scheduled_tasks row"""
+        return (
+            task.id, task.name, task.description, task.schedule_type.value,
+            task.schedule_expression, task.timezone, task.task_request,
+            json.dumps(task.task_parameters), task.priority.value,
+            task.max_duration_hours, task.max_retries, task.timeout_seconds,
+            task.start_date.isoformat() if task.start_date else None,
+            task.end_date.isoformat() if task.end_date else None,
+            task.status.value,
+            task.next_execution.isoformat() if task.next_execution else None,
+            task.last_execution.isoformat() if task.last_execution else None,
+            task.execution_count, task.success_count, task.failure_count,
+            json.dumps(task.last_result), json.dumps(task.notification_channels),
+            task.notification_on_failure, task.notification_on_success,
+            task.created_at.isoformat(), task.created_by, json.dumps(list(task.tags))
+        )
+    
+    def _mark_dirty(self, task: ScheduledTask):
+        """Queue a task for the next batched write"""
+        if not self._dirty:
+            self._wakeup.set()
+        self._dirty.add(task.id)
+    
+    def _flush_dirty(self) -> Optional[asyncio.Future]:
+        """Write execution state of changed tasks in one transaction, off the event loop"""
+        self._last_flush = time.time()
+        if self._flush_future and not self._flush_future.done():
+            return self._flush_future  # Previous batch still writing; retry next interval
+        
+        rows = []
+        for task_id in self._dirty:
+            task = self.scheduled_tasks.get(task_id)
+            if task:
+                rows.append((
+                    task.status.value,
+                    task.next_execution.isoformat() if task.next_execution else None,
+                    task.last_execution.isoformat() if task.last_execution else None,
+                    task.execution_count, task.success_count, task.failure_count,
+                    json.dumps(task.last_result), task.id
+                ))
+        self._dirty.clear()
+        
+        if not rows:
+            return None
+        self._flush_future = asyncio.get_running_loop().run_in_executor(
+            None, self._write_task_states, rows
+        )
+        return self._flush_future
+    
+    def _write_task_states(self, rows: List[Tuple]):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(_UPDATE_TASK_STATE_SQL, rows)
+            conn.commit()
+        logger.debug(f"Persisted {len(rows)} scheduled task updates")
+    
+    def _push_timer(self, task: ScheduledTask):
+        """(Re)insert a task's next execution into the timer heap"""
+        self._cancel_timer(task.id)
+        if task.status != ScheduledTaskStatus.ACTIVE or not task.next_execution:
+            return
+        
+        entry = [task.next_execution.timestamp(), next(self._timer_sequence), task.id]
+        self._timer_entries[task.id] = entry
+        heapq.heappush(self._timer_heap, entry)
+        
+        # Wake the loop if this is now the earliest deadline
+        if self._timer_heap[0] is entry:
+            self._wakeup.set()
+    
+    def _cancel_timer(self, task_id: str):
+        """Invalidate a task's heap entry; it is discarded when popped"""
+        entry = self._timer_entries.pop(task_id, None)
+        if entry is None:
+            return
+        entry[2] = None
+        if self._timer_heap[0] is entry:
+            self._wakeup.set()
+        
+        # Rebuild once superseded entries dominate the heap
+        if len(self._timer_heap) > 2 * len(self._timer_entries) + 64:
+            self._timer_heap = [e for e in self._timer_heap if e[2] is not None]
+            heapq.heapify(self._timer_heap)
+    
     async def start_scheduler(self):
         """Start the background task scheduler"""
         if self.running:
@@ -406,65 +539,112 @@ class TaskScheduler:
             execution_future.cancel()
         
         self.execution_futures.clear()
+        for waiting in self._waiting.values():
+            waiting.clear()
+        self._queued.clear()
+        
+        while self._dirty or (self._flush_future and not self._flush_future.done()):
+            flush = self._flush_dirty()
+            if flush:
+                await flush
         
         logger.info("Task scheduler stopped")
     
     async def _scheduler_loop(self):
-        """Main scheduler loop"""
+        """Main scheduler loop: run due tasks, then sleep until the next deadline"""
         logger.info("Scheduler loop started")
         
         while self.running:
             try:
-                current_time = datetime.now(timezone.utc)
+                self._wakeup.clear()
+                now = time.time()
                 
-                # Check all scheduled tasks
+                # Pop every due entry
                 ready_tasks = []
-                for task_id, task in list(self.scheduled_tasks.items()):
+                while self._timer_heap and self._timer_heap[0][0] <= now:
+                    _, _, task_id = heapq.heappop(self._timer_heap)
+                    if task_id is None:
+                        continue
+                    del self._timer_entries[task_id]
                     
-                    # Update next execution if needed
-                    if not task.next_execution:
-                        task.next_execution = task.calculate_next_execution()
-                        await self._persist_scheduled_task(task)
-                    
-                    # Check if ready to execute
-                    if task.should_execute_now():
-                        # Don't start if already running
-                        if task_id not in self.execution_futures:
-                            ready_tasks.append(task)
+                    task = self.scheduled_tasks.get(task_id)
+                    # A task still running is rescheduled when it completes
+                    if task and task_id not in self.execution_futures:
+                        ready_tasks.append(task)
                 
                 # Execute ready tasks (by priority)
                 ready_tasks.sort(key=lambda t: self._get_priority_weight(t.priority), reverse=True)
                 
                 for task in ready_tasks:
-                    # Start task execution
-                    execution_future = asyncio.create_task(
-                        self._execute_scheduled_task(task)
-                    )
-                    self.execution_futures[task.id] = execution_future
-                    
-                    logger.info(f"Started execution of scheduled task: {task.id} ({task.name})")
+                    self._dispatch(task)
                 
-                # Clean up completed executions
-                completed_executions = []
-                for task_id, future in self.execution_futures.items():
-                    if future.done():
-                        completed_executions.append(task_id)
+                # Batched persistence of next_execution and results
+                if self._dirty and now - self._last_flush >= self.persist_interval:
+                    self._flush_dirty()
                 
-                for task_id in completed_executions:
-                    future = self.execution_futures.pop(task_id)
-                    try:
-                        result = await future
-                        logger.debug(f"Scheduled task execution completed: {task_id}")
-                    except Exception as e:
-                        logger.error(f"Scheduled task execution error: {task_id}: {e}")
+                # Sleep until the next deadline, a flush, or a wakeup
+                while self._timer_heap and self._timer_heap[0][2] is None:
+                    heapq.heappop(self._timer_heap)
+                timeout = self._timer_heap[0][0] - time.time() if self._timer_heap else None
+                if self._dirty:
+                    flush_in = self._last_flush + self.persist_interval - time.time()
+                    timeout = flush_in if timeout is None else min(timeout, flush_in)
                 
-                # Sleep before next check (adjust based on workload)
-                check_interval = 30 if ready_tasks else 60  # More frequent when busy
-                await asyncio.sleep(check_interval)
+                if timeout is None or timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
                 
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(60)  # Back off on error
+                await asyncio.sleep(1)  # Back off on error
+    
+    def _dispatch(self, task: ScheduledTask):
+        """Start a due task, or queue it if its priority is at its concurrency limit"""
+        limit = self.priority_concurrency.get(task.priority)
+        if limit is not None and self._running_by_priority[task.priority] >= limit:
+            if task.id not in self._queued:
+                self._queued.add(task.id)
+                self._waiting[task.priority].append(task.id)
+            return
+        
+        self._start_execution(task)
+    
+    def _start_execution(self, task: ScheduledTask):
+        self._running_by_priority[task.priority] += 1
+        execution_future = asyncio.create_task(self._execute_scheduled_task(task))
+        self.execution_futures[task.id] = execution_future
+        execution_future.add_done_callback(
+            functools.partial(self._on_execution_done, task.id, task.priority)
+        )
+        
+        logger.info(f"Started execution of scheduled task: {task.id} ({task.name})")
+    
+    def _on_execution_done(self, task_id: str, priority: TaskPriority, future: asyncio.Task):
+        """Release the priority slot, reschedule, and start the next waiting task"""
+        self._running_by_priority[priority] -= 1
+        if self.execution_futures.get(task_id) is future:
+            del self.execution_futures[task_id]
+        
+        if not future.cancelled() and future.exception():
+            logger.error(f"Scheduled task execution error: {task_id}: {future.exception()}")
+        else:
+            logger.debug(f"Scheduled task execution completed: {task_id}")
+        
+        task = self.scheduled_tasks.get(task_id)
+        if task and self.running:
+            self._push_timer(task)
+        
+        limit = self.priority_concurrency.get(priority)
+        waiting = self._waiting[priority]
+        while waiting and (limit is None or self._running_by_priority[priority] < limit):
+            next_id = waiting.popleft()
+            self._queued.discard(next_id)
+            next_task = self.scheduled_tasks.get(next_id)
+            if (next_task and next_task.status == ScheduledTaskStatus.ACTIVE
+                    and next_task.id not in self.execution_futures):
+                self._start_execution(next_task)
     
     def _get_priority_weight(self, priority: TaskPriority) -> int:
         """Get numeric weight for priority sorting"""
@@ -484,10 +664,11 @@ class TaskScheduler:
         
         logger.info(f"Executing scheduled task: {scheduled_task.id} ({scheduled_task.name})")
         
-        # Record execution start in database
-        await self._record_execution_start(execution_id, scheduled_task.id)
-        
         try:
+            # Record execution start in database (inside the try so a failure
+            # still records the attempt and advances next_execution)
+            await self._record_execution_start(execution_id, scheduled_task.id)
+            
             # Execute task using workflow executor
             try:
                 from amas.orchestration.workflow_executor import get_workflow_executor
@@ -532,7 +713,7 @@ class TaskScheduler:
             
             # Record execution result
             scheduled_task.record_execution(success, result, duration)
-            await self._persist_scheduled_task(scheduled_task)
+            self._mark_dirty(scheduled_task)
             
             # Record in execution history
             await self._record_execution_completion(execution_id, scheduled_task.id, 
@@ -560,7 +741,7 @@ class TaskScheduler:
             result = {"error": "execution_timeout", "duration_seconds": duration}
             
             scheduled_task.record_execution(False, result, duration)
-            await self._persist_scheduled_task(scheduled_task)
+            self._mark_dirty(scheduled_task)
             
             await self._record_execution_completion(execution_id, scheduled_task.id, 
                                                    False, result, duration)
@@ -576,7 +757,7 @@ class TaskScheduler:
             result = {"error": str(e), "duration_seconds": duration}
             
             scheduled_task.record_execution(False, result, duration)
-            await self._persist_scheduled_task(scheduled_task)
+            self._mark_dirty(scheduled_task)
             
             await self._record_execution_completion(execution_id, scheduled_task.id, 
                                                    False, result, duration)
@@ -738,6 +919,7 @@ class TaskScheduler:
             return False
         
         task.status = ScheduledTaskStatus.PAUSED
+        self._cancel_timer(task_id)
         await self._persist_scheduled_task(task)
         
         # Cancel running execution if any
@@ -757,6 +939,7 @@ class TaskScheduler:
         task.status = ScheduledTaskStatus.ACTIVE
         task.next_execution = task.calculate_next_execution()
         await self._persist_scheduled_task(task)
+        self._push_timer(task)
         
         logger.info(f"Scheduled task resumed: {task_id}")
         return True
@@ -774,6 +957,8 @@ class TaskScheduler:
         
         # Remove from memory
         del self.scheduled_tasks[task_id]
+        self._cancel_timer(task_id)
+        self._dirty.discard(task_id)
         
         # Remove from database
         with sqlite3.connect(self.db_path) as conn:
@@ -790,6 +975,7 @@ class TaskScheduler:
                           if task.status == ScheduledTaskStatus.ACTIVE)
         
         running_executions = len(self.execution_futures)
+        waiting_executions = sum(len(waiting) for waiting in self._waiting.values())
         
         success_rate = (self.successful_executions / max(1, self.total_executions)) * 100
         
@@ -807,6 +993,7 @@ class TaskScheduler:
             "total_scheduled_tasks": len(self.scheduled_tasks),
             "active_tasks": active_tasks,
             "running_executions": running_executions,
+            "waiting_executions": waiting_executions,
             "total_executions": self.total_executions,
             "successful_executions": self.successful_executions,
             "failed_executions": self.failed_executions,
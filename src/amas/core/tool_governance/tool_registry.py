@@ -6,6 +6,7 @@ and usage monitoring for all agent interactions.
 """
 
 import logging
+import time
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
@@ -16,6 +17,7 @@ from typing import Any, Dict, List, Optional, Set
 import jsonschema
 import yaml
 
+from ...utils.rate_limit import LRUClientTable, SlidingWindowCounter
 from ..agent_contracts.base_agent_contract import ContractViolationError, ToolCapability
 
 logger = logging.getLogger(__name__)
@@ -245,7 +247,10 @@ class ToolPermissionsEngine:
         self.registry = registry
         self.capabilities_path = Path(agent_capabilities_path)
         self.agent_permissions: Dict[str, Set[str]] = {}
-        self.rate_limiters: Dict[str, Dict[str, Any]] = {}  # agent_id -> tool_name -> limiter state
+        # "agent_id:tool_name" -> one-minute sliding window of calls
+        self.rate_limiters: LRUClientTable[SlidingWindowCounter] = LRUClientTable(
+            lambda: SlidingWindowCounter(60)
+        )
         self._load_agent_permissions()
     
     def _load_agent_permissions(self):
@@ -303,31 +308,16 @@ class ToolPermissionsEngine:
                                tool_name: str, 
                                limit_per_minute: int) -> bool:
         """Check if agent is rate limited for tool"""
-        key = f"{agent_id}:{tool_name}"
-        
-        if key not in self.rate_limiters:
-            self.rate_limiters[key] = {
-                "requests": [],
-                "last_reset": datetime.now(timezone.utc)
-            }
-        
-        limiter = self.rate_limiters[key]
-        now = datetime.now(timezone.utc)
-        
-        # Remove requests older than 1 minute
-        cutoff_time = now - timedelta(minutes=1)
-        limiter["requests"] = [
-            req_time for req_time in limiter["requests"]
-            if req_time > cutoff_time
-        ]
+        limiter = self.rate_limiters.get(f"{agent_id}:{tool_name}")
+        now = time.monotonic()
         
         # Check if under limit
-        if len(limiter["requests"]) >= limit_per_minute:
+        if limiter.count(now) >= limit_per_minute:
             logger.warning(f"Rate limit exceeded for {agent_id} using {tool_name}")
             return True
         
         # Add current request
-        limiter["requests"].append(now)
+        limiter.add(now)
         return False
     
     def validate_tool_parameters(self, 
@@ -19,6 +19,8 @@ from urllib.parse import urljoin, urlparse
 import aiohttp
 from bs4 import BeautifulSoup
 
+from src.amas.ai.streaming import emit_token, token_sink
+
 logger = logging.getLogger(__name__)
 
 # Tracing support (optional)
@@ -890,13 +892,18 @@ class UnifiedIntelligenceOrchestrator:
         parameters: Dict[str, Any],
         assigned_agents: Optional[List[str]] = None,
         user_context: Optional[Dict[str, Any]] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        token_callback: Optional[Callable] = None
     ) -> Dict[str, Any]:
         """
         Execute task with full orchestration (PART_1 requirement)
         
         This method provides the execute_task interface required by PART_1,
         using the existing agent infrastructure.
+        
+        If ``token_callback`` is given, AI generations made by the agents are
+        streamed and each token is passed to it as
+        ``{"agent_id", "provider", "delta"}``.
         """
         execution_start = time.time()
         correlation_id = str(uuid.uuid4())[:8]
@@ -985,16 +992,23 @@ class UnifiedIntelligenceOrchestrator:
                         if other_results:
                             enhanced_parameters["_other_agents_results"] = other_results
                         
+                        # Stream this agent's AI tokens to the caller, tagged with the agent
+                        agent_token_sink = None
+                        if token_callback:
+                            async def agent_token_sink(event: Dict[str, Any]):
+                                await emit_token(token_callback, {"agent_id": agent_id, **event})
+                        
                         # Check if agent is AI-powered (BaseAgent) or simple agent
                         if BASE_AGENT_AVAILABLE and isinstance(agent, BaseAgent):
                             # AI-powered agent - use execute method with enhanced context
                             logger.info(f"[{correlation_id}] Orchestrator: Using AI-powered agent: {agent_id} for task: {task_type}",
                                        extra={"task_id": task_id, "correlation_id": correlation_id, "agent_id": agent_id, "task_type": task_type, "operation": "ai_agent_execute"})
-                            result = await agent.execute(
-                                task_id=task_id,
-                                target=target,
-                                parameters=enhanced_parameters
-                            )
+                            with token_sink(agent_token_sink):
+                                result = await agent.execute(
+                                    task_id=task_id,
+                                    target=target,
+                                    parameters=enhanced_parameters
+                                )
                             # Convert BaseAgent result format to expected format
                             agent_results[agent_id] = {
                                 "success": result.get("success", False),
@@ -1019,7 +1033,8 @@ class UnifiedIntelligenceOrchestrator:
                                 priority=TaskPriority.MEDIUM,
                                 parameters=enhanced_parameters
                             )
-                            result = await agent.execute_task(task)
+                            with token_sink(agent_token_sink):
+                                result = await agent.execute_task(task)
                             agent_results[agent_id] = result
                         
                         agent_duration = time.time() - agent_start_time
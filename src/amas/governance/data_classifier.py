@@ -22,6 +22,7 @@ Example:
 """
 
 import asyncio
+import bisect
 import copy
 import hashlib
 import json
@@ -33,7 +34,9 @@ import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Pattern
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+)
 
 logger = logging.getLogger(__name__)
 
@@ -257,57 +260,251 @@ class PIIDetector:
             PIIType.DATE_OF_BIRTH: ['birth', 'dob', 'birthday', 'born']
         }
 
+        self._build_scanner()
+
         logger.info(
             "PII Detector initialized with %d pattern types",
             len(self.patterns)
         )
 
+    def _build_scanner(self) -> None:
+        """Compile all patterns into one single-pass scanner
+
+        Every pattern becomes a named alternative of a combined regex, so
+        text is scanned once instead of once per pattern. Patterns starting
+        with ``\\b`` share one leading word-boundary test, which rejects most
+        positions before any alternative is tried. Matches do not overlap.
+        The text is scanned left to right and the leftmost match wins, so a
+        pattern matching from an earlier position hides any match that
+        overlaps it, whatever their order. Between matches starting at the
+        same position, ``\\b`` patterns are tried before the others, each
+        in ``self.patterns`` order, and the first that matches wins (e.g.
+        ``A12345678`` is a passport, not a driver's license). Call again
+        after changing ``patterns`` or ``context_keywords``.
+        """
+        at_word_start = []
+        anywhere = []
+        self._group_types: Dict[str, PIIType] = {}
+        for pii_type, patterns in self.patterns.items():
+            for pattern in patterns:
+                name = f"p{len(self._group_types)}"
+                flags = "i" if pattern.flags & re.IGNORECASE else ""
+                source = pattern.pattern
+                if source.startswith(r"\b"):
+                    at_word_start.append(f"(?P<{name}>(?{flags}:{source[2:]}))")
+                else:
+                    anywhere.append(f"(?P<{name}>(?{flags}:{source}))")
+                self._group_types[name] = pii_type
+
+        alternatives = anywhere
+        if at_word_start:
+            alternatives = [r"\b(?:" + "|".join(at_word_start) + ")"] + anywhere
+        self._scanner = re.compile("|".join(alternatives))
+
+        self._keyword_types: Dict[str, List[PIIType]] = {}
+        for pii_type, keywords in self.context_keywords.items():
+            for keyword in keywords:
+                self._keyword_types.setdefault(keyword.lower(), []).append(pii_type)
+
+    def _index_keywords(
+        self,
+        text: str,
+        all_positions: bool = False
+    ) -> Dict[PIIType, List[int]]:
+        """Map PII types to positions of their context keywords in ``text``
+
+        Keywords are matched case-insensitively as substrings. Without
+        ``all_positions`` only the first occurrence of each keyword is
+        recorded, which is enough to test for presence.
+        """
+        lowered = text.lower()
+        index: Dict[PIIType, List[int]] = {}
+        for keyword, pii_types in self._keyword_types.items():
+            positions = []
+            start = lowered.find(keyword)
+            while start != -1:
+                positions.append(start)
+                if not all_positions:
+                    break
+                start = lowered.find(keyword, start + 1)
+            if positions:
+                for pii_type in pii_types:
+                    index.setdefault(pii_type, []).extend(positions)
+        if all_positions:
+            for positions in index.values():
+                positions.sort()
+        return index
+
+    @staticmethod
+    def _has_context(
+        keyword_index: Dict[PIIType, List[int]],
+        pii_type: PIIType,
+        start: int,
+        end: int,
+        context_window: Optional[int]
+    ) -> bool:
+        """Check for a context keyword anywhere, or within the window"""
+        positions = keyword_index.get(pii_type)
+        if not positions:
+            return False
+        if context_window is None:
+            return True
+        i = bisect.bisect_left(positions, start - context_window)
+        return i < len(positions) and positions[i] <= end + context_window
+
+    def _iter_matches(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None
+    ) -> Iterator[Tuple[PIIType, "re.Match[str]"]]:
+        """Yield (type, match) for every PII match in one pass"""
+        group_types = self._group_types
+        if endpos is None:
+            endpos = len(text)
+        for match in self._scanner.finditer(text, pos, endpos):
+            yield group_types[match.lastgroup], match
+
+    def _make_detection(
+        self,
+        pii_type: PIIType,
+        matched_value: str,
+        confidence: float,
+        start: int,
+        end: int,
+        context: Optional[str]
+    ) -> PIIDetection:
+        """Build a detection (hash and redaction are only computed here)"""
+        return PIIDetection(
+            pii_type=pii_type,
+            confidence=confidence,
+            location=f"position_{start}_{end}",
+            value_hash=hashlib.sha256(matched_value.encode()).hexdigest()[:16],
+            redacted_value=self._create_redacted_value(pii_type, matched_value),
+            original_value=matched_value,
+            context=context
+        )
+
     def detect_pii_in_text(
         self,
         text: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        min_confidence: float = 0.0,
+        context_window: Optional[int] = None
     ) -> List[PIIDetection]:
-        """Detect PII in text content with confidence scoring"""
+        """Detect PII in text content with confidence scoring
+
+        Args:
+            text: Text to scan
+            context: Label attached to every detection (e.g. field name)
+            min_confidence: Drop matches scoring below this before hashing
+            context_window: Only count context keywords within this many
+                characters of a match (None = anywhere in the text)
+
+        Returns:
+            Detections in text order
+        """
         if not text or not isinstance(text, str):
             return []
 
+        keyword_index = self._index_keywords(
+            text, all_positions=context_window is not None
+        )
         detections = []
 
-        for pii_type, patterns in self.patterns.items():
-            for pattern in patterns:
-                matches = pattern.finditer(text)
+        for pii_type, match in self._iter_matches(text):
+            matched_value = match.group()
+            start, end = match.span()
+            confidence = self._score(
+                pii_type,
+                matched_value,
+                self._has_context(
+                    keyword_index, pii_type, start, end, context_window
+                )
+            )
+            if confidence < min_confidence:
+                continue
+            detections.append(self._make_detection(
+                pii_type, matched_value, confidence, start, end, context
+            ))
 
-                for match in matches:
-                    matched_value = match.group()
+        return detections
 
-                    # Calculate confidence
-                    confidence = self._calculate_confidence(
-                        pii_type, matched_value, text
-                    )
+    def scan_stream(
+        self,
+        chunks: Iterable[str],
+        overlap: int = 256,
+        context: Optional[str] = None,
+        min_confidence: float = 0.0,
+        context_window: Optional[int] = None
+    ) -> Iterator[PIIDetection]:
+        """Detect PII in chunked input without holding the whole document
+
+        Consecutive chunks are scanned with ``overlap`` characters carried
+        over, so PII split across a chunk boundary is still found once.
+        ``overlap`` must exceed the longest value to detect. Without a
+        ``context_window``, a context keyword counts if it appeared anywhere
+        in the stream so far or in the current chunk.
 
-                    # Create redacted value
-                    redacted_value = self._create_redacted_value(
-                        pii_type, matched_value
+        Args:
+            chunks: Text chunks in document order
+            overlap: Characters carried into the next scan
+            context: Label attached to every detection
+            min_confidence: Drop matches scoring below this before hashing
+            context_window: Only count keywords within this many characters
+
+        Yields:
+            Detections with document-wide positions, in text order
+        """
+        carry = ""
+        base = 0          # Document offset of carry[0]
+        scan_from = 0     # Offset in the buffer where scanning resumes
+        seen_context = set()
+        chunk_iter = iter(chunks)
+        chunk = next(chunk_iter, None)
+
+        while chunk is not None:
+            next_chunk = next(chunk_iter, None)
+            final = next_chunk is None
+            buffer = carry + chunk
+            keyword_index = self._index_keywords(
+                buffer, all_positions=context_window is not None
+            )
+            # Matches ending past this point may still grow with more input
+            safe_end = len(buffer) if final else max(scan_from, len(buffer) - overlap)
+            cut = safe_end
+
+            for pii_type, match in self._iter_matches(buffer, scan_from):
+                start, end = match.span()
+                if end > safe_end:
+                    cut = min(cut, start)
+                    break
+                matched_value = match.group()
+                if context_window is None:
+                    has_context = (
+                        pii_type in seen_context or pii_type in keyword_index
                     )
-
-                    # Generate secure hash for tracking
-                    value_hash = hashlib.sha256(
-                        matched_value.encode()
-                    ).hexdigest()[:16]
-
-                    detection = PIIDetection(
-                        pii_type=pii_type,
-                        confidence=confidence,
-                        location=f"position_{match.start()}_{match.end()}",
-                        value_hash=value_hash,
-                        redacted_value=redacted_value,
-                        original_value=matched_value,
-                        context=context
+                else:
+                    has_context = self._has_context(
+                        keyword_index, pii_type, start, end, context_window
                     )
-
-                    detections.append(detection)
-
-        return detections
+                confidence = self._score(pii_type, matched_value, has_context)
+                if confidence >= min_confidence:
+                    yield self._make_detection(
+                        pii_type, matched_value, confidence,
+                        base + start, base + end, context
+                    )
+                cut = max(cut, end)
+
+            seen_context.update(keyword_index)
+            # Keep one character before the cut so word boundaries still hold
+            keep_from = max(0, cut - 1)
+            if context_window is not None:
+                keep_from = max(0, min(keep_from, cut - context_window))
+            carry = buffer[keep_from:]
+            base += keep_from
+            scan_from = cut - keep_from
+            chunk = next_chunk
 
     def detect_pii_in_dict(
         self,
@@ -359,16 +556,24 @@ class PIIDetector:
         full_text: str
     ) -> float:
         """Calculate confidence score for PII detection"""
+        return self._score(
+            pii_type,
+            matched_value,
+            pii_type in self._index_keywords(full_text)
+        )
+
+    def _score(
+        self,
+        pii_type: PIIType,
+        matched_value: str,
+        has_context: bool
+    ) -> float:
+        """Confidence for a match given whether a context keyword is present"""
         base_confidence = 0.7  # Base confidence for pattern match
 
         # Boost confidence based on context keywords
-        if pii_type in self.context_keywords:
-            context_lower = full_text.lower()
-            if any(
-                keyword in context_lower
-                for keyword in self.context_keywords[pii_type]
-            ):
-                base_confidence = min(0.95, base_confidence + 0.2)
+        if has_context:
+            base_confidence = min(0.95, base_confidence + 0.2)
 
         # Boost confidence for strong patterns
         if (
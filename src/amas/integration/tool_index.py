@@ -0,0 +1,217 @@
+"""
+Tool Catalog Index
+
+Inverted indexes over registered tools by category, capability and agent
+specialty, plus a tokenized name/description index ranked with BM25.
+Static ranking terms are precomputed per tool and the usage normaliser is
+maintained incrementally, so ToolRegistry searches touch only the
+candidate tools instead of rebuilding and re-sorting the whole catalog.
+"""
+
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters; name terms count NAME_WEIGHT times towards term frequency
+BM25_K1 = 1.2
+BM25_B = 0.75
+NAME_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens"""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _signature(tool: Any) -> Tuple[Any, ...]:
+    """The tool fields the filter and text indexes are built from"""
+    return (tool.name, tool.description, tool.category, tuple(tool.capabilities))
+
+
+class ToolCatalogIndex:
+    """Incrementally maintained search index over tool definitions"""
+
+    def __init__(self, specialty_categories: Dict[str, Iterable[Any]]):
+        self.specialty_categories = {
+            specialty: set(categories) for specialty, categories in specialty_categories.items()
+        }
+
+        self.by_category: Dict[Any, Set[str]] = {}
+        self.by_capability: Dict[Any, Set[str]] = {}
+        self.by_specialty: Dict[str, Set[str]] = {s: set() for s in self.specialty_categories}
+
+        # Text index: term -> {tool_id: weighted term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.vocabulary: List[str] = []  # Sorted, for prefix expansion
+        self.doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+        # Ranking constants
+        self.base_scores: Dict[str, float] = {}
+        self.usage_counts: Dict[str, int] = {}
+        self.max_usage = 0
+
+        self._tools: Dict[str, Any] = {}
+        # Indexed fields and terms as of add(), so remove() and is_current()
+        # stay correct after a tool object is mutated in place
+        self._signatures: Dict[str, Tuple[Any, ...]] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, tool_id: str) -> bool:
+        return tool_id in self._tools
+
+    # Updates
+
+    def add(self, tool: Any):
+        """Index a tool, replacing any previous entry with the same id"""
+        if tool.id in self._tools:
+            self.remove(tool.id)
+        self._tools[tool.id] = tool
+        self._signatures[tool.id] = _signature(tool)
+        self._order[tool.id] = self._next_order
+        self._next_order += 1
+
+        self.by_category.setdefault(tool.category, set()).add(tool.id)
+        for capability in tool.capabilities:
+            self.by_capability.setdefault(capability, set()).add(tool.id)
+        for specialty, categories in self.specialty_categories.items():
+            if tool.category in categories:
+                self.by_specialty[specialty].add(tool.id)
+
+        frequencies: Dict[str, int] = {}
+        for term in tokenize(tool.name):
+            frequencies[term] = frequencies.get(term, 0) + NAME_WEIGHT
+        for term in tokenize(tool.description):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, frequency in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self.vocabulary, term)
+            postings[tool.id] = frequency
+        self._terms[tool.id] = list(frequencies)
+        length = sum(frequencies.values())
+        self.doc_lengths[tool.id] = length
+        self._total_length += length
+
+        self.update_stats(tool)
+
+    def remove(self, tool_id: str):
+        """Drop a tool from every index"""
+        if self._tools.pop(tool_id, None) is None:
+            return
+        del self._order[tool_id]
+        _, _, category, _ = self._signatures.pop(tool_id)
+
+        self.by_category[category].discard(tool_id)
+        for ids in self.by_capability.values():
+            ids.discard(tool_id)
+        for ids in self.by_specialty.values():
+            ids.discard(tool_id)
+
+        for term in self._terms.pop(tool_id):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(tool_id, None)
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+        self._total_length -= self.doc_lengths.pop(tool_id)
+
+        self.base_scores.pop(tool_id)
+        if self.usage_counts.pop(tool_id) == self.max_usage:
+            self.max_usage = max(self.usage_counts.values(), default=0)
+
+    def is_current(self, tool: Any) -> bool:
+        """Whether the index holds this exact tool object with unchanged indexed fields"""
+        return self._tools.get(tool.id) is tool and self._signatures[tool.id] == _signature(tool)
+
+    def tool_ids(self) -> List[str]:
+        """Ids of every indexed tool"""
+        return list(self._tools)
+
+    def update_stats(self, tool: Any):
+        """Refresh ranking constants after a tool's quality or usage changes"""
+        self.base_scores[tool.id] = (
+            tool.quality_score * 0.4 +
+            tool.success_rate * 0.3 +
+            (1.0 - min(tool.cost_per_execution / 0.1, 1.0)) * 0.2  # Lower cost = higher rank
+        )
+        previous = self.usage_counts.get(tool.id, 0)
+        self.usage_counts[tool.id] = tool.usage_count
+        if tool.usage_count >= self.max_usage:
+            self.max_usage = tool.usage_count
+        elif previous == self.max_usage:
+            self.max_usage = max(self.usage_counts.values())
+
+    # Queries
+
+    def candidates(self,
+                   category: Any = None,
+                   capabilities: Optional[Iterable[Any]] = None,
+                   agent_specialty: Optional[str] = None) -> Optional[Set[str]]:
+        """Tool ids passing the indexed filters, or None when none were given"""
+        sets = []
+        if category:
+            sets.append(self.by_category.get(category, set()))
+        if capabilities:
+            sets.append(set().union(*(self.by_capability.get(c, set()) for c in capabilities)))
+        if agent_specialty:
+            sets.append(self.by_specialty.get(agent_specialty, set()))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def text_scores(self, query: str) -> Dict[str, float]:
+        """BM25 scores of tools matching every query token (as a word prefix)"""
+        tokens = tokenize(query)
+        if not tokens or not self._tools:
+            return {}
+
+        n = len(self._tools)
+        avg_length = self._total_length / n or 1.0
+        scores: Optional[Dict[str, float]] = None
+        for token in dict.fromkeys(tokens):
+            token_scores: Dict[str, float] = {}
+            start = bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:]:
+                if not term.startswith(token):
+                    break
+                postings = self.postings[term]
+                idf = math.log(1.0 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for tool_id, frequency in postings.items():
+                    if scores is not None and tool_id not in scores:
+                        continue
+                    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_lengths[tool_id] / avg_length)
+                    score = idf * frequency * (BM25_K1 + 1.0) / (frequency + norm)
+                    # A token expanding to several terms counts its best match once
+                    if score > token_scores.get(tool_id, 0.0):
+                        token_scores[tool_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {tool_id: scores[tool_id] + s for tool_id, s in token_scores.items()}
+            if not scores:
+                return {}
+        return scores
+
+    def rank_score(self, tool_id: str) -> float:
+        """Quality, reliability, cost and normalised usage ranking score"""
+        return (
+            self.base_scores[tool_id] +
+            self.usage_counts[tool_id] / max(1, self.max_usage) * 0.1
+        )
+
+    def order(self, tool_id: str) -> int:
+        """Registration order, used to break ranking ties deterministically"""
+        return self._order[tool_id]
@@ -21,6 +21,8 @@ import yaml
 import jsonschema
 from abc import ABC, abstractmethod
 
+from .tool_index import ToolCatalogIndex
+
 logger = logging.getLogger(__name__)
 
 class ToolCategory(str, Enum):
@@ -85,6 +87,17 @@ class ToolCapability(str, Enum):
     CACHED = "cached"
     STATEFUL = "stateful"
 
+# Tool categories each agent specialty can use
+AGENT_SPECIALTY_CATEGORIES = {
+    'academic_researcher': [ToolCategory.RESEARCH_TOOLS, ToolCategory.DATA_PROCESSING],
+    'web_intelligence_gatherer': [ToolCategory.WEB_SCRAPING, ToolCategory.API_INTEGRATION],
+    'data_analyst': [ToolCategory.DATA_PROCESSING, ToolCategory.ANALYTICS, ToolCategory.VISUALIZATION],
+    'graphics_designer': [ToolCategory.VISUALIZATION, ToolCategory.MEDIA_PROCESSING],
+    'content_writer': [ToolCategory.CONTENT_CREATION, ToolCategory.DOCUMENT_GENERATION],
+    'fact_checker': [ToolCategory.RESEARCH_TOOLS, ToolCategory.API_INTEGRATION],
+    'quality_controller': [ToolCategory.AUDIT, ToolCategory.COMPLIANCE]
+}
+
 @dataclass
 class ToolParameter:
     """Represents a tool parameter definition"""
@@ -147,19 +160,7 @@ class ToolDefinition:
     
     def is_compatible_with_agent(self, agent_specialty: str) -> bool:
         """Check if tool is compatible with agent specialty"""
-        # Define compatibility mapping
-        compatibility_map = {
-            'academic_researcher': [ToolCategory.RESEARCH_TOOLS, ToolCategory.DATA_PROCESSING],
-            'web_intelligence_gatherer': [ToolCategory.WEB_SCRAPING, ToolCategory.API_INTEGRATION],
-            'data_analyst': [ToolCategory.DATA_PROCESSING, ToolCategory.ANALYTICS, ToolCategory.VISUALIZATION],
-            'graphics_designer': [ToolCategory.VISUALIZATION, ToolCategory.MEDIA_PROCESSING],
-            'content_writer': [ToolCategory.CONTENT_CREATION, ToolCategory.DOCUMENT_GENERATION],
-            'fact_checker': [ToolCategory.RESEARCH_TOOLS, ToolCategory.API_INTEGRATION],
-            'quality_controller': [ToolCategory.AUDIT, ToolCategory.COMPLIANCE]
-        }
-        
-        compatible_categories = compatibility_map.get(agent_specialty, [])
-        return self.category in compatible_categories
+        return self.category in AGENT_SPECIALTY_CATEGORIES.get(agent_specialty, [])
 
 @dataclass
 class ToolExecution:
@@ -243,6 +244,7 @@ class ToolRegistry:
         # Tool storage
         self.registered_tools: Dict[str, ToolDefinition] = {}
         self.tool_instances: Dict[str, BaseTool] = {}
+        self.tool_index = ToolCatalogIndex(AGENT_SPECIALTY_CATEGORIES)
         
         # Execution tracking
         self.active_executions: Dict[str, ToolExecution] = {}
@@ -425,12 +427,14 @@ class ToolRegistry:
         """Register a tool with its instance"""
         self.registered_tools[definition.id] = definition
         self.tool_instances[definition.id] = tool_instance
+        self.tool_index.add(definition)
         
         logger.info(f"Registered tool: {definition.name} ({definition.id})")
     
     async def _register_tool_definition(self, definition: ToolDefinition):
         """Register tool definition (for config-based tools)"""
         self.registered_tools[definition.id] = definition
+        self.tool_index.add(definition)
         
         logger.info(f"Registered tool definition: {definition.name} ({definition.id})")
     
@@ -529,6 +533,7 @@ class ToolRegistry:
             self.successful_executions += 1
             definition.usage_count += 1
             definition.last_used = execution.completed_at
+            self.tool_index.update_stats(definition)
             
             logger.info(f"Tool execution successful: {tool_id} ({execution_id})")
             
@@ -581,6 +586,27 @@ class ToolRegistry:
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
+    def update_tool_stats(self, tool_id: str, **stats: Any):
+        """Update a tool's quality/usage fields and its ranking in the index"""
+        definition = self.registered_tools.get(tool_id)
+        if not definition:
+            raise ValueError(f"Tool not found: {tool_id}")
+        for name, value in stats.items():
+            if not hasattr(definition, name):
+                raise ValueError(f"Unknown tool field: {name}")
+            setattr(definition, name, value)
+        self.tool_index.update_stats(definition)
+    
+    def _sync_index(self):
+        """Reindex tools added, replaced, mutated or removed outside the registry"""
+        index = self.tool_index
+        for tool_id in index.tool_ids():
+            if tool_id not in self.registered_tools:
+                index.remove(tool_id)
+        for definition in self.registered_tools.values():
+            if not index.is_current(definition):
+                index.add(definition)
+    
     def search_tools(self,
                     query: str = None,
                     category: ToolCategory = None,
@@ -589,21 +615,30 @@ class ToolRegistry:
                     max_cost: float = None,
                     max_time: float = None,
                     min_quality: float = None) -> List[ToolDefinition]:
-        """Search tools with filters and ranking"""
+        """Search tools with filters and ranking
         
-        results = list(self.registered_tools.values())
+        Category, capability and specialty filters are answered from the
+        tool index. Query tokens must each match a word (or word prefix) of
+        the name or description; matches rank by BM25 relevance, then by
+        quality, reliability, cost and usage.
+        """
+        self._sync_index()
+        index = self.tool_index
         
-        # Apply filters
-        if category:
-            results = [tool for tool in results if tool.category == category]
+        candidate_ids = index.candidates(category, capabilities, agent_specialty)
         
-        if capabilities:
-            results = [tool for tool in results 
-                      if any(cap in tool.capabilities for cap in capabilities)]
+        text_scores = None
+        if query:
+            text_scores = index.text_scores(query)
+            if candidate_ids is None:
+                candidate_ids = text_scores.keys()
+            else:
+                candidate_ids = candidate_ids & text_scores.keys()
         
-        if agent_specialty:
-            results = [tool for tool in results 
-                      if tool.is_compatible_with_agent(agent_specialty)]
+        if candidate_ids is None:
+            results = list(self.registered_tools.values())
+        else:
+            results = [self.registered_tools[tool_id] for tool_id in candidate_ids]
         
         if max_cost is not None:
             results = [tool for tool in results if tool.cost_per_execution <= max_cost]
@@ -614,32 +649,24 @@ class ToolRegistry:
         if min_quality is not None:
             results = [tool for tool in results if tool.quality_score >= min_quality]
         
-        # Text search in name and description
-        if query:
-            query_lower = query.lower()
-            results = [tool for tool in results 
-                      if query_lower in tool.name.lower() or 
-                         query_lower in tool.description.lower()]
-        
         # Rank results by relevance and quality
-        results.sort(key=lambda t: (
-            t.quality_score * 0.4 +
-            t.success_rate * 0.3 +
-            (1.0 - min(t.cost_per_execution / 0.1, 1.0)) * 0.2 +  # Lower cost = higher rank
-            (t.usage_count / max(1, max(tool.usage_count for tool in results))) * 0.1
-        ), reverse=True)
+        if text_scores is not None:
+            results.sort(key=lambda t: (-text_scores[t.id], -index.rank_score(t.id), index.order(t.id)))
+        else:
+            results.sort(key=lambda t: (-index.rank_score(t.id), index.order(t.id)))
         
         return results
     
     def get_tools_for_agent(self, agent_specialty: str) -> List[ToolDefinition]:
         """Get recommended tools for specific agent specialty"""
         compatible_tools = self.search_tools(agent_specialty=agent_specialty)
+        max_usage = max(1, self.tool_index.max_usage)
         
         # Sort by compatibility score and usage
         compatible_tools.sort(key=lambda t: (
             t.quality_score * 0.5 +
             t.success_rate * 0.3 +
-            (t.usage_count / max(1, max(tool.usage_count for tool in compatible_tools))) * 0.2
+            (t.usage_count / max_usage) * 0.2
         ), reverse=True)
         
         return compatible_tools[:20]  # Return top 20 tools
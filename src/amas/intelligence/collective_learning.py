@@ -9,7 +9,7 @@ import hashlib
 import json
 import logging
 import pickle
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -61,14 +61,84 @@ class CollectiveKnowledge:
     last_updated: str
 
 
+class PatternFeatureStore:
+    """
+    Pre-normalized task feature rows per task category
+
+    Rows live in one contiguous float32 matrix per category (grown by
+    doubling), so scoring a query against every historical pattern is a
+    single matrix-vector product instead of a Python loop.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.initial_capacity = initial_capacity
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._patterns: Dict[str, List[TaskPattern]] = defaultdict(list)
+
+    def add(self, category: str, features: np.ndarray, pattern: TaskPattern):
+        """Append a pattern's feature row to its category"""
+        patterns = self._patterns[category]
+        count = len(patterns)
+        matrix = self._matrices.get(category)
+        if matrix is None or count == len(matrix):
+            grown = np.zeros(
+                (max(self.initial_capacity, 2 * count), len(features)), dtype=np.float32
+            )
+            if matrix is not None:
+                grown[:count] = matrix
+            matrix = self._matrices[category] = grown
+
+        matrix[count] = _normalize(features)
+        patterns.append(pattern)
+
+    def top_k(
+        self, category: str, features: np.ndarray, k: int, threshold: float
+    ) -> List[Tuple[TaskPattern, float]]:
+        """Patterns in ``category`` with cosine similarity above ``threshold``, best first"""
+        patterns = self._patterns.get(category)
+        if not patterns:
+            return []
+
+        scores = self._matrices[category][: len(patterns)] @ _normalize(features)
+        if len(scores) > k:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[scores[candidates] > threshold]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(patterns[i], float(scores[i])) for i in candidates]
+
+    def clear(self):
+        self._matrices.clear()
+        self._patterns.clear()
+
+    def __len__(self) -> int:
+        return sum(len(patterns) for patterns in self._patterns.values())
+
+
+def _normalize(features: np.ndarray) -> np.ndarray:
+    vector = np.asarray(features, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
 class CollectiveIntelligenceEngine:
     """Advanced collective learning system for multi-agent coordination"""
 
-    def __init__(self, knowledge_db_path: str = "data/collective_knowledge.pkl"):
+    def __init__(
+        self,
+        knowledge_db_path: str = "data/collective_knowledge.pkl",
+        similarity_cache_size: int = 1000,
+    ):
         self.knowledge_db_path = knowledge_db_path
         self.shared_knowledge: Dict[str, CollectiveKnowledge] = {}
         self.agent_specializations: Dict[str, List[str]] = {}
-        self.task_similarity_cache: Dict[str, List[Tuple[str, float]]] = {}
+        self.pattern_features = PatternFeatureStore()
+        # LRU of similarity results; keys carry the category's generation so
+        # recording a task invalidates that category's cached results
+        self.similarity_cache_size = similarity_cache_size
+        self.task_similarity_cache: "OrderedDict[Tuple, List[Tuple[TaskPattern, float]]]" = OrderedDict()
+        self._category_generations: Dict[str, int] = defaultdict(int)
         self.learning_graph = nx.DiGraph()
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words="english")
         self.logger = logging.getLogger(__name__)
@@ -153,6 +223,23 @@ class CollectiveIntelligenceEngine:
             self.logger.error(f"❌ Error loading knowledge base: {e}")
             self.shared_knowledge = {}
 
+        self._rebuild_pattern_features()
+
+    def _rebuild_pattern_features(self):
+        """Index every stored pattern's features for similarity search"""
+        self.pattern_features.clear()
+        self.task_similarity_cache.clear()
+        for knowledge in self.shared_knowledge.values():
+            for pattern in knowledge.patterns:
+                self._index_pattern(knowledge.category, pattern)
+
+    def _index_pattern(self, category: str, pattern: TaskPattern):
+        features = self._extract_task_features(
+            pattern.task_type, pattern.target, pattern.parameters
+        )
+        self.pattern_features.add(category, features, pattern)
+        self._category_generations[category] += 1
+
     def save_knowledge_base(self):
         """Save collective knowledge to persistent storage"""
         try:
@@ -266,6 +353,8 @@ class CollectiveIntelligenceEngine:
                 last_updated=datetime.now().isoformat(),
             )
 
+        self._index_pattern(task_type, task_pattern)
+
         # Update learning graph
         self._update_learning_graph(task_pattern)
 
@@ -421,40 +510,31 @@ class CollectiveIntelligenceEngine:
     ) -> List[Tuple[TaskPattern, float]]:
         """Find similar tasks from historical data"""
 
-        cache_key = f"{task_type}_{target}_{hash(str(parameters))}"
+        cache_key = (
+            task_type,
+            self._category_generations[task_type],
+            target,
+            json.dumps(parameters, sort_keys=True, default=str),
+        )
 
         if cache_key in self.task_similarity_cache:
+            self.task_similarity_cache.move_to_end(cache_key)
             return self.task_similarity_cache[cache_key]
 
-        similar_tasks = []
-
         # Create feature vector for current task
         current_features = self._extract_task_features(task_type, target, parameters)
 
-        # Compare with all historical tasks
-        for knowledge in self.shared_knowledge.values():
-            if knowledge.category == task_type:
-                for pattern in knowledge.patterns:
-                    historical_features = self._extract_task_features(
-                        pattern.task_type, pattern.target, pattern.parameters
-                    )
-
-                    similarity = self._calculate_task_similarity(
-                        current_features, historical_features
-                    )
-
-                    if similarity > 0.3:  # Similarity threshold
-                        similar_tasks.append((pattern, similarity))
-
-        # Sort by similarity
-        similar_tasks.sort(key=lambda x: x[1], reverse=True)
+        # Top 10 historical tasks above the similarity threshold
+        similar_tasks = self.pattern_features.top_k(
+            task_type, current_features, k=10, threshold=0.3
+        )
 
         # Cache results
-        self.task_similarity_cache[cache_key] = similar_tasks[
-            :10
-        ]  # Top 10 similar tasks
+        self.task_similarity_cache[cache_key] = similar_tasks
+        if len(self.task_similarity_cache) > self.similarity_cache_size:
+            self.task_similarity_cache.popitem(last=False)
 
-        return similar_tasks[:10]
+        return similar_tasks
 
     def _extract_task_features(
         self, task_type: str, target: str, parameters: Dict[str, Any]
@@ -778,11 +858,11 @@ class CollectiveIntelligenceManager:
 
     async def _cleanup_cache(self):
         """Clean up old cache entries"""
-        # Clear similarity cache to prevent it from growing too large
-        if len(self.engine.task_similarity_cache) > 1000:
-            # Keep only the 500 most recent entries
-            items = list(self.engine.task_similarity_cache.items())
-            self.engine.task_similarity_cache = dict(items[-500:])
+        # The similarity cache is a bounded LRU; trim it back to the 500
+        # most recently used entries between cycles
+        cache = self.engine.task_similarity_cache
+        while len(cache) > 500:
+            cache.popitem(last=False)
 
     async def _generate_learning_report(self):
         """Generate periodic learning report"""
@@ -15,6 +15,8 @@ Key Features:
 - Quality Coordination: Specialized coordinators for research and QA workflows
 - Message Expiration: Time-based message expiration for stale data
 - Retry Logic: Automatic retry with exponential backoff for failed deliveries
+- Event-Driven Delivery: Senders wake the delivery loop and waiting recipients
+  immediately instead of relying on polling
 
 Dependencies:
 - asyncio: For asynchronous message processing
@@ -42,6 +44,9 @@ Usage Example:
 
 Performance Considerations:
 - Message queues use deque for O(1) append/pop operations
+- Pending messages are drained in batches per delivery tick
+- Retries wait on a heap keyed by due time, so backoff never blocks delivery
+  of healthy messages
 - Broadcast subscriptions use sets for O(1) membership checks
 - Message cleanup runs in background to prevent memory leaks
 - Failed deliveries are tracked for monitoring and debugging
@@ -53,8 +58,10 @@ Security Considerations:
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
@@ -369,7 +376,7 @@ class CommunicationChannel:
 class AgentCommunicationBus:
     """Central communication hub for all agent interactions"""
     
-    def __init__(self):
+    def __init__(self, delivery_batch_size: int = 256, latency_window: int = 10000):
         self.channels: Dict[str, CommunicationChannel] = {}
         self.message_queues: Dict[str, deque] = defaultdict(deque)
         self.broadcast_subscriptions: Dict[str, Set[str]] = defaultdict(set)
@@ -378,6 +385,16 @@ class AgentCommunicationBus:
         self.pending_deliveries: deque = deque()
         self.failed_deliveries: deque = deque()
         
+        # Event-driven delivery: senders set _delivery_event to wake the
+        # delivery loop, recipients wait on their own event for new messages.
+        # Retries sit in a heap of (due_time, seq, message) until they are due.
+        self.delivery_batch_size = delivery_batch_size
+        self._delivery_event = asyncio.Event()
+        self._recipient_events: Dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+        self._retry_heap: List[Tuple[float, int, AgentMessage]] = []
+        self._retry_sequence = itertools.count()
+        self._delivery_latencies_ms: deque = deque(maxlen=latency_window)
+        
         # Performance tracking
         self.total_messages: int = 0
         self.successful_deliveries: int = 0
@@ -445,9 +462,10 @@ class AgentCommunicationBus:
         if priority in [Priority.HIGH, Priority.URGENT, Priority.CRITICAL]:
             message.expires_at = datetime.now(timezone.utc) + timedelta(minutes=30)
         
-        # Queue for delivery
+        # Queue for delivery and wake the delivery loop
         self.pending_deliveries.append(message)
         self.total_messages += 1
+        self._delivery_event.set()
         
         logger.debug(f"Queued message {message.id}: {sender_id} -> {recipient_id} ({message_type.value})")
         
@@ -495,6 +513,8 @@ class AgentCommunicationBus:
     async def get_messages(self, agent_id: str, limit: int = 10) -> List[AgentMessage]:
         """Get pending messages for an agent"""
         agent_queue = self.message_queues[agent_id]
+        if agent_id in self._recipient_events:
+            self._recipient_events[agent_id].clear()
         
         messages = []
         for _ in range(min(limit, len(agent_queue))):
@@ -505,8 +525,30 @@ class AgentCommunicationBus:
                     message.delivered = True
                     self.successful_deliveries += 1
         
+        if agent_queue and agent_id in self._recipient_events:
+            self._recipient_events[agent_id].set()
+        
         return messages
     
+    async def wait_for_messages(self,
+                              agent_id: str,
+                              limit: int = 10,
+                              timeout: Optional[float] = None) -> List[AgentMessage]:
+        """
+        Wait until messages are delivered to an agent, then return them.
+        
+        Wakes as soon as a message lands in the agent's queue rather than
+        polling. Returns an empty list if the timeout elapses first.
+        """
+        if not self.message_queues[agent_id]:
+            event = self._recipient_events[agent_id]
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return await self.get_messages(agent_id, limit)
+    
     async def send_response(self,
                           responding_agent_id: str,
                           original_message_id: str,
@@ -705,39 +747,71 @@ class AgentCommunicationBus:
     
     async def _process_message_queue(self):
         """Background task to process pending message deliveries"""
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                if self.pending_deliveries:
-                    message = self.pending_deliveries.popleft()
-                    
-                    if message.is_expired():
-                        self.failed_deliveries_count += 1
-                        logger.warning(f"Message {message.id} expired before delivery")
-                        continue
-                    
-                    # Attempt delivery
-                    success = await self._deliver_message(message)
-                    
-                    if success:
-                        self.successful_deliveries += 1
-                    else:
-                        message.delivery_attempts += 1
-                        
-                        if message.delivery_attempts < message.max_delivery_attempts:
-                            # Retry with exponential backoff
-                            await asyncio.sleep(2 ** message.delivery_attempts)
-                            self.pending_deliveries.append(message)
-                        else:
-                            self.failed_deliveries.append(message)
-                            self.failed_deliveries_count += 1
-                            logger.error(f"Message {message.id} failed after {message.max_delivery_attempts} attempts")
+                if not self.pending_deliveries:
+                    # Sleep until a sender wakes us or the next retry is due
+                    timeout = None
+                    if self._retry_heap:
+                        timeout = max(0.0, self._retry_heap[0][0] - loop.time())
+                    try:
+                        await asyncio.wait_for(self._delivery_event.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                self._delivery_event.clear()
                 
-                await asyncio.sleep(0.1)  # Prevent busy waiting
+                self._requeue_due_retries(loop.time())
+                await self._deliver_batch(loop.time())
                 
+                # Yield so senders and recipients run between batches
+                await asyncio.sleep(0)
+                
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in message processing: {e}")
                 await asyncio.sleep(1)
     
+    def _requeue_due_retries(self, now: float):
+        """Move retries whose backoff has elapsed back to pending deliveries"""
+        while self._retry_heap and self._retry_heap[0][0] <= now:
+            _, _, message = heapq.heappop(self._retry_heap)
+            self.pending_deliveries.append(message)
+    
+    async def _deliver_batch(self, now: float):
+        """Deliver up to delivery_batch_size pending messages"""
+        for _ in range(min(self.delivery_batch_size, len(self.pending_deliveries))):
+            message = self.pending_deliveries.popleft()
+            
+            if message.is_expired():
+                self.failed_deliveries_count += 1
+                logger.warning(f"Message {message.id} expired before delivery")
+                continue
+            
+            # Attempt delivery
+            success = await self._deliver_message(message)
+            
+            if success:
+                self.successful_deliveries += 1
+            else:
+                message.delivery_attempts += 1
+                
+                if message.delivery_attempts < message.max_delivery_attempts:
+                    # Retry with exponential backoff off the delivery path
+                    due = now + 2 ** message.delivery_attempts
+                    heapq.heappush(
+                        self._retry_heap, (due, next(self._retry_sequence), message)
+                    )
+                else:
+                    self.failed_deliveries.append(message)
+                    self.failed_deliveries_count += 1
+                    logger.error(f"Message {message.id} failed after {message.max_delivery_attempts} attempts")
+        
+        if self.pending_deliveries:
+            # More than one batch queued; keep draining on the next tick
+            self._delivery_event.set()
+    
     async def _deliver_message(self, message: AgentMessage) -> bool:
         """Attempt to deliver a message to its recipient"""
         try:
@@ -767,6 +841,16 @@ class AgentCommunicationBus:
             # Update delivery status
             message.delivered = True
             
+            latency_ms = message.get_age_seconds() * 1000
+            self._delivery_latencies_ms.append(latency_ms)
+            channel.avg_latency_ms += (
+                latency_ms - channel.avg_latency_ms
+            ) / channel.message_count
+            
+            # Wake the recipient if it is waiting for messages
+            if message.recipient_agent_id in self._recipient_events:
+                self._recipient_events[message.recipient_agent_id].set()
+            
             logger.debug(f"Message {message.id} delivered to {message.recipient_agent_id}")
             return True
             
@@ -837,8 +921,10 @@ class AgentCommunicationBus:
             "active_channels": active_channels,
             "total_queue_size": total_queue_size,
             "pending_deliveries": len(self.pending_deliveries),
+            "scheduled_retries": len(self._retry_heap),
             "broadcast_topics": len(self.broadcast_subscriptions),
-            "avg_delivery_latency_ms": self._calculate_avg_delivery_latency()
+            "avg_delivery_latency_ms": self._calculate_avg_delivery_latency(),
+            "p99_delivery_latency_ms": self._calculate_delivery_latency_percentile(99)
         }
     
     def _calculate_avg_delivery_latency(self) -> float:
@@ -851,6 +937,14 @@ class AgentCommunicationBus:
             count += 1
         
         return total_latency / max(1, count)
+    
+    def _calculate_delivery_latency_percentile(self, percentile: float) -> float:
+        """Calculate a delivery latency percentile over recent deliveries"""
+        if not self._delivery_latencies_ms:
+            return 0.0
+        latencies = sorted(self._delivery_latencies_ms)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return round(latencies[index], 3)
 
 # Specialized communication helpers
 
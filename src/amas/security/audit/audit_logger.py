@@ -6,18 +6,20 @@ buffered writes, and compliance-ready audit trails.
 """
 
 import asyncio
+import functools
 import hashlib
-import json
 import logging
 import os
 import re
 from contextlib import asynccontextmanager
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .segment_store import AuditSegmentStore
+
 logger = logging.getLogger(__name__)
 
 class AuditEventType(str, Enum):
@@ -179,14 +181,25 @@ class PIIRedactor:
         return redacted_data, any_pii_found
 
 class AuditLogger:
-    """High-performance audit logger with buffering and async writes"""
+    """High-performance audit logger with buffering and async writes
+
+    Flushed batches are appended to an indexed segment store (see
+    segment_store.py) by a background writer, which groups every batch
+    queued since its last write into one writev and optional fsync.
+    ``backup_count`` is accepted for older configs; retention is now by
+    age (``retention_days``).
+    """
     
     def __init__(self, 
                  log_file: str = "logs/audit.jsonl",
                  buffer_size: int = 100,
                  flush_interval: int = 30,
                  enable_redaction: bool = True,
-                 backup_count: int = 5):
+                 backup_count: int = 5,
+                 segment_partition: str = "day",
+                 max_segment_bytes: int = 100 * 1024 * 1024,
+                 retention_days: Optional[float] = 90,
+                 fsync: bool = False):
         # Expand environment variables in log_file path if needed
         if "${" in log_file:
             import os
@@ -213,6 +226,8 @@ class AuditLogger:
         self._flush_task: Optional[asyncio.Task] = None
         self._write_queue: Optional[asyncio.Queue] = None
         self._writer_task: Optional[asyncio.Task] = None
+        # Batches handed to the writer but not yet in the store, for search
+        self._unwritten: List[List[AuditEvent]] = []
         
         self.pii_redactor = PIIRedactor() if enable_redaction else None
         
@@ -227,8 +242,13 @@ class AuditLogger:
         except Exception as e:
             logger.warning(f"Could not create log directory: {e}, using current directory")
         
-        # Setup structured logging
-        self.logger = self._setup_logger()
+        self._store = AuditSegmentStore(
+            self.log_file,
+            partition=segment_partition,
+            max_segment_bytes=max_segment_bytes,
+            retention_days=retention_days,
+            fsync=fsync,
+        )
         
         # Start async write queue and writer task (only if event loop is running)
         self._write_queue = asyncio.Queue(maxsize=1000)
@@ -242,62 +262,42 @@ class AuditLogger:
         
         logger.info(f"Audit logger initialized: {log_file} (buffer: {buffer_size}, redaction: {enable_redaction})")
     
-    def _setup_logger(self) -> logging.Logger:
-        """Setup structured audit logger"""
-        audit_logger = logging.getLogger("amas.audit")
-        audit_logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers
-        for handler in audit_logger.handlers[:]:
-            audit_logger.removeHandler(handler)
-        
-        # File handler with rotation
-        from logging.handlers import RotatingFileHandler
-        handler = RotatingFileHandler(
-            self.log_file,
-            maxBytes=100 * 1024 * 1024,  # 100MB
-            backupCount=self.backup_count
-        )
-        
-        # JSON formatter
-        handler.setFormatter(logging.Formatter('%(message)s'))
-        audit_logger.addHandler(handler)
-        
-        # Prevent propagation to root logger
-        audit_logger.propagate = False
-        
-        return audit_logger
+    def _write_batches(self, batches: List[List[AuditEvent]]):
+        """Append queued batches to the segment store in one grouped write"""
+        # vars() rather than asdict(): the encoder walks nested details itself
+        self._store.append([vars(event) for batch in batches for event in batch])
     
     def _start_async_writer(self):
         """Start background task for async log writing"""
         async def async_writer():
-            """Async writer that processes events from queue"""
+            """Async writer that drains every queued batch per store write"""
+            loop = asyncio.get_running_loop()
             while True:
                 try:
-                    # Get event from queue (with timeout to allow cancellation)
-                    try:
-                        event = await asyncio.wait_for(self._write_queue.get(), timeout=1.0)
-                    except asyncio.TimeoutError:
-                        continue
+                    batches = [await self._write_queue.get()]
+                    while not self._write_queue.empty():
+                        batches.append(self._write_queue.get_nowait())
                     
-                    # Write event to log file
                     try:
-                        event_dict = asdict(event)
-                        self.logger.info(json.dumps(event_dict, default=str))
+                        await loop.run_in_executor(None, self._write_batches, batches)
                     except Exception as e:
-                        logger.error(f"Failed to write audit event: {e}")
-                    
-                    self._write_queue.task_done()
+                        logger.error(f"Failed to write audit events: {e}")
+                    finally:
+                        del self._unwritten[:len(batches)]
+                        for _ in batches:
+                            self._write_queue.task_done()
                     
                 except asyncio.CancelledError:
                     # Process remaining events before shutdown
+                    batches = []
                     while not self._write_queue.empty():
-                        try:
-                            event = self._write_queue.get_nowait()
-                            event_dict = asdict(event)
-                            self.logger.info(json.dumps(event_dict, default=str))
-                        except Exception as e:
-                            logger.error(f"Failed to write final audit event: {e}")
+                        batches.append(self._write_queue.get_nowait())
+                        self._write_queue.task_done()
+                    try:
+                        self._write_batches(batches)
+                    except Exception as e:
+                        logger.error(f"Failed to write final audit events: {e}")
+                    self._unwritten.clear()
                     break
                 except Exception as e:
                     logger.error(f"Error in async writer: {e}")
@@ -336,8 +336,7 @@ class AuditLogger:
                     event.details = redacted_details
                     event.pii_detected = pii_found
                     event.sensitive_data_redacted = True
-                event_dict = asdict(event)
-                self.logger.info(json.dumps(event_dict, default=str))
+                self._write_batches([[event]])
                 return
         
         # Redact PII if enabled
@@ -382,23 +381,11 @@ class AuditLogger:
         self._buffer.clear()
         self._last_flush = datetime.now(timezone.utc)
         
-        # Add events to async write queue (non-blocking)
-        try:
-            for event in events_to_flush:
-                # Use put_nowait to avoid blocking; if queue is full, log warning
-                try:
-                    self._write_queue.put_nowait(event)
-                except asyncio.QueueFull:
-                    logger.warning("Audit write queue full, dropping event")
-                    # In production, consider using a bounded queue or alerting
-            
-            logger.debug(f"Queued {len(events_to_flush)} audit events for async write")
-            
-        except Exception as e:
-            logger.error(f"Failed to queue audit events: {e}")
-            # Re-add events to buffer for retry
-            async with self._buffer_lock:
-                self._buffer.extend(events_to_flush)
+        # Hand the whole batch to the writer; a full queue makes flushing
+        # (and so logging) wait for the writer instead of growing unbounded
+        self._unwritten.append(events_to_flush)
+        await self._write_queue.put(events_to_flush)
+        logger.debug(f"Queued {len(events_to_flush)} audit events for async write")
     
     # Convenience methods for common audit events
     async def log_authentication(self, 
@@ -608,15 +595,40 @@ class AuditLogger:
                               user_id: Optional[str] = None,
                               event_type: Optional[AuditEventType] = None,
                               agent_id: Optional[str] = None,
-                              hours: int = 24) -> List[AuditEvent]:
-        """Search audit logs with filters"""
+                              hours: int = 24,
+                              limit: int = 1000) -> List[AuditEvent]:
+        """Search audit logs with filters
+
+        Flushed history is answered from the segment store's index; events
+        still buffered or queued for the writer are filtered in memory.
+        At most ``limit`` events are returned, oldest first.
+        """
+        # Snapshot unwritten events before querying the store, so a batch
+        # written meanwhile is found twice (and deduplicated), never missed
         async with self._buffer_lock:
-            buffer_copy = self._buffer.copy()
+            unflushed = [event for batch in self._unwritten for event in batch]
+            unflushed.extend(self._buffer)
         
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        filtered_events = []
-        for event in buffer_copy:
+        records = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                self._store.search,
+                since=cutoff_time.timestamp(),
+                limit=limit,
+                user_id=user_id,
+                agent_id=agent_id,
+                event_type=event_type,
+            ),
+        )
+        filtered_events = [self._event_from_record(record) for record in records]
+        stored_ids = {event.event_id for event in filtered_events}
+        
+        for event in unflushed:
+            if event.event_id in stored_ids:
+                continue
+            
             # Time filter
             if datetime.fromisoformat(event.timestamp) < cutoff_time:
                 continue
@@ -635,7 +647,15 @@ class AuditLogger:
             
             filtered_events.append(event)
         
-        return filtered_events
+        return filtered_events[:limit]
+    
+    @staticmethod
+    def _event_from_record(record: Dict[str, Any]) -> AuditEvent:
+        """Rebuild an AuditEvent from a stored JSON record"""
+        values = {f.name: record[f.name] for f in fields(AuditEvent) if f.name in record}
+        values["event_type"] = AuditEventType(values["event_type"])
+        values["status"] = AuditStatus(values["status"])
+        return AuditEvent(**values)
     
     @asynccontextmanager
     async def audit_context(self, 
@@ -718,6 +738,8 @@ class AuditLogger:
             except asyncio.CancelledError:
                 pass
         
+        self._store.close()
+        
         logger.info("Audit logger shutdown complete")
 
 # Global audit logger instance
@@ -734,7 +756,11 @@ def initialize_audit_logger(config: Dict[str, Any]) -> AuditLogger:
         buffer_size=audit_config.get("buffer_size", 100),
         flush_interval=audit_config.get("flush_interval", 30),
         enable_redaction=audit_config.get("redact_sensitive", True),
-        backup_count=audit_config.get("backup_count", 5)
+        backup_count=audit_config.get("backup_count", 5),
+        segment_partition=audit_config.get("segment_partition", "day"),
+        max_segment_bytes=int(audit_config.get("max_segment_mb", 100) * 1024 * 1024),
+        retention_days=audit_config.get("retention_days", 90),
+        fsync=audit_config.get("fsync", False)
     )
     
     return _global_audit_logger
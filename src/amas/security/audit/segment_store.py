@@ -0,0 +1,416 @@
+"""
+Append-only segment store for audit events
+
+Audit events are appended as JSON lines to time-partitioned segment files
+with one batched ``writev`` per flush and optional grouped ``fsync``. Each
+segment has a sidecar index holding its timestamp and offset columns plus
+posting lists for user_id, agent_id and event_type, so searches seek
+straight to matching rows instead of rereading the JSONL.
+
+The active (head) segment lives at the configured log file path. Segments
+are sealed and renamed to ``<stem>.<partition>.<seq><suffix>`` when the
+partition period changes or the segment reaches ``max_segment_bytes``;
+sealed segments older than ``retention_days`` are deleted.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("user_id", "agent_id", "event_type")
+
+PARTITION_FORMATS = {
+    "hour": "%Y%m%d%H",
+    "day": "%Y%m%d",
+}
+
+_ENCODER = json.JSONEncoder(default=str, separators=(",", ":"))
+_IOV_MAX = 1024
+_INDEX_VERSION = 1
+
+
+def _column_value(value: Any) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+def _parse_timestamp(value: Any) -> float:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return time.time()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _write_all(fd: int, chunks: List[bytes]) -> None:
+    """Write every chunk, IOV_MAX buffers per writev call"""
+    for start in range(0, len(chunks), _IOV_MAX):
+        group = chunks[start:start + _IOV_MAX]
+        if hasattr(os, "writev"):
+            expected = sum(len(chunk) for chunk in group)
+            written = os.writev(fd, group)
+            if written == expected:
+                continue
+            remaining = b"".join(group)[written:]
+        else:
+            remaining = b"".join(group)
+        while remaining:
+            remaining = remaining[os.write(fd, remaining):]
+
+
+def _read_at(fd: int, length: int, offset: int) -> bytes:
+    """Read ``length`` bytes at ``offset``, with pread where available"""
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    data = b""
+    while len(data) < length:
+        chunk = os.read(fd, length - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class SegmentIndex:
+    """Columnar index of one segment: row timestamps, byte offsets and postings"""
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.offsets = array("q", [0])
+        self.columns: Dict[str, Dict[str, array]] = {name: {} for name in INDEXED_FIELDS}
+        self.min_ts = float("inf")
+        self.max_ts = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def size(self) -> int:
+        return self.offsets[-1]
+
+    def add(self, record: Dict[str, Any], length: int) -> None:
+        row = len(self.timestamps)
+        ts = _parse_timestamp(record.get("timestamp"))
+        self.timestamps.append(ts)
+        self.offsets.append(self.offsets[-1] + length)
+        self.min_ts = min(self.min_ts, ts)
+        self.max_ts = max(self.max_ts, ts)
+        for name in INDEXED_FIELDS:
+            value = record.get(name)
+            if value is not None:
+                self.columns[name].setdefault(_column_value(value), array("l")).append(row)
+
+    def rows(self, since: Optional[float], until: Optional[float],
+             filters: Dict[str, str], limit: int) -> Iterable[int]:
+        """Row numbers matching the filters and time range, in append order"""
+        if not self.timestamps:
+            return []
+        if (since is not None and self.max_ts < since) or (until is not None and self.min_ts > until):
+            return []
+
+        candidates: Optional[Iterable[int]] = None
+        if filters:
+            postings = []
+            for name, value in filters.items():
+                rows = self.columns[name].get(value)
+                if rows is None:
+                    return []
+                postings.append(rows)
+            postings.sort(key=len)
+            candidates = postings[0]
+            for other in postings[1:]:
+                members = set(other)
+                candidates = [row for row in candidates if row in members]
+        if candidates is None:
+            candidates = range(limit)
+
+        timestamps = self.timestamps
+        return [
+            row for row in candidates
+            if row < limit
+            and (since is None or timestamps[row] >= since)
+            and (until is None or timestamps[row] <= until)
+        ]
+
+    def to_bytes(self) -> bytes:
+        postings = array("l")
+        columns = {}
+        for name, values in self.columns.items():
+            columns[name] = {}
+            for value, rows in values.items():
+                columns[name][value] = [len(postings), len(rows)]
+                postings.extend(rows)
+        header = {
+            "version": _INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(self.timestamps),
+            "bytes": self.size,
+            "min_ts": self.min_ts if self.timestamps else None,
+            "max_ts": self.max_ts if self.timestamps else None,
+            "postings": len(postings),
+            "columns": columns,
+        }
+        return b"".join((
+            json.dumps(header, separators=(",", ":")).encode(), b"\n",
+            self.timestamps.tobytes(), self.offsets.tobytes(), postings.tobytes(),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SegmentIndex":
+        newline = data.index(b"\n")
+        header = json.loads(data[:newline])
+        if header["version"] != _INDEX_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError("Incompatible audit index")
+
+        index = cls()
+        rows = header["rows"]
+        position = newline + 1
+        for column, count in ((index.timestamps, rows), (index.offsets, rows + 1)):
+            end = position + count * column.itemsize
+            del column[:]
+            column.frombytes(data[position:end])
+            position = end
+        postings = array("l")
+        postings.frombytes(data[position:position + header["postings"] * postings.itemsize])
+        if len(postings) != header["postings"]:
+            raise ValueError("Truncated audit index")
+
+        for name, values in header["columns"].items():
+            index.columns[name] = {
+                value: postings[start:start + count] for value, (start, count) in values.items()
+            }
+        if rows:
+            index.min_ts, index.max_ts = header["min_ts"], header["max_ts"]
+        return index
+
+    @classmethod
+    def build(cls, path: Path) -> "SegmentIndex":
+        """Rebuild an index by scanning a segment file"""
+        index = cls()
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn final write
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {}
+                index.add(record, len(line))
+        return index
+
+
+class AuditSegmentStore:
+    """Time-partitioned, indexed, append-only JSONL store for audit records"""
+
+    def __init__(self,
+                 path: Path,
+                 partition: str = "day",
+                 max_segment_bytes: int = 100 * 1024 * 1024,
+                 retention_days: Optional[float] = 90,
+                 fsync: bool = False):
+        if partition not in PARTITION_FORMATS:
+            raise ValueError(f"Unknown audit segment partition: {partition}")
+
+        self.path = Path(path)
+        self.partition = partition
+        self.max_segment_bytes = max_segment_bytes
+        self.retention_days = retention_days
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._sealed: Dict[Path, Optional[SegmentIndex]] = {}
+        self._segment_pattern = re.compile(
+            rf"^{re.escape(self.path.stem)}\.(\d{{8,10}})\.(\d{{4,}}){re.escape(self.path.suffix)}$"
+        )
+
+        for segment in sorted(self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}")):
+            if self._segment_pattern.match(segment.name):
+                self._sealed[segment] = None  # Loaded on first search
+
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        self._head = self._load_index(self.path)
+        if self._head.size != os.fstat(self._fd).st_size:
+            os.ftruncate(self._fd, self._head.size)  # Drop a torn final write
+        # The head sidecar is only valid until the next append; close() rewrites it
+        self._index_path(self.path).unlink(missing_ok=True)
+        self._head_partition = self._partition_of(
+            self._head.min_ts if len(self._head) else time.time()
+        )
+        self._apply_retention()
+
+    @staticmethod
+    def _index_path(segment: Path) -> Path:
+        return segment.with_suffix(".idx")
+
+    def _partition_of(self, ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).strftime(PARTITION_FORMATS[self.partition])
+
+    def _load_index(self, segment: Path) -> SegmentIndex:
+        """Read a segment's sidecar index, rebuilding it if missing or stale"""
+        index_path = self._index_path(segment)
+        try:
+            index = SegmentIndex.from_bytes(index_path.read_bytes())
+            if index.size == segment.stat().st_size:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        if not segment.exists():
+            return SegmentIndex()
+        index = SegmentIndex.build(segment)
+        if segment != self.path:
+            self._write_index(segment, index)
+        return index
+
+    def _write_index(self, segment: Path, index: SegmentIndex) -> None:
+        index_path = self._index_path(segment)
+        tmp_path = index_path.with_suffix(".idx.tmp")
+        tmp_path.write_bytes(index.to_bytes())
+        os.replace(tmp_path, index_path)
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Append records in one vectored write, fsyncing once if enabled"""
+        if not records:
+            return
+        chunks = [(_ENCODER.encode(record) + "\n").encode() for record in records]
+
+        with self._lock:
+            if (self._partition_of(time.time()) != self._head_partition
+                    or self._head.size >= self.max_segment_bytes):
+                self._rotate()
+            _write_all(self._fd, chunks)
+            if self.fsync:
+                os.fsync(self._fd)
+            for record, chunk in zip(records, chunks):
+                self._head.add(record, len(chunk))
+
+    def _rotate(self) -> None:
+        """Seal the head segment under its partition name and start a new one"""
+        if len(self._head):
+            sequence = 1 + max(
+                (int(match.group(2)) for match in map(self._segment_pattern.match, (s.name for s in self._sealed))
+                 if match.group(1) == self._head_partition),
+                default=0,
+            )
+            sealed = self.path.with_name(
+                f"{self.path.stem}.{self._head_partition}.{sequence:04d}{self.path.suffix}"
+            )
+            if self.fsync:
+                os.fsync(self._fd)
+            os.close(self._fd)
+            os.replace(self.path, sealed)
+            self._write_index(sealed, self._head)
+            self._sealed[sealed] = self._head
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+            self._head = SegmentIndex()
+            self._apply_retention()
+        self._head_partition = self._partition_of(time.time())
+
+    def _apply_retention(self) -> None:
+        if self.retention_days is None:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for segment in list(self._sealed):
+            try:
+                if segment.stat().st_mtime >= cutoff:
+                    continue
+                segment.unlink()
+                self._index_path(segment).unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+            del self._sealed[segment]
+            logger.info(f"Removed expired audit segment {segment.name}")
+
+    def search(self,
+               since: Optional[float] = None,
+               until: Optional[float] = None,
+               limit: Optional[int] = None,
+               **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Return stored records matching the time range and field filters"""
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unindexed audit fields: {sorted(unknown)}")
+        filters = {name: _column_value(value) for name, value in filters.items() if value is not None}
+
+        # Snapshot under the lock, read outside it so appends are not blocked.
+        # Sealed segments never change; the head is only read up to the rows
+        # it held at snapshot time, through a descriptor opened before any
+        # rotation could rename it.
+        with self._lock:
+            segments = list(self._sealed.items())
+            head_index, head_rows = self._head, len(self._head)
+            head_fd = os.open(self.path, os.O_RDONLY)
+
+        results: List[Dict[str, Any]] = []
+        try:
+            for segment, index in segments:
+                if index is None:
+                    index = self._load_sealed_index(segment)
+                    if index is None:
+                        continue  # Removed by retention since the snapshot
+                rows = index.rows(since, until, filters, len(index))
+                if not rows:
+                    continue
+                try:
+                    fd = os.open(segment, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    if self._read_rows(fd, index, rows, results, limit):
+                        return results
+                finally:
+                    os.close(fd)
+
+            rows = head_index.rows(since, until, filters, head_rows)
+            self._read_rows(head_fd, head_index, rows, results, limit)
+            return results
+        finally:
+            os.close(head_fd)
+
+    def _load_sealed_index(self, segment: Path) -> Optional[SegmentIndex]:
+        """Load a sealed segment's index outside the lock and cache it"""
+        try:
+            index = self._load_index(segment)
+        except OSError:
+            return None
+        with self._lock:
+            if segment not in self._sealed:
+                return None
+            if self._sealed[segment] is None:
+                self._sealed[segment] = index
+            return self._sealed[segment]
+
+    @staticmethod
+    def _read_rows(fd: int, index: SegmentIndex, rows: Iterable[int],
+                   results: List[Dict[str, Any]], limit: Optional[int]) -> bool:
+        """Append the records at ``rows``; True once ``limit`` is reached"""
+        offsets = index.offsets
+        for row in rows:
+            start = offsets[row]
+            results.append(json.loads(_read_at(fd, offsets[row + 1] - start, start)))
+            if limit is not None and len(results) >= limit:
+                return True
+        return False
+
+    def close(self) -> None:
+        """Flush the head segment and persist its index"""
+        with self._lock:
+            if self._fd < 0:
+                return
+            if self.fsync:
+                os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+            self._write_index(self.path, self._head)
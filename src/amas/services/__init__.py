@@ -11,6 +11,7 @@ from .service_manager import ServiceManager
 from .vector_service import VectorService
 
 # Performance & Scaling Services
+from .embedding_service import EmbeddingService, get_embedding_service
 from .semantic_cache_service import SemanticCacheService, get_semantic_cache
 from .circuit_breaker_service import (
     CircuitBreaker,
@@ -35,6 +36,7 @@ from .cost_tracking_service import (
     CostSummary,
     get_cost_tracking_service,
 )
+from .cost_rollup_store import CostRollup, CostRollupStore
 from .connection_pool_service import (
     ConnectionPoolService,
     get_connection_pool_service,
@@ -52,6 +54,8 @@ __all__ = [
     "VectorService",
     "SecurityService",
     # Performance & Scaling Services
+    "EmbeddingService",
+    "get_embedding_service",
     "SemanticCacheService",
     "get_semantic_cache",
     "CircuitBreaker",
@@ -68,6 +72,8 @@ __all__ = [
     "CostTrackingService",
     "CostEntry",
     "CostSummary",
+    "CostRollup",
+    "CostRollupStore",
     "get_cost_tracking_service",
     "ConnectionPoolService",
     "get_connection_pool_service",
@@ -1,15 +1,19 @@
 """
 Agent Cache Service
 Agent performance caching with intelligent invalidation
+
+Reads go through a TieredCache (in-process L1 over Redis L2). Top-agent
+rankings share the ``rankings`` generation, so an execution retires them
+with one INCR instead of scanning the keyspace.
 """
 
-import json
 import logging
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from src.cache.redis import get_redis_client
 
+from .tiered_cache import TieredCache
+
 logger = logging.getLogger(__name__)
 
 # Global service instance
@@ -24,38 +28,16 @@ class AgentCacheService:
     - Cache agent performance metrics
     - Cache top agents rankings
     - Invalidate on execution completion
-    - Pattern-based invalidation
+    - Generation-based ranking invalidation
     """
     
+    RANKINGS = "rankings"  # Generation group for top-agent rankings
+    
     def __init__(self):
         self.cache = get_redis_client()
         self.ttl_medium = 300  # 5 minutes
-        self.key_prefix = "amas:agent:"
-    
-    def _make_key(self, *parts: str) -> str:
-        """Generate cache key"""
-        return f"{self.key_prefix}{':'.join(parts)}"
-    
-    def _serialize(self, data: Any) -> str:
-        """Serialize data to JSON string"""
-        if isinstance(data, dict):
-            serialized = {}
-            for key, value in data.items():
-                if isinstance(value, datetime):
-                    serialized[key] = value.isoformat()
-                else:
-                    serialized[key] = value
-            return json.dumps(serialized)
-        return json.dumps(data)
-    
-    def _deserialize(self, data: str) -> Any:
-        """Deserialize JSON string to Python object"""
-        if not data:
-            return None
-        try:
-            return json.loads(data)
-        except (json.JSONDecodeError, TypeError):
-            return data
+        self.ttl_stale = 60  # Served stale while a ranking is recomputed
+        self.tiered = TieredCache("amas:agent", redis=self.cache)
     
     # ========================================================================
     # AGENT PERFORMANCE CACHING
@@ -67,32 +49,12 @@ class AgentCacheService:
         
         TTL: 300 seconds (5 minutes)
         """
-        if not self.cache:
-            return await self._fetch_agent_performance_from_db(agent_id)
-        
-        cache_key = self._make_key("performance", agent_id)
-        
         try:
-            # Try cache
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.debug(f"Agent performance cache HIT: {agent_id}")
-                return self._deserialize(cached)
-            
-            logger.debug(f"Agent performance cache MISS: {agent_id}")
-            
-            # Fetch from database
-            performance = await self._fetch_agent_performance_from_db(agent_id)
-            
-            if performance:
-                # Cache for 5 minutes
-                await self.cache.setex(
-                    cache_key,
-                    self.ttl_medium,
-                    self._serialize(performance)
-                )
-            
-            return performance
+            return await self.tiered.get_or_load(
+                f"performance:{agent_id}",
+                lambda: self._fetch_agent_performance_from_db(agent_id),
+                self.ttl_medium,
+            )
         except Exception as e:
             logger.error(f"Error in get_agent_performance for {agent_id}: {e}")
             return await self._fetch_agent_performance_from_db(agent_id)
@@ -190,38 +152,18 @@ class AgentCacheService:
         Get top performing agents (cached)
         
         Cache rankings (expensive query)
-        TTL: 300 seconds
+        TTL: 300 seconds, then served stale for up to a minute while one
+        replica recomputes them
         """
-        if not self.cache:
-            return await self._fetch_top_agents_from_db(task_type, limit)
-        
-        cache_key = self._make_key(
-            "top",
-            task_type or "all",
-            str(limit)
-        )
-        
         try:
-            # Try cache
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.debug(f"Top agents cache HIT: {task_type or 'all'}")
-                return self._deserialize(cached)
-            
-            logger.debug(f"Top agents cache MISS: {task_type or 'all'}")
-            
-            # Fetch from database
-            top_agents = await self._fetch_top_agents_from_db(task_type, limit)
-            
-            if top_agents:
-                # Cache for 5 minutes
-                await self.cache.setex(
-                    cache_key,
-                    self.ttl_medium,
-                    self._serialize(top_agents)
-                )
-            
-            return top_agents
+            return await self.tiered.get_or_load(
+                f"top:{task_type or 'all'}:{limit}",
+                lambda: self._fetch_top_agents_from_db(task_type, limit),
+                self.ttl_medium,
+                group=self.RANKINGS,
+                stale_ttl=self.ttl_stale,
+                lock=True,
+            )
         except Exception as e:
             logger.error(f"Error in get_top_agents: {e}")
             return await self._fetch_top_agents_from_db(task_type, limit)
@@ -313,27 +255,12 @@ class AgentCacheService:
         
         Called on execution completion or agent update
         """
-        if not self.cache:
-            return
-        
         try:
             # Invalidate performance cache
-            performance_key = self._make_key("performance", agent_id)
-            await self.cache.delete(performance_key)
+            await self.tiered.delete(f"performance:{agent_id}")
             
             # Invalidate top agents caches (all task types)
-            pattern = self._make_key("top", "*")
-            cursor = 0
-            while True:
-                cursor, keys = await self.cache.scan(
-                    cursor,
-                    match=pattern,
-                    count=100
-                )
-                if keys:
-                    await self.cache.delete(*keys)
-                if cursor == 0:
-                    break
+            await self.tiered.invalidate(self.RANKINGS)
             
             logger.debug(f"Invalidated caches for agent: {agent_id}")
         except Exception as e:
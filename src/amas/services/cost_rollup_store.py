@@ -0,0 +1,480 @@
+"""
+Time-bucketed cost rollups for CostTrackingService
+
+Each recorded request is folded, on write, into fixed minute, hour and day
+buckets. A bucket holds counters for every dimension value the request
+belongs to: overall (``all``), ``provider``, ``model`` (``provider/model``)
+and ``user``:
+
+- requests, errors, tokens_input, tokens_output, cost_usd
+- log-scale histograms of latency and total tokens (bins 10% wide), from
+  which range queries read percentiles without touching raw entries
+
+Increments are summed per minute in process and rolled up into hours and
+days when flushed, every ``flush_interval`` seconds and before every
+query. A flush is one pipeline of HINCRBY/HINCRBYFLOAT calls on one Redis
+hash per bucket and dimension, or one SQLite upsert batch when Redis is
+unavailable, so queries read only the dimension they group by.
+
+A range query reads the fewest buckets that cover it: whole days in the
+middle, then hours and minutes at the edges. Minute buckets are kept for
+two days, hours for 90 and days for two years; past a resolution's
+retention the edges round out to the next coarser bucket.
+
+Raw entries are appended to one NDJSON file per UTC day under ``log_dir``
+for audits; ``read_entries`` returns them for a time range.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+RETENTION: Dict[str, int] = {"minute": 2 * 86400, "hour": 90 * 86400, "day": 730 * 86400}
+DIMENSIONS = ("all", "provider", "model", "user")
+
+_COARSER = {"minute": "hour", "hour": "day"}
+_HISTOGRAM_BASE = 1.1
+_LOG_BASE = math.log(_HISTOGRAM_BASE)
+_PRUNE_INTERVAL = 3600.0
+
+# (resolution, bucket start, dimension) -> "key|metric" -> increment
+Increments = Dict[Tuple[str, int, str], DefaultDict[str, float]]
+
+
+def _increments() -> Increments:
+    return defaultdict(lambda: defaultdict(float))
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _utc(seconds: float) -> datetime:
+    """Naive UTC datetime, matching the datetime.utcnow() timestamps on entries"""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+def _bin(value: float) -> int:
+    """Histogram bin of ``value``: 0 for values up to 1, else ceil(log_1.1(value))"""
+    return 0 if value <= 1 else math.ceil(math.log(value) / _LOG_BASE)
+
+
+def _bin_value(index: int) -> float:
+    """Geometric midpoint of a histogram bin (within 5% of any value in it)"""
+    return 0.0 if index == 0 else _HISTOGRAM_BASE ** (index - 0.5)
+
+
+def _percentile(histogram: Dict[int, int], q: float) -> float:
+    total = sum(histogram.values())
+    if total <= 0:
+        return 0.0
+    rank = q / 100 * total
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return _bin_value(index)
+    return _bin_value(max(histogram))
+
+
+@dataclass
+class CostRollup:
+    """Aggregated cost for one dimension value over a bucket or a range"""
+    dimension: str
+    key: str
+    period_start: datetime
+    period_end: datetime
+    requests: int = 0
+    errors: int = 0
+    tokens_input: int = 0
+    tokens_output: int = 0
+    cost_usd: float = 0.0
+    latency_histogram: Dict[int, int] = field(default_factory=dict, repr=False)
+    tokens_histogram: Dict[int, int] = field(default_factory=dict, repr=False)
+
+    def latency_percentile(self, q: float) -> float:
+        """Approximate ``q``th percentile of request latency in milliseconds"""
+        return _percentile(self.latency_histogram, q)
+
+    def tokens_percentile(self, q: float) -> float:
+        """Approximate ``q``th percentile of total tokens per request"""
+        return _percentile(self.tokens_histogram, q)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dimension": self.dimension,
+            "key": self.key,
+            "period_start": self.period_start.isoformat(),
+            "period_end": self.period_end.isoformat(),
+            "requests": self.requests,
+            "errors": self.errors,
+            "tokens_input": self.tokens_input,
+            "tokens_output": self.tokens_output,
+            "cost_usd": self.cost_usd,
+            "latency_p50_ms": self.latency_percentile(50),
+            "latency_p95_ms": self.latency_percentile(95),
+            "latency_p99_ms": self.latency_percentile(99),
+            "tokens_p50": self.tokens_percentile(50),
+            "tokens_p95": self.tokens_percentile(95),
+        }
+
+    def _add(self, metric: str, value: float) -> None:
+        if metric.startswith("lat:"):
+            index = int(metric[4:])
+            self.latency_histogram[index] = self.latency_histogram.get(index, 0) + int(value)
+        elif metric.startswith("tok:"):
+            index = int(metric[4:])
+            self.tokens_histogram[index] = self.tokens_histogram.get(index, 0) + int(value)
+        elif metric == "cost_usd":
+            self.cost_usd += value
+        elif metric in ("requests", "errors", "tokens_input", "tokens_output"):
+            setattr(self, metric, getattr(self, metric) + int(value))
+
+
+class CostRollupStore:
+    """Minute/hour/day cost buckets in Redis (or SQLite) plus an NDJSON entry log"""
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        sqlite_path: str = ":memory:",
+        log_dir: Optional[str] = None,
+        key_prefix: str = "cost:rollup",
+        flush_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            redis_client: Async Redis client; buckets go to SQLite while None
+            sqlite_path: SQLite database for buckets without Redis
+            log_dir: Directory for the raw NDJSON entry log (None disables it)
+            key_prefix: Prefix of the Redis bucket hashes
+            flush_interval: Seconds between flushes of buffered increments
+            clock: Source of the current time, for retention
+        """
+        self.redis = redis_client
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.key_prefix = key_prefix
+        self.flush_interval = flush_interval
+        self.clock = clock
+
+        self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cost_rollups ("
+            "resolution TEXT NOT NULL, bucket INTEGER NOT NULL, dimension TEXT NOT NULL, "
+            "field TEXT NOT NULL, value REAL NOT NULL, "
+            "PRIMARY KEY (resolution, bucket, dimension, field)) WITHOUT ROWID"
+        )
+        self._db_lock = threading.Lock()
+        self._last_prune = 0.0
+
+        self._pending: Increments = _increments()  # Minute buckets only
+        self._pending_entries: List[str] = []
+        self._last_flush = clock()
+        self._flush_lock = asyncio.Lock()
+        self.stats = {"recorded": 0, "flushes": 0, "buckets_written": 0, "flush_errors": 0}
+
+    # Writes
+
+    def add(self, entry: Any) -> None:
+        """Fold a CostEntry into its minute bucket; written out by the next flush"""
+        timestamp = _epoch(entry.timestamp)
+        minute = int(timestamp // 60 * 60)
+        latency = f"lat:{_bin(entry.latency_ms)}"
+        tokens = f"tok:{_bin(entry.tokens_total)}"
+        user = getattr(entry, "user_id", None) or "anonymous"
+        for dimension, key in (
+            ("all", "*"),
+            ("provider", entry.provider),
+            ("model", f"{entry.provider}/{entry.model}"),
+            ("user", user),
+        ):
+            prefix = f"{str(key).replace('|', '_')}|"
+            pending = self._pending[("minute", minute, dimension)]
+            pending[prefix + "requests"] += 1
+            if not entry.success:
+                pending[prefix + "errors"] += 1
+            pending[prefix + "tokens_input"] += entry.tokens_input
+            pending[prefix + "tokens_output"] += entry.tokens_output
+            pending[prefix + "cost_usd"] += entry.cost_usd
+            pending[prefix + latency] += 1
+            pending[prefix + tokens] += 1
+
+        if self.log_dir is not None:
+            self._pending_entries.append(json.dumps({
+                "request_id": entry.request_id,
+                "ts": timestamp,
+                "provider": entry.provider,
+                "model": entry.model,
+                "user_id": getattr(entry, "user_id", None),
+                "tokens_input": entry.tokens_input,
+                "tokens_output": entry.tokens_output,
+                "cost_usd": entry.cost_usd,
+                "latency_ms": entry.latency_ms,
+                "success": entry.success,
+            }, separators=(",", ":")))
+        self.stats["recorded"] += 1
+
+    async def record(self, entry: Any) -> None:
+        """``add`` the entry, flushing if ``flush_interval`` has passed"""
+        self.add(entry)
+        if self.clock() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered increments and entries out"""
+        async with self._flush_lock:
+            pending, self._pending = self._roll_up(self._pending), _increments()
+            entries, self._pending_entries = self._pending_entries, []
+            self._last_flush = self.clock()
+
+            if pending:
+                try:
+                    if self.redis is not None:
+                        await self._flush_redis(pending)
+                    else:
+                        await asyncio.to_thread(self._flush_sqlite, pending)
+                    self.stats["flushes"] += 1
+                    self.stats["buckets_written"] += len(pending)
+                except Exception as e:
+                    # Keep the increments for the next flush rather than losing them
+                    logger.warning(f"Cost rollup flush failed, will retry: {e}")
+                    self.stats["flush_errors"] += 1
+                    self._merge_back(pending)
+            if entries:
+                try:
+                    await asyncio.to_thread(self._append_entries, entries)
+                except OSError as e:
+                    logger.error(f"Failed to append cost entries to {self.log_dir}: {e}")
+
+    @staticmethod
+    def _roll_up(minutes: Increments) -> Increments:
+        """Minute increments plus the hour and day increments they add up to"""
+        rolled = _increments()
+        for (_, minute, dimension), increments in minutes.items():
+            rolled[("minute", minute, dimension)] = increments
+            for resolution in ("hour", "day"):
+                size = RESOLUTIONS[resolution]
+                target = rolled[(resolution, minute // size * size, dimension)]
+                for name, value in increments.items():
+                    target[name] += value
+        return rolled
+
+    def _merge_back(self, pending: Increments) -> None:
+        # Only the minute buckets; the next flush rolls them up again
+        for slot, increments in pending.items():
+            if slot[0] == "minute":
+                target = self._pending[slot]
+                for name, value in increments.items():
+                    target[name] += value
+
+    async def _flush_redis(self, pending: Increments) -> None:
+        # MULTI/EXEC: a failed flush is merged back and retried, so it must
+        # apply all of its increments or none of them
+        pipe = self.redis.pipeline(transaction=True)
+        for (resolution, bucket, dimension), increments in pending.items():
+            key = self._bucket_key(resolution, bucket, dimension)
+            for name, value in increments.items():
+                if name.endswith("|cost_usd"):
+                    pipe.hincrbyfloat(key, name, value)
+                else:
+                    pipe.hincrby(key, name, int(value))
+            pipe.expire(key, RETENTION[resolution])
+        await pipe.execute()
+
+    def _flush_sqlite(self, pending: Increments) -> None:
+        rows = [
+            (resolution, bucket, dimension, name, value)
+            for (resolution, bucket, dimension), increments in pending.items()
+            for name, value in increments.items()
+        ]
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT INTO cost_rollups (resolution, bucket, dimension, field, value) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (resolution, bucket, dimension, field) DO UPDATE SET value = value + excluded.value",
+                rows,
+            )
+            now = self.clock()
+            if now - self._last_prune >= _PRUNE_INTERVAL:
+                for resolution, retention in RETENTION.items():
+                    self._db.execute(
+                        "DELETE FROM cost_rollups WHERE resolution = ? AND bucket < ?",
+                        (resolution, int(now - retention)),
+                    )
+                self._last_prune = now
+
+    def _append_entries(self, entries: List[str]) -> None:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        by_day: DefaultDict[str, List[str]] = defaultdict(list)
+        for line in entries:
+            day = _utc(json.loads(line)["ts"]).strftime("%Y%m%d")
+            by_day[day].append(line)
+        for day, lines in by_day.items():
+            with open(self._entry_log(day), "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+
+    def _entry_log(self, day: str) -> Path:
+        return self.log_dir / f"cost-entries-{day}.ndjson"
+
+    def _bucket_key(self, resolution: str, bucket: int, dimension: str) -> str:
+        return f"{self.key_prefix}:{resolution}:{bucket}:{dimension}"
+
+    # Range queries
+
+    async def query(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        group_by: str = "all",
+        resolution: Optional[str] = None,
+    ) -> List[CostRollup]:
+        """
+        Cost rollups for ``[start_time, end_time)``, one per ``group_by`` value.
+
+        Args:
+            group_by: One of ``all``, ``provider``, ``model`` or ``user``
+            resolution: ``minute``, ``hour`` or ``day`` for one rollup per
+                bucket and value (a time series); None for range totals
+        """
+        if group_by not in DIMENSIONS:
+            raise ValueError(f"group_by must be one of {DIMENSIONS}, got {group_by!r}")
+        if resolution is not None and resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {tuple(RESOLUTIONS)}, got {resolution!r}")
+
+        start, end = _epoch(start_time), _epoch(end_time)
+        if resolution is None:
+            spans = self._cover(start, end)
+        else:
+            size = RESOLUTIONS[resolution]
+            spans = [(resolution, bucket) for bucket in range(int(start // size * size), math.ceil(end), size)]
+
+        rows = await self._read(spans, group_by)
+        return self._aggregate(rows, group_by, per_bucket=resolution is not None, start=start, end=end)
+
+    async def summarize(self, start_time: datetime, end_time: datetime) -> Dict[str, List[CostRollup]]:
+        """Range totals for every dimension"""
+        start, end = _epoch(start_time), _epoch(end_time)
+        spans = self._cover(start, end)
+        return {
+            dimension: self._aggregate(await self._read(spans, dimension), dimension, False, start, end)
+            for dimension in DIMENSIONS
+        }
+
+    def _cover(self, start: float, end: float) -> List[Tuple[str, int]]:
+        """Fewest retained buckets covering ``[start, end)`` at minute precision"""
+        now = self.clock()
+        t = int(start // 60 * 60)
+        end = math.ceil(end / 60) * 60
+        spans = []
+        while t < end:
+            resolution = next(
+                r for r in ("day", "hour", "minute")
+                if t % RESOLUTIONS[r] == 0 and t + RESOLUTIONS[r] <= end
+            )
+            # Past a resolution's retention its buckets are gone; widen to a coarser one
+            while resolution in _COARSER and t < now - RETENTION[resolution]:
+                resolution = _COARSER[resolution]
+                t = t // RESOLUTIONS[resolution] * RESOLUTIONS[resolution]
+            spans.append((resolution, t))
+            t += RESOLUTIONS[resolution]
+        return spans
+
+    async def _read(self, spans: List[Tuple[str, int]], dimension: str) -> List[Tuple[str, int, Dict[str, float]]]:
+        await self.flush()
+        if not spans:
+            return []
+        if self.redis is not None:
+            pipe = self.redis.pipeline(transaction=False)
+            for resolution, bucket in spans:
+                pipe.hgetall(self._bucket_key(resolution, bucket, dimension))
+            hashes = await pipe.execute()
+            return [
+                (resolution, bucket, {name: float(value) for name, value in fields.items()})
+                for (resolution, bucket), fields in zip(spans, hashes)
+                if fields
+            ]
+        return await asyncio.to_thread(self._read_sqlite, spans, dimension)
+
+    def _read_sqlite(self, spans: List[Tuple[str, int]], dimension: str) -> List[Tuple[str, int, Dict[str, float]]]:
+        by_resolution: DefaultDict[str, List[int]] = defaultdict(list)
+        for resolution, bucket in spans:
+            by_resolution[resolution].append(bucket)
+
+        buckets: Dict[Tuple[str, int], Dict[str, float]] = {}
+        with self._db_lock:
+            for resolution, starts in by_resolution.items():
+                for chunk in range(0, len(starts), 500):
+                    part = starts[chunk:chunk + 500]
+                    cursor = self._db.execute(
+                        "SELECT bucket, field, value FROM cost_rollups WHERE resolution = ? AND dimension = ? "
+                        f"AND bucket IN ({','.join('?' * len(part))})",
+                        (resolution, dimension, *part),
+                    )
+                    for bucket, name, value in cursor:
+                        buckets.setdefault((resolution, bucket), {})[name] = value
+        return [(resolution, bucket, fields) for (resolution, bucket), fields in buckets.items()]
+
+    def _aggregate(
+        self,
+        rows: List[Tuple[str, int, Dict[str, float]]],
+        group_by: str,
+        per_bucket: bool,
+        start: float,
+        end: float,
+    ) -> List[CostRollup]:
+        rollups: Dict[Tuple[int, str], CostRollup] = {}
+        for resolution, bucket, fields in rows:
+            for name, value in fields.items():
+                key, metric = name.split("|", 1)
+                slot = (bucket if per_bucket else 0, key)
+                rollup = rollups.get(slot)
+                if rollup is None:
+                    period = (bucket, bucket + RESOLUTIONS[resolution]) if per_bucket else (start, end)
+                    rollup = rollups[slot] = CostRollup(group_by, key, _utc(period[0]), _utc(period[1]))
+                rollup._add(metric, value)
+        return [rollups[slot] for slot in sorted(rollups)]
+
+    # Raw entries
+
+    async def read_entries(self, start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+        """Raw entries logged in ``[start_time, end_time)``, for audits"""
+        if self.log_dir is None:
+            return []
+        await self.flush()
+        return await asyncio.to_thread(self._read_entries, _epoch(start_time), _epoch(end_time))
+
+    def _read_entries(self, start: float, end: float) -> List[Dict[str, Any]]:
+        entries = []
+        day = int(start // 86400 * 86400)
+        while day < end:
+            path = self._entry_log(_utc(day).strftime("%Y%m%d"))
+            if path.exists():
+                with open(path, encoding="utf-8") as handle:
+                    for line in handle:
+                        entry = json.loads(line)
+                        if start <= entry["ts"] < end:
+                            entries.append(entry)
+            day += 86400
+        return entries
+
+    async def close(self) -> None:
+        await self.flush()
+        with self._db_lock:
+            self._db.close()
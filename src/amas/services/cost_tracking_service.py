@@ -3,12 +3,15 @@ Cost Tracking and Optimization Service for AMAS
 
 Tracks token usage, API costs, and infrastructure costs per request.
 Provides optimization recommendations.
+
+Requests are aggregated on write into minute/hour/day rollups per
+provider, model and user (see cost_rollup_store), which answer range
+queries such as cost per provider per hour over the last week.
 """
 
-import asyncio
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 try:
@@ -18,6 +21,8 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+from .cost_rollup_store import CostRollup, CostRollupStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +39,7 @@ class CostEntry:
     cost_usd: float
     latency_ms: float
     success: bool
+    user_id: Optional[str] = None
 
 
 @dataclass
@@ -49,6 +55,13 @@ class CostSummary:
     cost_by_provider: Dict[str, float] = field(default_factory=dict)
     cost_by_model: Dict[str, float] = field(default_factory=dict)
     requests_by_provider: Dict[str, int] = field(default_factory=dict)
+    cost_by_user: Dict[str, float] = field(default_factory=dict)
+    failed_requests: int = 0
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    tokens_p50: float = 0.0
+    tokens_p95: float = 0.0
 
 
 # Provider cost per 1M tokens (input/output)
@@ -77,7 +90,9 @@ class CostTrackingService:
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
-        daily_budget_usd: float = 100.0
+        daily_budget_usd: float = 100.0,
+        rollup_db_path: str = ":memory:",
+        entry_log_dir: Optional[str] = None
     ):
         """
         Initialize cost tracking service.
@@ -85,10 +100,13 @@ class CostTrackingService:
         Args:
             redis_url: Redis connection URL for cost storage
             daily_budget_usd: Daily budget limit in USD
+            rollup_db_path: SQLite database for rollups when Redis is unavailable
+            entry_log_dir: Directory for the raw NDJSON entry log (None disables it)
         """
         self.redis_url = redis_url
         self.daily_budget_usd = daily_budget_usd
         self.redis_client: Optional[redis.Redis] = None
+        self.rollups = CostRollupStore(sqlite_path=rollup_db_path, log_dir=entry_log_dir)
         
         # Cost statistics
         self.stats = {
@@ -101,8 +119,7 @@ class CostTrackingService:
     async def initialize(self):
         """Initialize Redis connection"""
         if not REDIS_AVAILABLE:
-            logger.warning("Redis not available. Cost tracking will use in-memory storage.")
-            self._memory_entries = []
+            logger.warning("Redis not available. Cost tracking will use SQLite rollups.")
             return
         
         try:
@@ -112,14 +129,15 @@ class CostTrackingService:
                 decode_responses=True
             )
             await self.redis_client.ping()
+            self.rollups.redis = self.redis_client
             logger.info("Cost tracking: Redis connection established")
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis for cost tracking: {e}. Using in-memory.")
+            logger.warning(f"Failed to connect to Redis for cost tracking: {e}. Using SQLite rollups.")
             self.redis_client = None
-            self._memory_entries = []
     
     async def close(self):
-        """Close Redis connection"""
+        """Flush rollups and close Redis connection"""
+        await self.rollups.close()
         if self.redis_client:
             await self.redis_client.close()
     
@@ -158,7 +176,8 @@ class CostTrackingService:
         tokens_input: int,
         tokens_output: int,
         latency_ms: float,
-        success: bool = True
+        success: bool = True,
+        user_id: Optional[str] = None
     ):
         """
         Record a request's cost.
@@ -171,6 +190,7 @@ class CostTrackingService:
             tokens_output: Output tokens
             latency_ms: Request latency in milliseconds
             success: Whether request was successful
+            user_id: User the request was made for
         """
         tokens_total = tokens_input + tokens_output
         cost_usd = self.calculate_cost(provider, model, tokens_input, tokens_output)
@@ -185,27 +205,12 @@ class CostTrackingService:
             tokens_total=tokens_total,
             cost_usd=cost_usd,
             latency_ms=latency_ms,
-            success=success
+            success=success,
+            user_id=user_id
         )
         
-        # Store in Redis or memory
-        if self.redis_client:
-            key = f"cost:entry:{request_id}"
-            await self.redis_client.setex(
-                key,
-                86400 * 30,  # Keep for 30 days
-                entry.__dict__.__str__()  # Simple serialization
-            )
-            
-            # Update daily cost
-            today_key = f"cost:daily:{datetime.utcnow().date().isoformat()}"
-            await self.redis_client.incrbyfloat(today_key, cost_usd)
-            await self.redis_client.expire(today_key, 86400 * 7)  # Keep for 7 days
-        else:
-            self._memory_entries.append(entry)
-            # Keep only last 10000 entries in memory
-            if len(self._memory_entries) > 10000:
-                self._memory_entries = self._memory_entries[-10000:]
+        # Fold into the minute/hour/day rollups (flushed in batches)
+        await self.rollups.record(entry)
         
         # Update stats
         self.stats["total_requests"] += 1
@@ -234,25 +239,55 @@ class CostTrackingService:
         Returns:
             CostSummary with aggregated data
         """
-        # This would query Redis or memory for entries in the time range
-        # For now, return summary from stats
+        rollups = await self.rollups.summarize(start_time, end_time)
+        overall = rollups["all"][0] if rollups["all"] else CostRollup("all", "*", start_time, end_time)
+        requests = overall.requests
         
         return CostSummary(
             period_start=start_time,
             period_end=end_time,
-            total_requests=self.stats["total_requests"],
-            total_tokens=self.stats["total_tokens"],
-            total_cost_usd=self.stats["total_cost_usd"],
-            avg_cost_per_request=(
-                self.stats["total_cost_usd"] / self.stats["total_requests"]
-                if self.stats["total_requests"] > 0 else 0.0
-            ),
+            total_requests=requests,
+            total_tokens=overall.tokens_input + overall.tokens_output,
+            total_cost_usd=overall.cost_usd,
+            avg_cost_per_request=overall.cost_usd / requests if requests > 0 else 0.0,
             avg_tokens_per_request=(
-                self.stats["total_tokens"] / self.stats["total_requests"]
-                if self.stats["total_requests"] > 0 else 0
-            )
+                (overall.tokens_input + overall.tokens_output) / requests
+                if requests > 0 else 0
+            ),
+            cost_by_provider={r.key: r.cost_usd for r in rollups["provider"]},
+            cost_by_model={r.key: r.cost_usd for r in rollups["model"]},
+            requests_by_provider={r.key: r.requests for r in rollups["provider"]},
+            cost_by_user={r.key: r.cost_usd for r in rollups["user"]},
+            failed_requests=overall.errors,
+            latency_p50_ms=overall.latency_percentile(50),
+            latency_p95_ms=overall.latency_percentile(95),
+            latency_p99_ms=overall.latency_percentile(99),
+            tokens_p50=overall.tokens_percentile(50),
+            tokens_p95=overall.tokens_percentile(95)
         )
     
+    async def get_cost_rollups(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        group_by: str = "provider",
+        resolution: Optional[str] = "hour"
+    ) -> List[CostRollup]:
+        """
+        Get cost per ``group_by`` value per time bucket.
+        
+        Args:
+            start_time: Start of period
+            end_time: End of period
+            group_by: ``all``, ``provider``, ``model`` or ``user``
+            resolution: ``minute``, ``hour`` or ``day``; None for one
+                rollup per value over the whole period
+            
+        Returns:
+            CostRollups ordered by bucket, then value
+        """
+        return await self.rollups.query(start_time, end_time, group_by=group_by, resolution=resolution)
+    
     async def get_optimization_recommendations(self) -> List[Dict[str, Any]]:
         """
         Get cost optimization recommendations.
@@ -0,0 +1,233 @@
+"""
+Embedding Service for AMAS
+
+Shared text embedding for the semantic cache, the vector service and the
+agentic RAG vector path. One model instance per process runs on a
+dedicated worker thread, so encoding never blocks the event loop, and
+concurrent requests are micro-batched: texts arriving within
+``batch_window_ms`` of each other are encoded in one ``encode`` call.
+
+Identical texts are deduplicated, both within a batch and against
+batches still being encoded, and results are kept in an LRU cache of
+text hash -> float32 vector.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None  # type: ignore[assignment]
+
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore[import-not-found]
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    SentenceTransformer = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingService:
+    """
+    Micro-batching, caching front end for a sentence embedding model.
+
+    Any object with a SentenceTransformer-compatible ``encode`` method can
+    be passed as ``model``; otherwise ``model_name`` is loaded on the
+    worker thread on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        model: Optional[Any] = None,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 64,
+        cache_size: int = 10_000
+    ):
+        """
+        Initialize embedding service.
+
+        Args:
+            model_name: SentenceTransformer model to load when no model is given
+            model: Preloaded model exposing ``encode(texts, ...)``
+            batch_window_ms: How long the first request of a batch waits for others
+            max_batch_size: Texts per encode call; a full batch is sent at once
+            cache_size: Embeddings kept in the LRU cache
+        """
+        self.model_name = model_name
+        self.model = model
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+
+        # A single worker keeps one model call in flight; requests arriving
+        # meanwhile queue up and form the next batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="amas-embed")
+        self._cache: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._pending: List[Tuple[bytes, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running batch tasks, referenced so they are not garbage-collected
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "batches": 0,
+            "encoded": 0,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Whether embeddings can be produced"""
+        return NUMPY_AVAILABLE and (self.model is not None or SENTENCE_TRANSFORMERS_AVAILABLE)
+
+    def _load_model(self) -> Any:
+        if self.model is None:
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise RuntimeError("sentence-transformers is not installed")
+            self.model = SentenceTransformer(self.model_name)
+            logger.info(f"Embedding service: loaded model {self.model_name}")
+        return self.model
+
+    def _encode_batch(self, texts: List[str]) -> Any:
+        """Encode on the worker thread"""
+        vectors = self._load_model().encode(texts, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    async def embed(self, text: str) -> Any:
+        """
+        Embed a single text.
+
+        Returns:
+            Read-only float32 vector shared with the cache; copy before
+            modifying it in place
+        """
+        self.stats["requests"] += 1
+        key = _text_key(text)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[key] = loop.create_future()
+            self._pending.append((key, text))
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shielded so one cancelled caller does not fail the others
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: Sequence[str]) -> Any:
+        """Embed several texts; returns a new (len(texts), dim) float32 matrix"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = await asyncio.gather(*(self.embed(text) for text in texts))
+        return np.stack(vectors)
+
+    def _flush(self) -> None:
+        """Send everything pending to the worker in batches"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch_size):
+            task = asyncio.ensure_future(self._run_batch(pending[start:start + self.max_batch_size]))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._batch_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Embedding batch failed: {task.exception()}")
+
+    async def _run_batch(self, batch: List[Tuple[bytes, str]]) -> None:
+        loop = asyncio.get_running_loop()
+        self.stats["batches"] += 1
+        try:
+            vectors = await loop.run_in_executor(
+                self._executor, self._encode_batch, [text for _, text in batch]
+            )
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            for key, _ in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats["encoded"] += len(batch)
+        for (key, _), vector in zip(batch, vectors):
+            vector.setflags(write=False)
+            self._remember(key, vector)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def _remember(self, key: bytes, vector: Any) -> None:
+        self._cache[key] = vector
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding statistics"""
+        return {
+            **self.stats,
+            "cache_entries": len(self._cache),
+            "model": self.model_name,
+            "model_loaded": self.model is not None,
+        }
+
+    def close(self) -> None:
+        """Cancel queued and running batches and stop the worker thread"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = []
+        for task in list(self._batch_tasks):
+            task.cancel()
+        for future in self._inflight.values():
+            if not future.done():
+                future.cancel()
+        self._inflight.clear()
+        self._executor.shutdown(wait=False)
+
+
+# One service (and model) per model name per process
+_embedding_services: Dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+    **kwargs
+) -> EmbeddingService:
+    """Get or create the process-wide embedding service for a model"""
+    service = _embedding_services.get(model_name)
+    if service is None:
+        service = _embedding_services[model_name] = EmbeddingService(model_name, **kwargs)
+    return service
@@ -11,6 +11,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, Optional
 
+from ..utils.cache import CACHE_POLICIES, CacheEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,19 +36,6 @@ class LoadBalanceStrategy(Enum):
     RANDOM = "random"
 
 
-@dataclass
-class CacheEntry:
-    """Cache entry data structure"""
-
-    key: str
-    value: Any
-    created_at: datetime
-    accessed_at: datetime
-    access_count: int
-    ttl: Optional[float] = None
-    size: int = 0
-
-
 @dataclass
 class PerformanceMetrics:
     """Performance metrics data structure"""
@@ -80,7 +69,8 @@ class PerformanceService:
 
         # Cache configuration
         self.cache_config = {
-            "max_size": config.get("cache_max_size", 1000),
+            "max_size": config.get("cache_max_size"),  # Optional entry cap
+            "max_bytes": config.get("cache_max_bytes", 100 * 1024 * 1024),
             "default_ttl": config.get("cache_default_ttl", 3600),
             "strategy": CacheStrategy(config.get("cache_strategy", "lru")),
             "enable_compression": config.get("cache_compression", True),
@@ -101,8 +91,14 @@ class PerformanceService:
         self.optimization_rules = []
 
         # Cache storage
-        self.cache = {}
-        self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+        strategy = self.cache_config["strategy"]
+        self.cache = CacheEngine(
+            policy=strategy.value if strategy.value in CACHE_POLICIES else "lru",
+            max_bytes=self.cache_config["max_bytes"],
+            max_entries=self.cache_config["max_size"],
+            default_ttl=self.cache_config["default_ttl"],
+        )
+        self.cache_stats = self.cache.stats
 
         # Load balancers
         self.load_balancers = {}
@@ -148,13 +144,11 @@ class PerformanceService:
         try:
             logger.info("Initializing cache system...")
 
-            # Initialize cache based on strategy
-            if self.cache_config["strategy"] == CacheStrategy.LRU:
-                await self._initialize_lru_cache()
-            elif self.cache_config["strategy"] == CacheStrategy.LFU:
-                await self._initialize_lfu_cache()
-            elif self.cache_config["strategy"] == CacheStrategy.TTL:
-                await self._initialize_ttl_cache()
+            # The engine is created with the service; log its policy and budget
+            logger.info(
+                f"Cache policy {self.cache.policy}, "
+                f"budget {self.cache.max_bytes / (1024 * 1024):.0f}MB"
+            )
 
             logger.info("Cache system initialized")
 
@@ -162,18 +156,6 @@ class PerformanceService:
             logger.error(f"Failed to initialize cache system: {e}")
             raise
 
-    async def _initialize_lru_cache(self):
-        """Initialize LRU cache"""
-        self.cache_order = []  # For LRU ordering
-
-    async def _initialize_lfu_cache(self):
-        """Initialize LFU cache"""
-        self.cache_frequency = {}  # For LFU frequency tracking
-
-    async def _initialize_ttl_cache(self):
-        """Initialize TTL cache"""
-        self.cache_ttl = {}  # For TTL tracking
-
     async def _initialize_load_balancers(self):
         """Initialize load balancers"""
         try:
@@ -313,33 +295,7 @@ class PerformanceService:
     async def get_from_cache(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
-            if key not in self.cache:
-                self.cache_stats["misses"] += 1
-                return None
-
-            entry = self.cache[key]
-
-            # Check TTL
-            if (
-                entry.ttl
-                and (datetime.utcnow() - entry.created_at).total_seconds() > entry.ttl
-            ):
-                await self._evict_from_cache(key)
-                self.cache_stats["misses"] += 1
-                return None
-
-            # Update access information
-            entry.accessed_at = datetime.utcnow()
-            entry.access_count += 1
-
-            # Update cache order for LRU
-            if self.cache_config["strategy"] == CacheStrategy.LRU:
-                if key in self.cache_order:
-                    self.cache_order.remove(key)
-                self.cache_order.append(key)
-
-            self.cache_stats["hits"] += 1
-            return entry.value
+            return self.cache.get(key)
 
         except Exception as e:
             logger.error(f"Failed to get from cache: {e}")
@@ -350,95 +306,12 @@ class PerformanceService:
     ) -> bool:
         """Set value in cache"""
         try:
-            # Check cache size limit
-            if len(self.cache) >= self.cache_config["max_size"]:
-                await self._evict_oldest_entry()
-
-            # Create cache entry
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.utcnow(),
-                accessed_at=datetime.utcnow(),
-                access_count=1,
-                ttl=ttl or self.cache_config["default_ttl"],
-                size=len(str(value)),
-            )
-
-            # Store in cache
-            self.cache[key] = entry
-
-            # Update cache order for LRU
-            if self.cache_config["strategy"] == CacheStrategy.LRU:
-                if key in self.cache_order:
-                    self.cache_order.remove(key)
-                self.cache_order.append(key)
-
-            # Update cache frequency for LFU
-            if self.cache_config["strategy"] == CacheStrategy.LFU:
-                self.cache_frequency[key] = 1
-
-            # Update cache stats
-            self.cache_stats["size"] = len(self.cache)
-
-            return True
+            return self.cache.set(key, value, ttl=ttl)
 
         except Exception as e:
             logger.error(f"Failed to set in cache: {e}")
             return False
 
-    async def _evict_from_cache(self, key: str):
-        """Evict entry from cache"""
-        try:
-            if key in self.cache:
-                del self.cache[key]
-
-                # Update cache order
-                if key in self.cache_order:
-                    self.cache_order.remove(key)
-
-                # Update cache frequency
-                if key in self.cache_frequency:
-                    del self.cache_frequency[key]
-
-                # Update cache stats
-                self.cache_stats["evictions"] += 1
-                self.cache_stats["size"] = len(self.cache)
-
-        except Exception as e:
-            logger.error(f"Failed to evict from cache: {e}")
-
-    async def _evict_oldest_entry(self):
-        """Evict oldest entry from cache"""
-        try:
-            if not self.cache:
-                return
-
-            if self.cache_config["strategy"] == CacheStrategy.LRU:
-                # Evict least recently used
-                if self.cache_order:
-                    oldest_key = self.cache_order[0]
-                    await self._evict_from_cache(oldest_key)
-
-            elif self.cache_config["strategy"] == CacheStrategy.LFU:
-                # Evict least frequently used
-                if self.cache_frequency:
-                    oldest_key = min(
-                        self.cache_frequency.keys(),
-                        key=lambda k: self.cache_frequency[k],
-                    )
-                    await self._evict_from_cache(oldest_key)
-
-            elif self.cache_config["strategy"] == CacheStrategy.TTL:
-                # Evict oldest by creation time
-                oldest_key = min(
-                    self.cache.keys(), key=lambda k: self.cache[k].created_at
-                )
-                await self._evict_from_cache(oldest_key)
-
-        except Exception as e:
-            logger.error(f"Failed to evict oldest entry: {e}")
-
     async def select_llm_provider(self, task_type: str = None) -> str:
         """Select LLM provider using load balancing"""
         try:
@@ -528,27 +401,10 @@ class PerformanceService:
         """Optimize cache performance"""
         while True:
             try:
-                # Clean expired entries
-                current_time = datetime.utcnow()
-                expired_keys = []
-
-                for key, entry in self.cache.items():
-                    if (
-                        entry.ttl
-                        and (current_time - entry.created_at).total_seconds()
-                        > entry.ttl
-                    ):
-                        expired_keys.append(key)
-
-                for key in expired_keys:
-                    await self._evict_from_cache(key)
-
-                # Optimize cache size
-                if len(self.cache) > self.cache_config["max_size"] * 0.9:
-                    # Evict 10% of entries
-                    evict_count = int(len(self.cache) * 0.1)
-                    for _ in range(evict_count):
-                        await self._evict_oldest_entry()
+                # Clean expired entries; capacity is enforced on every write
+                expired = self.cache.expire()
+                if expired:
+                    logger.debug(f"Expired {expired} cache entries")
 
                 await asyncio.sleep(300)  # Optimize every 5 minutes
 
@@ -676,8 +532,9 @@ class PerformanceService:
             # Clear cache
             await self._clear_cache()
 
-            # Reduce cache size
-            self.cache_config["max_size"] = int(self.cache_config["max_size"] * 0.8)
+            # Reduce cache memory budget
+            self.cache_config["max_bytes"] = int(self.cache_config["max_bytes"] * 0.8)
+            self.cache.resize(max_bytes=self.cache_config["max_bytes"])
 
             logger.info("Memory usage optimized")
 
@@ -700,9 +557,6 @@ class PerformanceService:
         """Clear cache"""
         try:
             self.cache.clear()
-            self.cache_order.clear()
-            self.cache_frequency.clear()
-            self.cache_stats["size"] = 0
 
             logger.info("Cache cleared")
 
@@ -786,10 +640,13 @@ class PerformanceService:
         return {
             "size": self.cache_stats["size"],
             "max_size": self.cache_config["max_size"],
+            "bytes": self.cache_stats["bytes"],
+            "max_bytes": self.cache.max_bytes,
             "hit_rate": hit_rate,
             "hits": self.cache_stats["hits"],
             "misses": self.cache_stats["misses"],
             "evictions": self.cache_stats["evictions"],
+            "expirations": self.cache_stats["expirations"],
             "strategy": self.cache_config["strategy"].value,
             "timestamp": datetime.utcnow().isoformat(),
         }
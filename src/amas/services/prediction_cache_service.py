@@ -1,15 +1,21 @@
 """
 Prediction Cache Service
 ML prediction caching with intelligent invalidation and version awareness
+
+Predictions go through a TieredCache (in-process L1 over Redis L2), keyed
+by the request hash shared with RequestDeduplicationService and grouped by
+model version. Concurrent requests for the same uncached prediction share
+one model call, across replicas too.
 """
 
-import hashlib
-import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from src.cache.redis import get_redis_client
 
+from .request_deduplication_service import request_key
+from .tiered_cache import TieredCache
+
 logger = logging.getLogger(__name__)
 
 # Global service instance
@@ -24,6 +30,7 @@ class PredictionCacheService:
     - Cache predictions by input hash
     - Version-aware caching (include model version in key)
     - Invalidate on model retraining
+    - Coalesce concurrent predictions for the same input
     - TTL: 3600 seconds (1 hour)
     """
     
@@ -31,34 +38,9 @@ class PredictionCacheService:
         self.cache = get_redis_client()
         self.model_version = model_version
         self.ttl = 3600  # 1 hour
+        self.ttl_stale = 300  # Served stale while a prediction is recomputed
         self.key_prefix = "amas:prediction:"
-    
-    def _generate_cache_key(self, task_data: Dict[str, Any]) -> str:
-        """
-        Generate deterministic cache key from task data
-        
-        Uses hash of canonical JSON representation
-        Includes model version in key
-        """
-        # Create canonical representation (sorted keys)
-        canonical = json.dumps(task_data, sort_keys=True)
-        hash_value = hashlib.md5(canonical.encode()).hexdigest()
-        
-        # Include model version in key
-        return f"{self.key_prefix}{self.model_version}:{hash_value}"
-    
-    def _serialize(self, data: Any) -> str:
-        """Serialize data to JSON string"""
-        return json.dumps(data)
-    
-    def _deserialize(self, data: str) -> Any:
-        """Deserialize JSON string to Python object"""
-        if not data:
-            return None
-        try:
-            return json.loads(data)
-        except (json.JSONDecodeError, TypeError):
-            return data
+        self.tiered = TieredCache("amas:prediction", redis=self.cache)
     
     # ========================================================================
     # PREDICTION CACHING
@@ -74,23 +56,33 @@ class PredictionCacheService:
         Key includes model version, so old predictions are automatically
         invalidated when model version changes
         """
-        if not self.cache:
-            return None
-        
         try:
-            cache_key = self._generate_cache_key(task_data)
-            cached = await self.cache.get(cache_key)
-            
-            if cached:
-                logger.debug(f"Prediction cache HIT: {cache_key[:50]}...")
-                return self._deserialize(cached)
-            
-            logger.debug(f"Prediction cache MISS: {cache_key[:50]}...")
-            return None
+            return await self.tiered.get(request_key(task_data), group=self.model_version)
         except Exception as e:
             logger.error(f"Error in get_prediction: {e}")
             return None
     
+    async def get_or_predict(
+        self,
+        task_data: Dict[str, Any],
+        predict: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Get cached prediction, or run ``predict()`` once for all concurrent
+        callers with the same task data and cache its result
+        
+        Errors from ``predict()`` propagate to every waiting caller and
+        nothing is cached.
+        """
+        return await self.tiered.get_or_load(
+            request_key(task_data),
+            predict,
+            self.ttl,
+            group=self.model_version,
+            stale_ttl=self.ttl_stale,
+            lock=True,
+        )
+    
     async def cache_prediction(
         self,
         task_data: Dict[str, Any],
@@ -101,17 +93,9 @@ class PredictionCacheService:
         
         TTL: 3600 seconds (1 hour)
         """
-        if not self.cache:
-            return
-        
         try:
-            cache_key = self._generate_cache_key(task_data)
-            await self.cache.setex(
-                cache_key,
-                self.ttl,
-                self._serialize(prediction)
-            )
-            logger.debug(f"Cached prediction: {cache_key[:50]}...")
+            await self.tiered.set(request_key(task_data), prediction, self.ttl, group=self.model_version)
+            logger.debug(f"Cached prediction for model {self.model_version}")
         except Exception as e:
             logger.error(f"Failed to cache prediction: {e}")
     
@@ -123,32 +107,12 @@ class PredictionCacheService:
         """
         Invalidate all predictions for current model version
         
-        Called when model is retrained
+        Called when model is retrained. Bumps the version's generation
+        instead of scanning for its keys; the old entries expire by TTL.
         """
-        if not self.cache:
-            return
-        
         try:
-            # Invalidate all predictions for current version
-            pattern = f"{self.key_prefix}{self.model_version}:*"
-            cursor = 0
-            deleted_count = 0
-            
-            while True:
-                cursor, keys = await self.cache.scan(
-                    cursor,
-                    match=pattern,
-                    count=100
-                )
-                if keys:
-                    await self.cache.delete(*keys)
-                    deleted_count += len(keys)
-                if cursor == 0:
-                    break
-            
-            logger.info(
-                f"Invalidated {deleted_count} predictions for version {self.model_version}"
-            )
+            await self.tiered.invalidate(self.model_version)
+            logger.info(f"Invalidated predictions for version {self.model_version}")
         except Exception as e:
             logger.error(f"Failed to invalidate predictions: {e}")
     
@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+from ..utils.metrics_buffer import LabelGuard, MetricsBuffer
+
 try:
     from prometheus_client import (
         CONTENT_TYPE_LATEST,
@@ -144,6 +146,11 @@ class PrometheusMetricsService:
         """Setup Prometheus metrics - 50+ metrics from PART_6.MD"""
         import logging
         logger = logging.getLogger(__name__)
+
+        # Registered first so a scrape flushes buffered records before the
+        # metrics themselves are collected
+        self.buffer = MetricsBuffer()
+        self.registry.register(self.buffer)
         
         # ========================================================================
         # TASK METRICS (7 metrics)
@@ -639,8 +646,50 @@ class PrometheusMetricsService:
             }
         )
 
+        self._bind_hot_path()
+
         logger.info("PrometheusMetricsService initialized with 50+ metrics")
 
+    def _bind_hot_path(self):
+        """Buffered handles for the metrics recorded on every request and task"""
+        # Raw request paths and client IPs are unbounded; cap them per metric
+        max_values = self.config.get("max_label_values", 500)
+        max_ips = self.config.get("max_ip_label_values", 100)
+        hot = self.buffer
+
+        def endpoint():
+            return {"endpoint": LabelGuard(max_values)}
+
+        self._http_requests = hot.counter(self.metrics["amas_http_requests_total"], endpoint())
+        self._http_duration = hot.histogram(self.metrics["amas_http_request_duration_seconds"], endpoint())
+        self._db_queries = hot.counter(self.metrics["amas_db_queries_total"])
+        self._db_duration = hot.histogram(self.metrics["amas_db_query_duration_seconds"])
+        self._cache_hits = hot.counter(self.metrics["amas_cache_hits_total"])
+        self._cache_misses = hot.counter(self.metrics["amas_cache_misses_total"])
+        self._task_creations = hot.counter(self.metrics["amas_task_creations_total"])
+        self._task_creation_duration = hot.histogram(self.metrics["amas_task_creation_duration_seconds"])
+        self._ai_calls = hot.counter(self.metrics["amas_ai_provider_calls_total"])
+        self._ai_latency = hot.histogram(self.metrics["amas_ai_provider_latency_seconds"])
+        self._ai_tokens = hot.counter(self.metrics["amas_ai_provider_tokens_total"])
+        self._ai_cost = hot.counter(self.metrics["amas_ai_provider_cost_usd_total"])
+        self._ai_fallbacks = hot.counter(self.metrics["amas_ai_provider_fallbacks_total"])
+        self._rate_limited = hot.counter(
+            self.metrics["rate_limit_exceeded_total"],
+            {**endpoint(), "ip_address": LabelGuard(max_ips, hash_buckets=16)},
+        )
+        self._auth_failures = hot.counter(
+            self.metrics["auth_failures_total"], {"ip_address": LabelGuard(max_ips, hash_buckets=16)}
+        )
+        hot.on_flush(self._update_cache_hit_ratio)
+
+    def _update_cache_hit_ratio(self):
+        """Set amas_cache_hit_ratio from the recorded hits and misses"""
+        hits = self._cache_hits.totals()
+        misses = self._cache_misses.totals()
+        for labels in hits.keys() | misses.keys():
+            total = hits.get(labels, 0.0) + misses.get(labels, 0.0)
+            self.metrics["amas_cache_hit_ratio"].labels(*labels).set(hits.get(labels, 0.0) / total)
+
     def _setup_dummy_metrics(self):
         """Setup dummy metrics when Prometheus is not available"""
         # Create dummy metric classes that do nothing
@@ -718,54 +767,23 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
         
-        # Record task creation duration
-        if "amas_task_creation_duration_seconds" in self.metrics:
-            self.metrics["amas_task_creation_duration_seconds"].labels(
-                task_type=task_type,
-                status=status
-            ).observe(duration)
-        
-        # Increment task creations counter
-        if "amas_task_creations_total" in self.metrics:
-            self.metrics["amas_task_creations_total"].labels(
-                task_type=task_type,
-                status=status
-            ).inc()
+        labels = (task_type, status)
+        self._task_creation_duration.observe(labels, duration)
+        self._task_creations.inc(labels)
     
     def record_cache_hit(self, cache_type: str):
-        """Record cache hit"""
+        """Record cache hit (amas_cache_hit_ratio is derived from hits and misses on scrape)"""
         if not self.enabled:
             return
         
-        if "amas_cache_hits_total" in self.metrics:
-            self.metrics["amas_cache_hits_total"].labels(
-                cache_type=cache_type
-            ).inc()
-        
-        # Update cache hit ratio
-        if "amas_cache_hit_ratio" in self.metrics:
-            # Get current hits and misses to calculate ratio
-            # This is a simplified version - in production, you'd track both
-            self.metrics["amas_cache_hit_ratio"].labels(
-                cache_type=cache_type
-            ).set(0.8)  # Placeholder - should be calculated from actual hits/misses
+        self._cache_hits.inc((cache_type,))
     
     def record_cache_miss(self, cache_type: str):
         """Record cache miss"""
         if not self.enabled:
             return
         
-        if "amas_cache_misses_total" in self.metrics:
-            self.metrics["amas_cache_misses_total"].labels(
-                cache_type=cache_type
-            ).inc()
-        
-        # Update cache hit ratio (decrease it)
-        if "amas_cache_hit_ratio" in self.metrics:
-            # This is a simplified version - in production, you'd calculate from actual hits/misses
-            self.metrics["amas_cache_hit_ratio"].labels(
-                cache_type=cache_type
-            ).set(0.7)  # Placeholder - should be calculated from actual hits/misses
+        self._cache_misses.inc((cache_type,))
 
     def record_task_execution(
         self,
@@ -865,40 +883,22 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
         
-        # Increment call counter
-        self.metrics["amas_ai_provider_calls_total"].labels(
-            provider=provider,
-            model=model,
-            status=status
-        ).inc()
+        self._ai_calls.inc((provider, model, status))
         
         # Record latency (convert ms to seconds if needed)
         latency_seconds = latency / 1000.0 if latency > 100 else latency
-        self.metrics["amas_ai_provider_latency_seconds"].labels(
-            provider=provider,
-            model=model
-        ).observe(latency_seconds)
+        labels = (provider, model)
+        self._ai_latency.observe(labels, latency_seconds)
         
-        # Record tokens
         if tokens_used > 0:
-            self.metrics["amas_ai_provider_tokens_total"].labels(
-                provider=provider,
-                model=model
-            ).inc(tokens_used)
+            self._ai_tokens.inc(labels, tokens_used)
         
-        # Record cost
         if cost_usd > 0:
-            self.metrics["amas_ai_provider_cost_usd_total"].labels(
-                provider=provider,
-                model=model
-            ).inc(cost_usd)
+            self._ai_cost.inc(labels, cost_usd)
         
         # Record fallback if occurred
         if fallback_from:
-            self.metrics["amas_ai_provider_fallbacks_total"].labels(
-                from_provider=fallback_from,
-                to_provider=provider
-            ).inc()
+            self._ai_fallbacks.inc((fallback_from, provider))
     
     def record_http_request(
         self,
@@ -913,23 +913,10 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
 
-        # Record request count (new metric name)
-        self.metrics["amas_http_requests_total"].labels(
-            method=method, endpoint=endpoint, status_code=str(status_code)
-        ).inc()
-
-        # Record duration (new metric name)
-        self.metrics["amas_http_request_duration_seconds"].labels(
-            method=method, endpoint=endpoint
-        ).observe(duration)
-
-        # Backward compatibility
-        self.metrics["http_requests_total"].labels(
-            method=method, endpoint=endpoint, status_code=str(status_code)
-        ).inc()
-        self.metrics["http_request_duration_seconds"].labels(
-            method=method, endpoint=endpoint
-        ).observe(duration)
+        # http_requests_total and http_request_duration_seconds are aliases of
+        # these collectors, so one record covers the old names too
+        self._http_requests.inc((method, endpoint, str(status_code)))
+        self._http_duration.observe((method, endpoint), duration)
 
     def record_auth_attempt(self, result: str, method: str = "password"):
         """Record authentication attempt"""
@@ -943,9 +930,7 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
 
-        self.metrics["auth_failures_total"].labels(
-            reason=reason, ip_address=ip_address
-        ).inc()
+        self._auth_failures.inc((reason, ip_address))
 
     def set_active_sessions(self, count: int):
         """Set active sessions count"""
@@ -1009,46 +994,10 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
 
-        # New metric names
-        self.metrics["amas_db_queries_total"].labels(
-            operation=operation,
-            table=table,
-            status=status
-        ).inc()
-
-        self.metrics["amas_db_query_duration_seconds"].labels(
-            operation=operation,
-            table=table
-        ).observe(duration)
-        
-        # Backward compatibility - use correct label names
-        # database_queries_total is aliased to amas_db_queries_total which has labels ["operation", "table", "status"]
-        # So we use the same labels, not "database"
-        try:
-            # Try to use the aliased metric with correct labels
-            if "database_queries_total" in self.metrics:
-                # If it's the same as amas_db_queries_total, skip to avoid duplicate
-                pass
-            else:
-                # If it's a separate metric, use it with correct labels
-                self.metrics["database_queries_total"].labels(
-                    operation=operation,
-                    table=table,
-                    status=status
-                ).inc()
-        except (KeyError, ValueError):
-            # Metric doesn't exist or labels don't match - skip backward compatibility
-            pass
-        
-        try:
-            if "database_query_duration_seconds" in self.metrics:
-                self.metrics["database_query_duration_seconds"].labels(
-                    operation=operation,
-                    table=table
-                ).observe(duration)
-        except (KeyError, ValueError):
-            # Metric doesn't exist or labels don't match - skip backward compatibility
-            pass
+        # database_queries_total and database_query_duration_seconds are
+        # aliases of these collectors
+        self._db_queries.inc((operation, table, status))
+        self._db_duration.observe((operation, table), duration)
     
     def record_database_query(
         self, database: str, operation: str, status: str, duration: float
@@ -1093,9 +1042,7 @@ class PrometheusMetricsService:
         if not self.enabled:
             return
 
-        self.metrics["rate_limit_exceeded_total"].labels(
-            endpoint=endpoint, ip_address=ip_address
-        ).inc()
+        self._rate_limited.inc((endpoint, ip_address))
 
     def set_users_total(self, status: str, count: int):
         """Set total users count"""
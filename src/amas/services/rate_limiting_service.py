@@ -8,9 +8,8 @@ sliding window algorithm, and configurable limits.
 import asyncio
 import logging
 import time
-from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 try:
     import redis.asyncio as redis
@@ -19,6 +18,8 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+from ..utils.rate_limit import LRUClientTable, SlidingWindowQuota
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +33,85 @@ class RateLimitConfig:
     enabled: bool = True
 
 
+# (name, seconds) of the windows every check enforces
+RATE_LIMIT_WINDOWS = (("minute", 60), ("hour", 3600), ("day", 86400))
+
+
+def _window_limits(config: RateLimitConfig):
+    return (config.requests_per_minute, config.requests_per_hour, config.requests_per_day)
+
+
+# Distributed sliding windows, one hash per user/endpoint key. Each window
+# keeps three fields - "<w>:i" (current fixed-window index), "<w>:c"
+# (count in it) and "<w>:p" (count in the previous one) - and estimates
+# the sliding count as p * (1 - elapsed / seconds) + c. Memory per key is
+# constant however many requests arrive, and a request is only counted
+# when every window admits it.
+#
+# KEYS: one hash per endpoint being checked
+# ARGV: now, cost, ttl, then (seconds, limit) for each window
+# Returns allowed, remaining, retry_after, reset_after per key; floats are
+# returned as strings since Redis truncates Lua numbers to integers.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local windows = (#ARGV - 3) / 2
+local reply = {}
+for k = 1, #KEYS do
+  local key = KEYS[k]
+  local allowed, remaining, retry_after, reset_after = 1, -1, 0, 0
+  local updates = {}
+  for w = 1, windows do
+    local seconds = tonumber(ARGV[2 + 2 * w])
+    local limit = tonumber(ARGV[3 + 2 * w])
+    local index = math.floor(now / seconds)
+    local stored = redis.call('HMGET', key, w .. ':i', w .. ':c', w .. ':p')
+    local stored_index = tonumber(stored[1])
+    local current, previous = 0, 0
+    if stored_index == index then
+      current, previous = tonumber(stored[2]) or 0, tonumber(stored[3]) or 0
+    elseif stored_index == index - 1 then
+      previous = tonumber(stored[2]) or 0
+    end
+    local elapsed = now - index * seconds
+    local estimate = previous * (1 - elapsed / seconds) + current
+    if estimate + cost > limit then
+      allowed, reset_after = 0, seconds
+      local room = limit - current - cost
+      if room >= 0 then
+        -- Wait for the previous window's weight to decay
+        retry_after = seconds * (1 - room / previous) - elapsed
+      elseif limit >= cost then
+        -- Wait for the rollover, then for the current count to decay
+        retry_after = seconds - elapsed + seconds * (1 - (limit - cost) / current)
+      else
+        retry_after = seconds
+      end
+      break
+    end
+    local left = math.floor(limit - estimate - cost)
+    if remaining < 0 or left < remaining then remaining = left end
+    if reset_after == 0 or seconds < reset_after then reset_after = seconds end
+    updates[#updates + 1] = {w, index, current + cost, previous}
+  end
+  if allowed == 1 then
+    for _, u in ipairs(updates) do
+      redis.call('HSET', key, u[1] .. ':i', u[2], u[1] .. ':c', u[3], u[1] .. ':p', u[4])
+    end
+    redis.call('EXPIRE', key, ttl)
+  else
+    remaining = 0
+  end
+  reply[#reply + 1] = allowed
+  reply[#reply + 1] = math.max(remaining, 0)
+  reply[#reply + 1] = tostring(retry_after)
+  reply[#reply + 1] = tostring(reset_after)
+end
+return reply
+"""
+
+
 @dataclass
 class RateLimitResult:
     """Result of rate limit check"""
@@ -55,7 +135,8 @@ class RateLimitingService:
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
-        default_config: RateLimitConfig = None
+        default_config: RateLimitConfig = None,
+        max_memory_keys: int = 100_000
     ):
         """
         Initialize rate limiting service.
@@ -63,16 +144,20 @@ class RateLimitingService:
         Args:
             redis_url: Redis connection URL for distributed rate limiting
             default_config: Default rate limit configuration
+            max_memory_keys: User/endpoint pairs kept by the in-memory
+                fallback before the least recently seen are evicted
         """
         self.redis_url = redis_url
         self.default_config = default_config or RateLimitConfig()
         
         self.redis_client: Optional[redis.Redis] = None
+        self._redis_script = None  # SLIDING_WINDOW_SCRIPT, registered on first use
         self.user_configs: Dict[str, RateLimitConfig] = {}
         
         # In-memory fallback (for single-instance deployments)
-        self._memory_windows: Dict[str, Dict[str, list]] = defaultdict(
-            lambda: defaultdict(list)
+        self._memory_windows: LRUClientTable[SlidingWindowQuota] = LRUClientTable(
+            lambda: SlidingWindowQuota([seconds for _, seconds in RATE_LIMIT_WINDOWS]),
+            max_memory_keys
         )
     
     async def initialize(self):
@@ -97,6 +182,7 @@ class RateLimitingService:
         """Close Redis connection"""
         if self.redis_client:
             await self.redis_client.close()
+        self._redis_script = None
     
     def set_user_config(self, user_id: str, config: RateLimitConfig):
         """Set rate limit configuration for a specific user"""
@@ -135,6 +221,45 @@ class RateLimitingService:
         else:
             return await self._check_memory_rate_limit(user_id, endpoint, config)
     
+    async def check_rate_limits(
+        self,
+        user_id: str,
+        endpoints: Sequence[str]
+    ) -> Dict[str, RateLimitResult]:
+        """
+        Check one request against several endpoints' limits at once.
+        
+        Each endpoint is admitted or denied independently. In Redis mode
+        all endpoints are evaluated in a single script call.
+        
+        Args:
+            user_id: User identifier
+            endpoints: Endpoint identifiers to check
+            
+        Returns:
+            Mapping of endpoint to its RateLimitResult
+        """
+        config = self.get_user_config(user_id)
+        endpoints = list(dict.fromkeys(endpoints))
+        
+        if not config.enabled:
+            return {
+                endpoint: RateLimitResult(allowed=True, remaining=999999, reset_time=time.time() + 3600)
+                for endpoint in endpoints
+            }
+        
+        if self.redis_client:
+            results = await self._check_redis_rate_limits(user_id, endpoints, config)
+            return dict(zip(endpoints, results))
+        return {
+            endpoint: await self._check_memory_rate_limit(user_id, endpoint, config)
+            for endpoint in endpoints
+        }
+    
+    def _redis_key(self, user_id: str, endpoint: str) -> str:
+        # Hash tag on the user keeps a batch's keys in one cluster slot
+        return f"ratelimit:{{{user_id}}}:{endpoint}"
+    
     async def _check_redis_rate_limit(
         self,
         user_id: str,
@@ -142,80 +267,40 @@ class RateLimitingService:
         config: RateLimitConfig
     ) -> RateLimitResult:
         """Check rate limit using Redis (distributed)"""
-        current_time = time.time()
-        key_prefix = f"ratelimit:{user_id}:{endpoint}"
-        
-        # Check all time windows
-        windows = [
-            ("minute", 60, config.requests_per_minute),
-            ("hour", 3600, config.requests_per_hour),
-            ("day", 86400, config.requests_per_day),
-        ]
-        
-        allowed = True
-        remaining = float('inf')
-        reset_time = current_time + 60
-        retry_after = None
-        
-        async with self.redis_client.pipeline() as pipe:
-            for window_name, window_seconds, limit in windows:
-                key = f"{key_prefix}:{window_name}"
-                
-                # Remove old entries outside window
-                pipe.zremrangebyscore(key, 0, current_time - window_seconds)
-                
-                # Count requests in window
-                pipe.zcard(key)
-                
-                # Add current request
-                pipe.zadd(key, {str(current_time): current_time})
-                
-                # Set expiry
-                pipe.expire(key, window_seconds)
-            
-            results = await pipe.execute()
-            
-            # Check each window
-            for i, (window_name, window_seconds, limit) in enumerate(windows):
-                # Results are: [zrem, zcard, zadd, expire] for each window
-                # zcard is at index 1, 5, 9...
-                count_index = 1 + i * 4
-                count = results[count_index]
-                
-                if count >= limit:
-                    allowed = False
-                    # Calculate retry after
-                    oldest_key = f"{key_prefix}:{window_name}"
-                    oldest = await self.redis_client.zrange(oldest_key, 0, 0, withscores=True)
-                    if oldest:
-                        retry_after = oldest[0][1] + window_seconds - current_time
-                    else:
-                        retry_after = window_seconds
-                    # Set remaining to 0 when limit exceeded
-                    remaining = 0
-                    # Calculate reset_time from the first window that failed
-                    reset_time = min(reset_time, current_time + window_seconds)
-                    # Break immediately - don't check other windows
-                    break
-                
-                remaining = min(remaining, limit - count)
-                reset_time = min(reset_time, current_time + window_seconds)
+        results = await self._check_redis_rate_limits(user_id, [endpoint], config)
+        return results[0]
+    
+    async def _check_redis_rate_limits(
+        self,
+        user_id: str,
+        endpoints: Sequence[str],
+        config: RateLimitConfig
+    ) -> List[RateLimitResult]:
+        """Check every endpoint's windows in one atomic script call"""
+        if self._redis_script is None:
+            self._redis_script = self.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
         
-        # Convert remaining to int, ensuring 0 when blocked, 999999 when unlimited
-        # Priority: blocked requests (not allowed) must have remaining=0
-        if not allowed:
-            final_remaining = 0
-        elif remaining == float('inf'):
-            final_remaining = 999999
-        else:
-            final_remaining = int(remaining)
+        current_time = time.time()
+        args = [current_time, 1, 2 * RATE_LIMIT_WINDOWS[-1][1]]
+        for (_, seconds), limit in zip(RATE_LIMIT_WINDOWS, _window_limits(config)):
+            args.extend((seconds, limit))
         
-        return RateLimitResult(
-            allowed=allowed,
-            remaining=final_remaining,
-            reset_time=reset_time,
-            retry_after=retry_after
+        reply = await self._redis_script(
+            keys=[self._redis_key(user_id, endpoint) for endpoint in endpoints],
+            args=args
         )
+        
+        results = []
+        for i in range(0, len(reply), 4):
+            allowed, remaining, retry_after, reset_after = reply[i:i + 4]
+            allowed = int(allowed) == 1
+            results.append(RateLimitResult(
+                allowed=allowed,
+                remaining=int(remaining),
+                reset_time=current_time + float(reset_after),
+                retry_after=None if allowed else max(0.0, float(retry_after))
+            ))
+        return results
     
     async def _check_memory_rate_limit(
         self,
@@ -223,78 +308,27 @@ class RateLimitingService:
         endpoint: str,
         config: RateLimitConfig
     ) -> RateLimitResult:
-        """Check rate limit using in-memory storage"""
+        """Check rate limit using in-memory sliding-window counters"""
         current_time = time.time()
-        key = f"{user_id}:{endpoint}"
-        
-        windows = self._memory_windows[key]
-        
-        # Check all time windows
-        window_configs = [
-            ("minute", 60, config.requests_per_minute),
-            ("hour", 3600, config.requests_per_hour),
-            ("day", 86400, config.requests_per_day),
-        ]
-        
-        allowed = True
-        remaining = float('inf')
-        reset_time = current_time + 60
-        retry_after = None
-        
-        for window_name, window_seconds, limit in window_configs:
-            window = windows[window_name]
-            
-            # Remove old entries
-            window[:] = [t for t in window if current_time - t < window_seconds]
-            
-            # Check limit BEFORE adding current request
-            # If window already has 'limit' entries, we've reached the limit
-            if len(window) >= limit:
-                allowed = False
-                if window:
-                    retry_after = window[0] + window_seconds - current_time
-                else:
-                    retry_after = window_seconds
-                # Don't add request if limit exceeded
-                remaining = 0
-                # Calculate reset_time from the first window that failed
-                reset_time = min(reset_time, current_time + window_seconds)
-                # Break immediately - don't check other windows
-                break
-            
-            # Add current request only if within limit
-            window.append(current_time)
-            
-            # Calculate remaining after adding this request
-            remaining = min(remaining, limit - len(window))
-            reset_time = min(reset_time, current_time + window_seconds)
-        
-        # Convert remaining to int, ensuring 0 when blocked, 999999 when unlimited
-        # Priority: blocked requests (not allowed) must have remaining=0
-        if not allowed:
-            final_remaining = 0
-        elif remaining == float('inf'):
-            final_remaining = 999999
-        else:
-            final_remaining = int(remaining)
+        quota = self._memory_windows.get(f"{user_id}:{endpoint}")
+        decision = quota.acquire(current_time, _window_limits(config))
         
         return RateLimitResult(
-            allowed=allowed,
-            remaining=final_remaining,
-            reset_time=reset_time,
-            retry_after=retry_after
+            allowed=decision.allowed,
+            remaining=decision.remaining,
+            reset_time=current_time + decision.reset_after,
+            retry_after=decision.retry_after
         )
     
     async def reset_user_limits(self, user_id: str):
         """Reset rate limits for a user"""
         if self.redis_client:
-            pattern = f"ratelimit:{user_id}:*"
-            keys = await self.redis_client.keys(pattern)
+            keys = [key async for key in self.redis_client.scan_iter(match=self._redis_key(user_id, "*"))]
             if keys:
                 await self.redis_client.delete(*keys)
         else:
             # Remove from memory
-            keys_to_remove = [k for k in self._memory_windows.keys() if k.startswith(f"{user_id}:")]
+            keys_to_remove = [k for k in self._memory_windows if k.startswith(f"{user_id}:")]
             for key in keys_to_remove:
                 self._memory_windows.pop(key, None)
     
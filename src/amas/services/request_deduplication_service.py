@@ -24,6 +24,19 @@ class DeduplicationConfig:
     enabled: bool = True
 
 
+def request_key(request_data: Any) -> str:
+    """Stable SHA-256 key for request data (dict key order does not matter)"""
+    if isinstance(request_data, dict):
+        # Sort keys for consistent hashing
+        normalized = json.dumps(request_data, sort_keys=True, default=str)
+    elif isinstance(request_data, str):
+        normalized = request_data
+    else:
+        normalized = json.dumps(request_data, default=str, sort_keys=True)
+    
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
 class RequestDeduplicationService:
     """
     Service that deduplicates concurrent identical requests.
@@ -50,17 +63,7 @@ class RequestDeduplicationService:
     
     def _generate_key(self, request_data: Any) -> str:
         """Generate deduplication key from request data"""
-        # Normalize request data
-        if isinstance(request_data, dict):
-            # Sort keys for consistent hashing
-            normalized = json.dumps(request_data, sort_keys=True)
-        elif isinstance(request_data, str):
-            normalized = request_data
-        else:
-            normalized = json.dumps(request_data, default=str, sort_keys=True)
-        
-        # Generate hash
-        return hashlib.sha256(normalized.encode()).hexdigest()
+        return request_key(request_data)
     
     async def deduplicate(
         self,
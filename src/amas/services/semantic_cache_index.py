@@ -0,0 +1,532 @@
+"""
+Semantic Cache Index for AMAS
+
+In-memory vector index backing SemanticCacheService. Embeddings live in a
+contiguous, pre-normalized float32 matrix per agent partition so a lookup is a
+single vectorized top-k search instead of a Redis KEYS scan followed by one GET
+and one JSON decode per entry.
+
+Large partitions switch to an inverted-file (IVF) layout: rows are assigned to
+coarse k-means centroids and a lookup only scores the rows of the ``nprobe``
+closest centroids. The index can optionally be mirrored to disk so a restart
+does not have to rebuild it from Redis.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "default"
+
+
+class _Partition:
+    """Vector storage for a single agent partition"""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        # Expiry of 0.0 marks an empty slot, so one comparison masks both
+        # free and expired rows during a search.
+        self.expires_at = np.zeros(capacity, dtype=np.float64)
+        self.last_access = np.zeros(capacity, dtype=np.float64)
+        self.keys: List[Optional[str]] = [None] * capacity
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.size = 0  # High-water mark of used rows
+
+        # IVF state (None while the partition is searched exhaustively)
+        self.centroids: Optional[Any] = None
+        self.assignments = np.full(capacity, -1, dtype=np.int32)
+        self.lists: List[Any] = []  # Row ids per IVF list
+        self.pending: List[List[int]] = []  # Rows assigned since last probe
+        self.trained_at_size = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _grow(self) -> None:
+        capacity = self.vectors.shape[0] * 2
+        old = self.vectors.shape[0]
+
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:old] = self.vectors
+        self.vectors = vectors
+
+        for name in ("expires_at", "last_access"):
+            grown = np.zeros(capacity, dtype=np.float64)
+            grown[:old] = getattr(self, name)
+            setattr(self, name, grown)
+
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[:old] = self.assignments
+        self.assignments = assignments
+
+        self.keys.extend([None] * (capacity - old))
+
+    def allocate(self) -> int:
+        if self.free:
+            return self.free.pop()
+        if self.size == self.vectors.shape[0]:
+            self._grow()
+        row = self.size
+        self.size += 1
+        return row
+
+    def release(self, row: int) -> Optional[str]:
+        key = self.keys[row]
+        if key is not None:
+            self.rows.pop(key, None)
+        self.keys[row] = None
+        self.expires_at[row] = 0.0
+        self.last_access[row] = 0.0
+        self.assignments[row] = -1
+        self.free.append(row)
+        return key
+
+
+class SemanticCacheIndex:
+    """
+    Vector index for semantic cache lookups.
+
+    Features:
+    - Contiguous float32 embedding matrix per agent partition
+    - Single vectorized top-k cosine search per lookup
+    - IVF coarse quantization for large partitions
+    - TTL-aware search and LRU eviction with evicted keys reported back
+    - Optional on-disk mirror (``.npz`` per partition)
+    """
+
+    def __init__(
+        self,
+        max_entries_per_partition: int = 100_000,
+        ivf_threshold: int = 20_000,
+        nprobe: int = 8,
+        eviction_batch: float = 0.01,
+        index_path: Optional[str] = None,
+    ):
+        """
+        Initialize semantic cache index.
+
+        Args:
+            max_entries_per_partition: Capacity of each agent partition
+            ivf_threshold: Partition size above which IVF search is used
+            nprobe: Number of IVF lists scored per lookup
+            eviction_batch: Fraction of a full partition evicted at once
+            index_path: Optional directory used to mirror the index on disk
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for SemanticCacheIndex")
+
+        self.max_entries_per_partition = max_entries_per_partition
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.eviction_batch = eviction_batch
+        self.index_path = index_path
+
+        self.dim: Optional[int] = None
+        self._partitions: Dict[str, _Partition] = {}
+        # key -> partition name, so removals do not need the agent id
+        self._key_partition: Dict[str, str] = {}
+
+        self.stats: Dict[str, int] = {
+            "searches": 0,
+            "ivf_searches": 0,
+            "evictions": 0,
+            "expired": 0,
+            "trainings": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._key_partition)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_partition
+
+    @staticmethod
+    def _partition_name(agent_id: Optional[str]) -> str:
+        return agent_id or DEFAULT_PARTITION
+
+    def _normalize(self, embedding: Sequence[float]) -> Optional[Any]:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if self.dim is None:
+            self.dim = int(vector.shape[0])
+        elif vector.shape[0] != self.dim:
+            logger.warning(
+                f"Embedding dimension mismatch: expected {self.dim}, "
+                f"got {vector.shape[0]}"
+            )
+            return None
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def add(
+        self,
+        key: str,
+        embedding: Sequence[float],
+        agent_id: Optional[str] = None,
+        ttl: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Add or replace an entry.
+
+        Args:
+            key: Cache key of the entry (the full Redis key)
+            embedding: Embedding of the cached query
+            agent_id: Partition the entry belongs to
+            ttl: Seconds until the entry expires (None = never)
+            now: Current wall-clock time, for callers restoring entries
+
+        Returns:
+            Keys evicted to make room; callers must delete them from the
+            backing store.
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return []
+
+        now = time.time() if now is None else now
+        name = self._partition_name(agent_id)
+
+        # A key moving between partitions is removed from the old one first
+        if self._key_partition.get(key, name) != name:
+            self.remove(key)
+
+        partition = self._partitions.get(name)
+        if partition is None:
+            partition = _Partition(self.dim)  # type: ignore[arg-type]
+            self._partitions[name] = partition
+
+        evicted: List[str] = []
+        row = partition.rows.get(key)
+        if row is None:
+            if len(partition) >= self.max_entries_per_partition:
+                evicted = self._evict(partition, now)
+            row = partition.allocate()
+            partition.keys[row] = key
+            partition.rows[key] = row
+            self._key_partition[key] = name
+
+        partition.vectors[row] = vector
+        partition.expires_at[row] = now + ttl if ttl else np.inf
+        partition.last_access[row] = now
+
+        if partition.centroids is not None:
+            self._assign(partition, row)
+        if len(partition) >= self.ivf_threshold and (
+            partition.centroids is None
+            or len(partition) >= 2 * partition.trained_at_size
+        ):
+            self._train(partition)
+
+        return evicted
+
+    def remove(self, key: str) -> bool:
+        """Remove an entry; returns True if it was indexed"""
+        name = self._key_partition.pop(key, None)
+        if name is None:
+            return False
+        partition = self._partitions[name]
+        row = partition.rows.get(key)
+        if row is not None:
+            partition.release(row)
+        return True
+
+    def touch(self, key: str, now: Optional[float] = None) -> None:
+        """Record an access for LRU eviction"""
+        name = self._key_partition.get(key)
+        if name is None:
+            return
+        partition = self._partitions[name]
+        row = partition.rows.get(key)
+        if row is not None:
+            partition.last_access[row] = time.time() if now is None else now
+
+    def keys(self, agent_id: Optional[str] = None) -> List[str]:
+        """Indexed keys, optionally restricted to one partition"""
+        if agent_id is None:
+            return list(self._key_partition)
+        partition = self._partitions.get(self._partition_name(agent_id))
+        return list(partition.rows) if partition else []
+
+    def clear(self, agent_id: Optional[str] = None) -> List[str]:
+        """Drop one partition (or everything) and return the removed keys"""
+        if agent_id is None:
+            removed = list(self._key_partition)
+            self._partitions.clear()
+            self._key_partition.clear()
+            return removed
+
+        partition = self._partitions.pop(self._partition_name(agent_id), None)
+        if partition is None:
+            return []
+        removed = list(partition.rows)
+        for key in removed:
+            self._key_partition.pop(key, None)
+        return removed
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        agent_id: Optional[str] = None,
+        top_k: int = 5,
+        threshold: float = 0.0,
+        now: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar live entries in a partition.
+
+        Args:
+            embedding: Query embedding
+            agent_id: Partition to search
+            top_k: Maximum number of candidates to return
+            threshold: Minimum cosine similarity
+            now: Current wall-clock time
+
+        Returns:
+            (key, similarity) pairs ordered by decreasing similarity
+        """
+        partition = self._partitions.get(self._partition_name(agent_id))
+        if partition is None or len(partition) == 0:
+            return []
+
+        query = self._normalize(embedding)
+        if query is None:
+            return []
+
+        now = time.time() if now is None else now
+        self.stats["searches"] += 1
+
+        if partition.centroids is not None:
+            self.stats["ivf_searches"] += 1
+            candidates = self._probe(partition, query)
+            if candidates.size == 0:
+                return []
+            scores = partition.vectors[candidates] @ query
+            live = partition.expires_at[candidates] > now
+        else:
+            candidates = None
+            scores = partition.vectors[: partition.size] @ query
+            live = partition.expires_at[: partition.size] > now
+
+        scores = np.where(live & (scores >= threshold), scores, -np.inf)
+
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return []
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top])]
+
+        results: List[Tuple[str, float]] = []
+        seen = set()
+        for position in top:
+            score = float(scores[position])
+            if score == -np.inf:
+                break
+            row = int(position if candidates is None else candidates[position])
+            key = partition.keys[row]
+            if key is not None and key not in seen:
+                seen.add(key)
+                results.append((key, score))
+        return results
+
+    def purge_expired(self, now: Optional[float] = None) -> List[str]:
+        """Remove expired entries from every partition"""
+        now = time.time() if now is None else now
+        removed: List[str] = []
+        for partition in self._partitions.values():
+            expired = self._expired_rows(partition, now)
+            removed.extend(self._release_rows(partition, expired))
+        self.stats["expired"] += len(removed)
+        return removed
+
+    def _expired_rows(self, partition: _Partition, now: float) -> Any:
+        expires = partition.expires_at[: partition.size]
+        return np.nonzero((expires > 0.0) & (expires <= now))[0]
+
+    def _release_rows(self, partition: _Partition, rows: Any) -> List[str]:
+        removed: List[str] = []
+        for row in rows:
+            key = partition.release(int(row))
+            if key is not None:
+                self._key_partition.pop(key, None)
+                removed.append(key)
+        return removed
+
+    def _evict(self, partition: _Partition, now: float) -> List[str]:
+        """Free room in a full partition: expired rows first, then LRU"""
+        expired = self._release_rows(partition, self._expired_rows(partition, now))
+        self.stats["expired"] += len(expired)
+        if len(partition) < self.max_entries_per_partition:
+            return expired
+
+        count = max(1, int(self.max_entries_per_partition * self.eviction_batch))
+        access = np.where(
+            partition.expires_at[: partition.size] > 0.0,
+            partition.last_access[: partition.size],
+            np.inf,
+        )
+        count = min(count, len(partition))
+        oldest = np.argpartition(access, count - 1)[:count]
+        evicted = self._release_rows(partition, oldest)
+        self.stats["evictions"] += len(evicted)
+        return expired + evicted
+
+    def _train(self, partition: _Partition, iterations: int = 8) -> None:
+        """Train IVF centroids with a few rounds of spherical k-means"""
+        live = np.nonzero(partition.expires_at[: partition.size] > 0.0)[0]
+        n_lists = max(1, min(live.size, int(2 * np.sqrt(live.size))))
+
+        rng = np.random.default_rng(0)
+        sample = live
+        if live.size > n_lists * 32:
+            sample = rng.choice(live, size=n_lists * 32, replace=False)
+        data = partition.vectors[sample]
+
+        seeds = rng.choice(data.shape[0], size=n_lists, replace=False)
+        centroids = data[seeds].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            nonempty = norms[:, 0] > 0
+            centroids[nonempty] = sums[nonempty] / norms[nonempty]
+
+        partition.centroids = centroids
+        partition.assignments[:] = -1
+
+        labels = np.argmax(partition.vectors[live] @ centroids.T, axis=1)
+        partition.assignments[live] = labels
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(n_lists + 1))
+        partition.lists = [
+            live[order[bounds[i]:bounds[i + 1]]].astype(np.int64)
+            for i in range(n_lists)
+        ]
+        partition.pending = [[] for _ in range(n_lists)]
+
+        partition.trained_at_size = len(partition)
+        self.stats["trainings"] += 1
+        logger.debug(
+            f"Semantic cache index: trained {n_lists} IVF lists "
+            f"over {live.size} entries"
+        )
+
+    def _assign(self, partition: _Partition, row: int) -> None:
+        label = int(np.argmax(partition.centroids @ partition.vectors[row]))
+        partition.assignments[row] = label
+        partition.pending[label].append(row)
+
+    def _probe(self, partition: _Partition, query: Any) -> Any:
+        centroid_scores = partition.centroids @ query
+        nprobe = min(self.nprobe, centroid_scores.shape[0])
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        chunks = []
+        for label in probed.tolist():
+            rows = partition.lists[label]
+            if partition.pending[label]:
+                rows = np.concatenate(
+                    (rows, np.asarray(partition.pending[label], dtype=np.int64))
+                )
+                partition.pending[label] = []
+            # Lists keep stale rows after release/reuse; drop them here and
+            # compact the list once it is mostly stale.
+            live = partition.assignments[rows] == label
+            valid = rows[live]
+            partition.lists[label] = valid if valid.size * 2 < rows.size else rows
+            chunks.append(valid)
+
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            **self.stats,
+            "entries": len(self),
+            "partitions": len(self._partitions),
+            "dimension": self.dim,
+            "ivf_partitions": sum(
+                1 for p in self._partitions.values() if p.centroids is not None
+            ),
+        }
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """Mirror the index to disk, one ``.npz`` file per partition"""
+        path = path or self.index_path
+        if not path:
+            return False
+
+        try:
+            os.makedirs(path, exist_ok=True)
+            existing = {f for f in os.listdir(path) if f.endswith(".npz")}
+            written = set()
+            for index, (name, partition) in enumerate(self._partitions.items()):
+                live = np.nonzero(partition.expires_at[: partition.size] > 0.0)[0]
+                filename = f"partition_{index}.npz"
+                tmp_file = os.path.join(path, f".{filename}.tmp")
+                with open(tmp_file, "wb") as f:
+                    np.savez(
+                        f,
+                        name=np.array(name),
+                        keys=np.array([partition.keys[r] for r in live], dtype=np.str_),
+                        vectors=partition.vectors[live],
+                        expires_at=partition.expires_at[live],
+                        last_access=partition.last_access[live],
+                    )
+                os.replace(tmp_file, os.path.join(path, filename))
+                written.add(filename)
+            for stale in existing - written:
+                os.remove(os.path.join(path, stale))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save semantic cache index: {e}")
+            return False
+
+    def load(self, path: Optional[str] = None, now: Optional[float] = None) -> int:
+        """Load a mirrored index from disk; returns the number of live entries"""
+        path = path or self.index_path
+        if not path or not os.path.isdir(path):
+            return 0
+
+        now = time.time() if now is None else now
+        loaded = 0
+        try:
+            for filename in sorted(os.listdir(path)):
+                if not filename.endswith(".npz"):
+                    continue
+                with np.load(os.path.join(path, filename)) as data:
+                    name = str(data["name"])
+                    agent_id = None if name == DEFAULT_PARTITION else name
+                    for key, vector, expires, accessed in zip(
+                        data["keys"], data["vectors"],
+                        data["expires_at"], data["last_access"]
+                    ):
+                        if expires <= now:
+                            continue
+                        ttl = None if np.isinf(expires) else float(expires - now)
+                        self.add(str(key), vector, agent_id, ttl=ttl, now=now)
+                        self.touch(str(key), now=float(accessed))
+                        loaded += 1
+        except Exception as e:
+            logger.error(f"Failed to load semantic cache index: {e}")
+        return loaded
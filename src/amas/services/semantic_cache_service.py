@@ -4,11 +4,15 @@ Semantic Caching Service for AMAS
 Provides intelligent semantic caching for agent responses using Redis.
 Implements semantic similarity matching to cache similar requests, achieving
 30%+ speed improvement for repeated or similar queries.
+
+Semantic lookups are served by an in-memory SemanticCacheIndex partitioned by
+agent; Redis only stores the cached values.
 """
 
 import hashlib
 import json
 import logging
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
@@ -29,6 +33,9 @@ except ImportError:
     SentenceTransformer = None  # type: ignore[assignment]
     np = None  # type: ignore[assignment]
 
+from .embedding_service import DEFAULT_EMBEDDING_MODEL, EmbeddingService, get_embedding_service
+from .semantic_cache_index import NUMPY_AVAILABLE, SemanticCacheIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,6 +59,7 @@ class SemanticCacheService:
     
     Features:
     - Semantic similarity matching (cosine similarity)
+    - Vector index with per-agent partitions for semantic lookups
     - Redis-based distributed caching
     - Automatic cache invalidation
     - Cache hit/miss metrics
@@ -64,7 +72,11 @@ class SemanticCacheService:
         similarity_threshold: float = 0.85,
         default_ttl: int = 3600,
         enable_embeddings: bool = True,
-        cache_prefix: str = "amas:semantic:"
+        cache_prefix: str = "amas:semantic:",
+        max_index_entries: int = 100_000,
+        search_top_k: int = 5,
+        index_path: Optional[str] = None,
+        embedding_service: Optional[EmbeddingService] = None
     ):
         """
         Initialize semantic cache service.
@@ -75,15 +87,20 @@ class SemanticCacheService:
             default_ttl: Default cache TTL in seconds
             enable_embeddings: Whether to use embeddings for semantic matching
             cache_prefix: Redis key prefix
+            max_index_entries: Maximum indexed entries per agent partition
+            search_top_k: Candidates fetched from Redis per semantic lookup
+            index_path: Optional directory to mirror the vector index to disk
+            embedding_service: Embedding service to use instead of the shared one
         """
         self.redis_url = redis_url
         self.similarity_threshold = similarity_threshold
         self.default_ttl = default_ttl
         self.enable_embeddings = enable_embeddings
         self.cache_prefix = cache_prefix
+        self.search_top_k = search_top_k
         
         self.redis_client: Optional[Any] = None
-        self.embedding_model: Optional[Any] = None
+        self.embedding_service: Optional[EmbeddingService] = embedding_service
         self._memory_cache: Dict[str, Any] = {}
         
         # Cache statistics
@@ -96,19 +113,19 @@ class SemanticCacheService:
             "sets": 0
         }
         
-        # Initialize embedding model if available
-        if enable_embeddings and EMBEDDINGS_AVAILABLE:
-            try:
-                # Use a lightweight model for fast embeddings
-                self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info("Semantic cache: Embedding model loaded")
-            except Exception as e:
-                logger.warning(
-                    f"Failed to load embedding model: {e}. "
-                    "Semantic matching disabled."
-                )
-                self.enable_embeddings = False
-        else:
+        self.index: Optional[SemanticCacheIndex] = None
+        if NUMPY_AVAILABLE:
+            self.index = SemanticCacheIndex(
+                max_entries_per_partition=max_index_entries,
+                index_path=index_path
+            )
+        
+        # Default to the process-wide embedding service (lightweight model,
+        # loaded on its worker thread on first use)
+        if enable_embeddings and self.embedding_service is None and EMBEDDINGS_AVAILABLE:
+            self.embedding_service = get_embedding_service(DEFAULT_EMBEDDING_MODEL)
+            logger.info("Semantic cache: using shared embedding service")
+        if not enable_embeddings or self.embedding_service is None:
             self.enable_embeddings = False
             if enable_embeddings:
                 logger.warning(
@@ -117,7 +134,12 @@ class SemanticCacheService:
                 )
     
     async def initialize(self) -> None:
-        """Initialize Redis connection"""
+        """Initialize Redis connection and warm the vector index"""
+        if self.index is not None and self.index.index_path:
+            loaded = self.index.load()
+            if loaded:
+                logger.info(f"Semantic cache: loaded {loaded} indexed entries")
+        
         if not REDIS_AVAILABLE:
             logger.warning(
                 "Redis not available. Semantic cache will use "
@@ -135,6 +157,8 @@ class SemanticCacheService:
             # Test connection
             await self.redis_client.ping()  # type: ignore[union-attr]
             logger.info("Semantic cache: Redis connection established")
+            if self.index is not None and len(self.index) == 0:
+                await self.rebuild_index()
         except Exception as e:
             logger.error(
                 f"Failed to connect to Redis: {e}. Using in-memory cache."
@@ -143,7 +167,9 @@ class SemanticCacheService:
             self.redis_client = None
     
     async def close(self) -> None:
-        """Close Redis connection"""
+        """Persist the vector index and close Redis connection"""
+        if self.index is not None and self.index.index_path:
+            self.index.save()
         if self.redis_client:
             await self.redis_client.close()  # type: ignore[union-attr]
     
@@ -165,15 +191,12 @@ class SemanticCacheService:
         text: str
     ) -> Optional[List[float]]:
         """Generate embedding for text"""
-        if not self.enable_embeddings or not self.embedding_model:
+        if not self.enable_embeddings or not self.embedding_service:
             return None
         
         try:
-            # Generate embedding
-            embedding = self.embedding_model.encode(
-                text,
-                convert_to_numpy=True
-            )
+            # Batched with concurrent requests and encoded off the event loop
+            embedding = await self.embedding_service.embed(text)
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
@@ -273,63 +296,142 @@ class SemanticCacheService:
         
         return None
     
+    async def rebuild_index(self, batch_size: int = 500) -> int:
+        """
+        Rebuild the vector index from entries stored in Redis.
+        
+        Uses incremental SCAN plus one MGET per batch, so Redis is never
+        blocked the way a KEYS call would.
+        
+        Returns:
+            Number of entries indexed
+        """
+        if self.index is None or not self.redis_client:
+            return 0
+        
+        indexed = 0
+        now = time.time()
+        batch: List[str] = []
+        
+        async def index_batch(keys: List[str]) -> int:
+            count = 0
+            values = await self.redis_client.mget(keys)  # type: ignore[union-attr]
+            for key, data in zip(keys, values):
+                if not data:
+                    continue
+                try:
+                    entry = json.loads(data)
+                except (TypeError, ValueError):
+                    continue
+                if not isinstance(entry, dict) or not entry.get("embedding"):
+                    continue
+                ttl = entry.get("ttl") or self.default_ttl
+                try:
+                    created = datetime.fromisoformat(entry["created_at"])
+                    age = (datetime.utcnow() - created).total_seconds()
+                except (KeyError, TypeError, ValueError):
+                    age = 0.0
+                remaining = ttl - age
+                if remaining <= 0:
+                    continue
+                self.index.add(  # type: ignore[union-attr]
+                    key,
+                    entry["embedding"],
+                    entry.get("agent_id"),
+                    ttl=remaining,
+                    now=now
+                )
+                count += 1
+            return count
+        
+        try:
+            async for key in self.redis_client.scan_iter(  # type: ignore[union-attr]
+                match=f"{self.cache_prefix}*",
+                count=batch_size
+            ):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    indexed += await index_batch(batch)
+                    batch = []
+            if batch:
+                indexed += await index_batch(batch)
+        except Exception as e:
+            logger.error(f"Error rebuilding semantic index: {e}")
+        
+        if indexed:
+            logger.info(f"Semantic cache: indexed {indexed} entries from Redis")
+        return indexed
+    
+    async def _get_many(
+        self,
+        keys: List[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get several entries in a single round-trip"""
+        if not self.redis_client:
+            return [
+                val if isinstance(val, dict) else None
+                for val in (self._memory_cache.get(key) for key in keys)
+            ]
+        
+        try:
+            values = await self.redis_client.mget(keys)  # type: ignore[union-attr]
+        except Exception as e:
+            logger.error(f"Error getting from Redis: {e}")
+            return [None] * len(keys)
+        
+        entries: List[Optional[Dict[str, Any]]] = []
+        for data in values:
+            try:
+                entries.append(json.loads(data) if data else None)
+            except (TypeError, ValueError):
+                entries.append(None)
+        return entries
+    
+    async def _delete_keys(self, keys: List[str]) -> None:
+        """Delete entries from the backing store"""
+        if not keys:
+            return
+        if self.redis_client:
+            try:
+                await self.redis_client.delete(*keys)  # type: ignore[union-attr]
+            except Exception as e:
+                logger.error(f"Error deleting evicted entries: {e}")
+        else:
+            for key in keys:
+                self._memory_cache.pop(key, None)
+    
     async def _find_semantic_match(
         self,
         query_embedding: List[float],
         agent_id: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        """Find semantically similar cached entry"""
-        if not self.redis_client:
-            # In-memory semantic search (limited)
-            best_match: Optional[Dict[str, Any]] = None
-            best_similarity = 0.0
-            
-            for key, entry_data in self._memory_cache.items():
-                if isinstance(entry_data, dict) and entry_data.get("embedding"):
-                    similarity = self._cosine_similarity(
-                        query_embedding,
-                        entry_data["embedding"]
-                    )
-                    if (
-                        similarity > best_similarity
-                        and similarity >= self.similarity_threshold
-                    ):
-                        best_similarity = similarity
-                        best_match = {
-                            "value": entry_data.get("value"),
-                            "similarity": similarity
-                        }
-            
-            return best_match
+        """Find semantically similar cached entry in the agent's partition"""
+        if self.index is None:
+            return None
         
-        # Redis-based semantic search
         try:
-            # Get all keys for this agent (or all if no agent specified)
-            pattern = f"{self.cache_prefix}*"
-            keys = await self.redis_client.keys(pattern)  # type: ignore[union-attr]
-            
-            best_match: Optional[Dict[str, Any]] = None
-            best_similarity = 0.0
+            candidates = self.index.search(
+                query_embedding,
+                agent_id,
+                top_k=self.search_top_k,
+                threshold=self.similarity_threshold
+            )
+            if not candidates:
+                return None
             
-            # Check up to 100 cached entries for performance
-            for key in keys[:100]:
-                entry_data = await self._get_from_redis(key)
-                if entry_data and entry_data.get("embedding"):
-                    similarity = self._cosine_similarity(
-                        query_embedding,
-                        entry_data["embedding"]
-                    )
-                    if (
-                        similarity > best_similarity
-                        and similarity >= self.similarity_threshold
-                    ):
-                        best_similarity = similarity
-                        best_match = {
-                            "value": entry_data.get("value"),
-                            "similarity": similarity
-                        }
+            entries = await self._get_many([key for key, _ in candidates])
+            for (key, similarity), entry_data in zip(candidates, entries):
+                if entry_data is None:
+                    # Expired or deleted behind the index's back
+                    self.index.remove(key)
+                    continue
+                self.index.touch(key)
+                return {
+                    "value": entry_data.get("value"),
+                    "similarity": similarity
+                }
             
-            return best_match
+            return None
             
         except Exception as e:
             logger.error(f"Error in semantic search: {e}")
@@ -383,6 +485,17 @@ class SemanticCacheService:
             else:
                 self._memory_cache[full_key] = entry
             
+            if self.index is not None and embedding:
+                evicted = self.index.add(
+                    full_key,
+                    embedding,
+                    agent_id,
+                    ttl=ttl or self.default_ttl
+                )
+                if evicted:
+                    await self._delete_keys(evicted)
+                    self.stats["evictions"] += len(evicted)
+            
             self.stats["sets"] += 1
             logger.debug(f"Cached response: {cache_key[:8]}...")
             return True
@@ -393,6 +506,8 @@ class SemanticCacheService:
     
     async def _update_access_stats(self, key: str) -> None:
         """Update access statistics for cache entry"""
+        if self.index is not None:
+            self.index.touch(key)
         try:
             entry = await self._get_from_redis(key)
             if entry:
@@ -424,6 +539,8 @@ class SemanticCacheService:
                 await self.redis_client.delete(full_key)  # type: ignore[union-attr]
             else:
                 self._memory_cache.pop(full_key, None)
+            if self.index is not None:
+                self.index.remove(full_key)
         else:
             # Invalidate all entries for agent
             pattern = f"{self.cache_prefix}*"
@@ -433,6 +550,8 @@ class SemanticCacheService:
                     await self.redis_client.delete(*keys)  # type: ignore[union-attr]
             else:
                 self._memory_cache.clear()
+            if self.index is not None:
+                self.index.clear()
     
     def get_stats(self) -> Dict[str, Union[int, float, bool]]:
         """Get cache statistics"""
@@ -448,7 +567,8 @@ class SemanticCacheService:
             "hit_rate": hit_rate,
             "total_requests": total_requests,
             "semantic_enabled": self.enable_embeddings,
-            "similarity_threshold": self.similarity_threshold
+            "similarity_threshold": self.similarity_threshold,
+            "indexed_entries": len(self.index) if self.index is not None else 0
         }
     
     async def clear(self) -> None:
@@ -460,6 +580,8 @@ class SemanticCacheService:
                 await self.redis_client.delete(*keys)  # type: ignore[union-attr]
         else:
             self._memory_cache.clear()
+        if self.index is not None:
+            self.index.clear()
         
         self.stats = {
             "hits": 0,
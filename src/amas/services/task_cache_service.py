@@ -1,15 +1,21 @@
 """
 Task Cache Service
 Task-specific caching with read-through, write-through patterns, and intelligent invalidation
+
+Reads go through a TieredCache (in-process L1 over Redis L2). Task lists
+and statistics share the ``lists`` generation, so a task update retires
+all of them with one INCR instead of scanning the keyspace.
 """
 
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.cache.redis import get_redis_client
 
+from .tiered_cache import TieredCache
+
 logger = logging.getLogger(__name__)
 
 # Global service instance
@@ -25,16 +31,19 @@ class TaskCacheService:
     - Cache task lists with pagination
     - Cache task statistics
     - Write-through caching
-    - Pattern-based invalidation
+    - Generation-based list/statistics invalidation
     - Recent tasks feed (Redis list)
     """
     
+    LISTS = "lists"  # Generation group for task lists and statistics
+    
     def __init__(self):
         self.cache = get_redis_client()
         self.ttl_short = 60  # 1 minute
         self.ttl_medium = 300  # 5 minutes
         self.ttl_long = 3600  # 1 hour
         self.key_prefix = "amas:task:"
+        self.tiered = TieredCache("amas:task", redis=self.cache)
     
     def _make_key(self, *parts: str) -> str:
         """Generate cache key"""
@@ -70,40 +79,14 @@ class TaskCacheService:
         """
         Get task with caching (read-through pattern)
         
-        Strategy: Check cache first, fetch from DB if miss, cache result
+        Strategy: Check memory, then Redis, fetch from DB if miss, cache result
         """
-        if not self.cache:
-            logger.warning("Redis cache not available, fetching from database")
-            return await self._fetch_task_from_db(task_id)
-        
-        cache_key = self._make_key("detail", task_id)
-        
         try:
-            # Try cache first
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.debug(f"Task cache HIT: {task_id}")
-                return self._deserialize(cached)
-            
-            logger.debug(f"Task cache MISS: {task_id}")
-            
-            # Fetch from database
-            task = await self._fetch_task_from_db(task_id)
-            
-            if task:
-                # Cache for 5 minutes
-                try:
-                    await self.cache.setex(
-                        cache_key,
-                        self.ttl_medium,
-                        self._serialize(task)
-                    )
-                except Exception as cache_error:
-                    # Non-critical: cache write failed, but we still return the task
-                    logger.debug(f"Cache write failed (non-critical): {cache_error}")
-                return task
-            
-            return None
+            return await self.tiered.get_or_load(
+                f"detail:{task_id}",
+                lambda: self._fetch_task_from_db(task_id),
+                self.ttl_medium,
+            )
         except Exception as e:
             # Log as debug for expected errors (Redis auth, connection issues)
             logger.debug(f"Error in get_task for {task_id} (non-critical): {e}")
@@ -113,6 +96,34 @@ class TaskCacheService:
             except Exception:
                 return None
     
+    async def get_cached_task(self, task_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Get a task from the cache only (no database fallback)
+        
+        Returns:
+            The cached task (or None) and the level that served it:
+            ``"memory"``, ``"redis"`` or None
+        """
+        task, tier = await self.tiered.get_with_tier(f"detail:{task_id}")
+        return task, {"l1": "memory", "l2": "redis"}.get(tier)
+    
+    async def cache_task(self, task_id: str, task_data: Dict[str, Any]):
+        """Write a task record to the cache (both levels) without touching the database"""
+        await self.tiered.set(f"detail:{task_id}", task_data, self.ttl_medium)
+    
+    async def update_cached_task(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        """
+        Merge ``fields`` into a cached task record, if the task is cached
+        
+        Returns:
+            Whether a cached record was updated
+        """
+        task = await self.tiered.get(f"detail:{task_id}")
+        if not task:
+            return False
+        await self.cache_task(task_id, {**task, **fields})
+        return True
+    
     async def _fetch_task_from_db(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Fetch task from database"""
         try:
@@ -199,16 +210,10 @@ class TaskCacheService:
                             task_dict[key] = value.isoformat()
                     
                     # Update cache (write-through)
-                    if self.cache:
-                        cache_key = self._make_key("detail", task_id)
-                        await self.cache.setex(
-                            cache_key,
-                            self.ttl_medium,
-                            self._serialize(task_dict)
-                        )
+                    await self.cache_task(task_id, task_dict)
                     
                     # Invalidate related caches
-                    await self._invalidate_task_lists()
+                    await self.invalidate_task_lists()
                     
                     logger.info(f"Updated task {task_id} (cache updated)")
                     return task_dict
@@ -220,15 +225,11 @@ class TaskCacheService:
     
     async def invalidate_task(self, task_id: str):
         """Invalidate task cache"""
-        if not self.cache:
-            return
-        
         try:
-            cache_key = self._make_key("detail", task_id)
-            await self.cache.delete(cache_key)
+            await self.tiered.delete(f"detail:{task_id}")
             
             # Also invalidate lists
-            await self._invalidate_task_lists()
+            await self.invalidate_task_lists()
             
             logger.debug(f"Invalidated cache for task: {task_id}")
         except Exception as e:
@@ -250,32 +251,13 @@ class TaskCacheService:
         Strategy: Cache entire result set for common queries
         TTL: 60 seconds (short, as lists change frequently)
         """
-        if not self.cache:
-            return await self._fetch_tasks_by_status_from_db(status, limit, offset)
-        
-        cache_key = self._make_key("list", "status", status, str(limit), str(offset))
-        
         try:
-            # Try cache
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.debug(f"Task list cache HIT: {status}")
-                return self._deserialize(cached)
-            
-            logger.debug(f"Task list cache MISS: {status}")
-            
-            # Fetch from database
-            tasks = await self._fetch_tasks_by_status_from_db(status, limit, offset)
-            
-            if tasks:
-                # Cache for 60 seconds
-                await self.cache.setex(
-                    cache_key,
-                    self.ttl_short,
-                    self._serialize(tasks)
-                )
-            
-            return tasks
+            return await self.tiered.get_or_load(
+                f"list:status:{status}:{limit}:{offset}",
+                lambda: self._fetch_tasks_by_status_from_db(status, limit, offset),
+                self.ttl_short,
+                group=self.LISTS,
+            )
         except Exception as e:
             logger.error(f"Error in get_tasks_by_status: {e}")
             return await self._fetch_tasks_by_status_from_db(status, limit, offset)
@@ -328,34 +310,18 @@ class TaskCacheService:
         """
         Get global task statistics (cached)
         
-        TTL: 300 seconds (medium, stats change slowly)
+        TTL: 300 seconds (medium, stats change slowly), then served stale
+        for up to a minute while one replica recomputes them
         """
-        if not self.cache:
-            return await self._fetch_statistics_from_db()
-        
-        cache_key = self._make_key("stats", "global")
-        
         try:
-            # Try cache
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.debug("Task statistics cache HIT")
-                return self._deserialize(cached)
-            
-            logger.debug("Task statistics cache MISS")
-            
-            # Fetch from database
-            stats = await self._fetch_statistics_from_db()
-            
-            if stats:
-                # Cache for 5 minutes
-                await self.cache.setex(
-                    cache_key,
-                    self.ttl_medium,
-                    self._serialize(stats)
-                )
-            
-            return stats
+            return await self.tiered.get_or_load(
+                "stats:global",
+                self._fetch_statistics_from_db,
+                self.ttl_medium,
+                group=self.LISTS,
+                stale_ttl=self.ttl_short,
+                lock=True,
+            )
         except Exception as e:
             logger.error(f"Error in get_task_statistics: {e}")
             return await self._fetch_statistics_from_db()
@@ -462,42 +428,10 @@ class TaskCacheService:
     # CACHE INVALIDATION
     # ========================================================================
     
-    async def _invalidate_task_lists(self):
-        """Invalidate all task list caches"""
-        if not self.cache:
-            return
-        
+    async def invalidate_task_lists(self):
+        """Invalidate all task list and statistics caches (one generation bump)"""
         try:
-            # Invalidate all status lists
-            pattern = self._make_key("list", "status", "*")
-            # Note: Redis doesn't support wildcard delete directly
-            # We'll need to scan and delete
-            cursor = 0
-            while True:
-                cursor, keys = await self.cache.scan(
-                    cursor,
-                    match=pattern,
-                    count=100
-                )
-                if keys:
-                    await self.cache.delete(*keys)
-                if cursor == 0:
-                    break
-            
-            # Invalidate statistics
-            stats_key = self._make_key("stats", "*")
-            cursor = 0
-            while True:
-                cursor, keys = await self.cache.scan(
-                    cursor,
-                    match=stats_key,
-                    count=100
-                )
-                if keys:
-                    await self.cache.delete(*keys)
-                if cursor == 0:
-                    break
-            
+            await self.tiered.invalidate(self.LISTS)
             logger.debug("Invalidated task list caches")
         except Exception as e:
             logger.error(f"Failed to invalidate task lists: {e}")
@@ -0,0 +1,431 @@
+"""
+Two-level cache: in-process L1 in front of Redis L2
+
+Reads check a bounded in-process LRU (``CacheEngine``) first, then Redis,
+and only then the caller's loader. L1 entries live at most ``l1_ttl``
+seconds, which bounds staleness if an invalidation message is lost.
+
+Invalidation never scans the keyspace:
+
+- Groups of derived entries (task lists, statistics, rankings) carry a
+  per-namespace generation counter in their keys. ``invalidate(group)`` is
+  a single ``INCR``; entries under the old generation are never read again
+  and age out of both levels by TTL.
+- Replicas learn about new generations and about rewritten or deleted
+  keys from a pub/sub channel per namespace, so their L1 entries are
+  dropped within milliseconds. Until the subscription is live, group
+  generations are read from Redis on every access instead.
+
+Misses are coalesced (``get_or_load``):
+
+- Concurrent misses for one key in a process share a single loader call
+  (``SingleFlight``). With ``lock=True`` replicas also take a short Redis
+  lock, so after a deploy or an expiry one replica loads and the others
+  wait for its result in L2.
+- Within ``stale_ttl`` seconds after an entry expires its old value is
+  served while one background refresh runs.
+- Entries are refreshed early with a probability that rises as expiry
+  approaches, scaled by how long the loader took (probabilistic early
+  expiration), so popular keys rarely expire at all.
+
+Without Redis the cache runs L1-only.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+from ..utils.cache import CacheEngine
+from ..utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+# Compare-and-delete, so a loader that overran its lock cannot release a newer holder's
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class _Cached(NamedTuple):
+    """A cached value with its (wall-clock) freshness deadline and load time"""
+
+    value: Any
+    fresh_until: float
+    delta: float = 0.0
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+
+class TieredCache:
+    """Read-through L1/L2 cache for one key namespace"""
+
+    def __init__(
+        self,
+        namespace: str,
+        redis: Optional[Any] = None,
+        l1_max_entries: int = 10_000,
+        l1_max_bytes: int = 64 * 1024 * 1024,
+        l1_ttl: float = 30.0,
+        lock_ttl: float = 10.0,
+        early_refresh_beta: float = 1.0,
+    ):
+        self.namespace = namespace
+        self.redis = redis
+        self.l1_ttl = l1_ttl
+        self.lock_ttl = lock_ttl
+        self.lock_poll = 0.05
+        self.early_refresh_beta = early_refresh_beta
+        self.l1 = CacheEngine(
+            policy="lru", max_bytes=l1_max_bytes, max_entries=l1_max_entries, default_ttl=l1_ttl
+        )
+        self.channel = f"{namespace}:invalidate"
+        self.origin = uuid.uuid4().hex
+
+        self._generations: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False
+        self._flights = SingleFlight()
+        self._refreshes: Set[asyncio.Future] = set()
+        self.stats = {
+            "l1_hits": 0, "l2_hits": 0, "misses": 0, "invalidations": 0, "messages": 0,
+            "stale_hits": 0, "early_refreshes": 0, "lock_waits": 0,
+        }
+
+    # Reads
+
+    async def get(self, key: str, group: Optional[str] = None) -> Optional[Any]:
+        """
+        Cached value for ``key`` (relative to the namespace), from either level.
+
+        L1 hands out the cached object itself; treat it as read-only and
+        write changes back with ``set``.
+        """
+        value, _ = await self.get_with_tier(key, group)
+        return value
+
+    async def get_with_tier(self, key: str, group: Optional[str] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """Cached value and the level that served it (``"l1"``, ``"l2"`` or None)"""
+        cached, tier = await self._lookup(await self._versioned(key, group))
+        if cached is None or not cached.is_fresh(time.time()):
+            return None, None
+        return cached.value, tier
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        group: Optional[str] = None,
+        stale_ttl: float = 0.0,
+        lock: bool = False,
+    ) -> Any:
+        """
+        Cached value for ``key``, else ``loader()``'s result, cached if truthy.
+
+        Args:
+            stale_ttl: Seconds after expiry during which the old value is
+                returned while one background refresh runs
+            lock: Also coalesce misses across replicas with a Redis lock;
+                worth it for loaders much slower than a Redis round trip
+        """
+        full_key = await self._versioned(key, group)
+        cached, _ = await self._lookup(full_key)
+        if cached is not None:
+            now = time.time()
+            if cached.is_fresh(now) and not self._expires_early(cached, now):
+                return cached.value
+            if now < cached.fresh_until + stale_ttl:
+                if cached.is_fresh(now):
+                    self.stats["early_refreshes"] += 1
+                else:
+                    self.stats["stale_hits"] += 1
+                self._refresh(full_key, loader, ttl, stale_ttl, lock, announce=group is None)
+                return cached.value
+
+        return await self._flights.do(
+            full_key, lambda: self._load(full_key, loader, ttl, stale_ttl, lock, announce=group is None)
+        )
+
+    async def _lookup(self, full_key: str) -> Tuple[Optional[_Cached], Optional[str]]:
+        self._ensure_listener()
+        cached = self.l1.get(full_key)
+        if cached is not None:
+            self.stats["l1_hits"] += 1
+            return cached, "l1"
+
+        cached = await self._read_l2(full_key)
+        if cached is not None:
+            self.l1.set(full_key, cached)
+            self.stats["l2_hits"] += 1
+            return cached, "l2"
+
+        self.stats["misses"] += 1
+        return None, None
+
+    async def _read_l2(self, full_key: str) -> Optional[_Cached]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(full_key)
+        except Exception as e:
+            logger.debug(f"L2 cache read failed for {full_key} (non-critical): {e}")
+            return None
+        if not raw:
+            return None
+        try:
+            data = json.loads(raw)
+            return _Cached(data["value"], data["fresh_until"], data.get("delta", 0.0))
+        except (json.JSONDecodeError, TypeError, KeyError):
+            return None
+
+    def _expires_early(self, cached: _Cached, now: float) -> bool:
+        """Probabilistic early expiration: likelier as expiry nears and for slow loaders"""
+        if cached.delta <= 0 or self.early_refresh_beta <= 0:
+            return False
+        jitter = -math.log(1.0 - random.random())
+        return now + cached.delta * self.early_refresh_beta * jitter >= cached.fresh_until
+
+    # Loading
+
+    async def _load(
+        self,
+        full_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float,
+        lock: bool,
+        announce: bool,
+        wait: bool = True,
+    ) -> Any:
+        token = None
+        if lock and self.redis is not None:
+            token = uuid.uuid4().hex
+            if not await self._acquire_lock(full_key, token):
+                token = None
+                if not wait:
+                    return None  # Another replica is already refreshing
+                cached = await self._wait_for_holder(full_key)
+                if cached is not None:
+                    return cached.value
+
+        try:
+            started = time.perf_counter()
+            value = await loader()
+            if value:
+                await self._store(
+                    full_key, value, ttl, announce, stale_ttl=stale_ttl, delta=time.perf_counter() - started
+                )
+            return value
+        finally:
+            if token is not None:
+                await self._release_lock(full_key, token)
+
+    def _refresh(self, full_key: str, loader, ttl: float, stale_ttl: float, lock: bool, announce: bool) -> None:
+        """Reload ``full_key`` in the background unless a load is already running"""
+        if self._flights.in_flight(full_key):
+            return
+        refresh = self._flights.start(
+            full_key, lambda: self._load(full_key, loader, ttl, stale_ttl, lock, announce, wait=False)
+        )
+        self._refreshes.add(refresh)
+        refresh.add_done_callback(self._refreshes.discard)
+
+    async def _acquire_lock(self, full_key: str, token: str) -> bool:
+        try:
+            return bool(await self.redis.set(
+                self._lock_key(full_key), token, nx=True, px=int(self.lock_ttl * 1000)
+            ))
+        except Exception as e:
+            logger.debug(f"Cache lock failed for {full_key}, loading without it: {e}")
+            return True
+
+    async def _release_lock(self, full_key: str, token: str) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LOCK, 1, self._lock_key(full_key), token)
+        except Exception as e:
+            logger.debug(f"Cache lock release failed for {full_key} (expires by itself): {e}")
+
+    async def _wait_for_holder(self, full_key: str) -> Optional[_Cached]:
+        """Poll L2 for the lock holder's result; None if it gave up or stored nothing"""
+        self.stats["lock_waits"] += 1
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll)
+            cached = await self._read_l2(full_key)
+            if cached is not None:
+                self.l1.set(full_key, cached)
+                return cached
+            try:
+                if not await self.redis.exists(self._lock_key(full_key)):
+                    return None
+            except Exception:
+                return None
+        return None
+
+    def _lock_key(self, full_key: str) -> str:
+        return f"{full_key}:lock"
+
+    # Writes and invalidation
+
+    async def set(self, key: str, value: Any, ttl: float, group: Optional[str] = None) -> None:
+        """Write ``value`` to both levels; other replicas drop their L1 copy of ``key``"""
+        await self._store(await self._versioned(key, group), value, ttl, announce=group is None)
+
+    async def _store(
+        self, full_key: str, value: Any, ttl: float, announce: bool, stale_ttl: float = 0.0, delta: float = 0.0
+    ) -> None:
+        self._ensure_listener()
+        cached = _Cached(value, time.time() + ttl, delta)
+        self.l1.set(full_key, cached, ttl=min(ttl + stale_ttl, self.l1_ttl))
+        if self.redis is None:
+            return
+        try:
+            payload = json.dumps(cached._asdict(), default=_json_default)
+            await self.redis.setex(full_key, math.ceil(ttl + stale_ttl), payload)
+            if announce:
+                await self._publish({"key": full_key})
+        except Exception as e:
+            logger.debug(f"L2 cache write failed for {full_key} (non-critical): {e}")
+
+    async def delete(self, key: str) -> None:
+        """Remove ``key`` from both levels on every replica"""
+        full_key = await self._versioned(key, None)
+        self.l1.delete(full_key)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(full_key)
+            await self._publish({"key": full_key})
+        except Exception as e:
+            logger.debug(f"L2 cache delete failed for {full_key} (non-critical): {e}")
+
+    async def invalidate(self, group: str) -> int:
+        """Retire every entry in ``group`` with one INCR; returns the new generation"""
+        self.stats["invalidations"] += 1
+        if self.redis is None:
+            generation = self._generations.get(group, 0) + 1
+            self._generations[group] = generation
+            return generation
+
+        try:
+            generation = int(await self.redis.incr(self._generation_key(group)))
+        except Exception as e:
+            # Without the shared counter only this process can move on
+            logger.debug(f"Cache generation bump failed for {group} (non-critical): {e}")
+            generation = self._generations.get(group, 0) + 1
+            self._generations[group] = generation
+            return generation
+
+        self._generations[group] = max(generation, self._generations.get(group, 0))
+        try:
+            await self._publish({"group": group, "generation": generation})
+        except Exception as e:
+            logger.debug(f"Cache invalidation publish failed for {group} (non-critical): {e}")
+        return generation
+
+    async def _versioned(self, key: str, group: Optional[str]) -> str:
+        if group is None:
+            return f"{self.namespace}:{key}"
+        return f"{self.namespace}:{group}:g{await self._generation(group)}:{key}"
+
+    async def _generation(self, group: str) -> int:
+        if self.redis is None or (self._listening and group in self._generations):
+            return self._generations.get(group, 0)
+        try:
+            generation = int(await self.redis.get(self._generation_key(group)) or 0)
+        except Exception as e:
+            logger.debug(f"Cache generation read failed for {group} (non-critical): {e}")
+            return self._generations.get(group, 0)
+        self._generations[group] = generation
+        return generation
+
+    def _generation_key(self, group: str) -> str:
+        return f"{self.namespace}:gen:{group}"
+
+    # Cross-replica invalidation
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        await self.redis.publish(self.channel, json.dumps({"origin": self.origin, **message}))
+
+    def _ensure_listener(self) -> None:
+        if self.redis is None or self._listener is not None:
+            return
+        try:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        except RuntimeError:
+            pass  # No running loop; stay on Redis-read generations
+
+    async def _listen(self) -> None:
+        backoff = 0.1
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Generations read before the subscription may be stale
+                self._generations.clear()
+                self._listening = True
+                backoff = 0.1
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Cache invalidation listener for {self.namespace} failed: {e}")
+            finally:
+                self._listening = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 5.0)
+
+    def _apply(self, data: Any) -> None:
+        try:
+            message = json.loads(data)
+        except (json.JSONDecodeError, TypeError):
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.stats["messages"] += 1
+        if "group" in message:
+            group = message["group"]
+            self._generations[group] = max(int(message["generation"]), self._generations.get(group, 0))
+        elif "key" in message:
+            self.l1.delete(message["key"])
+
+    async def close(self) -> None:
+        for refresh in list(self._refreshes):
+            refresh.cancel()
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            **self._flights.stats,
+            "l1_size": len(self.l1),
+            "l1_bytes": self.l1.bytes_used,
+            "listening": self._listening,
+            "generations": dict(self._generations),
+        }
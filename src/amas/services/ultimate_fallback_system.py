@@ -19,6 +19,9 @@ from cerebras.cloud.sdk import Cerebras
 from google import genai
 from groq import Groq
 
+from ..ai.provider_scoring import get_provider_scorer
+from ..ai.provider_transport import get_provider_transport
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -186,11 +189,13 @@ class UltimateFallbackSystem:
             "last_reset": datetime.now().isoformat(),
             "random_selection_count": 0,
             "priority_selection_count": 0,
+            "adaptive_selection_count": 0,
         }
 
         self.active_providers = self._get_active_providers()
         self.current_provider_index = 0
         self.random_mode = True  # Start with random selection
+        self.adaptive_mode = True  # Order by live latency/error statistics
 
     def _get_active_providers(self) -> List[str]:
         """Get list of active providers with valid API keys"""
@@ -247,46 +252,73 @@ class UltimateFallbackSystem:
         """Test OpenRouter-based providers"""
         config = self.providers[provider_id]
 
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Authorization": f"Bearer {config['api_key']}",
-                "Content-Type": "application/json",
-            }
+        session = get_provider_transport().session
+        headers = {
+            "Authorization": f"Bearer {config['api_key']}",
+            "Content-Type": "application/json",
+        }
 
-            test_payload = {
-                "model": config["model"],
-                "messages": [{"role": "user", "content": "Test"}],
-                "max_tokens": 10,
-            }
+        test_payload = {
+            "model": config["model"],
+            "messages": [{"role": "user", "content": "Test"}],
+            "max_tokens": 10,
+        }
 
-            start_time = time.time()
-            async with session.post(
-                f"{config['base_url']}/chat/completions",
-                headers=headers,
-                json=test_payload,
-                timeout=aiohttp.ClientTimeout(total=config["timeout"]),
-            ) as response:
-                response_time = time.time() - start_time
-                config["response_time"] = response_time
+        start_time = time.time()
+        async with session.post(
+            f"{config['base_url']}/chat/completions",
+            headers=headers,
+            json=test_payload,
+            timeout=aiohttp.ClientTimeout(total=config["timeout"]),
+        ) as response:
+            response_time = time.time() - start_time
+            config["response_time"] = response_time
 
-                if response.status == 200:
-                    config["status"] = ProviderStatus.ACTIVE
-                    return True
-                elif response.status == 429:  # Rate limited
-                    config["status"] = ProviderStatus.RATE_LIMITED
-                    config["rate_limit_until"] = (
-                        datetime.now().timestamp() + 3600
-                    )  # 1 hour
-                    return False
-                else:
-                    config["status"] = ProviderStatus.FAILED
-                    return False
+            if response.status == 200:
+                config["status"] = ProviderStatus.ACTIVE
+                return True
+            elif response.status == 429:  # Rate limited
+                config["status"] = ProviderStatus.RATE_LIMITED
+                config["rate_limit_until"] = (
+                    datetime.now().timestamp() + 3600
+                )  # 1 hour
+                return False
+            else:
+                config["status"] = ProviderStatus.FAILED
+                return False
+
+    def _sdk_client(self, provider_id: str):
+        """Get the SDK client for a Groq, Cerebras or Gemini provider
+
+        Clients are built once per provider and key on the shared provider
+        transport, so calls reuse its pooled keep-alive connections.
+        """
+        config = self.providers[provider_id]
+        api_key = config["api_key"]
+        transport = get_provider_transport()
+        if provider_id == "gemini":
+            # google-genai does not take an httpx client; reuse the SDK's own
+            return transport.sdk_client(
+                provider_id,
+                api_key,
+                lambda: genai.Client(api_key=api_key),
+                asynchronous=False,
+                pooled_http=False,
+            )
+        factory = Groq if provider_id == "groq" else Cerebras
+        return transport.sdk_client(
+            provider_id,
+            api_key,
+            lambda **kw: factory(api_key=api_key, **kw),
+            base_url=config["base_url"],
+            asynchronous=False,
+        )
 
     async def _test_groq_provider(self, provider_id: str) -> bool:
         """Test Groq provider"""
         try:
             config = self.providers[provider_id]
-            client = Groq(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
 
             start_time = time.time()
             client.chat.completions.create(
@@ -307,7 +339,7 @@ class UltimateFallbackSystem:
         """Test Cerebras provider"""
         try:
             config = self.providers[provider_id]
-            client = Cerebras(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
 
             start_time = time.time()
             client.chat.completions.create(
@@ -328,7 +360,7 @@ class UltimateFallbackSystem:
         """Test Gemini provider"""
         try:
             config = self.providers[provider_id]
-            client = genai.Client(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
 
             start_time = time.time()
             client.models.generate_content(model=config["model"], contents="Test")
@@ -380,8 +412,29 @@ class UltimateFallbackSystem:
 
         return None
 
-    async def _get_next_provider(self) -> Optional[str]:
+    def _get_next_provider_adaptive(self, tried: set) -> Optional[str]:
+        """Get the untried provider with the best live score"""
+        available_providers = [
+            p
+            for p in self.active_providers
+            if p not in tried
+            and self.providers[p]["status"]
+            in [ProviderStatus.ACTIVE, ProviderStatus.UNKNOWN]
+        ]
+
+        if not available_providers:
+            return None
+
+        return get_provider_scorer().order(available_providers)[0]
+
+    async def _get_next_provider(self, tried: Optional[set] = None) -> Optional[str]:
         """Get next available provider using intelligent selection"""
+        if self.adaptive_mode:
+            provider = self._get_next_provider_adaptive(tried or set())
+            if provider:
+                self.fallback_stats["adaptive_selection_count"] += 1
+                return provider
+
         # Toggle between random and priority selection
         if self.random_mode:
             provider = self._get_next_provider_random()
@@ -418,56 +471,56 @@ class UltimateFallbackSystem:
         start_time = time.time()
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{config['base_url']}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=config["timeout"]),
-                ) as response:
-                    response_time = time.time() - start_time
-                    config["response_time"] = response_time
-                    config["last_used"] = datetime.now().isoformat()
-
-                    if response.status == 200:
-                        result = await response.json()
-                        config["success_count"] += 1
-                        config["status"] = ProviderStatus.ACTIVE
-
-                        return {
-                            "success": True,
-                            "provider": provider_id,
-                            "provider_name": config["name"],
-                            "response": result,
-                            "content": result["choices"][0]["message"]["content"],
-                            "response_time": response_time,
-                            "tokens_used": result.get("usage", {}).get(
-                                "total_tokens", 0
-                            ),
-                        }
-                    elif response.status == 429:  # Rate limited
-                        config["failure_count"] += 1
-                        config["status"] = ProviderStatus.RATE_LIMITED
-                        config["rate_limit_until"] = datetime.now().timestamp() + 3600
-                        return {
-                            "success": False,
-                            "provider": provider_id,
-                            "provider_name": config["name"],
-                            "error": "Rate limited",
-                            "response_time": response_time,
-                        }
-                    else:
-                        error_text = await response.text()
-                        config["failure_count"] += 1
-                        config["status"] = ProviderStatus.FAILED
-
-                        return {
-                            "success": False,
-                            "provider": provider_id,
-                            "provider_name": config["name"],
-                            "error": f"HTTP {response.status}: {error_text}",
-                            "response_time": response_time,
-                        }
+            session = get_provider_transport().session
+            async with session.post(
+                f"{config['base_url']}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=config["timeout"]),
+            ) as response:
+                response_time = time.time() - start_time
+                config["response_time"] = response_time
+                config["last_used"] = datetime.now().isoformat()
+
+                if response.status == 200:
+                    result = await response.json()
+                    config["success_count"] += 1
+                    config["status"] = ProviderStatus.ACTIVE
+
+                    return {
+                        "success": True,
+                        "provider": provider_id,
+                        "provider_name": config["name"],
+                        "response": result,
+                        "content": result["choices"][0]["message"]["content"],
+                        "response_time": response_time,
+                        "tokens_used": result.get("usage", {}).get(
+                            "total_tokens", 0
+                        ),
+                    }
+                elif response.status == 429:  # Rate limited
+                    config["failure_count"] += 1
+                    config["status"] = ProviderStatus.RATE_LIMITED
+                    config["rate_limit_until"] = datetime.now().timestamp() + 3600
+                    return {
+                        "success": False,
+                        "provider": provider_id,
+                        "provider_name": config["name"],
+                        "error": "Rate limited",
+                        "response_time": response_time,
+                    }
+                else:
+                    error_text = await response.text()
+                    config["failure_count"] += 1
+                    config["status"] = ProviderStatus.FAILED
+
+                    return {
+                        "success": False,
+                        "provider": provider_id,
+                        "provider_name": config["name"],
+                        "error": f"HTTP {response.status}: {error_text}",
+                        "response_time": response_time,
+                    }
         except Exception as e:
             response_time = time.time() - start_time
             config["failure_count"] += 1
@@ -490,7 +543,7 @@ class UltimateFallbackSystem:
         start_time = time.time()
 
         try:
-            client = Groq(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
             response = client.chat.completions.create(
                 messages=messages,
                 model=config["model"],
@@ -535,7 +588,7 @@ class UltimateFallbackSystem:
         start_time = time.time()
 
         try:
-            client = Cerebras(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
             response = client.chat.completions.create(
                 messages=messages,
                 model=config["model"],
@@ -580,7 +633,7 @@ class UltimateFallbackSystem:
         start_time = time.time()
 
         try:
-            client = genai.Client(api_key=config["api_key"])
+            client = self._sdk_client(provider_id)
 
             # Convert messages to Gemini format
             content = messages[-1]["content"] if messages else "Hello"
@@ -637,11 +690,13 @@ class UltimateFallbackSystem:
         messages = [{"role": "user", "content": prompt}]
 
         # Try each provider in intelligent order
+        tried = set()
         for attempt in range(len(self.active_providers)):
-            provider_id = await self._get_next_provider()
+            provider_id = await self._get_next_provider(tried)
 
             if not provider_id:
                 break
+            tried.add(provider_id)
 
             # Test provider if needed
             if not await self._test_provider(provider_id):
@@ -651,8 +706,16 @@ class UltimateFallbackSystem:
                 f"Attempting request with {self.providers[provider_id]['name']} (attempt {attempt + 1})"
             )
 
+            start_time = time.time()
             try:
                 result = await self._make_request(provider_id, messages, **kwargs)
+                get_provider_scorer().record(
+                    provider_id,
+                    success=result["success"],
+                    latency_ms=(time.time() - start_time) * 1000,
+                    rate_limited=result.get("error") == "Rate limited",
+                    tokens_used=result.get("tokens_used", 0),
+                )
 
                 if result["success"]:
                     self.fallback_stats["successful_requests"] += 1
@@ -686,6 +749,11 @@ class UltimateFallbackSystem:
                     )
 
             except Exception as e:
+                get_provider_scorer().record(
+                    provider_id,
+                    success=False,
+                    latency_ms=(time.time() - start_time) * 1000,
+                )
                 logger.warning(
                     f"❌ {self.providers[provider_id]['name']} exception: {e}"
                 )
@@ -739,6 +807,12 @@ class UltimateFallbackSystem:
             },
             "random_selection_count": self.fallback_stats["random_selection_count"],
             "priority_selection_count": self.fallback_stats["priority_selection_count"],
+            "adaptive_selection_count": self.fallback_stats["adaptive_selection_count"],
+            "provider_scores": {
+                p: stats
+                for p, stats in get_provider_scorer().get_stats().items()
+                if p in self.providers
+            },
             "last_reset": self.fallback_stats["last_reset"],
         }
 
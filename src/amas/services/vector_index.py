@@ -0,0 +1,222 @@
+"""
+FAISS index construction and search tuning for VectorService
+
+Index types (``index_type`` in the VectorService config):
+
+- ``flat``: exact inner-product scan; cost grows linearly with the corpus.
+- ``ivf``: inverted file over ``nlist`` k-means centroids, searching the
+  ``nprobe`` closest lists. Optionally product-quantized (``pq_m``
+  sub-quantizers of 8 bits) to cut memory per vector from 4*d bytes to
+  ``pq_m`` bytes. IVF needs training, so the corpus is kept flat until it
+  reaches ``train_threshold`` vectors and then rebuilt as IVF.
+- ``hnsw``: navigable small-world graph with ``hnsw_m`` links per node,
+  searched with ``ef_search`` candidates. HNSW cannot remove vectors, so
+  deletions are tombstoned and excluded at search time until the next
+  rebuild.
+
+Every index is addressed by the VectorStore row ids. ``nprobe`` and
+``ef_search`` can be overridden per query, and a selector restricts a
+search to rows matching a metadata filter inside FAISS rather than
+post-filtering its top_k.
+"""
+
+import math
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import faiss  # type: ignore[import-not-found]
+    import numpy as np  # type: ignore[import-not-found]
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+    faiss = None  # type: ignore[assignment]
+    np = None  # type: ignore[assignment]
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# Training points faiss wants per centroid, and the sample cap per centroid
+_MIN_POINTS_PER_CENTROID = 39
+_MAX_POINTS_PER_CENTROID = 256
+
+
+@dataclass
+class VectorIndexConfig:
+    """Index type and tuning knobs"""
+    index_type: str = "flat"
+    train_threshold: int = 20_000  # IVF: vectors required before training
+    nlist: int = 0  # IVF lists; 0 picks 4 * sqrt(corpus) at training time
+    nprobe: int = 16
+    pq_m: int = 0  # IVF product quantization sub-quantizers; 0 stores full vectors
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+
+    def __post_init__(self):
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {self.index_type!r}")
+        if self.pq_m and self.index_type != "ivf":
+            raise ValueError("pq_m is only supported with index_type 'ivf'")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "VectorIndexConfig":
+        """Pick the index settings out of a VectorService config dict"""
+        return cls(**{f.name: config[f.name] for f in fields(cls) if f.name in config})
+
+
+def index_kind(index: Any) -> str:
+    """The INDEX_TYPES entry an index was built as"""
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def needs_training(config: VectorIndexConfig, index: Any) -> bool:
+    """Whether the corpus has grown enough to rebuild a flat index as IVF"""
+    return (
+        config.index_type == "ivf"
+        and index_kind(index) == "flat"
+        and index.ntotal >= max(config.train_threshold, _MIN_POINTS_PER_CENTROID)
+    )
+
+
+def create_index(config: VectorIndexConfig, dimension: int) -> Any:
+    """Empty index for ``config``; IVF starts flat until it can be trained"""
+    if config.index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(dimension, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        base.hnsw.efConstruction = config.ef_construction
+        return faiss.IndexIDMap2(base)
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+
+def build_index(config: VectorIndexConfig, ids: Any, vectors: Any) -> Any:
+    """Build (training if needed) a ``config`` index holding ``vectors`` under ``ids``"""
+    dimension = vectors.shape[1]
+    if config.index_type != "ivf":
+        index = create_index(config, dimension)
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        return index
+
+    nlist = config.nlist or int(4 * math.sqrt(len(vectors)))
+    nlist = max(1, min(nlist, len(vectors) // _MIN_POINTS_PER_CENTROID))
+    quantizer = faiss.IndexFlatIP(dimension)
+    if config.pq_m:
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, config.pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+    # IVF takes ids natively; the hashtable direct map allows reconstruct
+    # (for filtered reranking and rebuilds) alongside remove_ids
+    index.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+    sample_size = min(len(vectors), nlist * _MAX_POINTS_PER_CENTROID)
+    sample = vectors
+    if sample_size < len(vectors):
+        picks = np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)
+        sample = vectors[picks]
+    index.train(np.ascontiguousarray(sample))
+    index.nprobe = config.nprobe
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def index_contents(index: Any) -> Tuple[Any, Any]:
+    """Row ids and (reconstructed) vectors currently in an index"""
+    if isinstance(index, faiss.IndexIDMap2):
+        ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+        return ids, index.index.reconstruct_n(0, index.ntotal)
+    invlists = index.invlists
+    ids = np.concatenate([
+        faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy()
+        for i in range(invlists.nlist)
+    ] or [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+    return ids, index.reconstruct_batch(ids) if len(ids) else np.zeros((0, index.d), dtype=np.float32)
+
+
+def search_parameters(
+    config: VectorIndexConfig,
+    index: Any,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    selector: Any = None
+) -> Any:
+    """Per-query search parameters for the index's kind"""
+    kind = index_kind(index)
+    if kind == "ivf":
+        return faiss.SearchParametersIVF(nprobe=nprobe or config.nprobe, sel=selector)
+    if kind == "hnsw":
+        return faiss.SearchParametersHNSW(efSearch=ef_search or config.ef_search, sel=selector)
+    return faiss.SearchParameters(sel=selector)
+
+
+def memory_bytes(index: Any) -> int:
+    """Serialized size of an index, a proxy for its resident memory"""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+# Recall-vs-latency benchmark over a synthetic corpus
+
+
+def synthetic_corpus(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> Any:
+    """Normalized vectors drawn around random topic centres, like embeddings"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    vectors = centres[rng.integers(0, clusters, count)]
+    vectors += 0.6 * rng.standard_normal((count, dimension), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def benchmark_indexes(
+    corpus: Any,
+    queries: Any,
+    configs: Iterable[Tuple[str, VectorIndexConfig, Dict[str, int]]],
+    k: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k against exact search, per-query latency and memory.
+
+    Args:
+        corpus: Vectors to index
+        queries: Query vectors
+        configs: (label, index config, search knobs) per variant; variants
+            sharing a label reuse the index built for the first of them
+        k: Neighbours per query
+
+    Returns:
+        One row per variant with recall, latency_ms, memory_mb and build_s
+    """
+    ids = np.arange(len(corpus), dtype=np.int64)
+    exact = build_index(VectorIndexConfig(), ids, corpus)
+    _, truth = exact.search(queries, k)
+
+    built: Dict[str, Tuple[Any, float]] = {}
+    rows = []
+    for label, config, knobs in configs:
+        if label not in built:
+            start = time.perf_counter()
+            built[label] = (build_index(config, ids, corpus), time.perf_counter() - start)
+        index, build_s = built[label]
+
+        params = search_parameters(config, index, **knobs)
+        results = []
+        start = time.perf_counter()
+        for query in queries:
+            _, found = index.search(query.reshape(1, -1), k, params=params)
+            results.append(found[0])
+        latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        hits = sum(len(set(r.tolist()) & set(t.tolist())) for r, t in zip(results, truth))
+        rows.append({
+            "index": label,
+            **knobs,
+            "recall": hits / (len(queries) * k),
+            "latency_ms": latency_ms,
+            "memory_mb": memory_bytes(index) / 1e6,
+            "build_s": build_s,
+        })
+    return rows
@@ -1,22 +1,43 @@
 """
 Vector Service Implementation for AMAS
+
+Vectors and document metadata are persisted through VectorStore: each
+ingested batch is appended to a vector log and upserted into SQLite, and a
+background compactor periodically snapshots the index so cold starts only
+replay the log written since.
+
+The FAISS index type (flat, IVF, HNSW, optionally product-quantized) is
+chosen by the ``index_type`` config key; see vector_index for the knobs.
 """
 
+import asyncio
 import json
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 try:
     import faiss
-    import sentence_transformers
+    import numpy as np
 
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
     logging.warning("FAISS not available, using fallback vector operations")
 
+from .embedding_service import EmbeddingService, get_embedding_service
+from .vector_index import (
+    VectorIndexConfig,
+    build_index,
+    create_index,
+    index_contents,
+    index_kind,
+    needs_training,
+    search_parameters,
+)
+from .vector_store import OP_ADD, VectorStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,10 +60,24 @@ class VectorService:
             "embedding_model", "sentence-transformers/all-MiniLM-L6-v2"
         )
         self.index = None
-        self.embedding_model = None
+        self.embedding_service: EmbeddingService = None
         self.dimension = 384  # Default for all-MiniLM-L6-v2
-        self.documents = []
-        self.metadata = []
+        self.store: VectorStore = None
+        self.index_config = VectorIndexConfig.from_config(config)
+
+        # Metadata fields given a SQLite index for filtered search, and the
+        # filter size up to which matches are scored exactly
+        self.filter_fields = config.get("filter_fields", [])
+        self.exact_filter_limit = config.get("exact_filter_limit", 10_000)
+        # HNSW cannot remove vectors; deleted rows are excluded at search time
+        self._tombstones: set = set()
+        self._rebuild_task: asyncio.Task = None
+
+        # Snapshot once this much log has accumulated, checked every interval
+        self.compact_log_bytes = int(config.get("compact_log_mb", 256) * 1024 * 1024)
+        self.compact_interval = config.get("compact_interval_seconds", 60)
+        self._write_lock = asyncio.Lock()
+        self._compactor: asyncio.Task = None
 
     async def initialize(self):
         """Initialize the vector service"""
@@ -54,6 +89,7 @@ class VectorService:
                 # Load embedding model
                 await self._load_embedding_model()
 
+                self._compactor = asyncio.create_task(self._compact_periodically())
                 logger.info("Vector service initialized successfully")
             else:
                 logger.warning("FAISS not available, using fallback mode")
@@ -63,44 +99,120 @@ class VectorService:
             raise
 
     async def _load_or_create_index(self):
-        """Load existing index or create new one"""
+        """Load the latest snapshot and replay the vector log written since"""
         try:
-            index_file = os.path.join(self.index_path, "faiss_index.bin")
-            metadata_file = os.path.join(self.index_path, "metadata.json")
+            self.store = VectorStore(self.index_path, fsync=self.config.get("fsync", False))
+            snapshot, records = await asyncio.to_thread(self.store.open)
+            for field in self.filter_fields:
+                await asyncio.to_thread(self.store.index_field, field)
 
-            if os.path.exists(index_file):
-                # Load existing index
-                self.index = faiss.read_index(index_file)
+            if snapshot is not None:
+                self.index = await asyncio.to_thread(faiss.read_index, str(snapshot))
                 self.dimension = self.index.d
-
-                # Load metadata
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, "r") as f:
-                        self.metadata = json.load(f)
-
-                logger.info(
-                    f"Loaded existing FAISS index with {self.index.ntotal} vectors"
-                )
             else:
-                # Create new index
-                os.makedirs(self.index_path, exist_ok=True)
-                self.index = faiss.IndexFlatIP(
-                    self.dimension
-                )  # Inner product for cosine similarity
-                logger.info("Created new FAISS index")
+                self.dimension = self.store.dimension or self.dimension
+                self.index = self._create_index()
+
+            replayed = await asyncio.to_thread(self._replay, records)
+            if snapshot is None and replayed == 0:
+                await self._migrate_legacy_index()
+
+            if index_kind(self.index) == "hnsw":
+                ids, _ = index_contents(self.index)
+                live = await asyncio.to_thread(self.store.all_rows)
+                self._tombstones = set(ids.tolist()) - set(live.tolist())
+            kind, configured = index_kind(self.index), self.index_config.index_type
+            if needs_training(self.index_config, self.index) or (
+                kind != configured and not (configured == "ivf" and kind == "flat")
+            ):
+                # index_type changed since the snapshot, or IVF is due for training
+                await asyncio.to_thread(self._rebuild_index)
+
+            logger.info(
+                f"Loaded FAISS index with {self.index.ntotal} vectors "
+                f"({replayed} log records replayed)"
+            )
 
         except Exception as e:
             logger.error(f"Error loading/creating index: {e}")
             raise
 
+    def _create_index(self):
+        """Empty index addressed by VectorStore row ids"""
+        return create_index(self.index_config, self.dimension)  # Inner product for cosine similarity
+
+    def _replay(self, records) -> int:
+        replayed = 0
+        for op, rows, vectors in records:
+            if op == OP_ADD:
+                self.index.add_with_ids(vectors, rows)
+            else:
+                self._remove_from_index(rows)
+            replayed += 1
+        return replayed
+
+    def _remove_from_index(self, rows):
+        if index_kind(self.index) == "hnsw":
+            self._tombstones.update(int(row) for row in rows)
+        else:
+            self.index.remove_ids(rows)
+
+    def _rebuild_index(self):
+        """Rebuild as the configured index type without tombstoned rows"""
+        ids, vectors = index_contents(self.index)
+        if self._tombstones:
+            live = ~np.isin(ids, np.fromiter(self._tombstones, dtype=np.int64))
+            ids, vectors = ids[live], vectors[live]
+        config = self.index_config
+        if config.index_type == "ivf" and len(ids) < config.train_threshold:
+            config = VectorIndexConfig()  # Not enough vectors to train yet
+        self.index = build_index(config, ids, np.ascontiguousarray(vectors, dtype=np.float32))
+        self._tombstones = set()
+        logger.info(f"Rebuilt vector index as {index_kind(self.index)} with {len(ids)} vectors")
+
+    @property
+    def document_count(self) -> int:
+        """Live vectors in the index"""
+        return self.index.ntotal - len(self._tombstones) if self.index else 0
+
+    async def _migrate_legacy_index(self):
+        """Import a faiss_index.bin/metadata.json pair saved by earlier versions"""
+        index_file = os.path.join(self.index_path, "faiss_index.bin")
+        metadata_file = os.path.join(self.index_path, "metadata.json")
+        if not os.path.exists(index_file):
+            return
+
+        legacy = faiss.read_index(index_file)
+        metadata = []
+        if os.path.exists(metadata_file):
+            with open(metadata_file, "r") as f:
+                metadata = json.load(f)
+
+        self.dimension = legacy.d
+        self.index = self._create_index()
+        if legacy.ntotal:
+            vectors = legacy.reconstruct_n(0, legacy.ntotal)
+            rows = self.store.allocate_rows(legacy.ntotal)
+            documents = [
+                metadata[i] if i < len(metadata) else {"id": f"doc_{i}"}
+                for i in range(legacy.ntotal)
+            ]
+            self.index.add_with_ids(vectors, rows)
+            await asyncio.to_thread(self.store.append, rows, vectors, documents)
+        await self.compact()
+
+        os.replace(index_file, index_file + ".migrated")
+        if os.path.exists(metadata_file):
+            os.replace(metadata_file, metadata_file + ".migrated")
+        logger.info(f"Migrated {legacy.ntotal} vectors from {index_file}")
+
     async def _load_embedding_model(self):
-        """Load sentence transformer model"""
+        """Attach the shared embedding service for the configured model"""
         try:
             if FAISS_AVAILABLE:
-                self.embedding_model = sentence_transformers.SentenceTransformer(
-                    self.embedding_model_name
-                )
-                logger.info(f"Loaded embedding model: {self.embedding_model_name}")
+                # One model per process, encoded off the event loop
+                self.embedding_service = get_embedding_service(self.embedding_model_name)
+                logger.info(f"Using embedding model: {self.embedding_model_name}")
             else:
                 logger.warning("Sentence transformers not available")
 
@@ -129,42 +241,55 @@ class VectorService:
             }
 
     async def add_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Add documents to the vector index"""
+        """Add documents to the vector index, replacing any with the same id"""
         try:
-            if not FAISS_AVAILABLE or not self.embedding_model:
+            if not FAISS_AVAILABLE or not self.embedding_service:
                 return {
                     "success": False,
                     "error": "Vector service not properly initialized",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 }
 
+            if not documents:
+                return {
+                    "success": True,
+                    "documents_added": 0,
+                    "total_documents": self.index.ntotal,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+
             texts = [doc.get("content", "") for doc in documents]
-            embeddings = self.embedding_model.encode(texts)
+            embeddings = await self.embedding_service.embed_many(texts)
 
             # Normalize embeddings for cosine similarity
             faiss.normalize_L2(embeddings)
 
-            # Add to index
-            self.index.add(embeddings.astype("float32"))
-
-            # Store metadata
-            for i, doc in enumerate(documents):
-                self.metadata.append(
-                    {
-                        "id": doc.get("id", f"doc_{len(self.metadata)}"),
-                        "content": doc.get("content", ""),
-                        "metadata": doc.get("metadata", {}),
-                        "index": self.index.ntotal - len(documents) + i,
-                    }
+            async with self._write_lock:
+                rows = self.store.allocate_rows(len(documents))
+                batch = {}  # Last occurrence wins for ids repeated in the batch
+                for i, (row, doc) in enumerate(zip(rows, documents)):
+                    doc_id = doc.get("id", f"doc_{row}")
+                    batch[doc_id] = (i, {**doc, "id": doc_id})
+                keep = [i for i, _ in batch.values()]
+
+                replaced = list(self.store.rows_for(list(batch)).values())
+                if replaced:
+                    await self._remove_rows(replaced)
+
+                rows, embeddings = rows[keep], embeddings[keep]
+                self.index.add_with_ids(embeddings, rows)
+                await asyncio.to_thread(
+                    self.store.append, rows, embeddings, [doc for _, doc in batch.values()]
                 )
 
-            # Save index and metadata
-            await self._save_index()
+            if needs_training(self.index_config, self.index) and not self._rebuild_task:
+                # Train IVF in the background; searches keep using the flat index
+                self._rebuild_task = asyncio.create_task(self._rebuild_and_snapshot())
 
             return {
                 "success": True,
                 "documents_added": len(documents),
-                "total_documents": self.index.ntotal,
+                "total_documents": self.document_count,
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
 
@@ -177,11 +302,28 @@ class VectorService:
             }
 
     async def search(
-        self, query: str, top_k: int = 5, threshold: float = 0.7
+        self,
+        query: str,
+        top_k: int = 5,
+        threshold: float = 0.7,
+        filters: Dict[str, Any] = None,
+        nprobe: int = None,
+        ef_search: int = None,
     ) -> Dict[str, Any]:
-        """Search for similar documents"""
+        """
+        Search for similar documents
+
+        Args:
+            query: Text to search for
+            top_k: Maximum results
+            threshold: Minimum cosine similarity
+            filters: Metadata field values every result must match (a list
+                matches any of its values); applied inside the search
+            nprobe: IVF lists to probe for this query
+            ef_search: HNSW candidate list size for this query
+        """
         try:
-            if not FAISS_AVAILABLE or not self.embedding_model:
+            if not FAISS_AVAILABLE or not self.embedding_service:
                 return {
                     "success": False,
                     "error": "Vector service not properly initialized",
@@ -189,26 +331,41 @@ class VectorService:
                 }
 
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query])
+            query_embedding = await self.embedding_service.embed_many([query])
             faiss.normalize_L2(query_embedding)
 
             # Search
-            scores, indices = self.index.search(
-                query_embedding.astype("float32"), top_k
-            )
+            if filters:
+                rows = await asyncio.to_thread(self.store.rows_matching, filters)
+                scores, indices = self._search_rows(query_embedding, top_k, rows, nprobe, ef_search)
+            else:
+                selector = None
+                if self._tombstones:
+                    excluded = faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype=np.int64))
+                    selector = faiss.IDSelectorNot(excluded)
+                params = search_parameters(self.index_config, self.index, nprobe, ef_search, selector)
+                scores, indices = self.index.search(
+                    query_embedding.astype("float32"), top_k, params=params
+                )
 
             # Format results
             results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.metadata) and score >= threshold:
-                    doc_meta = self.metadata[idx]
+            matches = [
+                (float(score), int(idx))
+                for score, idx in zip(scores[0], indices[0])
+                if idx >= 0 and score >= threshold
+            ]
+            documents = await asyncio.to_thread(self.store.get, [idx for _, idx in matches])
+            for score, idx in matches:
+                doc_meta = documents.get(idx)
+                if doc_meta is not None:
                     results.append(
                         {
                             "id": doc_meta["id"],
                             "content": doc_meta["content"],
                             "metadata": doc_meta["metadata"],
-                            "score": float(score),
-                            "index": int(idx),
+                            "score": score,
+                            "index": idx,
                         }
                     )
 
@@ -228,40 +385,113 @@ class VectorService:
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
 
-    async def _save_index(self):
-        """Save index and metadata to disk"""
+    def _search_rows(self, query_embedding, top_k, rows, nprobe, ef_search):
+        """Top-k restricted to ``rows``: exact for small sets, else a FAISS selector"""
+        if len(rows) == 0:
+            return np.zeros((1, 0), dtype=np.float32), np.zeros((1, 0), dtype=np.int64)
+        if len(rows) <= self.exact_filter_limit:
+            vectors = self.index.reconstruct_batch(rows)
+            scores = vectors @ query_embedding[0]
+            order = np.argsort(-scores)[:top_k]
+            return scores[order][None, :], rows[order][None, :]
+        selector = faiss.IDSelectorBatch(rows)
+        params = search_parameters(self.index_config, self.index, nprobe, ef_search, selector)
+        return self.index.search(query_embedding.astype("float32"), top_k, params=params)
+
+    async def delete_documents(self, doc_ids: Sequence[str]) -> Dict[str, Any]:
+        """Remove documents from the vector index by id"""
         try:
-            if self.index:
-                # Save FAISS index
-                index_file = os.path.join(self.index_path, "faiss_index.bin")
-                faiss.write_index(self.index, index_file)
+            if not FAISS_AVAILABLE or not self.store:
+                return {
+                    "success": False,
+                    "error": "Vector service not properly initialized",
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+
+            async with self._write_lock:
+                rows = list(self.store.rows_for(list(doc_ids)).values())
+                if rows:
+                    await self._remove_rows(rows)
 
-                # Save metadata
-                metadata_file = os.path.join(self.index_path, "metadata.json")
-                with open(metadata_file, "w") as f:
-                    json.dump(self.metadata, f, indent=2)
+            return {
+                "success": True,
+                "documents_deleted": len(rows),
+                "total_documents": self.document_count,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
 
-                logger.info("Index and metadata saved successfully")
+        except Exception as e:
+            logger.error(f"Error deleting documents: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
 
+    async def _remove_rows(self, rows: List[int]):
+        """Drop rows from the index and the store; caller holds the write lock"""
+        ids = np.asarray(rows, dtype=np.int64)
+        self._remove_from_index(ids)
+        await asyncio.to_thread(self.store.delete, ids)
+
+    async def compact(self):
+        """Snapshot the index so restarts skip replaying the log so far"""
+        async with self._write_lock:
+            if len(self._tombstones) > 0.2 * self.index.ntotal:
+                await asyncio.to_thread(self._rebuild_index)
+            generation = self.store.begin_snapshot()
+            # Searches may continue while serializing; writes wait
+            data = await asyncio.to_thread(faiss.serialize_index, self.index)
+        await asyncio.to_thread(self.store.commit_snapshot, generation, data.tobytes())
+        logger.info(f"Vector index snapshot {generation} written ({self.index.ntotal} vectors)")
+
+    async def _rebuild_and_snapshot(self):
+        try:
+            async with self._write_lock:
+                await asyncio.to_thread(self._rebuild_index)
+            await self.compact()
         except Exception as e:
-            logger.error(f"Error saving index: {e}")
+            logger.error(f"Error rebuilding vector index: {e}")
+        finally:
+            self._rebuild_task = None
+
+    async def _compact_periodically(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                if self.store.log_bytes >= self.compact_log_bytes:
+                    await self.compact()
+            except Exception as e:
+                logger.error(f"Error compacting vector index: {e}")
 
     async def get_stats(self) -> Dict[str, Any]:
         """Get vector service statistics"""
         return {
-            "total_documents": self.index.ntotal if self.index else 0,
+            "total_documents": self.document_count,
             "dimension": self.dimension,
             "model": self.embedding_model_name,
             "index_path": self.index_path,
+            "index_type": index_kind(self.index) if self.index else None,
+            "configured_index_type": self.index_config.index_type,
+            "tombstones": len(self._tombstones),
+            "log_bytes": self.store.log_bytes if self.store else 0,
+            "snapshot_generation": self.store.snapshot_generation if self.store else None,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
     async def close(self):
         """Close vector service and cleanup resources"""
         try:
-            # Save index before closing if it exists
-            if self.index:
-                await self._save_index()
+            if self._compactor:
+                self._compactor.cancel()
+                self._compactor = None
+            if self._rebuild_task:
+                await self._rebuild_task
+            if self.store:
+                # Snapshot on the way out so the next start has no log to replay
+                if self.index is not None and self.store.log_bytes:
+                    await self.compact()
+                self.store.close()
             logger.info("Vector service closed successfully")
         except Exception as e:
             logger.error(f"Error closing vector service: {e}")
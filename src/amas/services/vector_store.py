@@ -0,0 +1,344 @@
+"""
+Append-log persistence for VectorService
+
+Ingestion cost is independent of corpus size: each batch appends its
+vectors to a binary write-ahead log and upserts its metadata into SQLite,
+instead of rewriting the whole index and a JSON dump of every document.
+
+On-disk layout under the index directory:
+
+- ``vectors.<gen>.log``: records of (op, rows, vectors); ``A`` adds
+  vectors under int64 row ids, ``D`` removes rows.
+- ``index.<gen>.bin``: serialized index covering every log older than
+  ``<gen>``, written by the compactor.
+- ``manifest.json``: generation of the current snapshot.
+- ``metadata.db``: document id, content and metadata per row, read on
+  demand rather than loaded at startup.
+
+Compaction starts a new log generation, writes the snapshot the caller
+serialized at that instant, then deletes the logs and snapshot it
+supersedes. A crash at any point leaves a snapshot plus the logs after
+it, which is everything recovery needs.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+OP_ADD = b"A"
+OP_DELETE = b"D"
+
+# op, row count, dimension (0 for deletes)
+_RECORD_HEADER = struct.Struct("<cII")
+_LOG_PATTERN = re.compile(r"^vectors\.(\d+)\.log$")
+
+LogRecord = Tuple[bytes, Any, Optional[Any]]  # (op, rows, vectors)
+
+
+def _json_path(field: str) -> str:
+    if not re.fullmatch(r"[A-Za-z0-9_\-]+", field):
+        raise ValueError(f"Unsupported metadata filter field: {field!r}")
+    return f'$."{field}"'
+
+
+class VectorStore:
+    """Write-ahead vector log, index snapshots and SQLite document metadata"""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.generation = 0
+        self.snapshot_generation: Optional[int] = None
+        self.dimension: Optional[int] = None
+        self.next_row = 0
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._db: Optional[sqlite3.Connection] = None
+
+    # Recovery
+
+    def open(self) -> Tuple[Optional[Path], Iterator[LogRecord]]:
+        """
+        Open the store for appending.
+
+        Returns:
+            The snapshot file to load (or None) and an iterator over the log
+            records written after it, to be replayed in order
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+        self.snapshot_generation = manifest.get("snapshot_generation")
+        self.dimension = manifest.get("dimension")
+        self.next_row = manifest.get("next_row", 0)
+
+        self._db = sqlite3.connect(str(self.path / "metadata.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "row INTEGER PRIMARY KEY, doc_id TEXT UNIQUE NOT NULL, "
+            "content TEXT, metadata TEXT)"
+        )
+        max_row = self._db.execute("SELECT MAX(row) FROM documents").fetchone()[0]
+        if max_row is not None:
+            self.next_row = max(self.next_row, max_row + 1)
+
+        first = self.snapshot_generation or 0
+        logs = [gen for gen in self._log_generations() if gen >= first]
+        for gen in self._log_generations():
+            if gen < first:
+                self._log_path(gen).unlink()  # Left over from an interrupted compaction
+        self.generation = max(logs, default=first)
+        for gen in logs:
+            self._truncate_torn_tail(self._log_path(gen))
+        self._log = open(self._log_path(self.generation), "ab")
+
+        snapshot = None
+        if self.snapshot_generation is not None:
+            snapshot = self._snapshot_path(self.snapshot_generation)
+        return snapshot, self._replay(logs)
+
+    def _replay(self, generations: Sequence[int]) -> Iterator[LogRecord]:
+        for gen in generations:
+            for record in self._read_log(self._log_path(gen)):
+                rows = record[1]
+                if len(rows):
+                    self.next_row = max(self.next_row, int(rows.max()) + 1)
+                yield record
+
+    def _read_log(self, path: Path) -> Iterator[LogRecord]:
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                op, count, dim = _RECORD_HEADER.unpack(header)
+                rows = np.frombuffer(f.read(8 * count), dtype=np.int64)
+                vectors = None
+                if op == OP_ADD:
+                    vectors = np.frombuffer(f.read(4 * count * dim), dtype=np.float32).reshape(count, dim)
+                yield op, rows, vectors
+
+    def _truncate_torn_tail(self, path: Path) -> None:
+        """Drop a partially written final record"""
+        size = path.stat().st_size
+        good = 0
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                op, count, dim = _RECORD_HEADER.unpack(header)
+                end = good + _RECORD_HEADER.size + 8 * count + (4 * count * dim if op == OP_ADD else 0)
+                if op not in (OP_ADD, OP_DELETE) or end > size:
+                    break
+                good = end
+                f.seek(good)
+        if good < size:
+            logger.warning(f"Truncating torn vector log record in {path} ({size - good} bytes)")
+            os.truncate(path, good)
+
+    # Appends
+
+    def allocate_rows(self, count: int) -> Any:
+        """Reserve ``count`` new row ids"""
+        with self._lock:
+            rows = np.arange(self.next_row, self.next_row + count, dtype=np.int64)
+            self.next_row += count
+            return rows
+
+    def rows_for(self, doc_ids: Sequence[str]) -> Dict[str, int]:
+        """Rows currently holding the given document ids"""
+        found: Dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(doc_ids), 500):
+                chunk = list(doc_ids[start:start + 500])
+                query = f"SELECT doc_id, row FROM documents WHERE doc_id IN ({','.join('?' * len(chunk))})"
+                found.update(self._db.execute(query, chunk).fetchall())
+        return found
+
+    def append(self, rows: Any, vectors: Any, documents: Sequence[Dict[str, Any]]) -> None:
+        """Log added vectors and upsert their documents' metadata"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+            self._write_record(OP_ADD, rows, vectors)
+            # Replacing by doc_id drops the document's previous row
+            self._db.executemany(
+                "INSERT OR REPLACE INTO documents (row, doc_id, content, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (int(row), doc["id"], doc.get("content", ""), json.dumps(doc.get("metadata", {}), default=str))
+                    for row, doc in zip(rows, documents)
+                ],
+            )
+            self._db.commit()
+
+    def delete(self, rows: Any) -> None:
+        """Log removed rows and delete their metadata"""
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            self._write_record(OP_DELETE, rows, None)
+            self._db.executemany("DELETE FROM documents WHERE row = ?", [(int(row),) for row in rows])
+            self._db.commit()
+
+    def _write_record(self, op: bytes, rows: Any, vectors: Optional[Any]) -> None:
+        dim = 0 if vectors is None else vectors.shape[1]
+        chunks = [_RECORD_HEADER.pack(op, len(rows), dim), rows.astype(np.int64).tobytes()]
+        if vectors is not None:
+            chunks.append(vectors.tobytes())
+        self._log.write(b"".join(chunks))
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    # Reads
+
+    def get(self, rows: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """Documents stored under the given rows"""
+        rows = [int(row) for row in rows]
+        if not rows:
+            return {}
+        with self._lock:
+            query = f"SELECT row, doc_id, content, metadata FROM documents WHERE row IN ({','.join('?' * len(rows))})"
+            found = self._db.execute(query, rows).fetchall()
+        return {
+            row: {"id": doc_id, "content": content, "metadata": json.loads(metadata or "{}")}
+            for row, doc_id, content, metadata in found
+        }
+
+    def all_rows(self) -> Any:
+        """Rows of every stored document"""
+        with self._lock:
+            found = self._db.execute("SELECT row FROM documents").fetchall()
+        return np.fromiter((row for row, in found), dtype=np.int64, count=len(found))
+
+    def rows_matching(self, filters: Dict[str, Any]) -> Any:
+        """Rows whose metadata has every ``field: value`` (a list matches any of its values)"""
+        clauses, params = [], []
+        for field, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            # Path inlined (it is validated) so expression indexes can match
+            clauses.append(f"json_extract(metadata, '{_json_path(field)}') IN ({','.join('?' * len(values))})")
+            params.extend(values)
+        query = "SELECT row FROM documents WHERE " + " AND ".join(clauses)
+        with self._lock:
+            found = self._db.execute(query, params).fetchall()
+        return np.fromiter((row for row, in found), dtype=np.int64, count=len(found))
+
+    def index_field(self, field: str) -> None:
+        """Add a SQLite expression index so filters on ``field`` avoid a table scan"""
+        name = "meta_" + re.sub(r"\W", "_", field)
+        with self._lock:
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON documents (json_extract(metadata, '{_json_path(field)}'))"
+            )
+            self._db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @property
+    def log_bytes(self) -> int:
+        """Bytes of log a cold start would replay"""
+        total = 0
+        for gen in self._log_generations():
+            if gen >= (self.snapshot_generation or 0):
+                total += self._log_path(gen).stat().st_size
+        return total
+
+    # Compaction
+
+    def begin_snapshot(self) -> int:
+        """
+        Start a new log generation.
+
+        Call while the index cannot change, and serialize the index in the
+        same critical section; the snapshot then covers exactly the logs
+        before the returned generation.
+        """
+        with self._lock:
+            self._log.close()
+            self.generation += 1
+            self._log = open(self._log_path(self.generation), "ab")
+            return self.generation
+
+    def commit_snapshot(self, generation: int, data: bytes) -> None:
+        """Persist a snapshot taken at ``generation`` and drop what it supersedes"""
+        target = self._snapshot_path(generation)
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+
+        with self._lock:
+            previous = self.snapshot_generation
+            self.snapshot_generation = generation
+            self._write_manifest()
+        if previous is not None and previous != generation:
+            self._snapshot_path(previous).unlink(missing_ok=True)
+        for gen in self._log_generations():
+            if gen < generation:
+                self._log_path(gen).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
+            if self._db:
+                self._db.close()
+                self._db = None
+
+    # Files
+
+    def _log_path(self, generation: int) -> Path:
+        return self.path / f"vectors.{generation:06d}.log"
+
+    def _snapshot_path(self, generation: int) -> Path:
+        return self.path / f"index.{generation:06d}.bin"
+
+    def _log_generations(self) -> List[int]:
+        generations = []
+        for name in os.listdir(self.path):
+            match = _LOG_PATTERN.match(name)
+            if match:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.path / "manifest.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_manifest(self) -> None:
+        target = self.path / "manifest.json"
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "snapshot_generation": self.snapshot_generation,
+                "dimension": self.dimension,
+                "next_row": self.next_row,
+            }, f)
+        os.replace(tmp, target)
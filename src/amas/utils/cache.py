@@ -0,0 +1,295 @@
+"""
+In-process cache engine shared by the AMAS performance services
+
+Every operation is O(1) (amortised) whatever the number of entries:
+
+- ``lru``: entries live in an ordered map; a hit moves the key to the end
+  and eviction pops the front.
+- ``lfu``: keys sit in a doubly linked list of frequency buckets, each an
+  ordered map so ties evict the least recently used key. A hit moves its
+  key to the next bucket; eviction takes the front of the lowest bucket.
+- ``ttl``: expiry deadlines sit in a min-heap; eviction removes the entry
+  closest to expiring. Overwritten keys leave stale heap items that are
+  skipped when popped and dropped when the heap is rebuilt.
+
+Every policy expires entries lazily on ``get`` and in bulk with
+``expire()``, which only touches the heap items that are due. Capacity is a
+memory budget (``max_bytes``) measured with ``estimate_size``, which samples
+large containers instead of serialising values, with an optional entry cap.
+"""
+
+import heapq
+import itertools
+import math
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+CACHE_POLICIES = ("lru", "lfu", "ttl")
+
+# Items measured per container before extrapolating, and nesting followed
+_SIZE_SAMPLE = 16
+_SIZE_DEPTH = 3
+_SCALARS = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate deep size of ``value`` in bytes, in bounded time"""
+    size = sys.getsizeof(value)
+    if isinstance(value, _SCALARS) or _depth >= _SIZE_DEPTH:
+        return size
+
+    if isinstance(value, dict):
+        count = len(value)
+        sample = itertools.islice(value.items(), _SIZE_SAMPLE)
+        measured = [estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in sample]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        measured = [estimate_size(item, _depth + 1) for item in itertools.islice(value, _SIZE_SAMPLE)]
+    elif hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value), _depth + 1)
+    else:
+        return size
+
+    if measured:
+        size += sum(measured) * count // len(measured)
+    return size
+
+
+class _FrequencyNode:
+    """LFU bucket holding the keys hit ``count`` times, least recent first"""
+
+    __slots__ = ("count", "keys", "prev", "next")
+
+    def __init__(self, count: int):
+        self.count = count
+        self.keys: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.prev: Optional["_FrequencyNode"] = None
+        self.next: Optional["_FrequencyNode"] = None
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "seq", "node")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float], seq: int):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.seq = seq
+        self.node: Optional[_FrequencyNode] = None
+
+
+class CacheEngine:
+    """Bounded key-value cache with LRU, LFU or TTL eviction"""
+
+    def __init__(
+        self,
+        policy: str = "lru",
+        max_bytes: int = 100 * 1024 * 1024,
+        max_entries: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"policy must be one of {CACHE_POLICIES}, got {policy!r}")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.sizeof = sizeof
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lfu_head: Optional[_FrequencyNode] = None
+        self._deadlines: List[Tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self.bytes_used = 0
+        self.stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "size": 0, "bytes": 0,
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value for ``key``, or ``default`` if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+        if entry.expires_at is not None and self.clock() > entry.expires_at:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return default
+
+        if self.policy == "lru":
+            self._entries.move_to_end(key)
+        elif self.policy == "lfu":
+            self._touch(key, entry)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Store ``value``, evicting entries until it fits the budget.
+
+        Returns:
+            False if the value alone is larger than ``max_bytes``
+        """
+        size = self.sizeof(value) + sys.getsizeof(key)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            self._update_size_stats()
+            return False
+
+        while self._entries and (
+            self.bytes_used + size > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) >= self.max_entries)
+        ):
+            self._evict()
+
+        ttl = ttl or self.default_ttl
+        entry = _Entry(value, size, self.clock() + ttl if ttl else None, next(self._seq))
+        self._entries[key] = entry
+        self.bytes_used += size
+        if self.policy == "lfu":
+            self._touch(key, entry)
+
+        deadline = self._deadline(entry)
+        if deadline is not None:
+            heapq.heappush(self._deadlines, (deadline, entry.seq, key))
+            if len(self._deadlines) > 2 * len(self._entries) + 64:
+                self._rebuild_deadlines()
+
+        self._update_size_stats()
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        self._update_size_stats()
+        return True
+
+    def expire(self) -> int:
+        """Drop every expired entry; returns how many were dropped"""
+        now = self.clock()
+        expired = 0
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, seq, key = heapq.heappop(self._deadlines)
+            entry = self._entries.get(key)
+            if entry is not None and entry.seq == seq and entry.expires_at is not None and entry.expires_at < now:
+                self._remove(key)
+                expired += 1
+        self.stats["expirations"] += expired
+        self._update_size_stats()
+        return expired
+
+    def resize(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> None:
+        """Change the budget, evicting down to it"""
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if max_entries is not None:
+            self.max_entries = max_entries
+        while self._entries and (
+            self.bytes_used > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            self._evict()
+        self._update_size_stats()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._lfu_head = None
+        self._deadlines.clear()
+        self.bytes_used = 0
+        self._update_size_stats()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Eviction
+
+    def _evict(self) -> None:
+        key = None
+        if self.policy == "lfu" and self._lfu_head is not None:
+            key = next(iter(self._lfu_head.keys))
+        elif self.policy == "ttl":
+            while self._deadlines:
+                _, seq, candidate = heapq.heappop(self._deadlines)
+                entry = self._entries.get(candidate)
+                if entry is not None and entry.seq == seq:
+                    key = candidate
+                    break
+        if key is None:
+            key = next(iter(self._entries))
+        self._remove(key)
+        self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes_used -= entry.size
+        if entry.node is not None:
+            node = entry.node
+            del node.keys[key]
+            if not node.keys:
+                self._unlink(node)
+
+    def _deadline(self, entry: _Entry) -> Optional[float]:
+        if entry.expires_at is not None:
+            return entry.expires_at
+        return math.inf if self.policy == "ttl" else None
+
+    def _rebuild_deadlines(self) -> None:
+        self._deadlines = [
+            (deadline, entry.seq, key)
+            for key, entry in self._entries.items()
+            for deadline in (self._deadline(entry),)
+            if deadline is not None
+        ]
+        heapq.heapify(self._deadlines)
+
+    def _update_size_stats(self) -> None:
+        self.stats["size"] = len(self._entries)
+        self.stats["bytes"] = self.bytes_used
+
+    # LFU frequency list
+
+    def _touch(self, key: Hashable, entry: _Entry) -> None:
+        """Move ``key`` into the bucket for one more hit"""
+        node = entry.node
+        count = node.count + 1 if node is not None else 1
+        following = node.next if node is not None else self._lfu_head
+
+        if following is not None and following.count == count:
+            target = following
+        else:
+            target = _FrequencyNode(count)
+            target.prev, target.next = node, following
+            if following is not None:
+                following.prev = target
+            if node is not None:
+                node.next = target
+            else:
+                self._lfu_head = target
+
+        target.keys[key] = None
+        entry.node = target
+        if node is not None:
+            del node.keys[key]
+            if not node.keys:
+                self._unlink(node)
+
+    def _unlink(self, node: _FrequencyNode) -> None:
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self._lfu_head = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
@@ -0,0 +1,220 @@
+"""
+Buffered recording for hot-path Prometheus metrics
+
+Every ``.labels(...).inc()`` on a prometheus_client metric validates the
+labels, looks the child up under the metric's lock and then takes the
+value's own lock. ``MetricsBuffer`` hands out counter and histogram
+handles that instead record into plain per-thread buffers (one writer
+per buffer, no locks) and push what was recorded since the last flush
+into the real collectors when the registry is scraped. Children are
+bound once per label tuple and kept, so the lookups happen once, not per
+record.
+
+Each event loop runs in one thread, so per-thread buffers are per-loop
+buffers as well. Counter totals are cumulative and only ever read by the
+flusher, so a record racing a flush is picked up by the next one.
+Histogram observations are queued per thread and replayed through the
+client's public ``observe`` on flush, which keeps working with any
+client version and in multiprocess mode.
+
+``LabelGuard`` bounds the distinct values a label can take (raw request
+paths, client IPs); values past the limit are folded into ``"other"`` or
+into a fixed number of hashed buckets.
+"""
+
+import threading
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+class LabelGuard:
+    """Caps the number of distinct values seen for one label"""
+
+    def __init__(self, limit: int, overflow: str = "other", hash_buckets: int = 0):
+        self.limit = limit
+        self.overflow = overflow
+        self.hash_buckets = hash_buckets
+        self.overflowed = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, value: str) -> str:
+        # Admitted values are only ever added, so the common case needs no lock
+        if value in self._seen:
+            return value
+        with self._lock:
+            if value in self._seen:
+                return value
+            if len(self._seen) < self.limit:
+                self._seen.add(value)
+                return value
+            self.overflowed += 1
+        if self.hash_buckets:
+            return f"{self.overflow}-{zlib.crc32(value.encode()) % self.hash_buckets:02x}"
+        return self.overflow
+
+
+class _BufferedMetric:
+    """Per-thread cumulative totals for one collector, keyed by label values"""
+
+    def __init__(self, metric: Any, guards: Optional[Dict[str, LabelGuard]] = None):
+        self.metric = metric
+        labelnames = tuple(getattr(metric, "_labelnames", ()))
+        self._guards = [
+            (labelnames.index(name), guard) for name, guard in (guards or {}).items() if name in labelnames
+        ]
+        self._local = threading.local()
+        self._buffers: List[Dict[LabelValues, Any]] = []
+        self._flushed: List[Dict[LabelValues, Any]] = []
+        self._children: Dict[LabelValues, Any] = {}
+        self._register_lock = threading.Lock()
+
+    def _totals(self) -> Dict[LabelValues, Any]:
+        try:
+            return self._local.totals
+        except AttributeError:
+            totals = self._local.totals = {}
+            with self._register_lock:
+                self._buffers.append(totals)
+                self._flushed.append({})
+            return totals
+
+    def _guard(self, labels: LabelValues) -> LabelValues:
+        if not self._guards:
+            return labels
+        values = list(labels)
+        for index, guard in self._guards:
+            values[index] = guard(values[index])
+        return tuple(values)
+
+    def _child(self, labels: LabelValues) -> Any:
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = self.metric.labels(*labels) if labels else self.metric
+        return child
+
+    def _pending(self):
+        """(labels, total, previously flushed total, flushed dict) per thread buffer"""
+        with self._register_lock:
+            pairs = list(zip(self._buffers, self._flushed))
+        for totals, flushed in pairs:
+            # dict.copy() is atomic under the GIL; the owning thread may keep writing
+            for labels, total in totals.copy().items():
+                yield labels, total, flushed.get(labels), flushed
+
+
+class BufferedCounter(_BufferedMetric):
+    """Counter handle whose ``inc`` is a dict update"""
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        if self._guards:
+            labels = self._guard(labels)
+        totals = self._totals()
+        totals[labels] = totals.get(labels, 0.0) + amount
+
+    def totals(self) -> Dict[LabelValues, float]:
+        """Recorded totals per label values, summed over threads"""
+        merged: Dict[LabelValues, float] = {}
+        for labels, total, _, _ in self._pending():
+            merged[labels] = merged.get(labels, 0.0) + total
+        return merged
+
+    def flush(self) -> None:
+        for labels, total, previous, flushed in self._pending():
+            delta = total - (previous or 0.0)
+            if delta > 0:
+                self._child(labels).inc(delta)
+                flushed[labels] = total
+
+
+class BufferedHistogram(_BufferedMetric):
+    """Histogram handle whose ``observe`` is a deque append
+
+    Observations wait in a per-thread queue until the next flush replays
+    them through the histogram's own ``observe``. A thread that queues
+    ``max_pending`` observations before any flush replays its own queue,
+    so an unscraped registry cannot grow memory without bound.
+    """
+
+    def __init__(self, metric: Any, guards: Optional[Dict[str, LabelGuard]] = None,
+                 max_pending: int = 10000):
+        super().__init__(metric, guards)
+        self.max_pending = max_pending
+        self._queues: List[Deque[Tuple[LabelValues, float]]] = []
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        if self._guards:
+            labels = self._guard(labels)
+        try:
+            pending = self._local.pending
+        except AttributeError:
+            pending = self._local.pending = deque()
+            with self._register_lock:
+                self._queues.append(pending)
+        pending.append((labels, value))
+        if len(pending) >= self.max_pending:
+            self._drain(pending)
+
+    def _drain(self, pending: Deque[Tuple[LabelValues, float]]) -> None:
+        # popleft is atomic, so the owner and the flusher may drain together
+        while True:
+            try:
+                labels, value = pending.popleft()
+            except IndexError:
+                return
+            self._child(labels).observe(value)
+
+    def flush(self) -> None:
+        with self._register_lock:
+            queues = list(self._queues)
+        for pending in queues:
+            self._drain(pending)
+
+
+class MetricsBuffer:
+    """
+    Registry of buffered metric handles
+
+    Register it with the ``CollectorRegistry`` before the metrics it
+    buffers: collecting it flushes every handle, so whichever way the
+    registry is scraped (``generate_latest``, the HTTP server,
+    ``get_sample_value``) sees up-to-date values.
+    """
+
+    def __init__(self):
+        self._metrics: List[_BufferedMetric] = []
+        self._hooks: List[Callable[[], None]] = []
+        self._flush_lock = threading.Lock()
+
+    def counter(self, metric: Any, guards: Optional[Dict[str, LabelGuard]] = None) -> BufferedCounter:
+        handle = BufferedCounter(metric, guards)
+        self._metrics.append(handle)
+        return handle
+
+    def histogram(self, metric: Any, guards: Optional[Dict[str, LabelGuard]] = None) -> BufferedHistogram:
+        handle = BufferedHistogram(metric, guards)
+        self._metrics.append(handle)
+        return handle
+
+    def on_flush(self, hook: Callable[[], None]) -> None:
+        """Run ``hook`` after each flush, e.g. to derive gauges from totals"""
+        self._hooks.append(hook)
+
+    def flush(self) -> None:
+        # Scrapes may overlap; deltas must be taken against one flushed state
+        with self._flush_lock:
+            for metric in self._metrics:
+                metric.flush()
+            for hook in self._hooks:
+                hook()
+
+    # prometheus_client collector protocol
+    def describe(self):
+        return []
+
+    def collect(self):
+        self.flush()
+        return []
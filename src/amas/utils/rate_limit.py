@@ -0,0 +1,206 @@
+"""
+Rate limiting primitives shared by the AMAS limiters
+
+Fixed-memory building blocks whose per-request cost does not grow with
+traffic:
+
+- SlidingWindowCounter: request counts in a ring of time buckets; old
+  buckets are zeroed lazily as the clock moves, so add/count are O(1)
+  amortised and memory is O(buckets) however many requests arrive.
+- SlidingWindowQuota: several windows (minute/hour/day) checked together;
+  a request is only counted when every window admits it.
+- GCRABucket: token bucket as a single theoretical-arrival-time float
+  (GCRA), refilled lazily on access.
+- LRUClientTable: per-client limiter state bounded to ``max_clients``,
+  evicting the least recently seen client.
+
+Callers pass ``now`` explicitly, which keeps the primitives clock-agnostic
+(time.time() or time.monotonic()) and deterministic under test.
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, NamedTuple, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = 60
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of a limiter check"""
+    allowed: bool
+    remaining: int
+    retry_after: Optional[float]  # Seconds until a denied request could pass
+    reset_after: float  # Seconds until the limiting window rolls over
+
+
+class SlidingWindowCounter:
+    """Approximate sliding-window request count over a ring of buckets
+
+    The window is split into ``buckets`` slots of ``window / buckets``
+    seconds. Counts cover the current slot plus the previous
+    ``buckets - 1``, so precision is one slot width.
+    """
+
+    __slots__ = ("window", "buckets", "width", "counts", "total", "_newest")
+
+    def __init__(self, window_seconds: float, buckets: int = DEFAULT_BUCKETS):
+        if window_seconds <= 0 or buckets <= 0:
+            raise ValueError("window_seconds and buckets must be positive")
+        self.window = window_seconds
+        self.buckets = buckets
+        self.width = window_seconds / buckets
+        self.counts = array("l", [0]) * buckets
+        self.total = 0
+        self._newest: Optional[int] = None  # Absolute slot number of the newest bucket
+
+    def _advance(self, now: float) -> int:
+        """Expire buckets that left the window and return the current slot"""
+        slot = int(now // self.width)
+        newest = self._newest
+        if newest is None or slot - newest >= self.buckets:
+            if self.total:
+                self.counts = array("l", [0]) * self.buckets
+                self.total = 0
+        elif slot > newest:
+            counts = self.counts
+            for stale in range(newest + 1, slot + 1):
+                index = stale % self.buckets
+                self.total -= counts[index]
+                counts[index] = 0
+        else:
+            slot = newest  # Clock went backwards: count into the newest bucket
+        self._newest = slot
+        return slot
+
+    def count(self, now: float) -> int:
+        """Requests counted in the window ending at ``now``"""
+        self._advance(now)
+        return self.total
+
+    def add(self, now: float, amount: int = 1):
+        """Count ``amount`` requests at ``now``"""
+        slot = self._advance(now)
+        self.counts[slot % self.buckets] += amount
+        self.total += amount
+
+    def retry_after(self, now: float, limit: int, cost: int = 1) -> float:
+        """Seconds until enough old buckets expire to admit ``cost`` more"""
+        slot = self._advance(now)
+        excess = self.total + cost - limit
+        if excess <= 0:
+            return 0.0
+        for age in range(self.buckets - 1, -1, -1):
+            oldest = slot - age
+            excess -= self.counts[oldest % self.buckets]
+            if excess <= 0:
+                return max(0.0, (oldest + self.buckets) * self.width - now)
+        return self.window  # cost alone exceeds the limit
+
+
+class SlidingWindowQuota:
+    """Several sliding windows enforced together, e.g. per minute/hour/day"""
+
+    __slots__ = ("counters",)
+
+    def __init__(self, window_seconds: Sequence[float], buckets: int = DEFAULT_BUCKETS):
+        self.counters = [SlidingWindowCounter(seconds, buckets) for seconds in window_seconds]
+
+    def acquire(self, now: float, limits: Sequence[int], cost: int = 1) -> RateLimitDecision:
+        """Admit and count a request only if every window has room for it
+
+        ``limits`` aligns with the windows given at construction.
+        """
+        remaining = None
+        for counter, limit in zip(self.counters, limits):
+            count = counter.count(now)
+            if count + cost > limit:
+                return RateLimitDecision(
+                    allowed=False,
+                    remaining=0,
+                    retry_after=counter.retry_after(now, limit, cost),
+                    reset_after=counter.window,
+                )
+            left = limit - count - cost
+            remaining = left if remaining is None else min(remaining, left)
+
+        for counter in self.counters:
+            counter.add(now, cost)
+        return RateLimitDecision(
+            allowed=True,
+            remaining=remaining if remaining is not None else 0,
+            retry_after=None,
+            reset_after=min((c.window for c in self.counters), default=0.0),
+        )
+
+
+class GCRABucket:
+    """Token bucket of ``capacity`` tokens refilled at ``rate`` per second
+
+    Stored as the theoretical arrival time (GCRA), so refill is implicit
+    in the clock rather than a per-request update. Starts full.
+    """
+
+    __slots__ = ("interval", "capacity", "tat")
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.interval = 1.0 / rate
+        self.capacity = capacity
+        self.tat = 0.0
+
+    def consume(self, now: float, tokens: float = 1.0) -> bool:
+        """Take ``tokens`` if available"""
+        tat = max(self.tat, now) + tokens * self.interval
+        if tat - now > self.capacity * self.interval + 1e-9:
+            return False
+        self.tat = tat
+        return True
+
+    def tokens(self, now: float) -> float:
+        """Tokens currently available"""
+        return max(0.0, self.capacity - max(0.0, self.tat - now) / self.interval)
+
+    def retry_after(self, now: float, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` can be consumed"""
+        tat = max(self.tat, now) + tokens * self.interval
+        return max(0.0, tat - now - self.capacity * self.interval)
+
+
+class LRUClientTable(Generic[T]):
+    """Per-client limiter state, bounded by evicting the least recently seen"""
+
+    def __init__(self, factory: Callable[[], T], max_clients: int = 100_000):
+        if max_clients <= 0:
+            raise ValueError("max_clients must be positive")
+        self.factory = factory
+        self.max_clients = max_clients
+        self._entries: "OrderedDict[Hashable, T]" = OrderedDict()
+
+    def get(self, key: Hashable) -> T:
+        """State for ``key``, created on first use"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = self.factory()
+            if len(self._entries) > self.max_clients:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def pop(self, key: Hashable, default: Optional[T] = None) -> Optional[T]:
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
@@ -0,0 +1,54 @@
+"""
+Request coalescing for expensive loads
+
+``SingleFlight`` runs at most one loader per key at a time: the first
+caller starts it and every concurrent caller for the same key awaits the
+same task. The loader runs as its own task, so a caller that goes away
+(a dropped HTTP request, a timeout) does not cancel the load the others
+are waiting on. The key is forgotten as soon as the load finishes, so
+results are never reused; caching them is the caller's job.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """At most one in-flight loader per key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"loads": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``loader()``, shared with concurrent callers for ``key``"""
+        return await asyncio.shield(self.start(key, loader))
+
+    def start(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """The in-flight load for ``key``, starting ``loader()`` if there is none"""
+        call = self._calls.get(key)
+        if call is not None:
+            self.stats["coalesced"] += 1
+            return call
+
+        call = asyncio.ensure_future(loader())
+        self._calls[key] = call
+        self.stats["loads"] += 1
+        call.add_done_callback(lambda done: self._forget(key, done))
+        return call
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the error retrieved even if every caller has gone away
+        if not call.cancelled() and call.exception() is not None:
+            logger.debug(f"Coalesced load for {key!r} failed: {call.exception()}")
+
+    def __len__(self) -> int:
+        return len(self._calls)
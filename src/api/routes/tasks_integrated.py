@@ -4,12 +4,13 @@ Integrates orchestrator, ML predictions, agents, WebSocket, and database
 """
 
 import asyncio
+import base64
 import json
 import logging
 import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
 from pydantic import BaseModel, Field
@@ -66,25 +67,18 @@ except ImportError:
     async def get_current_user_optional() -> Optional[User]:
         return User()
 
-# In-memory cache for recently accessed tasks (cache layer, not primary storage)
-# Used as a read-through cache after database persistence
-# This allows fast retrieval of recently accessed tasks
-_recently_accessed_tasks: Dict[str, Dict[str, Any]] = {}
-_recently_accessed_tasks_timestamps: Dict[str, float] = {}
-_CACHE_TTL_SECONDS = 300  # 5 minutes cache TTL
-
-# Cleanup old cache entries periodically
-async def _cleanup_old_cache():
-    """Remove cache entries older than TTL"""
-    import time
-    current_time = time.time()
-    expired_tasks = [
-        task_id for task_id, timestamp in _recently_accessed_tasks_timestamps.items()
-        if current_time - timestamp > _CACHE_TTL_SECONDS
-    ]
-    for task_id in expired_tasks:
-        _recently_accessed_tasks.pop(task_id, None)
-        _recently_accessed_tasks_timestamps.pop(task_id, None)
+# Recently accessed tasks are cached by TaskCacheService (in-process L1 over
+# Redis L2), shared with its read-through and invalidation paths
+
+
+async def _update_cached_task(task_id: str, fields: Dict[str, Any]) -> bool:
+    """Merge fields into the cached task record, if the task is cached"""
+    try:
+        from src.amas.services.task_cache_service import get_task_cache_service
+        return await get_task_cache_service().update_cached_task(task_id, fields)
+    except Exception as e:
+        _log_error_with_context(e, level="debug", task_id=task_id, operation="update_cached_task")
+        return False
 
 # Tracing support (optional)
 try:
@@ -437,21 +431,23 @@ async def _get_ml_prediction(
     
     Returns:
         Prediction dictionary with success_probability, estimated_duration, etc.
+    
+    Predictions are cached per input; concurrent identical tasks share one
+    model call.
     """
-    try:
+    # Get initial agent suggestions (will be refined)
+    initial_agents = task_data.required_capabilities or []
+    prediction_input = {
+        "task_type": task_data.task_type,
+        "target": task_data.target,
+        "parameters": task_data.parameters or {},
+        "agents_planned": initial_agents,
+    }
+    
+    async def predict() -> Dict[str, Any]:
         predictive_engine = get_predictive_engine()
-        
-        # Get initial agent suggestions (will be refined)
-        initial_agents = task_data.required_capabilities or []
-        
-        prediction_result = await predictive_engine.predict_task_outcome(
-            task_type=task_data.task_type,
-            target=task_data.target,
-            parameters=task_data.parameters or {},
-            agents_planned=initial_agents
-        )
-        
-        prediction = {
+        prediction_result = await predictive_engine.predict_task_outcome(**prediction_input)
+        return {
             "success_probability": prediction_result.success_probability,
             "estimated_duration": prediction_result.estimated_duration,
             "quality_score_prediction": prediction_result.quality_score_prediction,
@@ -459,6 +455,15 @@ async def _get_ml_prediction(
             "risk_factors": prediction_result.risk_factors,
             "optimization_suggestions": prediction_result.optimization_suggestions
         }
+    
+    try:
+        try:
+            from src.amas.services.prediction_cache_service import (
+                get_prediction_cache_service,
+            )
+            prediction = await get_prediction_cache_service().get_or_predict(prediction_input, predict)
+        except ImportError:
+            prediction = await predict()
         
         logger.info(f"Task {task_id} prediction: "
                    f"success_prob={prediction['success_probability']:.2f}, "
@@ -636,17 +641,16 @@ async def _cache_task(
     user_id: Optional[str] = None
 ) -> None:
     """
-    Cache task in memory and Redis (secondary cache layer)
+    Cache task in the two-level task cache (memory + Redis)
     
     Args:
         task_id: Task ID
         task_data: Task creation data
         prediction: ML prediction results
         selected_agents: Selected agents
-        redis: Redis client
+        redis: Redis client (used directly only if cache services are unavailable)
         user_id: User ID for logging
     """
-    # Cache in memory
     task_record = {
         "id": task_id,
         "task_id": task_id,
@@ -659,40 +663,21 @@ async def _cache_task(
         "created_at": datetime.now().isoformat(),
         "created_by": user_id or "system",
         "parameters": task_data.parameters or {},
+        "prediction": prediction,
         "execution_metadata": prediction,
+        "assigned_agents": selected_agents,
     }
-    _recently_accessed_tasks[task_id] = task_record
-    _recently_accessed_tasks_timestamps[task_id] = time.time()
-    logger.debug(f"Task {task_id} cached in memory (5 min TTL)",
-                extra={"task_id": task_id, "operation": "cache_memory"})
     
     # Try to cache using cache services
     try:
-        from src.amas.services.prediction_cache_service import (
-            get_prediction_cache_service,
-        )
         from src.amas.services.task_cache_service import get_task_cache_service
         
         task_cache_service = get_task_cache_service()
-        prediction_cache_service = get_prediction_cache_service()
-        
-        task_record_cache = {
-            "task_id": task_id,
-            "title": task_data.title,
-            "description": task_data.description,
-            "task_type": task_data.task_type,
-            "target": task_data.target,
-            "parameters": task_data.parameters,
-            "status": "pending",
-            "priority": task_data.priority or 5,
-            "prediction": prediction,
-            "assigned_agents": selected_agents,
-            "created_at": datetime.now().isoformat()
-        }
         
-        # Cache task using TaskCacheService
+        # Cache task using TaskCacheService; a new task changes the lists
         try:
-            await task_cache_service.update_task(task_id, task_record_cache)
+            await task_cache_service.cache_task(task_id, task_record)
+            await task_cache_service.invalidate_task_lists()
         except Exception as cache_error:
             _log_error_with_context(
                 cache_error,
@@ -700,25 +685,6 @@ async def _cache_task(
                 task_id=task_id,
                 operation="cache_task_update"
             )
-        
-        # Cache prediction using PredictionCacheService
-        if prediction:
-            try:
-                await prediction_cache_service.cache_prediction(
-                    {
-                        "task_type": task_data.task_type,
-                        "target": task_data.target,
-                        "parameters": task_data.parameters or {}
-                    },
-                    prediction
-                )
-            except Exception as pred_cache_error:
-                _log_error_with_context(
-                    pred_cache_error,
-                    level="debug",
-                    task_id=task_id,
-                    operation="cache_prediction"
-                )
         logger.info(f"Task {task_id} cached using cache services",
                    extra={"task_id": task_id, "operation": "cache_task"})
     except ImportError:
@@ -795,6 +761,29 @@ async def _broadcast_task_created(
         )
 
 
+def _task_token_callback(task_id: str) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+    """
+    Build the orchestrator token callback that streams AI output to task subscribers
+    
+    Args:
+        task_id: Task ID
+        
+    Returns:
+        Async callback forwarding each token chunk as a WebSocket event
+    """
+    async def token_callback(token: Dict[str, Any]) -> None:
+        await websocket_manager.send_to_task_subscribers(task_id, {
+            # "task_token_reset" tells clients to drop this agent's partial output
+            "event": "task_token_reset" if token.get("reset") else "task_token",
+            "task_id": task_id,
+            "agent_id": token.get("agent_id"),
+            "provider": token.get("provider"),
+            "delta": token.get("delta", ""),
+        })
+    
+    return token_callback
+
+
 def _schedule_auto_execution(
     task_id: str,
     task_data: 'TaskCreate',
@@ -835,9 +824,7 @@ def _schedule_auto_execution(
                 })
                 
                 # Update task status in cache
-                if task_id in _recently_accessed_tasks:
-                    _recently_accessed_tasks[task_id]["status"] = "executing"
-                    _recently_accessed_tasks_timestamps[task_id] = time.time()
+                await _update_cached_task(task_id, {"status": "executing"})
                 
                 # Progress callback to broadcast events
                 async def progress_callback(progress_data: Dict[str, Any]):
@@ -895,46 +882,48 @@ def _schedule_auto_execution(
                     parameters=task_data.parameters or {},
                     assigned_agents=selected_agents,
                     user_context={"user_id": user_id} if user_id else {},
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback,
+                    token_callback=_task_token_callback(task_id)
                 )
                 
                 logger.info(f"Task {task_id} execution completed. Result: {result.get('success', False)}",
                            extra={"task_id": task_id, "operation": "auto_execute_complete", "success": result.get('success', False)})
                 
                 # Update task status and result in cache
-                if task_id in _recently_accessed_tasks:
-                    has_agent_results = (
-                        result and 
-                        result.get("output") and 
-                        result.get("output", {}).get("agent_results")
-                    )
-                    
-                    is_successful = result and result.get("success", False)
-                    has_valuable_outputs = has_agent_results and (
-                        result.get("quality_score", 0.0) > 0.0 or
-                        result.get("output", {}).get("agent_results", {})
-                    )
-                    
-                    if is_successful or has_valuable_outputs:
-                        _recently_accessed_tasks[task_id]["status"] = "completed"
-                        _recently_accessed_tasks[task_id]["result"] = result
-                        _recently_accessed_tasks[task_id]["output"] = result.get("output", {})
-                        _recently_accessed_tasks[task_id]["summary"] = result.get("summary", "") or result.get("insights", {}).get("summary", "")
-                        _recently_accessed_tasks[task_id]["quality_score"] = result.get("quality_score", 0.0)
-                        _recently_accessed_tasks[task_id]["execution_time"] = result.get("execution_time", 0.0)
-                        _recently_accessed_tasks[task_id]["total_cost_usd"] = result.get("output", {}).get("total_cost_usd", 0.0)
-                        _recently_accessed_tasks[task_id]["agent_results"] = result.get("output", {}).get("agent_results", {})
-                        _recently_accessed_tasks_timestamps[task_id] = time.time()
-                        logger.info(f"Task {task_id} results saved to cache: quality_score={result.get('quality_score', 0.0)}, agents={list(result.get('output', {}).get('agent_results', {}).keys())}",
-                                   extra={"task_id": task_id, "operation": "auto_execute_save_results"})
-                    else:
-                        _recently_accessed_tasks[task_id]["status"] = "failed"
-                        _recently_accessed_tasks[task_id]["error"] = result.get("error", "Execution failed") if result else "Unknown error"
-                        _recently_accessed_tasks_timestamps[task_id] = time.time()
-                        if result:
-                            _recently_accessed_tasks[task_id]["result"] = result
-                            _recently_accessed_tasks[task_id]["output"] = result.get("output", {})
-                            _recently_accessed_tasks_timestamps[task_id] = time.time()
+                has_agent_results = (
+                    result and 
+                    result.get("output") and 
+                    result.get("output", {}).get("agent_results")
+                )
+                
+                is_successful = result and result.get("success", False)
+                has_valuable_outputs = has_agent_results and (
+                    result.get("quality_score", 0.0) > 0.0 or
+                    result.get("output", {}).get("agent_results", {})
+                )
+                
+                if is_successful or has_valuable_outputs:
+                    await _update_cached_task(task_id, {
+                        "status": "completed",
+                        "result": result,
+                        "output": result.get("output", {}),
+                        "summary": result.get("summary", "") or result.get("insights", {}).get("summary", ""),
+                        "quality_score": result.get("quality_score", 0.0),
+                        "execution_time": result.get("execution_time", 0.0),
+                        "total_cost_usd": result.get("output", {}).get("total_cost_usd", 0.0),
+                        "agent_results": result.get("output", {}).get("agent_results", {}),
+                    })
+                    logger.info(f"Task {task_id} results saved to cache: quality_score={result.get('quality_score', 0.0)}, agents={list(result.get('output', {}).get('agent_results', {}).keys())}",
+                               extra={"task_id": task_id, "operation": "auto_execute_save_results"})
+                else:
+                    failed_fields = {
+                        "status": "failed",
+                        "error": result.get("error", "Execution failed") if result else "Unknown error",
+                    }
+                    if result:
+                        failed_fields["result"] = result
+                        failed_fields["output"] = result.get("output", {})
+                    await _update_cached_task(task_id, failed_fields)
                 
                 # Broadcast completion
                 has_agent_results = (
@@ -971,10 +960,7 @@ def _schedule_auto_execution(
                     operation="auto_execute_task"
                 )
                 # Update status to failed
-                if task_id in _recently_accessed_tasks:
-                    _recently_accessed_tasks[task_id]["status"] = "failed"
-                    _recently_accessed_tasks[task_id]["error"] = str(e)
-                    _recently_accessed_tasks_timestamps[task_id] = time.time()
+                await _update_cached_task(task_id, {"status": "failed", "error": str(e)})
                 
                 # Broadcast failure
                 await websocket_manager.broadcast({
@@ -1100,6 +1086,8 @@ class TaskListResponse(BaseModel):
     """
     tasks: List[TaskResponse] = Field(..., description="List of tasks")
     total: int = Field(..., description="Total number of tasks (before pagination)", example=1, ge=0)
+    total_is_estimate: bool = Field(False, description="Whether total is a planner estimate (count=estimate)")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page (None on the last page)")
 
 
 class TaskProgressResponse(BaseModel):
@@ -1206,12 +1194,7 @@ async def create_task(
         )
         
         # Update cache with complete task response
-        _recently_accessed_tasks[task_id] = task_response.dict()
-        _recently_accessed_tasks_timestamps[task_id] = time.time()
-        
-        # Cleanup old cache entries periodically (non-blocking)
-        if len(_recently_accessed_tasks) > 1000:
-            asyncio.create_task(_cleanup_old_cache())
+        await _update_cached_task(task_id, task_response.dict())
         
         # STEP 8: Schedule auto-execution if needed
         _schedule_auto_execution(task_id, task_data, selected_agents, background_tasks, user_id)
@@ -1504,7 +1487,8 @@ async def execute_task(
                     parameters=task_data.get("parameters", {}),
                     assigned_agents=assigned_agents,
                     user_context=user_context,
-                    progress_callback=progress_callback_fn
+                    progress_callback=progress_callback_fn,
+                    token_callback=_task_token_callback(task_id)
                 )
                 
                 execution_duration = time.time() - execution_start
@@ -1633,15 +1617,15 @@ async def execute_task(
                             await db.rollback()
                 
                 # Also update cache
-                if task_id in _recently_accessed_tasks:
-                    _recently_accessed_tasks[task_id]["status"] = final_status
-                    _recently_accessed_tasks[task_id]["result"] = result
-                    _recently_accessed_tasks[task_id]["output"] = result.get("output", {})
-                    _recently_accessed_tasks[task_id]["summary"] = result.get("summary", "") or result.get("insights", {}).get("summary", "")
-                    _recently_accessed_tasks[task_id]["quality_score"] = result.get("quality_score", 0.0)
-                    _recently_accessed_tasks[task_id]["execution_time"] = execution_duration
-                    _recently_accessed_tasks[task_id]["agent_results"] = result.get("output", {}).get("agent_results", {})
-                    _recently_accessed_tasks_timestamps[task_id] = time.time()
+                if await _update_cached_task(task_id, {
+                    "status": final_status,
+                    "result": result,
+                    "output": result.get("output", {}),
+                    "summary": result.get("summary", "") or result.get("insights", {}).get("summary", ""),
+                    "quality_score": result.get("quality_score", 0.0),
+                    "execution_time": execution_duration,
+                    "agent_results": result.get("output", {}).get("agent_results", {}),
+                }):
                     logger.info(f"Task {task_id} results updated in cache: agents={list(result.get('output', {}).get('agent_results', {}).keys())}",
                                extra={"task_id": task_id, "operation": "update_cache", "agents": list(result.get('output', {}).get('agent_results', {}).keys())})
                 
@@ -1771,6 +1755,194 @@ async def execute_task(
         raise HTTPException(status_code=500, detail=f"Failed to execute task: {str(e)}")
 
 
+# Columns selectable by GET /tasks. Keys are TaskResponse fields; values are
+# SQL expressions (placeholders where the current schema has no column).
+_TASK_LIST_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "task_type": "'' AS task_type",
+    "target": "'' AS target",
+    "status": "status",
+    "priority": "priority",
+    "created_at": "created_at",
+    "created_by": "'' AS created_by",
+    "completed_at": "completed_at",
+}
+# Fields derived from the JSON result column; only loaded when requested
+_TASK_DETAIL_FIELDS = {
+    "result", "output", "agent_results", "summary",
+    "quality_score", "duration_seconds", "success_rate",
+}
+# Always selected: needed for the response model and the keyset cursor
+_TASK_LIST_REQUIRED_FIELDS = ("id", "status", "created_at")
+TASK_COUNT_MODES = ("exact", "estimate")
+
+
+def _parse_task_fields(fields: Optional[str]) -> Optional[set]:
+    """Parse the comma-separated fields= projection (None = list view defaults)"""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(_TASK_LIST_COLUMNS) - _TASK_DETAIL_FIELDS
+    if unknown:
+        raise _create_error_response(
+            status_code=400,
+            detail=f"Unknown task fields: {', '.join(sorted(unknown))}",
+            error_code="INVALID_FIELDS"
+        )
+    return requested | set(_TASK_LIST_REQUIRED_FIELDS)
+
+
+def _encode_task_cursor(created_at: Any, task_id: Any) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor"""
+    created = created_at.isoformat() if hasattr(created_at, "isoformat") else str(created_at)
+    payload = json.dumps([created, task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_task_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """Decode a cursor from _encode_task_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created), task_id
+    except (ValueError, TypeError) as e:
+        raise _create_error_response(
+            status_code=400,
+            detail="Invalid pagination cursor",
+            error_code="INVALID_CURSOR"
+        ) from e
+
+
+def _build_task_list_query(
+    fields: Optional[set],
+    status: Optional[str],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[datetime, Any]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the GET /tasks SELECT
+    
+    With a cursor the page starts strictly after (created_at, id), which the
+    (created_at, id) indexes serve directly at any depth; offset pagination
+    still has to walk every skipped row. One extra row is fetched so the
+    caller can tell whether a next page exists.
+    
+    Returns:
+        SQL text and bind parameters
+    """
+    columns = [
+        expr for name, expr in _TASK_LIST_COLUMNS.items()
+        if fields is None or name in fields
+    ]
+    if fields is not None and fields & _TASK_DETAIL_FIELDS:
+        columns.append("result")
+    
+    conditions = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    if status:
+        conditions.append("status = :status")
+        params["status"] = status
+    if cursor is not None:
+        conditions.append("(created_at, id) < (:cursor_created_at, :cursor_id)")
+        params["cursor_created_at"], params["cursor_id"] = cursor
+    
+    query = f"SELECT {', '.join(columns)} FROM tasks"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+    if cursor is None and offset:
+        query += " OFFSET :offset"
+        params["offset"] = offset
+    return query, params
+
+
+def _task_row_to_dict(row: Any, fields: Optional[set]) -> Dict[str, Any]:
+    """Convert a task row, parsing the JSON result only when it was selected"""
+    created_at = row.created_at
+    completed_at = getattr(row, "completed_at", None)
+    task = {
+        "id": str(row.id),
+        "title": getattr(row, "title", None) or "",
+        "description": getattr(row, "description", None) or "",
+        "status": row.status or "pending",
+        "task_type": getattr(row, "task_type", None) or "unknown",
+        "target": getattr(row, "target", None) or "",
+        "priority": getattr(row, "priority", None) or 5,
+        "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else str(created_at),
+        "created_by": getattr(row, "created_by", None) or None,
+        "completed_at": completed_at.isoformat() if hasattr(completed_at, "isoformat") else completed_at,
+    }
+    if fields is None or not fields & _TASK_DETAIL_FIELDS:
+        return task
+    
+    task_result = getattr(row, "result", None)
+    if isinstance(task_result, str):
+        try:
+            task_result = json.loads(task_result)
+        except ValueError:
+            task_result = None
+    if not isinstance(task_result, dict):
+        task_result = None
+    
+    details = {}
+    if task_result:
+        output = task_result.get("output")
+        details = {
+            "result": task_result,
+            "output": output if isinstance(output, dict) else None,
+            "agent_results": output.get("agent_results") if isinstance(output, dict) else None,
+            "summary": task_result.get("summary"),
+            "quality_score": task_result.get("quality_score"),
+            "duration_seconds": task_result.get("execution_time"),
+            "success_rate": task_result.get("success_rate"),
+        }
+    for name in fields & _TASK_DETAIL_FIELDS:
+        task[name] = details.get(name)
+    return task
+
+
+async def _count_tasks(db: AsyncSession, status: Optional[str], mode: str) -> Tuple[Optional[int], bool]:
+    """
+    Count tasks for GET /tasks
+    
+    ``estimate`` reads PostgreSQL's planner statistics (pg_class.reltuples,
+    or the EXPLAIN row estimate when filtering) instead of scanning the
+    table, and falls back to an exact COUNT(*) when no estimate is available.
+    
+    Returns:
+        (total, is_estimate); total is None if counting failed
+    """
+    params = {"status": status} if status else {}
+    where = " WHERE status = :status" if status else ""
+    if mode == "estimate":
+        try:
+            if status:
+                result = await db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM tasks{where}"), params)
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = int(plan[0]["Plan"]["Plan Rows"])
+            else:
+                result = await db.execute(text("SELECT reltuples::bigint AS total FROM pg_class WHERE relname = 'tasks'"))
+                row = result.fetchone()
+                estimate = int(row.total) if row is not None else -1
+            if estimate >= 0:  # reltuples is -1 before the first ANALYZE
+                return estimate, True
+        except Exception as e:
+            logger.debug(f"Task count estimate unavailable, using COUNT(*): {e}")
+    try:
+        result = await db.execute(text(f"SELECT COUNT(*) AS total FROM tasks{where}"), params)
+        row = result.fetchone()
+        return int(row.total), False
+    except Exception as e:
+        logger.warning(f"Failed to get total count from database: {e}",
+                       extra={"operation": "list_tasks_total_count_fallback"})
+        return None, False
+
+
 @router.get(
     "/tasks",
     response_model=TaskListResponse,
@@ -1782,7 +1954,7 @@ async def execute_task(
     - Fetches tasks from database (primary source)
     - Falls back to Redis cache if database unavailable
     - Supports filtering by status and task_type
-    - Supports pagination with skip and limit
+    - Supports keyset (cursor) pagination, and offset pagination with skip and limit
     - Returns tasks sorted by created_at (newest first)
     
     **Authentication**: Required (JWT token) or optional in development mode
@@ -1793,8 +1965,14 @@ async def execute_task(
     - `limit`: Maximum number of tasks to return (default: 100, max: 1000)
     - `status`: Filter by task status (pending, executing, completed, failed)
     - `task_type`: Filter by task type (security_scan, code_analysis, etc.)
-    
-    **Performance**: Optimized with database indexes for fast queries
+    - `cursor`: Opaque `next_cursor` from the previous page; takes precedence over `skip`
+    - `fields`: Comma-separated fields to return, e.g. `id,title,status,created_at`.
+      Result fields (`result`, `output`, `agent_results`, `summary`, `quality_score`,
+      `duration_seconds`, `success_rate`) are only loaded when listed here
+    - `count`: `exact` (default, COUNT(*)) or `estimate` (planner statistics, no table scan)
+    
+    **Performance**: Cursor pages cost the same at any depth (index range scan on
+    (created_at, id)); offset pages get slower the deeper they go
     """,
     responses={
         200: {
@@ -1815,11 +1993,16 @@ async def execute_task(
                                 "created_by": "user_123"
                             }
                         ],
-                        "total": 1
+                        "total": 1,
+                        "total_is_estimate": False,
+                        "next_cursor": None
                     }
                 }
             }
         },
+        400: {
+            "description": "Invalid cursor, fields or count mode",
+        },
         500: {
             "description": "Failed to list tasks",
             "content": {
@@ -1845,82 +2028,39 @@ async def list_tasks(
     db: AsyncSession = Depends(get_db),
     redis = Depends(get_redis),
     current_user: User = Depends(get_current_user_optional if AUTH_AVAILABLE else get_current_user),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    count: str = "exact",
 ):
     # Get metrics service
     metrics_service = get_metrics_service() if METRICS_AVAILABLE else None
     list_start_time = time.time()
     
+    # Validate paging options up front so bad input is a 400, not a 500
+    selected_fields = _parse_task_fields(fields)
+    after = _decode_task_cursor(cursor) if cursor else None
+    if count not in TASK_COUNT_MODES:
+        raise _create_error_response(
+            status_code=400,
+            detail=f"count must be one of: {', '.join(TASK_COUNT_MODES)}",
+            error_code="INVALID_COUNT_MODE"
+        )
+    
     try:
         all_tasks = []
+        db_paginated = False
+        next_cursor = None
+        total_is_estimate = False
         
-        # 1. Get tasks from database (primary source) - Optimized with indexes
+        # 1. Get tasks from database (primary source)
+        # Ordered by (created_at, id) so keyset pages are served by the
+        # (created_at, id) / (status, created_at, id) indexes at any depth.
+        # Note: task_type column doesn't exist in the current schema, so
+        # filtering by task_type is not possible in SQL.
         if db is not None:
             try:
                 db_query_start = time.time()
-                # Optimized query using composite indexes:
-                # - ix_tasks_status_created_at for status + created_at queries
-                # - ix_tasks_task_type_status for task_type + status queries
-                # - ix_tasks_created_by_created_at for user-specific queries
-                if status and task_type:
-                    # Use composite index (task_type, status) + created_at
-                    # Note: Using id as task_id since task_id column doesn't exist in current schema
-                    query = """
-                    SELECT id, id::text as task_id, title, description, '' as task_type, '' as target, status, priority, created_at, '' as created_by,
-                           NULL::jsonb as result, NULL::jsonb as output, '' as summary, NULL::numeric as quality_score, NULL::numeric as duration_seconds, NULL::numeric as success_rate, completed_at
-                    FROM tasks 
-                    WHERE status = :status
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                    params = {
-                        "status": status,
-                        "limit": limit,
-                        "offset": skip
-                    }
-                elif status:
-                    # Use composite index (status, created_at)
-                    # Note: Using id as task_id since task_id column doesn't exist in current schema
-                    query = """
-                    SELECT id, id::text as task_id, title, description, '' as task_type, '' as target, status, priority, created_at, '' as created_by,
-                           NULL::jsonb as result, NULL::jsonb as output, '' as summary, NULL::numeric as quality_score, NULL::numeric as duration_seconds, NULL::numeric as success_rate, completed_at
-                    FROM tasks 
-                    WHERE status = :status
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                    params = {
-                        "status": status,
-                        "limit": limit,
-                        "offset": skip
-                    }
-                elif task_type:
-                    # Use index on task_type
-                    # Note: task_type column doesn't exist, so filtering by task_type is not possible
-                    query = """
-                    SELECT id, id::text as task_id, title, description, '' as task_type, '' as target, status, priority, created_at, '' as created_by,
-                           NULL::jsonb as result, NULL::jsonb as output, '' as summary, NULL::numeric as quality_score, NULL::numeric as duration_seconds, NULL::numeric as success_rate, completed_at
-                    FROM tasks 
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                    params = {
-                        "limit": limit,
-                        "offset": skip
-                    }
-                else:
-                    # No filters - use created_at index
-                    query = """
-                    SELECT id, id::text as task_id, title, description, '' as task_type, '' as target, status, priority, created_at, '' as created_by,
-                           NULL::jsonb as result, NULL::jsonb as output, '' as summary, NULL::numeric as quality_score, NULL::numeric as duration_seconds, NULL::numeric as success_rate, completed_at
-                    FROM tasks 
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                    params = {
-                        "limit": limit,
-                        "offset": skip
-                    }
-                
+                query, params = _build_task_list_query(selected_fields, status, limit, skip, after)
                 result = await db.execute(text(query), params)
                 db_query_duration = time.time() - db_query_start
                 
@@ -1929,65 +2069,16 @@ async def list_tasks(
                     metrics_service.record_db_query("select", "tasks", "success", db_query_duration)
                 rows = result.fetchall()
                 
-                logger.info(f"List tasks query returned {len(rows)} rows: status={status}, task_type={task_type}, skip={skip}, limit={limit}",
+                logger.info(f"List tasks query returned {len(rows)} rows: status={status}, task_type={task_type}, skip={skip}, limit={limit}, cursor={bool(after)}",
                            extra={"operation": "list_tasks_query", "row_count": len(rows), "status": status, "task_type": task_type, "skip": skip, "limit": limit})
                 
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = _encode_task_cursor(rows[-1].created_at, rows[-1].id)
+                
                 for row in rows:
-                    task_id = row.id or row.task_id
-                    
-                    # Parse result and output if they exist
-                    task_result = None
-                    task_output = None
-                    agent_results = None
-                    
-                    if hasattr(row, 'result') and row.result:
-                        try:
-                            task_result = json.loads(row.result) if isinstance(row.result, str) else row.result
-                        except Exception:
-                            try:
-                                task_result = row.result if isinstance(row.result, dict) else None
-                            except Exception:
-                                pass
-                    
-                    if hasattr(row, 'output') and row.output:
-                        try:
-                            task_output = json.loads(row.output) if isinstance(row.output, str) else row.output
-                            if isinstance(task_output, dict):
-                                agent_results = task_output.get("agent_results")
-                        except Exception:
-                            try:
-                                task_output = row.output if isinstance(row.output, dict) else None
-                                if isinstance(task_output, dict):
-                                    agent_results = task_output.get("agent_results")
-                            except Exception:
-                                pass
-                    
-                    # Extract agent_results from result if not in output
-                    if not agent_results and task_result and isinstance(task_result, dict):
-                        output_data = task_result.get("output", {})
-                        if isinstance(output_data, dict):
-                            agent_results = output_data.get("agent_results")
-                    
-                    # Add task from database (database is primary source)
-                    all_tasks.append({
-                            "id": task_id,
-                            "title": row.title or "",
-                            "description": row.description or "",
-                            "status": row.status or "pending",
-                            "task_type": row.task_type or "unknown",
-                            "target": row.target or "",
-                            "priority": row.priority or 5,
-                            "created_at": row.created_at.isoformat() if hasattr(row.created_at, 'isoformat') else str(row.created_at),
-                            "created_by": row.created_by,
-                            "result": task_result,
-                            "output": task_output,
-                            "agent_results": agent_results,
-                            "summary": getattr(row, 'summary', None) or (task_result.get("summary") if task_result and isinstance(task_result, dict) else None),
-                            "quality_score": getattr(row, 'quality_score', None) or (task_result.get("quality_score") if task_result and isinstance(task_result, dict) else None),
-                            "duration_seconds": getattr(row, 'duration_seconds', None) or (task_result.get("execution_time") if task_result and isinstance(task_result, dict) else None),
-                            "success_rate": getattr(row, 'success_rate', None) or (task_result.get("success_rate") if task_result and isinstance(task_result, dict) else None),
-                            "completed_at": getattr(row, 'completed_at', None).isoformat() if hasattr(row, 'completed_at') and row.completed_at and hasattr(row.completed_at, 'isoformat') else None
-                        })
+                    all_tasks.append(_task_row_to_dict(row, selected_fields))
+                db_paginated = True
             except Exception as db_error:
                 logger.error(f"Database query failed in list_tasks: {db_error}", exc_info=True,
                            extra={"operation": "list_tasks_db_query", "status": status, "task_type": task_type, 
@@ -1999,8 +2090,8 @@ async def list_tasks(
                     user_id=current_user.id if current_user and hasattr(current_user, 'id') else None
                 )
         
-        # 3. Get tasks from Redis cache (if available)
-        if redis is not None:
+        # 2. Get tasks from Redis cache (fallback when the database is unavailable)
+        if redis is not None and not db_paginated:
             try:
                 # Get all task keys from Redis
                 task_keys = await redis.keys("task:*")
@@ -2048,57 +2139,38 @@ async def list_tasks(
         logger.info(f"List tasks: {len(unique_tasks)} unique tasks found after deduplication",
                    extra={"operation": "list_tasks_deduplication", "unique_count": len(unique_tasks)})
         
-        # If we got data from database with pagination, tasks are already paginated
-        # Otherwise, apply pagination here
-        if db is not None and (status or task_type):
-            # Already paginated by database query
+        if db_paginated:
+            # Already filtered, ordered and paginated by the database query
             paginated_tasks = unique_tasks
-            # For paginated queries, we need to get total count separately
-            # Try to get total count from database
-            try:
-                count_query = "SELECT COUNT(*) as total FROM tasks"
-                count_params = {}
-                if status and task_type:
-                    count_query += " WHERE task_type = :task_type AND status = :status"
-                    count_params = {"task_type": task_type, "status": status}
-                elif status:
-                    count_query += " WHERE status = :status"
-                    count_params = {"status": status}
-                elif task_type:
-                    count_query += " WHERE task_type = :task_type"
-                    count_params = {"task_type": task_type}
-                
-                count_result = await db.execute(text(count_query), count_params)
-                count_row = count_result.fetchone()
-                total = count_row.total if count_row and hasattr(count_row, 'total') else len(unique_tasks)
-                logger.info(f"List tasks: Total count from database = {total}",
-                           extra={"operation": "list_tasks_total_count", "total": total})
-            except Exception as count_error:
-                logger.warning(f"Failed to get total count from database: {count_error}, using unique_tasks length",
-                             extra={"operation": "list_tasks_total_count_fallback"})
-                total = len(unique_tasks)
+            total, total_is_estimate = await _count_tasks(db, status, count)
+            if total is None:
+                total = skip + len(unique_tasks)
+            logger.info(f"List tasks: Total count from database = {total} (estimate={total_is_estimate})",
+                       extra={"operation": "list_tasks_total_count", "total": total})
         else:
-            # Apply filters (if not already filtered by DB query)
-            if not status and not task_type:
-                filtered_tasks = unique_tasks
-            else:
-                filtered_tasks = unique_tasks
-                if status:
-                    filtered_tasks = [t for t in filtered_tasks if t.get("status") == status]
-                if task_type:
-                    filtered_tasks = [t for t in filtered_tasks if t.get("task_type") == task_type]
-            
-            # Sort by created_at (newest first) - only if not already sorted by DB
-            if db is None:
-                filtered_tasks.sort(key=lambda t: t.get("created_at", ""), reverse=True)
-            else:
-                filtered_tasks = unique_tasks
+            # Apply filters, ordering and pagination to the cached tasks
+            filtered_tasks = unique_tasks
+            if status:
+                filtered_tasks = [t for t in filtered_tasks if t.get("status") == status]
+            if task_type:
+                filtered_tasks = [t for t in filtered_tasks if t.get("task_type") == task_type]
+            filtered_tasks.sort(key=lambda t: (t.get("created_at", ""), str(t.get("id", ""))), reverse=True)
             
             # Get total count before pagination
             total = len(filtered_tasks)
             
-            # Apply pagination
-            paginated_tasks = filtered_tasks[skip : skip + limit]
+            if after:
+                after_key = (after[0].isoformat(), str(after[1]))
+                filtered_tasks = [
+                    t for t in filtered_tasks
+                    if (t.get("created_at", ""), str(t.get("id", ""))) < after_key
+                ]
+                paginated_tasks = filtered_tasks[:limit]
+            else:
+                paginated_tasks = filtered_tasks[skip : skip + limit]
+            if paginated_tasks and len(filtered_tasks) > (limit if after else skip + limit):
+                last = paginated_tasks[-1]
+                next_cursor = _encode_task_cursor(last.get("created_at", ""), last.get("id"))
         
         # Convert to TaskResponse format
         task_responses = []
@@ -2147,7 +2219,9 @@ async def list_tasks(
         
         return TaskListResponse(
             tasks=task_responses,
-            total=total
+            total=total,
+            total_is_estimate=total_is_estimate,
+            next_cursor=next_cursor
         )
     
     except Exception as e:
@@ -2267,18 +2341,22 @@ async def get_task(
     get_start_time = time.time()
     
     try:
-        # Try cache first (for recently accessed tasks)
-        if task_id in _recently_accessed_tasks:
-            # Record cache hit
-            if metrics_service:
-                metrics_service.record_cache_hit("memory")
-            logger.debug(f"Task {task_id} found in cache")
-            task_data = _recently_accessed_tasks[task_id]
-            # Update cache timestamp (LRU behavior)
-            _recently_accessed_tasks_timestamps[task_id] = time.time()
-            # Ensure result is included if available
-            task_dict = dict(task_data)
-            # Create TaskResponse with all available data including results
+        # Try cache first (in-process, then Redis)
+        try:
+            from src.amas.services.task_cache_service import get_task_cache_service
+            task_dict, cache_tier = await get_task_cache_service().get_cached_task(task_id)
+        except Exception as cache_error:
+            logger.debug(f"Cache fetch failed (non-critical): {cache_error}")
+            task_dict, cache_tier = None, None
+        
+        if metrics_service:
+            if task_dict:
+                metrics_service.record_cache_hit(cache_tier)
+            else:
+                metrics_service.record_cache_miss("redis")
+        
+        if task_dict:
+            logger.debug(f"Task {task_id} found in {cache_tier} cache")
             # Extract agent_results from output or result
             agent_results = None
             task_output = task_dict.get("output")
@@ -2312,25 +2390,6 @@ async def get_task(
                 completed_at=task_dict.get("completed_at")
             )
         
-        # Try cache second
-        if redis is not None:
-            try:
-                from src.amas.services.task_cache_service import get_task_cache_service
-                task_cache_service = get_task_cache_service()
-                cached_task = await task_cache_service.get_task(task_id)
-                if cached_task:
-                    # Record cache hit
-                    if metrics_service:
-                        metrics_service.record_cache_hit("redis")
-                    return TaskResponse(**cached_task)
-                else:
-                    # Record cache miss
-                    if metrics_service:
-                        metrics_service.record_cache_miss("redis")
-            except Exception as cache_error:
-                logger.debug(f"Cache fetch failed (non-critical): {cache_error}")
-                pass
-        
         # Try database
         if db is not None:
             try:
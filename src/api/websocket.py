@@ -3,16 +3,140 @@ WebSocket connection manager for real-time updates
 """
 
 import asyncio
+import json
 import logging
+import os
 import uuid
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
 from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
 
 
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Events where only the latest queued message per key matters
+COALESCED_EVENTS = {"task_progress", "heartbeat"}
+
+
+def _serialize(message: Dict) -> str:
+    """Encode a message once, matching WebSocket.send_json's wire format"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _coalesce_key(message: Dict) -> Optional[Tuple[str, Optional[str]]]:
+    event = message.get("event")
+    if event not in COALESCED_EVENTS:
+        return None
+    return event, message.get("task_id")
+
+
+class ConnectionSender:
+    """
+    Bounded outbound queue for one connection, drained by its own writer task
+
+    A slow client only fills its own queue; when full, the slow-consumer
+    policy decides what happens:
+    • drop_oldest - discard the oldest queued COALESCED_EVENTS message
+    • coalesce - replace a queued message with the same coalesce key
+      (latest task_progress per task, latest heartbeat), else drop as above
+    • disconnect - close the connection
+    
+    Other events (streamed task_token chunks, task_completed/task_failed)
+    are never dropped: losing one would corrupt the client's view without
+    any sign of the gap. If the queue holds nothing droppable, the client is
+    disconnected under every policy.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        connection_id: str,
+        on_failure: Callable[[str], None],
+        max_queue: int = 256,
+        policy: str = "coalesce",
+        send_timeout: float = 10.0,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.websocket = websocket
+        self.connection_id = connection_id
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self.queue: Deque[List] = deque()
+        self._pending: Dict[Tuple, List] = {}
+        self._on_failure = on_failure
+        self._closed = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, text: str, key: Optional[Tuple] = None) -> bool:
+        """Queue serialized text; returns False if the client must be disconnected"""
+        if key is not None and self.policy == "coalesce":
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = text
+                return True
+
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "disconnect" or not self._evict_droppable():
+                return False
+
+        entry = [key, text]
+        self.queue.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+        self._ready.set()
+        return True
+
+    def _evict_droppable(self) -> bool:
+        """Drop the oldest coalescable message; False if there is none"""
+        for index, entry in enumerate(self.queue):
+            key = entry[0]
+            if key is not None:
+                del self.queue[index]
+                if self._pending.get(key) is entry:
+                    del self._pending[key]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _run(self):
+        try:
+            # Checked as well as cancelling: wait_for can swallow a cancel
+            # that races with a completed send
+            while not self._closed:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                key, text = self.queue.popleft()
+                if key is not None:
+                    self._pending.pop(key, None)
+                await asyncio.wait_for(
+                    self.websocket.send_text(text), timeout=self.send_timeout
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket writer for {self.connection_id} stopped: {e}",
+                          extra={"connection_id": self.connection_id, "operation": "websocket_send", "error": str(e)})
+            self._on_failure(self.connection_id)
+
+    def close(self):
+        """Stop the writer task and drop anything still queued"""
+        self._closed = True
+        self._ready.set()
+        self._task.cancel()
+        self.queue.clear()
+        self._pending.clear()
+
+
 class ConnectionManager:
     """
     WebSocket connection manager for real-time updates
@@ -23,12 +147,21 @@ class ConnectionManager:
     • Targeted messaging by user/task
     • Automatic reconnection handling
     • Message queuing for offline clients
+    • Per-connection send queues so one slow client cannot stall the rest
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+    ):
         # Active connections by connection ID
         self.active_connections: Dict[str, WebSocket] = {}
         
+        # Outbound queue and writer task per connection
+        self.senders: Dict[str, ConnectionSender] = {}
+        
         # Connections grouped by user ID
         self.user_connections: Dict[str, Set[str]] = {}
         
@@ -38,6 +171,14 @@ class ConnectionManager:
         # Message queue for offline clients (in-memory, can move to Redis)
         self.message_queue: Dict[str, List[Dict]] = {}
         
+        self.max_queue = max_queue or int(os.getenv("AMAS_WS_MAX_QUEUE", "256"))
+        self.slow_consumer_policy = slow_consumer_policy or os.getenv(
+            "AMAS_WS_SLOW_CONSUMER_POLICY", "coalesce"
+        )
+        self.send_timeout = send_timeout or float(os.getenv("AMAS_WS_SEND_TIMEOUT", "10"))
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {self.slow_consumer_policy}")
+        
         logger.info("WebSocket connection manager initialized")
     
     async def connect(self, websocket: WebSocket, connection_id: str, user_id: str = None):
@@ -45,6 +186,14 @@ class ConnectionManager:
         await websocket.accept()
         
         self.active_connections[connection_id] = websocket
+        self.senders[connection_id] = ConnectionSender(
+            websocket,
+            connection_id,
+            self.disconnect,
+            max_queue=self.max_queue,
+            policy=self.slow_consumer_policy,
+            send_timeout=self.send_timeout,
+        )
         
         if user_id:
             if user_id not in self.user_connections:
@@ -60,11 +209,7 @@ class ConnectionManager:
             logger.info(f"Sending {queued_count} queued messages to {connection_id}",
                        extra={"connection_id": connection_id, "queued_count": queued_count, "operation": "send_queued_messages"})
             for message in self.message_queue[connection_id]:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Failed to send queued message: {e}",
-                               extra={"connection_id": connection_id, "operation": "send_queued_message", "error": str(e)})
+                self.send_to_connection(connection_id, message)
             del self.message_queue[connection_id]
     
     def disconnect(self, connection_id: str):
@@ -72,6 +217,10 @@ class ConnectionManager:
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
         
+        sender = self.senders.pop(connection_id, None)
+        if sender:
+            sender.close()
+        
         # Remove from user connections
         for user_id, conn_ids in self.user_connections.items():
             if connection_id in conn_ids:
@@ -85,10 +234,54 @@ class ConnectionManager:
         
         logger.info(f"WebSocket disconnected: {connection_id}")
     
+    def _fan_out(self, connection_ids: Iterable[str], message: Dict) -> int:
+        """Serialize once and queue for each connection; returns connections reached"""
+        if "timestamp" not in message:
+            message["timestamp"] = datetime.now().isoformat()
+        
+        text = _serialize(message)
+        key = _coalesce_key(message)
+        slow = []
+        sent = 0
+        
+        for connection_id in connection_ids:
+            sender = self.senders.get(connection_id)
+            if sender is None:
+                continue
+            if sender.put(text, key):
+                sent += 1
+            else:
+                slow.append(connection_id)
+        
+        # Slow consumers under the disconnect policy
+        for connection_id in slow:
+            logger.warning(f"Disconnecting slow WebSocket consumer {connection_id}",
+                          extra={"connection_id": connection_id, "operation": "websocket_slow_consumer"})
+            websocket = self.active_connections.get(connection_id)
+            self.disconnect(connection_id)
+            if websocket is not None:
+                asyncio.create_task(self._close_quietly(websocket))
+        
+        return sent
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1008)
+        except Exception:
+            pass
+    
+    def send_to_connection(self, connection_id: str, message: Dict) -> bool:
+        """Queue a message for one connection"""
+        return self._fan_out((connection_id,), message) == 1
+    
     async def broadcast(self, message: Dict):
         """
         Broadcast message to all connected clients
         
+        The message is serialized once and queued for every connection;
+        delivery happens on each connection's writer task.
+        
         Message format:
         {
             "event": "task_created" | "task_progress" | "agent_update" | ...,
@@ -96,63 +289,25 @@ class ConnectionManager:
             "timestamp": "2025-01-19T05:34:00Z"
         }
         """
-        if "timestamp" not in message:
-            message["timestamp"] = datetime.now().isoformat()
-        
-        disconnected = []
-        
-        for connection_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except WebSocketDisconnect:
-                disconnected.append(connection_id)
-            except Exception as e:
-                logger.error(f"Broadcast failed to {connection_id}: {e}")
-                disconnected.append(connection_id)
+        sent = self._fan_out(list(self.senders), message)
         
-        # Clean up disconnected clients
-        for connection_id in disconnected:
-            self.disconnect(connection_id)
-        
-        logger.info(f"Broadcast to {len(self.active_connections)} clients: {message.get('event', 'unknown')}",
-                   extra={"event": message.get('event', 'unknown'), "client_count": len(self.active_connections), "operation": "websocket_broadcast"})
+        logger.info(f"Broadcast to {sent} clients: {message.get('event', 'unknown')}",
+                   extra={"event": message.get('event', 'unknown'), "client_count": sent, "operation": "websocket_broadcast"})
     
     async def send_to_user(self, user_id: str, message: Dict):
         """Send message to all connections for specific user"""
-        if "timestamp" not in message:
-            message["timestamp"] = datetime.now().isoformat()
-        
         if user_id not in self.user_connections:
             logger.warning(f"No connections found for user {user_id}")
             return
         
-        connection_ids = list(self.user_connections[user_id])
-        
-        for connection_id in connection_ids:
-            if connection_id in self.active_connections:
-                try:
-                    await self.active_connections[connection_id].send_json(message)
-                except Exception as e:
-                    logger.error(f"Send to user failed: {e}")
-                    self.disconnect(connection_id)
+        self._fan_out(list(self.user_connections[user_id]), message)
     
     async def send_to_task_subscribers(self, task_id: str, message: Dict):
         """Send message to all clients subscribed to specific task"""
-        if "timestamp" not in message:
-            message["timestamp"] = datetime.now().isoformat()
-        
         if task_id not in self.task_subscribers:
             return
         
-        connection_ids = list(self.task_subscribers[task_id])
-        
-        for connection_id in connection_ids:
-            if connection_id in self.active_connections:
-                try:
-                    await self.active_connections[connection_id].send_json(message)
-                except Exception as e:
-                    logger.error(f"Send to task subscribers failed: {e}")
-                    self.disconnect(connection_id)
+        self._fan_out(list(self.task_subscribers[task_id]), message)
     
     def subscribe_to_task(self, connection_id: str, task_id: str):
         """Subscribe connection to task updates"""
@@ -198,6 +353,8 @@ async def websocket_endpoint(
     Events sent to client:
     • task_created - New task created
     • task_progress - Task execution progress
+    • task_token - Streamed AI output chunk (subscribers of the task only)
+    • task_token_reset - Discard streamed output; generation is restarting
     • task_completed - Task finished
     • task_failed - Task error
     • agent_update - Agent status change
@@ -266,7 +423,7 @@ async def websocket_endpoint(
         await websocket_manager.connect(websocket, connection_id, user_id)
         
         # Send welcome message
-        await websocket.send_json({
+        websocket_manager.send_to_connection(connection_id, {
             "event": "connected",
             "connection_id": connection_id,
             "message": "WebSocket connection established"
@@ -283,7 +440,7 @@ async def websocket_endpoint(
                     task_id = data.get("task_id")
                     if task_id:
                         websocket_manager.subscribe_to_task(connection_id, task_id)
-                        await websocket.send_json({
+                        websocket_manager.send_to_connection(connection_id, {
                             "event": "subscribed",
                             "task_id": task_id
                         })
@@ -292,13 +449,13 @@ async def websocket_endpoint(
                     task_id = data.get("task_id")
                     if task_id:
                         websocket_manager.unsubscribe_from_task(connection_id, task_id)
-                        await websocket.send_json({
+                        websocket_manager.send_to_connection(connection_id, {
                             "event": "unsubscribed",
                             "task_id": task_id
                         })
                 
                 elif data.get("command") == "ping":
-                    await websocket.send_json({
+                    websocket_manager.send_to_connection(connection_id, {
                         "event": "pong",
                         "timestamp": datetime.now().isoformat()
                     })
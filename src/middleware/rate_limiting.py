@@ -1,16 +1,17 @@
 """
 Rate limiting middleware for AMAS
-Implements token bucket algorithm for API rate limiting
+Implements sliding-window and token bucket (GCRA) API rate limiting
 """
 
 import time
-from collections import deque
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 
 from fastapi import HTTPException, Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from src.amas.utils.rate_limit import GCRABucket, LRUClientTable, SlidingWindowCounter
+
 
 @dataclass
 class RateLimitConfig:
@@ -20,46 +21,18 @@ class RateLimitConfig:
     requests_per_hour: int = 10000  # Increased for development
     burst_limit: int = 100  # Increased for development
     window_size: int = 60  # seconds
+    max_clients: int = 100_000  # Least recently seen clients are evicted beyond this
 
 
-@dataclass
-class TokenBucket:
-    """Token bucket for rate limiting"""
-
-    capacity: int
-    tokens: float = field(default_factory=lambda: 0)
-    last_refill: float = field(default_factory=time.time)
-
-    def refill(self, rate: float) -> None:
-        """Refill tokens based on rate"""
-        now = time.time()
-        time_passed = now - self.last_refill
-        tokens_to_add = time_passed * rate
-        self.tokens = min(self.capacity, self.tokens + tokens_to_add)
-        self.last_refill = now
-
-    def consume(self, tokens: int = 1) -> bool:
-        """Try to consume tokens from bucket"""
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
-
-
-@dataclass
 class ClientRateLimit:
-    """Client rate limit tracking"""
+    """Client rate limit tracking in fixed memory"""
 
-    per_minute: TokenBucket
-    per_hour: TokenBucket
-    burst: TokenBucket
-    requests: deque = field(default_factory=lambda: deque())
+    __slots__ = ("per_minute", "per_hour", "burst")
 
     def __init__(self, config: RateLimitConfig):
-        self.per_minute = TokenBucket(config.requests_per_minute)
-        self.per_hour = TokenBucket(config.requests_per_hour)
-        self.burst = TokenBucket(config.burst_limit)
-        self.requests = deque()
+        self.per_minute = SlidingWindowCounter(config.window_size)
+        self.per_hour = SlidingWindowCounter(3600)
+        self.burst = GCRABucket(config.burst_limit / 60, config.burst_limit)
 
 
 class RateLimitingMiddleware(BaseHTTPMiddleware):
@@ -68,9 +41,9 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, config: Optional[RateLimitConfig] = None):
         super().__init__(app)
         self.config = config or RateLimitConfig()
-        self.clients: Dict[str, ClientRateLimit] = {}
-        self.cleanup_interval = 300  # 5 minutes
-        self.last_cleanup = time.time()
+        self.clients: LRUClientTable[ClientRateLimit] = LRUClientTable(
+            lambda: ClientRateLimit(self.config), self.config.max_clients
+        )
         # Allow bypassing rate limits for health checks and API routes in development
         import os
         is_dev = os.getenv("ENVIRONMENT", "production").lower() in ["development", "dev", "test"]
@@ -90,90 +63,44 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
 
         return f"{client_ip}:{user_agent_hash}"
 
-    def _cleanup_old_clients(self):
-        """Clean up old client data to prevent memory leaks"""
-        now = time.time()
-        if now - self.last_cleanup < self.cleanup_interval:
-            return
-
-        # Remove clients with no recent activity (older than 1 hour)
-        cutoff_time = now - 3600
-        clients_to_remove = []
-
-        for client_id, client in self.clients.items():
-            if not client.requests or client.requests[-1] < cutoff_time:
-                clients_to_remove.append(client_id)
-
-        for client_id in clients_to_remove:
-            del self.clients[client_id]
-
-        self.last_cleanup = now
-
-    def _check_rate_limit(self, client_id: str) -> Tuple[bool, Dict[str, any]]:
-        """Check if client is within rate limits"""
+    def _check_rate_limit(self, client_id: str) -> Tuple[bool, Dict[str, str]]:
+        """Check if client is within rate limits, counting the request if so"""
         now = time.time()
+        client = self.clients.get(client_id)
+        config = self.config
 
-        # Get or create client rate limit
-        if client_id not in self.clients:
-            self.clients[client_id] = ClientRateLimit(self.config)
-
-        client = self.clients[client_id]
-
-        # Clean up old requests
-        cutoff_time = now - 60  # Remove requests older than 1 minute
-        while client.requests and client.requests[0] < cutoff_time:
-            client.requests.popleft()
-
-        # Add current request
-        client.requests.append(now)
-
-        # Refill token buckets
-        client.per_minute.refill(self.config.requests_per_minute / 60)
-        client.per_hour.refill(self.config.requests_per_hour / 3600)
-        client.burst.refill(self.config.burst_limit / 60)
+        minute_count = client.per_minute.count(now)
+        hour_count = client.per_hour.count(now)
 
         # Check limits
         limits_exceeded = []
-
-        # Check per-minute limit
-        if not client.per_minute.consume():
+        if minute_count >= config.requests_per_minute:
             limits_exceeded.append("per_minute")
-
-        # Check per-hour limit
-        if not client.per_hour.consume():
+        if hour_count >= config.requests_per_hour:
             limits_exceeded.append("per_hour")
-
-        # Check burst limit
-        if not client.burst.consume():
+        if not limits_exceeded and not client.burst.consume(now):
             limits_exceeded.append("burst")
 
-        # Check request count in current minute
-        current_minute_requests = sum(
-            1 for req_time in client.requests if now - req_time < 60
-        )
-        if current_minute_requests > self.config.requests_per_minute:
-            limits_exceeded.append("per_minute_count")
-
-        # Check request count in current hour
-        current_hour_requests = sum(
-            1 for req_time in client.requests if now - req_time < 3600
-        )
-        if current_hour_requests > self.config.requests_per_hour:
-            limits_exceeded.append("per_hour_count")
-
-        is_allowed = len(limits_exceeded) == 0
+        is_allowed = not limits_exceeded
+        if is_allowed:
+            client.per_minute.add(now)
+            client.per_hour.add(now)
+            minute_count += 1
+            hour_count += 1
 
         # Prepare rate limit headers
         headers = {
-            "X-RateLimit-Limit-Minute": str(self.config.requests_per_minute),
-            "X-RateLimit-Limit-Hour": str(self.config.requests_per_hour),
-            "X-RateLimit-Limit-Burst": str(self.config.burst_limit),
-            "X-RateLimit-Remaining-Minute": str(int(client.per_minute.tokens)),
-            "X-RateLimit-Remaining-Hour": str(int(client.per_hour.tokens)),
-            "X-RateLimit-Remaining-Burst": str(int(client.burst.tokens)),
+            "X-RateLimit-Limit-Minute": str(config.requests_per_minute),
+            "X-RateLimit-Limit-Hour": str(config.requests_per_hour),
+            "X-RateLimit-Limit-Burst": str(config.burst_limit),
+            "X-RateLimit-Remaining-Minute": str(max(0, config.requests_per_minute - minute_count)),
+            "X-RateLimit-Remaining-Hour": str(max(0, config.requests_per_hour - hour_count)),
+            "X-RateLimit-Remaining-Burst": str(int(client.burst.tokens(now))),
             "X-RateLimit-Reset-Minute": str(int(now + 60)),
             "X-RateLimit-Reset-Hour": str(int(now + 3600)),
         }
+        if limits_exceeded:
+            headers["X-RateLimit-Exceeded"] = ",".join(limits_exceeded)
 
         return is_allowed, headers
 
@@ -209,9 +136,6 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
         if is_dev and path.startswith("/api/v1"):
             return await call_next(request)
 
-        # Clean up old clients periodically
-        self._cleanup_old_clients()
-
         # Get client identifier
         client_id = self._get_client_id(request)
 
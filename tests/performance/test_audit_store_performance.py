@@ -0,0 +1,123 @@
+"""
+Performance tests for the audit segment store
+
+Writes a week of synthetic audit history (AMAS_BENCH_AUDIT_EVENTS events,
+default 300k) the way the previous AuditLogger did, one json.dumps and one
+RotatingFileHandler call per event, and through the segment store in flush
+batches. Then compares finding one user's events for the last day by
+rereading the JSONL against the sidecar index, warm and after a restart.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from src.amas.security.audit.segment_store import AuditSegmentStore
+
+EVENTS = int(os.getenv("AMAS_BENCH_AUDIT_EVENTS", "300000"))
+BATCH = 100  # AuditLogger's default buffer_size
+USERS = 500
+DAYS = 7
+
+
+def _events():
+    start = datetime.now(timezone.utc) - timedelta(days=DAYS)
+    step = timedelta(days=DAYS) / EVENTS
+    for i in range(EVENTS):
+        yield {
+            "event_id": f"{i:016x}",
+            "timestamp": (start + step * i).isoformat(),
+            "event_type": ("tool_usage", "agent_execution", "data_access")[i % 3],
+            "status": "success",
+            "user_id": f"user-{i % USERS}",
+            "agent_id": f"agent-{i % 40}",
+            "action": "execute",
+            "details": {"tool_name": "web_search", "parameter_count": 3},
+            "risk_score": 0.0,
+            "duration_ms": 12.5,
+        }
+
+
+def _legacy_search(path, since, user_id):
+    hits = []
+    for segment in sorted(path.parent.glob(path.name + "*")):
+        with open(segment) as f:
+            for line in f:
+                event = json.loads(line)
+                if (event["user_id"] == user_id
+                        and datetime.fromisoformat(event["timestamp"]).timestamp() >= since):
+                    hits.append(event)
+    return hits
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_week_of_history_write_and_search(tmp_path):
+    """Test batched writes and indexed search over a week of audit events"""
+    events = list(_events())
+    since = time.time() - 86400
+
+    # Before: json.dumps + logging call per event, search by rereading
+    legacy_path = tmp_path / "legacy" / "audit.jsonl"
+    legacy_path.parent.mkdir()
+    legacy_logger = logging.getLogger("bench.audit.legacy")
+    legacy_logger.propagate = False
+    legacy_logger.setLevel(logging.INFO)
+    handler = RotatingFileHandler(legacy_path, maxBytes=16 * 1024 * 1024, backupCount=100)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    legacy_logger.addHandler(handler)
+    start = time.perf_counter()
+    for event in events:
+        legacy_logger.info(json.dumps(event, default=str))
+    legacy_write_s = time.perf_counter() - start
+    handler.close()
+    legacy_logger.removeHandler(handler)
+
+    start = time.perf_counter()
+    expected = _legacy_search(legacy_path, since, "user-7")
+    legacy_search_s = time.perf_counter() - start
+
+    # After: one writev per flush batch, indexed search
+    path = tmp_path / "store" / "audit.jsonl"
+    path.parent.mkdir()
+    store = AuditSegmentStore(path, max_segment_bytes=16 * 1024 * 1024)
+    start = time.perf_counter()
+    for offset in range(0, EVENTS, BATCH):
+        store.append(events[offset:offset + BATCH])
+    store_write_s = time.perf_counter() - start
+
+    store.search(since=since, user_id="user-0")  # Load sidecars once
+    start = time.perf_counter()
+    hits = store.search(since=since, user_id="user-7")
+    warm_search_s = time.perf_counter() - start
+    store.close()
+
+    reopened = AuditSegmentStore(path, max_segment_bytes=16 * 1024 * 1024)
+    start = time.perf_counter()
+    cold_hits = reopened.search(since=since, user_id="user-7")
+    cold_search_s = time.perf_counter() - start
+    reopened.close()
+
+    segments = len(list(path.parent.glob("audit.*.jsonl"))) + 1
+    print(
+        f"\nAudit history: {EVENTS:,} events over {DAYS} days in {segments} segments"
+        f"\n  write  before (json.dumps + RotatingFileHandler per event): {legacy_write_s:.2f}s"
+        f"\n         after (writev per {BATCH}-event batch + index): {store_write_s:.2f}s"
+        f"\n  search one user, last 24h ({len(hits)} hits):"
+        f"\n         before (reread JSONL): {legacy_search_s * 1000:.0f}ms"
+        f"\n         after (sidecar index): {warm_search_s * 1000:.1f}ms warm, "
+        f"{cold_search_s * 1000:.1f}ms after restart"
+    )
+
+    # Rotated legacy files are not in write order; compare as sorted ids
+    expected_ids = sorted(e["event_id"] for e in expected)
+    assert [e["event_id"] for e in hits] == expected_ids
+    assert [e["event_id"] for e in cold_hits] == expected_ids
+    assert store_write_s < legacy_write_s
+    assert warm_search_s < 0.1
+    assert cold_search_s < legacy_search_s / 10
@@ -0,0 +1,92 @@
+"""
+Performance tests for the shared cache engine
+
+Times get hits and evicting sets for each policy with the cache full at
+1k, 10k, 100k and 1M entries (capped by AMAS_BENCH_CACHE_MAX_ENTRIES), and
+compares them with PerformanceService's previous list-ordered LRU and
+min()-scan LFU/TTL eviction, whose per-op cost grew with the cache.
+"""
+
+import os
+import random
+import time
+
+import pytest
+
+from amas.utils.cache import CacheEngine
+
+MAX_ENTRIES = int(os.getenv("AMAS_BENCH_CACHE_MAX_ENTRIES", "1000000"))
+SIZES = [size for size in (1_000, 10_000, 100_000, 1_000_000) if size <= MAX_ENTRIES]
+OPS = 20_000
+LEGACY_OPS = 200
+
+
+def _time_ops(get, put, size, ops):
+    rng = random.Random(5)
+    keys = [f"key{rng.randrange(size)}" for _ in range(ops)]
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        if i % 4:
+            get(key)
+        else:
+            put(f"new{size}_{i}", key)
+    return (time.perf_counter() - start) / ops * 1_000_000
+
+
+def _engine_us(policy, size):
+    cache = CacheEngine(policy=policy, max_entries=size, default_ttl=3600)
+    for i in range(size):
+        cache.set(f"key{i}", f"value{i}")
+    return _time_ops(cache.get, cache.set, size, OPS)
+
+
+def _legacy_us(policy, size):
+    """Previous PerformanceService cache bookkeeping"""
+    cache = {f"key{i}": f"value{i}" for i in range(size)}
+    order = list(cache)
+    frequency = dict.fromkeys(cache, 1)
+    created = {key: i for i, key in enumerate(cache)}
+
+    def get(key):
+        if key in cache:
+            if policy == "lru":
+                order.remove(key)
+                order.append(key)
+            return cache[key]
+
+    def put(key, value):
+        if policy == "lru":
+            oldest = order.pop(0)
+        elif policy == "lfu":
+            oldest = min(frequency.keys(), key=lambda k: frequency[k])
+            del frequency[oldest]
+        else:
+            oldest = min(cache.keys(), key=lambda k: created[k])
+        del cache[oldest]
+        cache[key] = value
+        len(str(value))
+        order.append(key)
+        frequency[key] = 1
+        created[key] = len(created)
+
+    return _time_ops(get, put, size, LEGACY_OPS)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.parametrize("policy", ["lru", "lfu", "ttl"])
+def test_per_op_latency_is_flat_in_cache_size(policy):
+    """Test get/set cost does not grow with the number of cached entries"""
+    results = {size: _engine_us(policy, size) for size in SIZES}
+    legacy = {size: _legacy_us(policy, size) for size in SIZES if size <= 100_000}
+
+    print(f"\n{policy.upper()} cache, 3 gets : 1 evicting set (us/op):")
+    for size in SIZES:
+        before = f"{legacy[size]:9.2f}" if size in legacy else "        -"
+        print(f"  {size:>9,} entries: before {before}   after {results[size]:6.2f}")
+
+    # 1000x the entries; what growth remains is CPU cache misses, not work
+    assert results[SIZES[-1]] < 4 * results[SIZES[0]]
+    largest_legacy = max(legacy)
+    if largest_legacy >= 100_000:
+        assert results[largest_legacy] * 10 < legacy[largest_legacy]
@@ -0,0 +1,90 @@
+"""
+Performance tests for collective learning similarity search
+
+Loads AMAS_BENCH_TASK_PATTERNS historical patterns (default 100,000) into
+one task category and times _find_similar_tasks, which
+predict_optimal_agent_combination calls per task creation, against the
+previous loop that rebuilt and compared every pattern's feature vector.
+"""
+
+import os
+import random
+import time
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from amas.intelligence.collective_learning import (
+    CollectiveIntelligenceEngine,
+    CollectiveKnowledge,
+    TaskPattern,
+)
+
+PATTERNS = int(os.getenv("AMAS_BENCH_TASK_PATTERNS", "100000"))
+QUERIES = 20
+TARGETS = ["example.com", "https://github.com/org/repo", "/srv/app", "10.0.0.1", "http://test.com/api"]
+PARAMETERS = [{}, {"depth": "quick"}, {"depth": "comprehensive", "ssl": True}, {"mode": "quick", "a": 1}]
+
+
+def _legacy_find_similar(engine, task_type, target, parameters):
+    current = engine._extract_task_features(task_type, target, parameters)
+    similar = []
+    for knowledge in engine.shared_knowledge.values():
+        if knowledge.category == task_type:
+            for pattern in knowledge.patterns:
+                historical = engine._extract_task_features(
+                    pattern.task_type, pattern.target, pattern.parameters
+                )
+                similarity = engine._calculate_task_similarity(current, historical)
+                if similarity > 0.3:
+                    similar.append((pattern, similarity))
+    similar.sort(key=lambda x: x[1], reverse=True)
+    return similar[:10]
+
+
+def _engine(tmp_path):
+    rng = random.Random(3)
+    engine = CollectiveIntelligenceEngine(knowledge_db_path=str(tmp_path / "knowledge.pkl"))
+    for chunk in range(0, PATTERNS, 1000):
+        patterns = [
+            TaskPattern(
+                task_id=f"t{i}", task_type="security_scan", target=rng.choice(TARGETS) + str(i),
+                parameters=rng.choice(PARAMETERS), agents_used=["security_expert"],
+                execution_time=1.0, success_rate=rng.random(), error_patterns=[],
+                solution_quality=rng.random(), timestamp="", context_hash="",
+            )
+            for i in range(chunk, min(chunk + 1000, PATTERNS))
+        ]
+        engine.shared_knowledge[f"k{chunk}"] = CollectiveKnowledge(
+            knowledge_id=f"k{chunk}", category="security_scan", title="", description="",
+            patterns=patterns, insights=[], effectiveness_score=0.5, usage_count=len(patterns),
+            last_updated="",
+        )
+    engine._rebuild_pattern_features()
+    return engine
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_find_similar_tasks_vectorized(tmp_path):
+    """Test similarity search is a matrix product rather than a Python loop"""
+    engine = _engine(tmp_path)
+    queries = [("security_scan", f"https://site{i}.com/path", {"depth": i}) for i in range(QUERIES)]
+
+    start = time.perf_counter()
+    legacy = [_legacy_find_similar(engine, *query) for query in queries[:2]]
+    legacy_ms = (time.perf_counter() - start) / 2 * 1000
+
+    start = time.perf_counter()
+    found = [await engine._find_similar_tasks(*query) for query in queries]
+    new_ms = (time.perf_counter() - start) / QUERIES * 1000
+
+    print(f"\n_find_similar_tasks over {PATTERNS:,} patterns:")
+    print(f"  before: {legacy_ms:.1f}ms/query")
+    print(f"  after:  {new_ms:.2f}ms/query ({legacy_ms / new_ms:.0f}x)")
+
+    for old, new in zip(legacy, found):
+        assert [round(s, 5) for _, s in new] == [round(s, 5) for _, s in old]
+    assert new_ms * 20 < legacy_ms
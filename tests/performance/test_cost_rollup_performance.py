@@ -0,0 +1,88 @@
+"""
+Performance tests for cost rollups
+
+Records AMAS_BENCH_COST_ENTRIES requests (default 200,000) spread over one
+week and five providers, then times "cost per provider per hour" and a
+week summary with p95 latency from the rollups against scanning the raw
+NDJSON entry log, the only way to answer them before.
+"""
+
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from amas.services.cost_rollup_store import CostRollupStore, _epoch
+from amas.services.cost_tracking_service import CostEntry
+
+ENTRIES = int(os.getenv("AMAS_BENCH_COST_ENTRIES", "200000"))
+WEEK_START = datetime(2026, 3, 2)
+PROVIDERS = ["openai", "anthropic", "deepseek", "glm", "grok"]
+
+
+def _scan_raw(log_dir, start, end):
+    """Group raw entries per provider per hour and take p95 latency by sorting"""
+    cost = defaultdict(float)
+    latencies = []
+    for path in sorted(log_dir.glob("cost-entries-*.ndjson")):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                entry = json.loads(line)
+                if start <= entry["ts"] < end:
+                    cost[(int(entry["ts"] // 3600), entry["provider"])] += entry["cost_usd"]
+                    latencies.append(entry["latency_ms"])
+    latencies.sort()
+    return cost, latencies[int(len(latencies) * 0.95)]
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_range_queries_read_buckets_not_entries(tmp_path):
+    """Test a week of per-provider hourly costs comes from rollups, not a scan"""
+    rng = random.Random(11)
+    store = CostRollupStore(
+        sqlite_path=str(tmp_path / "rollups.db"), log_dir=str(tmp_path),
+        clock=lambda: _epoch(WEEK_START + timedelta(days=7)),
+    )
+    start = time.perf_counter()
+    for i in range(ENTRIES):
+        store.add(CostEntry(
+            request_id=f"r{i}", timestamp=WEEK_START + timedelta(seconds=i * 604800 / ENTRIES),
+            provider=rng.choice(PROVIDERS), model="model", tokens_input=rng.randint(10, 4000),
+            tokens_output=rng.randint(10, 2000), tokens_total=0, cost_usd=rng.random() / 100,
+            latency_ms=rng.lognormvariate(5, 0.7), success=rng.random() > 0.02, user_id=f"u{i % 50}",
+        ))
+        if i % 5000 == 4999:
+            await store.flush()
+    await store.flush()
+    record_us = (time.perf_counter() - start) / ENTRIES * 1_000_000
+
+    week_end = WEEK_START + timedelta(days=7)
+    start = time.perf_counter()
+    raw_cost, raw_p95 = _scan_raw(tmp_path, _epoch(WEEK_START), _epoch(week_end))
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    hourly = await store.query(WEEK_START, week_end, group_by="provider", resolution="hour")
+    hourly_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    summary = await store.summarize(WEEK_START, week_end)
+    summary_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{ENTRIES:,} requests over a week, recorded at {record_us:.1f}us each:")
+    print(f"  before (scan raw log): {scan_ms:.0f}ms")
+    print(f"  after: per provider per hour {hourly_ms:.1f}ms, week summary {summary_ms:.1f}ms")
+
+    assert len(hourly) == len(raw_cost)
+    for rollup in hourly:
+        key = (int(_epoch(rollup.period_start) // 3600), rollup.key)
+        assert rollup.cost_usd == pytest.approx(raw_cost[key])
+    assert summary["all"][0].latency_percentile(95) == pytest.approx(raw_p95, rel=0.1)
+    # Rollup reads depend on the number of buckets, the scan on the number of entries
+    assert summary_ms * 10 < scan_ms
+    await store.close()
@@ -0,0 +1,81 @@
+"""
+Performance tests for the shared embedding service
+
+Simulates AMAS_BENCH_EMBED_REQUESTS concurrent single-text embedding
+requests (default 256, with 25% repeated texts) against a model that, like
+a transformer on CPU, has a fixed per-call overhead plus a per-text cost
+and releases the GIL while it runs. Compares the previous pattern, where
+each caller ran encode() on the event loop one string at a time, with the
+micro-batching service, and reports the worst event-loop stall of each.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.embedding_service import EmbeddingService
+
+REQUESTS = int(os.getenv("AMAS_BENCH_EMBED_REQUESTS", "256"))
+CALL_OVERHEAD_S = 0.004
+PER_TEXT_S = 0.0002
+
+
+class SimulatedModel:
+    def encode(self, texts, convert_to_numpy=True):
+        if isinstance(texts, str):
+            texts = [texts]
+        time.sleep(CALL_OVERHEAD_S + PER_TEXT_S * len(texts))
+        return np.ones((len(texts), 384), dtype=np.float32)
+
+
+async def _run(embed):
+    """Run all requests concurrently; returns (seconds, worst loop stall ms)"""
+    texts = [f"query {i % (REQUESTS * 3 // 4)}" for i in range(REQUESTS)]
+    worst_gap = 0.0
+    done = False
+
+    async def watchdog():
+        nonlocal worst_gap
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst_gap = max(worst_gap, now - last)
+            last = now
+
+    watcher = asyncio.create_task(watchdog())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(embed(text) for text in texts))
+    elapsed = time.perf_counter() - start
+    done = True
+    await watcher
+    return elapsed, worst_gap * 1000
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_batched_embedding_throughput():
+    """Test micro-batching raises throughput and keeps the loop responsive"""
+    model = SimulatedModel()
+
+    async def legacy_embed(text):
+        return model.encode(text, convert_to_numpy=True)
+
+    service = EmbeddingService(model=model, batch_window_ms=2, max_batch_size=64)
+    legacy_s, legacy_stall = asyncio.run(_run(legacy_embed))
+    batched_s, batched_stall = asyncio.run(_run(service.embed))
+    stats = service.get_stats()
+    service.close()
+
+    print(f"\n{REQUESTS} concurrent embedding requests:")
+    print(f"  before: {REQUESTS / legacy_s:,.0f} texts/s, worst loop stall {legacy_stall:.1f}ms")
+    print(f"  after:  {REQUESTS / batched_s:,.0f} texts/s, worst loop stall {batched_stall:.1f}ms "
+          f"({stats['batches']} batches, {stats['deduplicated']} deduplicated)")
+
+    assert legacy_s > batched_s * 3
+    assert batched_stall < legacy_stall
@@ -0,0 +1,112 @@
+"""
+Performance tests for the single-pass PII scanner
+
+Streams a synthetic 100 MB corpus (agent-output style prose with ~1% PII
+tokens) through ``PIIDetector.scan_stream`` in 1 MB chunks, and compares
+throughput on a 2 MB sample against the previous detector loop: one
+``finditer`` per pattern, a full-text ``lower()`` keyword rescan per match
+and a SHA-256 per match. Set AMAS_BENCH_PII_MB to change the corpus size.
+"""
+
+import hashlib
+import os
+import random
+import time
+
+import pytest
+
+from src.amas.governance.data_classifier import PIIDetector
+
+CORPUS_MB = int(os.getenv("AMAS_BENCH_PII_MB", "100"))
+CHUNK_CHARS = 1_000_000
+SAMPLE_CHARS = 2_000_000
+
+WORDS = (
+    "the agent analysis report found network server result value data "
+    "summary request response status contact address number system task "
+    "security scan output completed pending review"
+).split()
+PII = [
+    "alice@example.com", "555-123-4567", "123-45-6789", "4532-1234-5678-9010",
+    "10.0.0.12", "8.8.4.4", "A12345678", "Bearer abcdef123456",
+    "sk-" + "a1" * 24, "(555) 987-6543",
+]
+
+
+def _chunk(rng):
+    parts, size = [], 0
+    while size < CHUNK_CHARS:
+        word = rng.choice(PII) if rng.random() < 0.01 else rng.choice(WORDS)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)
+
+
+def _corpus(total_chars):
+    """Yield the corpus in chunks, never holding all of it"""
+    rng = random.Random(7)
+    pool = [_chunk(rng) for _ in range(8)]
+    produced = 0
+    while produced < total_chars:
+        chunk = pool[rng.randrange(len(pool))]
+        produced += len(chunk)
+        yield chunk
+
+
+def _legacy_detect(detector, text):
+    """The detector loop before the combined scanner"""
+    found = 0
+    for pii_type, patterns in detector.patterns.items():
+        for pattern in patterns:
+            for match in pattern.finditer(text):
+                value = match.group()
+                lowered = text.lower()
+                any(k in lowered for k in detector.context_keywords.get(pii_type, []))
+                hashlib.sha256(value.encode()).hexdigest()
+                found += 1
+    return found
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_single_pass_scanner_on_100mb_corpus():
+    """Test streaming throughput over the corpus and speedup on a sample"""
+    detector = PIIDetector()
+
+    sample = next(_corpus(SAMPLE_CHARS))[:SAMPLE_CHARS // 2] * 2
+    sample_mb = len(sample) / 1e6
+    start = time.perf_counter()
+    legacy_found = _legacy_detect(detector, sample)
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    new_found = len(detector.detect_pii_in_text(sample))
+    new_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed = 0
+    corpus_chars = 0
+
+    def counted(chunks):
+        nonlocal corpus_chars
+        for chunk in chunks:
+            corpus_chars += len(chunk)
+            yield chunk
+
+    for _ in detector.scan_stream(counted(_corpus(CORPUS_MB * 1_000_000))):
+        streamed += 1
+    stream_s = time.perf_counter() - start
+
+    print(
+        f"\nPII scan of {sample_mb:.1f} MB sample:"
+        f"\n  before (per-pattern passes + per-match rescan): {legacy_s:.2f}s, "
+        f"{legacy_found:,} matches ({sample_mb / legacy_s:.2f} MB/s)"
+        f"\n  after (single pass): {new_s:.2f}s, {new_found:,} matches "
+        f"({sample_mb / new_s:.2f} MB/s), {legacy_s / new_s:.0f}x faster"
+        f"\nStreaming {corpus_chars / 1e6:.0f} MB in {CHUNK_CHARS / 1e6:.0f} MB chunks: "
+        f"{stream_s:.1f}s, {streamed:,} detections "
+        f"({corpus_chars / 1e6 / stream_s:.1f} MB/s)"
+    )
+
+    assert new_found > 0
+    assert new_s < legacy_s
+    assert streamed > 0
@@ -0,0 +1,98 @@
+"""
+Performance tests for the shared AI provider transport
+
+Runs a local stub provider and compares a new ``aiohttp.ClientSession`` per
+call (the previous router behaviour) against the pooled transport, reporting
+handshakes avoided and p50/p99 request latency.
+"""
+
+import asyncio
+import statistics
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from amas.ai.provider_transport import ProviderTransport
+
+REQUESTS = 500
+CONCURRENCY = 8
+
+
+@pytest.fixture
+async def stub_provider():
+    async def chat(request):
+        await request.read()
+        await asyncio.sleep(0.001)  # Simulated inference time
+        return web.json_response(
+            {"choices": [{"message": {"content": "ok"}}], "usage": {}}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/v1/chat/completions"
+    await runner.cleanup()
+
+
+async def _run(url, call):
+    latencies = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return REQUESTS / elapsed, statistics.median(latencies), p99
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_pooled_transport_vs_session_per_call(stub_provider):
+    """Test connection reuse and latency against a session per call"""
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+
+    async def session_per_call(url):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, json=payload) as resp:
+                await resp.json()
+
+    transport = ProviderTransport()
+
+    async def pooled(url):
+        async with transport.session.post(url, json=payload) as resp:
+            await resp.json()
+
+    before_rate, before_p50, before_p99 = await _run(stub_provider, session_per_call)
+    after_rate, after_p50, after_p99 = await _run(stub_provider, pooled)
+    stats = transport.get_stats()
+    await transport.close()
+
+    print(
+        f"\nProvider transport before (session per call): {before_rate:,.0f} req/s, "
+        f"p50={before_p50:.2f}ms p99={before_p99:.2f}ms, "
+        f"{REQUESTS} connections"
+        f"\nProvider transport after (pooled): {after_rate:,.0f} req/s, "
+        f"p50={after_p50:.2f}ms p99={after_p99:.2f}ms, "
+        f"{stats['connections_created']} connections, "
+        f"{stats['handshakes_avoided']} handshakes avoided"
+    )
+
+    assert stats["requests"] == REQUESTS
+    assert stats["connections_created"] <= CONCURRENCY
+    assert stats["handshakes_avoided"] >= REQUESTS - CONCURRENCY
+    assert after_p50 < before_p50
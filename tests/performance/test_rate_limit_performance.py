@@ -0,0 +1,175 @@
+"""
+Microbenchmark for the shared rate limiting primitives
+
+Drives one client at 10,000 requests/second of simulated time and measures
+the per-request cost once 1k, 10k and 100k requests are inside the window.
+The previous limiters rescanned their timestamps on every request: the
+middleware summed a deque twice and RateLimitingService's memory mode
+rebuilt a list per window, so their cost grows with the window contents.
+Also times the real limiters built on the primitives, and compares the
+Redis limiter's per-key storage and round trips with the sorted-set
+pipeline it replaced (against fakeredis when installed).
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import pytest
+
+from amas.utils.rate_limit import GCRABucket, SlidingWindowCounter, SlidingWindowQuota
+
+RPS = 10_000
+FILL_LEVELS = (1_000, 10_000, 100_000)
+SAMPLE = 2_000
+UNLIMITED = (10**9, 10**9, 10**9)
+
+
+def _legacy_middleware_check(requests, now):
+    while requests and requests[0] < now - 60:
+        requests.popleft()
+    requests.append(now)
+    minute = sum(1 for t in requests if now - t < 60)
+    hour = sum(1 for t in requests if now - t < 3600)
+    return minute, hour
+
+
+def _legacy_service_check(windows, now):
+    for name, seconds in (("minute", 60), ("hour", 3600), ("day", 86400)):
+        window = windows[name]
+        window[:] = [t for t in window if now - t < seconds]
+        window.append(now)
+
+
+def _per_request_us(step, start, count):
+    began = time.perf_counter()
+    for i in range(count):
+        step(start + i / RPS)
+    return (time.perf_counter() - began) / count * 1e6
+
+
+async def _real_limiters_us(tmp_path):
+    """Per-call cost of the limiters built on the primitives, one hot client"""
+    from amas.core.tool_governance.tool_registry import ToolPermissionsEngine, ToolRegistry
+    from amas.services.rate_limiting_service import RateLimitConfig, RateLimitingService
+
+    service = RateLimitingService(default_config=RateLimitConfig(*UNLIMITED))
+    began = time.perf_counter()
+    for _ in range(SAMPLE):
+        await service._check_memory_rate_limit("hot", "default", service.default_config)
+    service_us = (time.perf_counter() - began) / SAMPLE * 1e6
+
+    engine = ToolPermissionsEngine(ToolRegistry(str(tmp_path / "tools.yaml")), str(tmp_path / "none.yaml"))
+    began = time.perf_counter()
+    for _ in range(SAMPLE):
+        await engine._check_rate_limit("agent", "web_search", 10**9)
+    governance_us = (time.perf_counter() - began) / SAMPLE * 1e6
+    return service_us, governance_us
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_constant_cost_at_10k_rps_per_client(tmp_path):
+    """Test per-request cost stays flat as the window fills"""
+    rows = []
+    for fill in FILL_LEVELS:
+        prefill = [i / RPS for i in range(fill)]
+        start = fill / RPS
+
+        requests = deque(prefill)
+        legacy_middleware = _per_request_us(lambda now: _legacy_middleware_check(requests, now), start, 200)
+
+        windows = {"minute": list(prefill), "hour": list(prefill), "day": list(prefill)}
+        legacy_service = _per_request_us(lambda now: _legacy_service_check(windows, now), start, 50)
+
+        quota = SlidingWindowQuota([60, 3600, 86400])
+        minute, hour = SlidingWindowCounter(60), SlidingWindowCounter(3600)
+        burst = GCRABucket(RPS * 2, RPS * 2)
+        for t in prefill:
+            quota.acquire(t, UNLIMITED)
+            minute.add(t)
+            hour.add(t)
+
+        def middleware_step(now):
+            minute.count(now)
+            hour.count(now)
+            burst.consume(now)
+            minute.add(now)
+            hour.add(now)
+
+        new_service = _per_request_us(lambda now: quota.acquire(now, UNLIMITED), start, SAMPLE)
+        new_middleware = _per_request_us(middleware_step, start, SAMPLE)
+        rows.append((fill, legacy_middleware, legacy_service, new_middleware, new_service))
+
+    service_us, governance_us = asyncio.run(_real_limiters_us(tmp_path))
+
+    print(f"\nPer-request cost at {RPS:,} rps for one client (us):")
+    print(f"  {'in window':>10} {'middleware before':>18} {'after':>8} {'service before':>15} {'after':>8}")
+    for fill, lm, ls, nm, ns in rows:
+        print(f"  {fill:>10,} {lm:>18.1f} {nm:>8.2f} {ls:>15.1f} {ns:>8.2f}")
+    print(f"  real limiters (wall clock): RateLimitingService memory mode {service_us:.1f}us, "
+          f"tool governance {governance_us:.1f}us")
+
+    first, last = rows[0], rows[-1]
+    assert last[3] < first[3] * 3
+    assert last[4] < first[4] * 3
+    assert last[1] > last[3] * 50
+    assert last[2] > last[4] * 50
+
+
+async def _legacy_redis_check(client, key_prefix, now, limits):
+    """Sorted-set pipeline the Redis limiter used: returns round trips"""
+    windows = [("minute", 60), ("hour", 3600), ("day", 86400)]
+    async with client.pipeline() as pipe:
+        for name, seconds in windows:
+            key = f"{key_prefix}:{name}"
+            pipe.zremrangebyscore(key, 0, now - seconds)
+            pipe.zcard(key)
+            pipe.zadd(key, {str(now): now})
+            pipe.expire(key, seconds)
+        results = await pipe.execute()
+    for i, ((name, _), limit) in enumerate(zip(windows, limits)):
+        if results[1 + i * 4] >= limit:
+            await client.zrange(f"{key_prefix}:{name}", 0, 0, withscores=True)
+            return 2
+    return 1
+
+
+async def _redis_limiters(requests):
+    import fakeredis
+
+    from amas.services.rate_limiting_service import RateLimitConfig, RateLimitingService
+
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    limits = (requests // 2, 10**9, 10**9)  # Second half of the traffic is denied
+    round_trips = 0
+    for i in range(requests):
+        round_trips += await _legacy_redis_check(client, "legacy", i / RPS, limits)
+    legacy_members = sum([await client.zcard(f"legacy:{name}") for name in ("minute", "hour", "day")])
+
+    service = RateLimitingService(default_config=RateLimitConfig(*limits))
+    service.redis_client = client
+    began = time.perf_counter()
+    for _ in range(requests):
+        await service.check_rate_limit("heavy")
+    script_us = (time.perf_counter() - began) / requests * 1e6
+    script_fields = await client.hlen(service._redis_key("heavy", "default"))
+    return round_trips / requests, legacy_members, script_fields, script_us
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_redis_limiter_storage_and_round_trips():
+    """Test the scripted Redis limiter keeps O(1) state and one round trip"""
+    pytest.importorskip("lupa")
+    pytest.importorskip("fakeredis")
+    requests = 4_000
+
+    legacy_trips, legacy_members, script_fields, script_us = asyncio.run(_redis_limiters(requests))
+
+    print(f"\nRedis limiter, {requests:,} requests from one user (half denied):")
+    print(f"  before: {legacy_trips:.2f} round trips/check, {legacy_members:,} sorted-set members")
+    print(f"  after:  1 round trip/check, {script_fields} hash fields ({script_us:.0f}us/check on fakeredis)")
+
+    assert legacy_members == 3 * requests  # Denied requests were stored too
+    assert script_fields == 9
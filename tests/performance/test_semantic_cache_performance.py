@@ -0,0 +1,60 @@
+"""
+Performance tests for the semantic cache vector index
+
+Measures lookup latency and recall once a partition has switched to IVF
+search. Run with AMAS_BENCH_ENTRIES=100000 to reproduce the 100k-entry
+target.
+"""
+
+import os
+import statistics
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.semantic_cache_index import SemanticCacheIndex
+
+ENTRIES = int(os.getenv("AMAS_BENCH_ENTRIES", "30000"))
+DIMENSION = 384
+QUERIES = 200
+LOOKUP_P95_TARGET = 0.005  # 5ms, generous for shared CI runners
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_semantic_index_lookup_latency():
+    """Test top-k lookup latency and recall over a large partition"""
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((ENTRIES // 50, DIMENSION)).astype(np.float32)
+    vectors = centers[rng.integers(0, centers.shape[0], ENTRIES)]
+    vectors += 0.5 * rng.standard_normal((ENTRIES, DIMENSION)).astype(np.float32)
+
+    index = SemanticCacheIndex(
+        max_entries_per_partition=ENTRIES,
+        ivf_threshold=min(20_000, ENTRIES // 2),
+    )
+    for i, vector in enumerate(vectors):
+        index.add(f"amas:semantic:{i}", vector)
+    assert index.get_stats()["ivf_partitions"] == 1
+
+    latencies = []
+    hits = 0
+    for target in rng.integers(0, ENTRIES, QUERIES):
+        query = vectors[target] + 0.05 * rng.standard_normal(DIMENSION)
+        start = time.perf_counter()
+        results = index.search(query, top_k=5, threshold=0.85)
+        latencies.append(time.perf_counter() - start)
+        hits += bool(results) and results[0][0] == f"amas:semantic:{target}"
+
+    p50 = statistics.median(latencies)
+    p95 = statistics.quantiles(latencies, n=20)[18]
+    print(
+        f"\nSemantic index: {ENTRIES} entries, "
+        f"p50={p50 * 1000:.3f}ms p95={p95 * 1000:.3f}ms "
+        f"recall@1={hits / QUERIES:.2%}"
+    )
+
+    assert p95 < LOOKUP_P95_TARGET
+    assert hits / QUERIES >= 0.95
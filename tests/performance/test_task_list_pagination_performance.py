@@ -0,0 +1,103 @@
+"""
+Performance tests for GET /tasks pagination
+
+Loads 1M task rows into SQLite (standing in for PostgreSQL) with the
+(created_at, id) index from migration 005, then compares page 1000 fetched
+with OFFSET (the previous query shape) against the keyset cursor query that
+``list_tasks`` now builds. Set AMAS_BENCH_TASK_ROWS to change the row count.
+"""
+
+import os
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.api.routes.tasks_integrated import (
+    _build_task_list_query,
+    _decode_task_cursor,
+    _encode_task_cursor,
+)
+
+ROWS = int(os.getenv("AMAS_BENCH_TASK_ROWS", "1000000"))
+PAGE_SIZE = 100
+PAGE = 1000
+RUNS = 5
+
+
+@pytest.fixture(scope="module")
+def tasks_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, description TEXT, "
+        "status TEXT, priority INTEGER, created_at TIMESTAMP, completed_at TIMESTAMP, "
+        "result TEXT)"
+    )
+    base = datetime(2025, 1, 1)
+    result = '{"summary": "done", "output": {"agent_results": {}}}' + " " * 2000
+    conn.executemany(
+        "INSERT INTO tasks VALUES (?, ?, '', ?, 5, ?, NULL, ?)",
+        (
+            (i, f"task {i}", ("pending", "completed")[i % 2],
+             (base + timedelta(seconds=i // 3)).isoformat(" "), result)
+            for i in range(1, ROWS + 1)
+        ),
+    )
+    conn.execute("CREATE INDEX ix_tasks_created_at_id ON tasks (created_at, id)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _timed(conn, query, params):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        rows = conn.execute(query, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return rows, statistics.median(timings)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_page_1000_offset_vs_keyset(tasks_db):
+    """Test keyset page 1000 is faster than OFFSET and returns the same rows"""
+    offset = (PAGE - 1) * PAGE_SIZE
+    if offset >= ROWS:
+        pytest.skip("AMAS_BENCH_TASK_ROWS too small for page 1000")
+
+    # Previous query shape: every list column, OFFSET into the sorted table
+    # (id tie-breaker added so both queries define the same page)
+    old_rows, offset_ms = _timed(
+        tasks_db,
+        "SELECT id, title, description, status, priority, created_at, completed_at, "
+        "NULL AS result FROM tasks ORDER BY created_at DESC, id DESC "
+        "LIMIT :limit OFFSET :offset",
+        {"limit": PAGE_SIZE, "offset": offset},
+    )
+
+    # Cursor as page 999 would have returned it
+    last = tasks_db.execute(
+        "SELECT created_at, id FROM tasks ORDER BY created_at DESC, id DESC "
+        "LIMIT 1 OFFSET :offset",
+        {"offset": offset - 1},
+    ).fetchone()
+    cursor = _decode_task_cursor(_encode_task_cursor(last[0], last[1]))
+    cursor = (cursor[0].isoformat(" "), cursor[1])
+
+    fields = {"id", "title", "status", "created_at"}
+    query, params = _build_task_list_query(fields, None, PAGE_SIZE, cursor=cursor)
+    new_rows, keyset_ms = _timed(tasks_db, query, params)
+    new_rows = new_rows[:PAGE_SIZE]
+
+    print(
+        f"\nGET /tasks page {PAGE} of {ROWS:,} rows ({PAGE_SIZE}/page):"
+        f"\n  before (OFFSET {offset:,}): {offset_ms:.2f}ms"
+        f"\n  after (keyset cursor, fields={','.join(sorted(fields))}): {keyset_ms:.2f}ms"
+        f"\n  speedup: {offset_ms / keyset_ms:.0f}x"
+    )
+
+    assert [r[0] for r in new_rows] == [r[0] for r in old_rows]
+    assert keyset_ms < offset_ms
@@ -200,8 +200,8 @@ class TestAPIPerformance:
             with patch('src.api.routes.tasks_integrated.get_redis', return_value=mock_redis):
                 with patch('src.api.routes.tasks_integrated.get_current_user_optional', return_value=mock_user):
                     # Mock memory cache first (fastest path)
-                    from src.api.routes.tasks_integrated import _recently_accessed_tasks, _recently_accessed_tasks_timestamps
-                    _recently_accessed_tasks["task1"] = {
+                    from src.amas.services.task_cache_service import get_task_cache_service
+                    await get_task_cache_service().cache_task("task1", {
                         "id": "task1",
                         "task_id": "task1",
                         "title": "Test Task",
@@ -212,8 +212,7 @@ class TestAPIPerformance:
                         "priority": 5,
                         "created_at": "2025-01-21T12:00:00",
                         "created_by": "user1"
-                    }
-                    _recently_accessed_tasks_timestamps["task1"] = time.time()
+                    })
                     
                     # Measure performance
                     times = []
@@ -0,0 +1,133 @@
+"""
+Performance tests for the two-level task cache
+
+Fills Redis with AMAS_BENCH_CACHED_TASKS task entries (default 20,000) plus
+a page of list entries and compares invalidating the lists with the
+previous SCAN + DEL pattern against TieredCache's single INCR, then
+compares L1 and L2 read latency. Also sends AMAS_BENCH_HERD_CALLERS
+concurrent requests (default 200) at a cold statistics key, spread over
+two replicas, with and without miss coalescing.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from amas.services.tiered_cache import TieredCache
+
+CACHED_TASKS = int(os.getenv("AMAS_BENCH_CACHED_TASKS", "20000"))
+LIST_PAGES = 50
+READS = 2000
+HERD_CALLERS = int(os.getenv("AMAS_BENCH_HERD_CALLERS", "200"))
+QUERY_SECONDS = 0.05
+
+
+async def _legacy_invalidate(redis):
+    """Previous TaskCacheService._invalidate_task_lists"""
+    for pattern in ("amas:task:list:*", "amas:task:stats:*"):
+        cursor = 0
+        while True:
+            cursor, keys = await redis.scan(cursor, match=pattern, count=100)
+            if keys:
+                await redis.delete(*keys)
+            if cursor == 0:
+                break
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_group_invalidation_does_not_scan():
+    """Test list invalidation cost is independent of the number of cached keys"""
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    cache = TieredCache("amas:task", redis=redis)
+    pipe = redis.pipeline()
+    for i in range(CACHED_TASKS):
+        pipe.setex(f"amas:task:detail:{i}", 600, "{}")
+    await pipe.execute()
+
+    for page in range(LIST_PAGES):
+        await redis.setex(f"amas:task:list:status:pending:20:{page * 20}", 600, "[]")
+    start = time.perf_counter()
+    await _legacy_invalidate(redis)
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    for page in range(LIST_PAGES):
+        await cache.set(f"list:status:pending:20:{page * 20}", [], ttl=600, group="lists")
+    start = time.perf_counter()
+    await cache.invalidate("lists")
+    new_ms = (time.perf_counter() - start) * 1000
+
+    for page in range(LIST_PAGES):
+        await cache.set(f"detail:{page}", {"id": page}, ttl=600)
+    start = time.perf_counter()
+    for i in range(READS):
+        await cache.get(f"detail:{i % LIST_PAGES}")
+    l1_us = (time.perf_counter() - start) / READS * 1_000_000
+    start = time.perf_counter()
+    for i in range(READS):
+        cache.l1.clear()
+        await cache.get(f"detail:{i % LIST_PAGES}")
+    l2_us = (time.perf_counter() - start) / READS * 1_000_000
+
+    print(f"\nList invalidation with {CACHED_TASKS:,} cached tasks:")
+    print(f"  before (SCAN + DEL): {legacy_ms:.2f}ms")
+    print(f"  after (INCR):        {new_ms:.2f}ms")
+    print(f"Task read: L1 {l1_us:.1f}us, L2 {l2_us:.1f}us")
+
+    await cache.close()
+    await redis.aclose()
+    assert new_ms * 10 < legacy_ms
+    assert l1_us < l2_us
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_cold_key_herd_runs_one_query():
+    """Test a burst of misses on one key runs the expensive query once"""
+    server = fakeredis.FakeServer()
+    clients = [fakeredis.aioredis.FakeRedis(server=server, decode_responses=True) for _ in range(2)]
+    replicas = [TieredCache("amas:task", redis=client) for client in clients]
+    queries = {"legacy": 0, "coalesced": 0}
+
+    def statistics_query(label):
+        async def query():
+            queries[label] += 1
+            await asyncio.sleep(QUERY_SECONDS)
+            return {"total_tasks": 1000}
+        return query
+
+    async def legacy_get(cache):
+        """Previous read-through: check the cache, else query and store"""
+        cached = await cache.redis.get("amas:task:stats:legacy")
+        if cached:
+            return cached
+        value = await statistics_query("legacy")()
+        await cache.redis.setex("amas:task:stats:legacy", 300, str(value))
+        return value
+
+    start = time.perf_counter()
+    await asyncio.gather(*(legacy_get(replicas[i % 2]) for i in range(HERD_CALLERS)))
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        replicas[i % 2].get_or_load("stats:global", statistics_query("coalesced"), 300, lock=True)
+        for i in range(HERD_CALLERS)
+    ))
+    coalesced_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{HERD_CALLERS} concurrent misses on a cold key across 2 replicas:")
+    print(f"  before: {queries['legacy']} queries, {legacy_ms:.0f}ms")
+    print(f"  after:  {queries['coalesced']} query, {coalesced_ms:.0f}ms")
+
+    for cache, client in zip(replicas, clients):
+        await cache.close()
+        await client.aclose()
+    assert queries["legacy"] == HERD_CALLERS
+    assert queries["coalesced"] == 1
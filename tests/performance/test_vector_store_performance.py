@@ -0,0 +1,90 @@
+"""
+Performance tests for VectorService append-log persistence
+
+Ingests AMAS_BENCH_VECTOR_DOCS documents (default 50,000; 384-dim float32)
+in batches of 100 through VectorStore and times a batch at several corpus
+sizes against the previous save path, which rewrote the full index and an
+indented JSON dump of all metadata after every batch (the index write is
+modelled with numpy.save of the full matrix, as FAISS is optional). Also
+compares cold-start time.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.vector_store import VectorStore
+
+DOCS = int(os.getenv("AMAS_BENCH_VECTOR_DOCS", "50000"))
+DIM = 384
+BATCH = 100
+
+
+def _batch(start):
+    rng = np.random.default_rng(start)
+    vectors = rng.standard_normal((BATCH, DIM), dtype=np.float32)
+    docs = [
+        {"id": f"doc_{i}", "content": f"OSINT report {i} " * 8, "metadata": {"source": "feed", "n": i}}
+        for i in range(start, start + BATCH)
+    ]
+    return vectors, docs
+
+
+def _legacy_save(path, vectors, metadata):
+    np.save(os.path.join(path, "faiss_index.npy"), vectors)
+    with open(os.path.join(path, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_constant_cost_ingestion_and_cold_start(tmp_path):
+    """Test per-batch persistence cost does not grow with the corpus"""
+    store_dir, legacy_dir = tmp_path / "store", tmp_path / "legacy"
+    legacy_dir.mkdir()
+    store = VectorStore(str(store_dir))
+    store.open()
+
+    checkpoints = {DOCS // 10, DOCS // 2, DOCS}
+    all_vectors, metadata, rows_out = [], [], []
+    for start in range(0, DOCS, BATCH):
+        vectors, docs = _batch(start)
+        began = time.perf_counter()
+        store.append(store.allocate_rows(BATCH), vectors, docs)
+        append_ms = (time.perf_counter() - began) * 1000
+
+        all_vectors.append(vectors)
+        metadata.extend({**doc, "index": start + i} for i, doc in enumerate(docs))
+        if start + BATCH in checkpoints:
+            began = time.perf_counter()
+            _legacy_save(str(legacy_dir), np.concatenate(all_vectors), metadata)
+            legacy_ms = (time.perf_counter() - began) * 1000
+            rows_out.append((start + BATCH, legacy_ms, append_ms))
+    store.close()
+
+    began = time.perf_counter()
+    np.load(os.path.join(legacy_dir, "faiss_index.npy"))
+    with open(os.path.join(legacy_dir, "metadata.json")) as f:
+        json.load(f)
+    legacy_cold_ms = (time.perf_counter() - began) * 1000
+
+    began = time.perf_counter()
+    store = VectorStore(str(store_dir))
+    _, records = store.open()
+    replayed = sum(len(rows) for _, rows, _ in records)
+    store_cold_ms = (time.perf_counter() - began) * 1000
+    store.close()
+
+    print(f"\nPersisting one {BATCH}-document batch ({DIM}-dim):")
+    for corpus, legacy_ms, append_ms in rows_out:
+        print(f"  at {corpus:>9,} docs: before {legacy_ms:8.1f}ms, after {append_ms:.2f}ms")
+    print(f"  cold start with {DOCS:,} docs: before {legacy_cold_ms:.0f}ms, "
+          f"after {store_cold_ms:.0f}ms (log replay, metadata left in SQLite)")
+
+    assert replayed == DOCS
+    assert rows_out[-1][2] < rows_out[-1][1] / 20
+    assert rows_out[-1][2] < max(rows_out[0][2] * 5, 5.0)
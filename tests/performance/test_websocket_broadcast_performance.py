@@ -0,0 +1,104 @@
+"""
+Load tests for WebSocket broadcast fan-out
+
+Simulates 5,000 connected sockets, a handful of which are slow consumers
+(100ms per send), and measures how long a burst of task_progress broadcasts
+takes to reach every healthy client with the previous sequential
+``send_json`` loop versus the per-connection writer queues.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.api.websocket import ConnectionManager
+
+SOCKETS = 5000
+SLOW_SOCKETS = 5
+SLOW_SEND_S = 0.1
+MESSAGES = 10
+
+
+class SimulatedSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data))
+
+
+def _sockets():
+    return [SimulatedSocket(SLOW_SEND_S if i < SLOW_SOCKETS else 0.0) for i in range(SOCKETS)]
+
+
+def _message(i):
+    return {
+        "event": "task_progress",
+        "task_id": f"task_{i}",
+        "progress": i,
+        "current_step": "analysing results",
+        "agent_activity": {f"agent_{a}": {"status": "running", "tokens": 1000 + a} for a in range(8)},
+    }
+
+
+async def _until_delivered(sockets, count):
+    while any(s.received < count for s in sockets):
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_broadcast_5000_sockets_with_slow_consumers():
+    """Test healthy clients are not held back by slow ones"""
+    # Before: one awaited send_json per connection, per message
+    sockets = _sockets()
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        for socket in sockets:
+            await socket.send_json(_message(i))
+    legacy_s = time.perf_counter() - start
+
+    # After: serialize once, queue per connection, writers drain concurrently
+    manager = ConnectionManager(max_queue=64, slow_consumer_policy="coalesce")
+    sockets = _sockets()
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, f"ws_{i}")
+    healthy = sockets[SLOW_SOCKETS:]
+
+    call_times = []
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        call_start = time.perf_counter()
+        await manager.broadcast(_message(i))
+        call_times.append(time.perf_counter() - call_start)
+        await asyncio.sleep(0)
+    await _until_delivered(healthy, MESSAGES)
+    fanout_s = time.perf_counter() - start
+
+    for i in range(SOCKETS):
+        manager.disconnect(f"ws_{i}")
+
+    print(
+        f"\nBroadcast of {MESSAGES} task_progress events to {SOCKETS:,} sockets "
+        f"({SLOW_SOCKETS} slow at {SLOW_SEND_S * 1000:.0f}ms/send):"
+        f"\n  before (sequential send_json): {legacy_s:.2f}s"
+        f"\n  after (per-connection queues): {fanout_s:.2f}s until all healthy "
+        f"clients received every event, broadcast() call max {max(call_times) * 1000:.1f}ms"
+        f"\n  speedup: {legacy_s / fanout_s:.1f}x"
+    )
+
+    assert all(s.received == MESSAGES for s in healthy)
+    assert fanout_s < legacy_s
+    assert fanout_s < SLOW_SOCKETS * SLOW_SEND_S * MESSAGES
@@ -84,6 +84,96 @@ class TestPIIDetection:
         assert len(phone_detections) > 0
 
 
+class TestSinglePassScanner:
+    """Test the combined single-pass PII scanner"""
+
+    TEXT = (
+        "Email john@example.com, phone 555-123-4567, SSN 123-45-6789, "
+        "card 4532-1234-5678-9010, host 8.8.8.8, passport A12345678"
+    )
+
+    def test_matches_each_value_once_in_text_order(self):
+        """Test overlapping patterns report a value once, under the first type"""
+        detector = PIIDetector()
+        detections = detector.detect_pii_in_text(self.TEXT)
+
+        assert [(d.pii_type, d.original_value) for d in detections] == [
+            (PIIType.EMAIL, "john@example.com"),
+            (PIIType.PHONE, "555-123-4567"),
+            (PIIType.SSN, "123-45-6789"),
+            (PIIType.CREDIT_CARD, "4532-1234-5678-9010"),
+            (PIIType.IP_ADDRESS, "8.8.8.8"),
+            (PIIType.PASSPORT, "A12345678"),
+        ]
+        # Every value is also found by the individual patterns
+        for d in detections:
+            assert any(
+                p.fullmatch(d.original_value) for p in detector.patterns[d.pii_type]
+            )
+
+    def test_same_span_goes_to_first_listed_pattern(self):
+        """Test a span several types match is reported once, by table order"""
+        detector = PIIDetector()
+        assert detector.patterns[PIIType.DRIVER_LICENSE][1].fullmatch("A12345678")
+
+        detections = detector.detect_pii_in_text("id A12345678")
+        assert [(d.pii_type, d.original_value) for d in detections] == [
+            (PIIType.PASSPORT, "A12345678")
+        ]
+
+        # Listing driver's licenses first hands them the same span
+        detector.patterns = {
+            PIIType.DRIVER_LICENSE: detector.patterns[PIIType.DRIVER_LICENSE],
+            PIIType.PASSPORT: detector.patterns[PIIType.PASSPORT],
+        }
+        detector._build_scanner()
+        detections = detector.detect_pii_in_text("id A12345678")
+        assert [d.pii_type for d in detections] == [PIIType.DRIVER_LICENSE]
+
+    def test_min_confidence_skips_hashing(self, monkeypatch):
+        """Test only matches above min_confidence are hashed"""
+        import src.amas.governance.data_classifier as module
+
+        detector = PIIDetector()
+        hashed = []
+        real_sha256 = module.hashlib.sha256
+        monkeypatch.setattr(
+            module.hashlib, "sha256", lambda data: hashed.append(data) or real_sha256(data)
+        )
+
+        detections = detector.detect_pii_in_text(self.TEXT, min_confidence=0.9)
+
+        assert {d.pii_type for d in detections} == {
+            PIIType.EMAIL, PIIType.PHONE, PIIType.SSN, PIIType.CREDIT_CARD
+        }
+        assert len(hashed) == len(detections)
+
+    def test_context_window(self):
+        """Test context keywords can be limited to a window around the match"""
+        detector = PIIDetector()
+        text = "phone list" + " " * 200 + "555-123-4567"
+
+        anywhere = detector.detect_pii_in_text(text)
+        nearby = detector.detect_pii_in_text(text, context_window=50)
+
+        assert anywhere[0].confidence == 0.9
+        assert nearby[0].confidence == 0.7
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 10_000])
+    def test_stream_matches_whole_text(self, chunk_size):
+        """Test chunked scanning finds the same PII at the same positions"""
+        detector = PIIDetector()
+        text = (self.TEXT + " filler words here ") * 5
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+        streamed = list(detector.scan_stream(chunks, overlap=64))
+        whole = detector.detect_pii_in_text(text)
+
+        assert [(d.pii_type, d.location, d.confidence) for d in streamed] == [
+            (d.pii_type, d.location, d.confidence) for d in whole
+        ]
+
+
 class TestDataClassification:
     """Test data classification capabilities"""
     
@@ -0,0 +1,94 @@
+"""
+Unit tests for AgentCommunicationBus delivery
+
+Tests event-driven delivery, recipient wake-ups and the retry delay queue.
+"""
+
+import asyncio
+
+import pytest
+
+from amas.orchestration.agent_communication import (
+    AgentCommunicationBus,
+    MessageType,
+)
+
+
+@pytest.fixture
+async def bus():
+    bus = AgentCommunicationBus()
+    yield bus
+    for task in asyncio.all_tasks():
+        if task.get_coro().__qualname__.startswith("AgentCommunicationBus."):
+            task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_message_delivered_without_polling_delay(bus):
+    """Test a sent message reaches the recipient queue immediately"""
+    await bus.send_message(
+        "agent_a", "agent_b", MessageType.SHARE_FINDINGS, {"n": 1}
+    )
+
+    messages = await bus.wait_for_messages("agent_b", timeout=0.05)
+
+    assert [m.payload["n"] for m in messages] == [1]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_messages_wakes_on_delivery(bus):
+    """Test a waiting recipient wakes as soon as a message arrives"""
+    waiter = asyncio.create_task(bus.wait_for_messages("agent_b", timeout=1.0))
+    await asyncio.sleep(0)
+
+    await bus.send_message(
+        "agent_a", "agent_b", MessageType.SHARE_CONTEXT, {"n": 2}
+    )
+    messages = await asyncio.wait_for(waiter, timeout=0.1)
+
+    assert [m.payload["n"] for m in messages] == [2]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_messages_times_out(bus):
+    """Test waiting without deliveries returns an empty list"""
+    assert await bus.wait_for_messages("agent_b", timeout=0.01) == []
+
+
+@pytest.mark.asyncio
+async def test_batch_is_drained_in_one_tick(bus):
+    """Test many queued messages are delivered without per-message sleeps"""
+    for i in range(500):
+        await bus.send_message(
+            "agent_a", "agent_b", MessageType.SHARE_FINDINGS, {"n": i}
+        )
+
+    await asyncio.sleep(0.05)
+
+    assert len(bus.message_queues["agent_b"]) == 500
+    metrics = await bus.get_communication_metrics()
+    assert metrics["pending_deliveries"] == 0
+    assert metrics["p99_delivery_latency_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_does_not_block_healthy_messages(bus):
+    """Test a failing delivery is scheduled for retry off the hot path"""
+    deliver = bus._deliver_message
+
+    async def flaky_deliver(message):
+        if message.recipient_agent_id == "broken":
+            return False
+        return await deliver(message)
+
+    bus._deliver_message = flaky_deliver
+
+    await bus.send_message("agent_a", "broken", MessageType.SHARE_FINDINGS, {})
+    await bus.send_message(
+        "agent_a", "agent_b", MessageType.SHARE_FINDINGS, {"n": 3}
+    )
+    messages = await bus.wait_for_messages("agent_b", timeout=0.1)
+
+    assert [m.payload["n"] for m in messages] == [3]
+    assert len(bus._retry_heap) == 1
+    assert bus._retry_heap[0][2].delivery_attempts == 1
@@ -0,0 +1,169 @@
+"""
+Unit tests for the audit segment store
+
+Tests indexed search, batched writes with grouped fsync, segment rotation,
+restart recovery, retention and search_audit_logs over flushed history.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.amas.security.audit import segment_store
+from src.amas.security.audit.audit_logger import AuditLogger, AuditStatus
+from src.amas.security.audit.segment_store import AuditSegmentStore
+
+
+def _record(i, hours_ago=0.0, **overrides):
+    record = {
+        "event_id": f"e{i}",
+        "timestamp": (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).isoformat(),
+        "event_type": "tool_usage" if i % 2 else "data_access",
+        "user_id": f"user{i % 3}",
+        "agent_id": f"agent{i % 5}",
+    }
+    record.update(overrides)
+    return record
+
+
+def test_search_filters_and_time_range(tmp_path):
+    """Test postings intersect and old rows are excluded by timestamp"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl")
+    store.append([_record(i, hours_ago=48 if i < 10 else 0) for i in range(60)])
+
+    since = time.time() - 3600
+    hits = store.search(since=since, user_id="user1", event_type="tool_usage")
+
+    expected = [f"e{i}" for i in range(10, 60) if i % 3 == 1 and i % 2]
+    assert [r["event_id"] for r in hits] == expected
+    assert len(store.search(agent_id="agent0")) == 12
+    assert store.search(user_id="nobody") == []
+    assert len(store.search(limit=5)) == 5
+
+
+def test_batch_is_one_writev_and_one_fsync(tmp_path, monkeypatch):
+    """Test a flush costs one vectored write and one fsync, not one per event"""
+    calls = {"writev": 0, "fsync": 0}
+    writev, fsync = os.writev, os.fsync
+    monkeypatch.setattr(os, "writev", lambda fd, b: calls.__setitem__("writev", calls["writev"] + 1) or writev(fd, b))
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.__setitem__("fsync", calls["fsync"] + 1) or fsync(fd))
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", fsync=True)
+
+    store.append([_record(i) for i in range(500)])
+
+    assert calls == {"writev": 1, "fsync": 1}
+    assert len((tmp_path / "audit.jsonl").read_text().splitlines()) == 500
+
+
+def test_rotation_by_size_and_partition(tmp_path):
+    """Test sealed segments get partition names and sidecars and stay searchable"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", max_segment_bytes=1000)
+    for batch in range(4):
+        store.append([_record(batch * 10 + i) for i in range(10)])
+    store._head_partition = "20000101"  # As if the day rolled over
+    store.append([_record(40)])
+
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    sealed = sorted(p.name for p in tmp_path.glob("audit.*.jsonl"))
+    assert sealed == ["audit.20000101.0001.jsonl", f"audit.{today}.0001.jsonl",
+                      f"audit.{today}.0002.jsonl", f"audit.{today}.0003.jsonl"]
+    assert all((tmp_path / name).with_suffix(".idx").exists() for name in sealed)
+    assert len(store.search()) == 41
+
+
+def test_reopen_uses_sidecars_and_recovers_torn_head(tmp_path, monkeypatch):
+    """Test restart loads sealed indexes from disk and drops a partial line"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", max_segment_bytes=1000)
+    for batch in range(3):
+        store.append([_record(batch * 10 + i) for i in range(10)])
+    store.close()
+    with open(tmp_path / "audit.jsonl", "ab") as f:
+        f.write(b'{"event_id": "torn"')
+
+    def no_scan(path):
+        raise AssertionError(f"rescanned {path}")
+
+    reopened = AuditSegmentStore(tmp_path / "audit.jsonl", max_segment_bytes=1000)
+    monkeypatch.setattr(segment_store.SegmentIndex, "build", classmethod(lambda cls, path: no_scan(path)))
+
+    assert [r["event_id"] for r in reopened.search(user_id="user2")] == [
+        f"e{i}" for i in range(30) if i % 3 == 2
+    ]
+    reopened.append([_record(99)])
+    assert reopened.search(agent_id="agent4")[-1]["event_id"] == "e99"
+
+
+def test_retention_removes_expired_segments(tmp_path):
+    """Test sealed segments older than retention_days are deleted"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", max_segment_bytes=100)
+    store.append([_record(1)])
+    store.append([_record(2)])
+    store.close()
+    old = next(tmp_path.glob("audit.*.jsonl"))
+    expired = time.time() - 10 * 86400
+    os.utime(old, (expired, expired))
+
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", retention_days=7)
+
+    assert not old.exists()
+    assert not old.with_suffix(".idx").exists()
+    assert [r["event_id"] for r in store.search()] == ["e2"]
+
+
+def test_search_reads_without_blocking_appends(tmp_path, monkeypatch):
+    """Test search reads records outside the writer lock, up to its snapshot"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl", max_segment_bytes=400)
+    store.append([_record(i) for i in range(4)])
+    store.append([_record(i) for i in range(4, 8)])
+    real_read_at = segment_store._read_at
+
+    def read_at(fd, length, offset):
+        assert not store._lock.locked()
+        store.append([_record(100 + offset)])  # Appends (and rotations) proceed
+        return real_read_at(fd, length, offset)
+
+    monkeypatch.setattr(segment_store, "_read_at", read_at)
+
+    assert [r["event_id"] for r in store.search()] == [f"e{i}" for i in range(8)]
+
+
+def test_search_without_pread(tmp_path, monkeypatch):
+    """Test reads fall back to lseek/read where os.pread is missing"""
+    store = AuditSegmentStore(tmp_path / "audit.jsonl")
+    store.append([_record(i) for i in range(3)])
+    monkeypatch.delattr(os, "pread")
+
+    assert [r["event_id"] for r in store.search(user_id="user1")] == ["e1"]
+
+
+@pytest.mark.asyncio
+async def test_search_audit_logs_covers_flushed_and_buffered(tmp_path):
+    """Test search sees flushed history and the live buffer exactly once"""
+    audit = AuditLogger(log_file=str(tmp_path / "audit.jsonl"), buffer_size=1000)
+    for i in range(5):
+        await audit.log_agent_execution(f"u{i % 2}", "agent-1", "run", AuditStatus.SUCCESS)
+    await audit.flush_buffer()
+    await audit.log_agent_execution("u0", "agent-1", "run", AuditStatus.ERROR)
+
+    events = await audit.search_audit_logs(user_id="u0", agent_id="agent-1")
+
+    assert [e.status for e in events] == [AuditStatus.SUCCESS] * 3 + [AuditStatus.ERROR]
+    assert len({e.event_id for e in events}) == 4
+    await audit.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_search_audit_logs_limit(tmp_path):
+    """Test search_audit_logs caps flushed and buffered results together"""
+    audit = AuditLogger(log_file=str(tmp_path / "audit.jsonl"), buffer_size=1000)
+    for _ in range(4):
+        await audit.log_agent_execution("u0", "agent-1", "run", AuditStatus.SUCCESS)
+    await audit.flush_buffer()
+    await audit.log_agent_execution("u0", "agent-1", "run", AuditStatus.ERROR)
+
+    assert len(await audit.search_audit_logs(user_id="u0", limit=3)) == 3
+    events = await audit.search_audit_logs(user_id="u0", limit=5)
+    assert [e.status for e in events] == [AuditStatus.SUCCESS] * 4 + [AuditStatus.ERROR]
+    await audit.shutdown()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the shared cache engine
+
+Tests LRU, LFU and TTL eviction order, expiry, the byte budget and size
+estimation, and PerformanceService's use of the engine.
+"""
+
+import pytest
+
+from amas.services.performance_service import PerformanceService
+from amas.utils.cache import CacheEngine, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _engine(policy, **kwargs):
+    kwargs.setdefault("sizeof", lambda value: 100)
+    kwargs.setdefault("max_entries", 3)
+    return CacheEngine(policy=policy, **kwargs)
+
+
+def test_lru_evicts_least_recently_used():
+    """Test a hit protects a key from the next eviction"""
+    cache = _engine("lru")
+    for key in "abc":
+        cache.set(key, key)
+    assert cache.get("a") == "a"
+
+    cache.set("d", "d")
+
+    assert "b" not in cache
+    assert [key for key in "acd" if key in cache] == ["a", "c", "d"]
+    assert cache.stats["evictions"] == 1
+
+
+def test_lfu_evicts_least_frequently_used_then_oldest():
+    """Test LFU evicts the lowest hit count, breaking ties by recency"""
+    cache = _engine("lfu")
+    for key in "abc":
+        cache.set(key, key)
+    for _ in range(3):
+        cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    cache.set("d", "d")  # b and c tie on one hit; b was hit first
+    assert "b" not in cache
+
+    cache.set("e", "e")  # d has no hits yet
+    assert "d" not in cache
+    assert all(key in cache for key in "ace")
+
+    cache.set("a", "again")  # Rewriting resets the hit count, after e's
+    cache.set("f", "f")
+    assert "e" not in cache
+    assert all(key in cache for key in "acf")
+
+
+def test_ttl_evicts_soonest_expiring_and_expires_lazily():
+    """Test TTL eviction order, expiry on read and bulk expire()"""
+    clock = FakeClock()
+    cache = _engine("ttl", clock=clock, default_ttl=60)
+    cache.set("long", 1, ttl=300)
+    cache.set("short", 2, ttl=10)
+    cache.set("default", 3)
+
+    cache.set("new", 4, ttl=100)
+    assert "short" not in cache
+
+    clock.now += 61
+    assert cache.get("default") is None
+    assert cache.stats["expirations"] == 1
+
+    clock.now += 50
+    assert cache.expire() == 1  # "new"
+    assert list(k for k in ("long", "new") if k in cache) == ["long"]
+    assert cache.stats["size"] == 1
+
+
+def test_byte_budget_and_rewrites():
+    """Test the byte budget bounds the cache and oversized values are refused"""
+    cache = CacheEngine(policy="lru", max_bytes=10_000)
+    for i in range(100):
+        assert cache.set(f"k{i}", "x" * 500)
+
+    assert cache.bytes_used <= 10_000
+    assert 0 < len(cache) < 100
+    assert "k99" in cache and "k0" not in cache
+
+    assert not cache.set("k99", "x" * 20_000)
+    assert "k99" not in cache
+
+    cache.resize(max_bytes=2_000)
+    assert cache.stats["bytes"] == cache.bytes_used <= 2_000
+
+
+def test_estimate_size_is_deep_and_sampled():
+    """Test nested containers are measured without walking every item"""
+    small = {"text": "x" * 1000}
+    big = [{"text": "x" * 1000} for _ in range(10_000)]
+
+    assert estimate_size(small) > 1000
+    assert 10_000_000 < estimate_size(big) < 15_000_000
+
+
+def test_stale_deadlines_are_compacted():
+    """Test rewriting one key does not grow the deadline heap without bound"""
+    cache = CacheEngine(policy="ttl", default_ttl=60)
+    for i in range(10_000):
+        cache.set("same", i)
+
+    assert len(cache._deadlines) < 100
+    assert cache.get("same") == 9_999
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["lru", "lfu", "ttl", "write_through"])
+async def test_performance_service_uses_engine(strategy):
+    """Test the service's cache API and stats on top of the engine"""
+    service = PerformanceService({"cache_strategy": strategy, "cache_max_size": 2})
+
+    assert await service.set_in_cache("a", {"v": 1})
+    assert await service.get_from_cache("a") == {"v": 1}
+    assert await service.get_from_cache("missing") is None
+    await service.set_in_cache("b", 2)
+    await service.set_in_cache("c", 3)
+
+    stats = await service.get_cache_stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["evictions"] == 1
+    assert 0 < stats["bytes"] <= stats["max_bytes"]
+
+    assert await service.clear_cache()
+    assert (await service.get_cache_stats())["size"] == 0
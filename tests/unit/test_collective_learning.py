@@ -0,0 +1,131 @@
+"""
+Unit tests for collective learning similarity search
+
+Tests the PatternFeatureStore against the per-pattern cosine similarity it
+replaces, incremental indexing in record_task_execution, rebuilding from a
+saved knowledge base and the bounded similarity cache.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from amas.intelligence.collective_learning import (
+    CollectiveIntelligenceEngine,
+    PatternFeatureStore,
+    TaskPattern,
+)
+
+TARGETS = ["example.com", "https://github.com/org/repo", "/srv/app", "10.0.0.1", "http://test.com/api"]
+PARAMETERS = [{}, {"depth": "quick"}, {"depth": "comprehensive", "ssl": True}, {"mode": "quick", "a": 1, "b": 2}]
+
+
+def _pattern(i, task_type="security_scan"):
+    return TaskPattern(
+        task_id=f"t{i}",
+        task_type=task_type,
+        target=TARGETS[i % len(TARGETS)],
+        parameters=PARAMETERS[i % len(PARAMETERS)],
+        agents_used=["security_expert"],
+        execution_time=1.0,
+        success_rate=0.9,
+        error_patterns=[],
+        solution_quality=0.8,
+        timestamp="",
+        context_hash="",
+    )
+
+
+async def _record(engine, i, task_type="security_scan"):
+    pattern = _pattern(i, task_type)
+    await engine.record_task_execution(
+        task_id=pattern.task_id,
+        task_type=task_type,
+        target=pattern.target,
+        parameters=pattern.parameters,
+        agents_used=pattern.agents_used,
+        execution_time=pattern.execution_time,
+        success_rate=pattern.success_rate,
+        error_patterns=[],
+        solution_quality=pattern.solution_quality,
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return CollectiveIntelligenceEngine(knowledge_db_path=str(tmp_path / "knowledge.pkl"))
+
+
+def test_top_k_matches_pairwise_cosine(engine):
+    """Test the matrix product ranks patterns like the per-pattern loop did"""
+    store = PatternFeatureStore(initial_capacity=4)  # Forces several regrowths
+    patterns = [_pattern(i) for i in range(40)]
+    for pattern in patterns:
+        store.add("security_scan", engine._extract_task_features(
+            pattern.task_type, pattern.target, pattern.parameters), pattern)
+
+    query = engine._extract_task_features("security_scan", "https://example.com/x", {"depth": 1})
+    expected = sorted(
+        (
+            (p, engine._calculate_task_similarity(
+                query, engine._extract_task_features(p.task_type, p.target, p.parameters)))
+            for p in patterns
+        ),
+        key=lambda x: x[1],
+        reverse=True,
+    )
+    expected = [(p, s) for p, s in expected if s > 0.3][:10]
+
+    found = store.top_k("security_scan", query, k=10, threshold=0.3)
+
+    assert len(store) == 40
+    assert [s for _, s in found] == pytest.approx([s for _, s in expected], abs=1e-6)
+    assert store.top_k("code_analysis", query, k=10, threshold=0.3) == []
+    assert store.top_k("security_scan", np.zeros(len(query)), k=10, threshold=0.3) == []
+
+
+@pytest.mark.asyncio
+async def test_recording_updates_similarity_results(engine):
+    """Test new executions are searchable at once, despite cached results"""
+    await _record(engine, 0)
+    first = await engine._find_similar_tasks("security_scan", "example.com", {})
+    assert [p.task_id for p, _ in first] == ["t0"]
+
+    await _record(engine, 5)  # Same target and parameters as t0
+    second = await engine._find_similar_tasks("security_scan", "example.com", {})
+
+    assert sorted(p.task_id for p, _ in second) == ["t0", "t5"]
+    assert await engine._find_similar_tasks("code_analysis", "example.com", {}) == []
+
+
+@pytest.mark.asyncio
+async def test_features_rebuilt_from_saved_knowledge(engine):
+    """Test a restarted engine indexes the patterns it loads"""
+    for i in range(6):
+        await _record(engine, i)
+
+    restarted = CollectiveIntelligenceEngine(knowledge_db_path=engine.knowledge_db_path)
+    query = ("security_scan", "https://github.com/org/other", {"depth": "quick"})
+
+    assert len(restarted.pattern_features) == 6
+    assert [p.task_id for p, _ in await restarted._find_similar_tasks(*query)] == [
+        p.task_id for p, _ in await engine._find_similar_tasks(*query)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_similarity_cache_is_bounded_lru(tmp_path):
+    """Test the cache evicts its least recently used entry"""
+    engine = CollectiveIntelligenceEngine(
+        knowledge_db_path=str(tmp_path / "knowledge.pkl"), similarity_cache_size=2
+    )
+    await _record(engine, 0)
+
+    await engine._find_similar_tasks("security_scan", "a.com", {})
+    await engine._find_similar_tasks("security_scan", "b.com", {})
+    await engine._find_similar_tasks("security_scan", "a.com", {})
+    await engine._find_similar_tasks("security_scan", "c.com", {})
+
+    targets = [key[2] for key in engine.task_similarity_cache]
+    assert targets == ["a.com", "c.com"]
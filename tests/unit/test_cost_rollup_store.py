@@ -0,0 +1,146 @@
+"""
+Unit tests for time-bucketed cost rollups
+
+Tests bucketing by provider/model/user, range totals and time series on
+the SQLite and Redis backends, percentiles, bucket covering and retention,
+the NDJSON entry log and CostTrackingService's range-aware summary.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from amas.services.cost_rollup_store import CostRollupStore, _epoch
+from amas.services.cost_tracking_service import CostEntry, CostTrackingService
+
+WEEK_START = datetime(2026, 3, 2)  # A Monday, 00:00 UTC
+
+
+def _entry(i, timestamp, provider="openai", model="gpt-4", user_id="alice", latency_ms=100.0, success=True):
+    return CostEntry(
+        request_id=f"r{i}", timestamp=timestamp, provider=provider, model=model,
+        tokens_input=100, tokens_output=50, tokens_total=150, cost_usd=0.01,
+        latency_ms=latency_ms, success=success, user_id=user_id,
+    )
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+async def store(request):
+    clock = lambda: _epoch(WEEK_START + timedelta(days=7))
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        yield CostRollupStore(redis_client=client, clock=clock)
+        await client.aclose()
+    else:
+        yield CostRollupStore(clock=clock)
+
+
+async def test_cost_per_provider_per_hour(store):
+    """Test an hourly time series per provider over a range"""
+    for i in range(10):
+        store.add(_entry(i, WEEK_START + timedelta(hours=1, minutes=i)))
+    for i in range(4):
+        store.add(_entry(100 + i, WEEK_START + timedelta(hours=2, minutes=i), provider="anthropic",
+                         model="claude-3-sonnet", success=i != 0))
+
+    rollups = await store.query(WEEK_START, WEEK_START + timedelta(days=1), group_by="provider", resolution="hour")
+
+    assert [(r.period_start.hour, r.key, r.requests) for r in rollups] == [
+        (1, "openai", 10), (2, "anthropic", 4),
+    ]
+    assert rollups[0].cost_usd == pytest.approx(0.10)
+    assert rollups[0].tokens_input == 1000 and rollups[0].tokens_output == 500
+    assert rollups[1].errors == 1
+    assert rollups[1].period_end - rollups[1].period_start == timedelta(hours=1)
+
+
+async def test_range_totals_by_model_and_user(store):
+    """Test range totals only include entries inside the range"""
+    store.add(_entry(1, WEEK_START + timedelta(minutes=30), user_id="alice"))
+    store.add(_entry(2, WEEK_START + timedelta(hours=5), model="gpt-3.5-turbo", user_id="bob"))
+    store.add(_entry(3, WEEK_START + timedelta(days=3), user_id=None))
+
+    by_model = await store.query(WEEK_START, WEEK_START + timedelta(hours=6), group_by="model")
+    by_user = await store.query(WEEK_START, WEEK_START + timedelta(days=7), group_by="user")
+
+    assert {r.key: r.requests for r in by_model} == {"openai/gpt-4": 1, "openai/gpt-3.5-turbo": 1}
+    assert {r.key: r.requests for r in by_user} == {"alice": 1, "bob": 1, "anonymous": 1}
+
+
+async def test_percentiles_from_histograms(store):
+    """Test latency percentiles are read from bucket histograms within 10%"""
+    for i in range(1, 101):
+        store.add(_entry(i, WEEK_START + timedelta(hours=i % 24), latency_ms=float(i * 10)))
+
+    (overall,) = await store.query(WEEK_START, WEEK_START + timedelta(days=1))
+
+    assert overall.requests == 100
+    assert overall.latency_percentile(50) == pytest.approx(500, rel=0.1)
+    assert overall.latency_percentile(95) == pytest.approx(950, rel=0.1)
+    assert overall.tokens_percentile(50) == pytest.approx(150, rel=0.1)
+    assert overall.to_dict()["latency_p99_ms"] == pytest.approx(990, rel=0.1)
+
+
+async def test_writes_are_batched_per_flush(store):
+    """Test entries are buffered and written as one batch per flush"""
+    for i in range(1000):
+        store.add(_entry(i, WEEK_START + timedelta(seconds=i)))
+    await store.flush()
+
+    assert store.stats["flushes"] == 1
+    # Minutes touched in 1000s, one hour and one day, for each of the four dimensions
+    assert store.stats["buckets_written"] == (17 + 1 + 1) * 4
+
+
+def test_cover_uses_coarsest_buckets():
+    """Test a week range reads days in the middle and finer buckets at the edges"""
+    start = WEEK_START + timedelta(hours=22, minutes=50)
+    store = CostRollupStore(clock=lambda: _epoch(start))
+    spans = store._cover(_epoch(start), _epoch(start + timedelta(days=7)))
+
+    resolutions = [resolution for resolution, _ in spans]
+    assert resolutions.count("day") == 6
+    assert len(spans) == 10 + 1 + 6 + 22 + 50
+    assert spans[0][1] == _epoch(start)
+    assert spans[-1][1] + 60 == _epoch(start + timedelta(days=7))
+
+    # Minute buckets have expired for the start edge; it rounds out to the hour
+    store.clock = lambda: _epoch(start + timedelta(days=5))
+    assert store._cover(_epoch(start), _epoch(start + timedelta(hours=1)))[0] == ("hour", _epoch(start) - 50 * 60)
+
+
+async def test_raw_entries_logged_as_ndjson(tmp_path):
+    """Test raw entries can be read back for a time range"""
+    store = CostRollupStore(log_dir=str(tmp_path))
+    for i in range(3):
+        store.add(_entry(i, WEEK_START + timedelta(days=i, hours=12)))
+
+    entries = await store.read_entries(WEEK_START + timedelta(days=1), WEEK_START + timedelta(days=3))
+
+    assert [e["request_id"] for e in entries] == ["r1", "r2"]
+    assert entries[0]["cost_usd"] == 0.01 and entries[0]["user_id"] == "alice"
+    assert len(list(tmp_path.glob("cost-entries-*.ndjson"))) == 3
+
+
+async def test_service_summary_respects_range():
+    """Test get_cost_summary aggregates only the requested period"""
+    service = CostTrackingService(daily_budget_usd=1000.0)
+    await service.record_request("a", "openai", "gpt-4", 1000, 500, latency_ms=200.0, user_id="alice")
+    await service.record_request("b", "deepseek", "deepseek-chat", 1000, 500, latency_ms=50.0, success=False)
+
+    now = datetime.utcnow()
+    summary = await service.get_cost_summary(now - timedelta(hours=1), now + timedelta(minutes=1))
+    empty = await service.get_cost_summary(now - timedelta(days=2), now - timedelta(days=1))
+
+    assert summary.total_requests == 2 and summary.failed_requests == 1
+    assert summary.total_tokens == 3000
+    assert summary.cost_by_provider["openai"] == pytest.approx(0.06)
+    assert summary.requests_by_provider == {"deepseek": 1, "openai": 1}
+    assert summary.cost_by_user.keys() == {"alice", "anonymous"}
+    assert summary.latency_p99_ms == pytest.approx(200, rel=0.1)
+    assert empty.total_requests == 0 and empty.cost_by_provider == {}
+
+    hourly = await service.get_cost_rollups(now - timedelta(hours=1), now + timedelta(minutes=1))
+    assert {r.key for r in hourly} == {"openai", "deepseek"}
+    await service.close()
@@ -0,0 +1,155 @@
+"""
+Unit tests for the shared embedding service
+
+Tests micro-batching of concurrent requests, deduplication, the LRU
+vector cache, off-loop encoding and the services built on it, using a
+stub model in place of sentence-transformers.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.embedding_service import EmbeddingService
+from amas.services.semantic_cache_service import SemanticCacheService
+
+
+class StubModel:
+    """Deterministic SentenceTransformer stand-in that records its calls"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = []
+        self.threads = set()
+        self.delay = delay
+        self.fail = fail
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        self.threads.add(threading.get_ident())
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model failure")
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float64)
+
+
+@pytest.fixture
+def model():
+    return StubModel()
+
+
+@pytest.fixture
+def service(model):
+    service = EmbeddingService(model=model, batch_window_ms=5, max_batch_size=8, cache_size=3)
+    yield service
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch(service, model):
+    """Test concurrent texts are encoded together and duplicates once"""
+    texts = ["alpha", "beta", "alpha", "gamma"]
+
+    vectors = await asyncio.gather(*(service.embed(t) for t in texts))
+
+    assert model.calls == [["alpha", "beta", "gamma"]]
+    assert vectors[0].dtype == np.float32
+    assert vectors[0] is vectors[2]
+    assert vectors[1].tolist() == [4.0, 1.0, 1.0]
+    assert service.get_stats()["deduplicated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting(model):
+    """Test reaching max_batch_size flushes immediately"""
+    service = EmbeddingService(model=model, batch_window_ms=10_000, max_batch_size=2)
+
+    vectors = await asyncio.wait_for(service.embed_many(["a", "b"]), timeout=1)
+
+    assert vectors.shape == (2, 3)
+    assert model.calls == [["a", "b"]]
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_skips_the_model(service, model):
+    """Test cached texts are served without encoding and the cache is bounded"""
+    await service.embed_many(["a", "b", "c"])
+    await service.embed("a")  # Refresh "a"
+    await service.embed("d")  # Evicts "b"
+    await service.embed_many(["a", "b"])
+
+    assert model.calls == [["a", "b", "c"], ["d"], ["b"]]
+    assert service.get_stats()["cache_entries"] == 3
+    with pytest.raises(ValueError):
+        (await service.embed("a"))[0] = 0.0  # Cached vectors are read-only
+
+
+@pytest.mark.asyncio
+async def test_encoding_does_not_block_the_event_loop():
+    """Test the model runs on the worker thread while the loop keeps ticking"""
+    model = StubModel(delay=0.1)
+    service = EmbeddingService(model=model, batch_window_ms=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await service.embed("slow")
+    task.cancel()
+
+    assert ticks >= 5
+    assert threading.get_ident() not in model.threads
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_waiter_and_are_not_cached():
+    """Test a failed batch raises for all callers and can be retried"""
+    model = StubModel(fail=True)
+    service = EmbeddingService(model=model, batch_window_ms=1)
+
+    results = await asyncio.gather(service.embed("x"), service.embed("x"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    model.fail = False
+    assert (await service.embed("x")).tolist() == [1.0, 0.0, 1.0]
+    assert len(model.calls) == 2
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_uses_the_embedding_service(service, model):
+    """Test SemanticCacheService embeds through the injected service"""
+    cache = SemanticCacheService(embedding_service=service)
+
+    await cache.set("banana bread", "recipe")
+
+    assert cache.enable_embeddings
+    assert model.calls == [["banana bread"]]
+    assert await cache._get_embedding("banana bread") == [12.0, 4.0, 1.0]
+    assert len(model.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_running_batches():
+    """Test close() cancels in-flight batch tasks and their waiters"""
+    service = EmbeddingService(model=StubModel(delay=0.2), batch_window_ms=1)
+
+    waiter = asyncio.ensure_future(service.embed("slow"))
+    await asyncio.sleep(0.05)
+    assert len(service._batch_tasks) == 1
+
+    service.close()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+    assert not service._batch_tasks
@@ -0,0 +1,109 @@
+"""
+Unit tests for EventBus write-behind Redis persistence
+
+Tests batching, per-type grouping, retention trimming and the bounded
+in-memory history.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.amas.agents.communication.event_bus import EventBus
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """FakeRedis that counts pipeline executions"""
+
+    pipelines = 0
+
+    def pipeline(self, *args, **kwargs):
+        CountingRedis.pipelines += 1
+        return super().pipeline(*args, **kwargs)
+
+
+@pytest.fixture
+async def bus():
+    CountingRedis.pipelines = 0
+    bus = EventBus(persist_batch_size=1000, persist_max_latency=0.02)
+    bus._redis_client = CountingRedis(decode_responses=True)
+    yield bus
+    await bus.stop_processing()
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_redis(bus):
+    """Test events are persisted after publish returns, in one batch"""
+    for i in range(50):
+        await bus.publish("task.progress", {"i": i})
+        await bus.publish("task.completed", {"i": i})
+
+    assert bus.get_stats()["events_persisted"] == 0
+
+    await asyncio.sleep(0.1)
+
+    stats = bus.get_stats()
+    assert stats["events_persisted"] == 100
+    assert stats["persist_batches"] == 1
+    assert CountingRedis.pipelines == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_history_is_newest_first_and_trimmed(bus):
+    """Test LPUSH ordering and LTRIM retention per event type"""
+    for i in range(EventBus.REDIS_HISTORY_LENGTH + 20):
+        await bus.publish("task.progress", {"i": i})
+    await bus.flush()
+
+    key = "event_bus:events:task.progress"
+    values = await bus._redis_client.lrange(key, 0, -1)
+
+    assert len(values) == EventBus.REDIS_HISTORY_LENGTH
+    assert json.loads(values[0])["data"]["i"] == EventBus.REDIS_HISTORY_LENGTH + 19
+    assert 0 < await bus._redis_client.ttl(key) <= EventBus.REDIS_HISTORY_TTL
+
+    events = await bus.get_event_history_from_redis("task.progress", limit=5)
+    assert [e.data["i"] for e in events][:2] == [119, 118]
+
+
+@pytest.mark.asyncio
+async def test_stop_processing_flushes_pending_events(bus):
+    """Test pending events are written when the bus stops"""
+    await bus.publish("agent.started", {"agent": "a"})
+
+    await bus.stop_processing()
+
+    assert await bus._redis_client.llen("event_bus:events:agent.started") == 1
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_buffer_full():
+    """Test publish blocks once the persistence buffer is full"""
+    bus = EventBus(persist_max_pending=2)
+    bus._redis_client = fakeredis.aioredis.FakeRedis()
+    bus._flush_task = asyncio.get_running_loop().create_future()  # Stalled flusher
+
+    await bus.publish("e", {})
+    await bus.publish("e", {})
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.publish("e", {}), timeout=0.05)
+
+    bus._flush_task = None
+    await bus.stop_processing()
+
+
+@pytest.mark.asyncio
+async def test_event_history_is_bounded():
+    """Test in-memory history keeps only the most recent events"""
+    bus = EventBus()
+    for i in range(1100):
+        await bus.publish("e", {"i": i})
+
+    history = await bus.get_event_history(limit=2000)
+
+    assert len(history) == 1000
+    assert history[0].data["i"] == 100
+    await bus.stop_processing()
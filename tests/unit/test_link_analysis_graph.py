@@ -0,0 +1,118 @@
+"""
+Unit tests for link analysis graph algorithms
+
+Tests the compact adjacency graph, connected components, Brandes
+betweenness, BFS closeness, pivot sampling and the LinkAnalysis wiring.
+"""
+
+import random
+
+import pytest
+
+from amas.agents.investigation.graph_algorithms import (
+    CompactGraph,
+    betweenness_centrality,
+    centrality,
+    closeness_centrality,
+    connected_components,
+)
+from amas.agents.investigation.link_analysis import LinkAnalysis
+
+
+def _random_graph(n, m, seed):
+    rng = random.Random(seed)
+    adjacency = {i: set() for i in range(n)}
+    for _ in range(m):
+        a, b = rng.randrange(n), rng.randrange(n)
+        adjacency[a].add(b)
+    return adjacency
+
+
+def test_compact_graph_symmetrises_and_drops_self_loops():
+    """Test one-sided and self edges become a clean undirected CSR graph"""
+    graph = CompactGraph.from_adjacency({"a": ["b", "a"], "b": [], "c": ["b", "x"]})
+
+    assert graph.nodes == ["a", "b", "c"]
+    assert graph.edge_count == 2
+    assert list(graph.neighbours(graph.index["b"])) == [0, 2]
+    assert graph.degree(graph.index["a"]) == 1
+
+
+def test_path_graph_betweenness_and_closeness():
+    """Test exact values on a - b - c - d beyond the old two-hop shortcut"""
+    graph = CompactGraph.from_adjacency({"a": ["b"], "b": ["c"], "c": ["d"], "d": []})
+    betweenness, closeness = centrality(graph)
+
+    # b lies on a-c and a-d: 2 of the 3 pairs not involving it
+    assert betweenness == pytest.approx([0.0, 2 / 3, 2 / 3, 0.0])
+    # a reaches b, c, d at distances 1, 2, 3
+    assert closeness[0] == pytest.approx(3 / 6)
+    assert closeness[1] == pytest.approx(3 / 4)
+
+
+def test_components_and_isolated_nodes():
+    """Test components are found largest first and isolated nodes score 0"""
+    graph = CompactGraph.from_adjacency(
+        {"a": ["b"], "b": ["c"], "c": [], "x": ["y"], "y": [], "z": []}
+    )
+
+    components = [[graph.nodes[i] for i in c] for c in connected_components(graph)]
+    assert components == [["a", "b", "c"], ["x", "y"], ["z"]]
+    assert closeness_centrality(graph)[graph.index["z"]] == 0.0
+
+
+def test_matches_networkx():
+    """Test exact results agree with networkx on a disconnected random graph"""
+    nx = pytest.importorskip("networkx")
+    adjacency = _random_graph(200, 400, seed=1)
+    graph = CompactGraph.from_adjacency(adjacency)
+    reference = nx.Graph()
+    reference.add_nodes_from(adjacency)
+    reference.add_edges_from((a, b) for a, bs in adjacency.items() for b in bs if a != b)
+
+    betweenness, closeness = centrality(graph)
+    expected_b = nx.betweenness_centrality(reference)
+    expected_c = nx.closeness_centrality(reference)
+
+    for node, i in graph.index.items():
+        assert betweenness[i] == pytest.approx(expected_b[node], abs=1e-12)
+        assert closeness[i] == pytest.approx(expected_c[node], abs=1e-12)
+
+
+def test_sampled_betweenness_finds_the_bridge():
+    """Test pivot sampling still ranks the cut vertices between two cliques first"""
+    adjacency = {}
+    for offset in (0, 100):
+        for i in range(offset, offset + 100):
+            adjacency[i] = [j for j in range(offset, offset + 100) if j != i]
+    adjacency["bridge"] = [0, 100]
+
+    graph = CompactGraph.from_adjacency(adjacency)
+    exact = betweenness_centrality(graph)
+    sampled = betweenness_centrality(graph, exact_max_nodes=50, sample_size=40)
+
+    cut_vertices = {graph.index[node] for node in ("bridge", 0, 100)}
+    ranked = sorted(range(len(graph)), key=sampled.__getitem__, reverse=True)
+    assert set(ranked[:3]) == cut_vertices
+    for i in cut_vertices:
+        assert sampled[i] == pytest.approx(exact[i], rel=0.3)
+
+
+@pytest.mark.asyncio
+async def test_analyze_network_uses_graph_engine():
+    """Test LinkAnalysis reports real centrality and components"""
+    analysis = LinkAnalysis()
+    entities = ["a", "b", "c", "d", "e"]
+    relationships = [
+        {"source_entity": "a", "target_entity": "b"},
+        {"source_entity": "b", "target_entity": "c"},
+        {"source_entity": "c", "target_entity": "d"},
+    ]
+
+    result = await analysis._analyze_network(entities, relationships, {})
+
+    measures = result["centrality_measures"]
+    assert measures["b"]["degree"] == 2
+    assert measures["b"]["betweenness"] == pytest.approx(4 / 12)
+    assert measures["a"]["closeness"] == pytest.approx((3 / 6) * (3 / 4))
+    assert result["network_structure"]["clusters"] == [["a", "b", "c", "d"]]
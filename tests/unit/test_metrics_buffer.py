@@ -0,0 +1,156 @@
+"""
+Unit tests for buffered hot-path metrics
+
+Tests that buffered counters and histograms flush into the collectors on
+scrape with the same values as direct recording, across threads and
+repeated scrapes, that label guards bound cardinality, and that
+PrometheusMetricsService records through the buffer.
+"""
+
+import threading
+
+import pytest
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+from amas.services.prometheus_metrics_service import PrometheusMetricsService
+from amas.utils.metrics_buffer import LabelGuard, MetricsBuffer
+
+
+@pytest.fixture
+def registry():
+    registry = CollectorRegistry()
+    buffer = MetricsBuffer()
+    registry.register(buffer)
+    registry.buffer = buffer
+    return registry
+
+
+def test_histogram_matches_direct_observe(registry):
+    """Test flushed buckets, sum and count equal observing each value"""
+    buffered = Histogram("buffered_seconds", "", ["op"], buckets=[0.1, 1, 5], registry=registry)
+    direct = Histogram("direct_seconds", "", ["op"], buckets=[0.1, 1, 5], registry=registry)
+    handle = registry.buffer.histogram(buffered)
+
+    for value in [0.05, 0.1, 0.7, 1, 3, 9, 0.0]:
+        handle.observe(("read",), value)
+        direct.labels("read").observe(value)
+
+    for suffix, le in [("bucket", "0.1"), ("bucket", "1.0"), ("bucket", "+Inf"), ("sum", None), ("count", None)]:
+        labels = {"op": "read", **({"le": le} if le else {})}
+        assert registry.get_sample_value(f"buffered_seconds_{suffix}", labels) == pytest.approx(
+            registry.get_sample_value(f"direct_seconds_{suffix}", labels)
+        )
+
+
+def test_repeated_scrapes_flush_only_deltas(registry):
+    """Test each record is counted once however often the registry is scraped"""
+    counter = Counter("events_total", "", ["kind"], registry=registry)
+    handle = registry.buffer.counter(counter)
+
+    handle.inc(("a",))
+    assert registry.get_sample_value("events_total", {"kind": "a"}) == 1
+    assert registry.get_sample_value("events_total", {"kind": "a"}) == 1
+
+    handle.inc(("a",), 2.5)
+    handle.inc(("b",))
+    assert registry.get_sample_value("events_total", {"kind": "a"}) == 3.5
+    assert registry.get_sample_value("events_total", {"kind": "b"}) == 1
+
+
+def test_threads_record_into_their_own_buffers(registry):
+    """Test concurrent recording from many threads loses nothing"""
+    counter = Counter("requests_total", "", ["path"], registry=registry)
+    handle = registry.buffer.counter(counter)
+
+    def record():
+        for i in range(5000):
+            handle.inc(("/tasks",))
+            if i % 1000 == 0:
+                registry.buffer.flush()
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.get_sample_value("requests_total", {"path": "/tasks"}) == 40000
+    assert handle.totals() == {("/tasks",): 40000}
+
+
+def test_histogram_pending_queue_is_bounded(registry):
+    """Test a thread replays its own observations once max_pending is reached"""
+    histogram = Histogram("queued_seconds", "", buckets=[1], registry=registry)
+    handle = registry.buffer.histogram(histogram)
+    handle.max_pending = 3
+
+    for _ in range(7):
+        handle.observe((), 0.5)
+
+    assert sum(len(q) for q in handle._queues) == 1
+    assert registry.get_sample_value("queued_seconds_count") == 7
+
+
+def test_label_guard_admits_exactly_limit_across_threads():
+    """Test concurrent first sightings never push the guard past its limit"""
+    guard = LabelGuard(50)
+    barrier = threading.Barrier(8)
+
+    def record(offset):
+        barrier.wait()
+        for i in range(200):
+            guard(f"v{offset}-{i}")
+
+    threads = [threading.Thread(target=record, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(guard._seen) == 50
+    assert guard.overflowed == 8 * 200 - 50
+
+
+def test_label_guard_caps_and_hashes():
+    """Test values past the limit fold into "other" or a fixed set of buckets"""
+    capped = LabelGuard(2)
+    assert [capped(v) for v in ["a", "b", "c", "a", "d"]] == ["a", "b", "other", "a", "other"]
+    assert capped.overflowed == 2
+
+    hashed = LabelGuard(0, hash_buckets=4)
+    values = {hashed(f"10.0.0.{i}") for i in range(200)}
+    assert len(values) == 4 and all(v.startswith("other-") for v in values)
+    assert hashed("10.0.0.1") == hashed("10.0.0.1")
+
+
+def test_service_records_through_buffer():
+    """Test hot-path records reach the registry and IP labels stay bounded"""
+    service = PrometheusMetricsService({"enabled": True, "max_ip_label_values": 10})
+
+    for i in range(3):
+        service.record_http_request("GET", "/api/v1/tasks", 200, 0.02)
+    service.record_db_query("select", "tasks", "success", 0.004)
+    service.record_ai_provider_call("openai", "gpt-4", "success", 1.5, tokens_used=100, cost_usd=0.01,
+                                    fallback_from="anthropic")
+    service.record_cache_hit("redis")
+    service.record_cache_hit("redis")
+    service.record_cache_hit("redis")
+    service.record_cache_miss("redis")
+    for i in range(1000):
+        service.record_rate_limit_exceeded("/api/v1/tasks", f"203.0.113.{i % 250}.{i}")
+
+    sample = service.registry.get_sample_value
+    # Counted once, although http_requests_total is the same collector
+    assert sample("amas_http_requests_total", {"method": "GET", "endpoint": "/api/v1/tasks", "status_code": "200"}) == 3
+    assert sample("amas_db_query_duration_seconds_count", {"operation": "select", "table": "tasks"}) == 1
+    assert sample("amas_ai_provider_cost_usd_total", {"provider": "openai", "model": "gpt-4"}) == pytest.approx(0.01)
+    assert sample("amas_ai_provider_fallbacks_total", {"from_provider": "anthropic", "to_provider": "openai"}) == 1
+    assert sample("amas_cache_hit_ratio", {"cache_type": "redis"}) == 0.75
+
+    exposition = service.get_metrics().decode()
+    ip_series = [line for line in exposition.splitlines() if line.startswith("rate_limit_exceeded_total{")]
+    assert len(ip_series) <= 10 + 16
+    assert sum(float(line.rsplit(" ", 1)[1]) for line in ip_series) == 1000
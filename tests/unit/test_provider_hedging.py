@@ -0,0 +1,219 @@
+"""
+Unit tests for hedged provider requests
+
+Tests hedge timing, loser cancellation, failure fall-through, p95-based
+hedge delays and the router integrations.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from amas.ai import provider_scoring
+from amas.ai.hedging import ProviderLatencyTracker, race_providers
+
+
+@pytest.fixture(autouse=True)
+def static_provider_order(monkeypatch):
+    """Keep the routers' static provider order for these tests"""
+    monkeypatch.setattr(
+        provider_scoring, "_provider_scorer", provider_scoring.ProviderScorer(epsilon=0)
+    )
+
+
+def _provider_calls(latencies, failures=()):
+    """Fake providers with fixed latencies, recording cancellations"""
+    cancelled = []
+
+    async def call(provider):
+        try:
+            await asyncio.sleep(latencies[provider])
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        if provider in failures:
+            raise RuntimeError(f"{provider} down")
+        return {"provider": provider, "content": provider}
+
+    return call, cancelled
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_is_slow():
+    """Test a hedge is fired after the delay and the loser is cancelled"""
+    call, cancelled = _provider_calls({"slow": 1.0, "fast": 0.01})
+
+    outcome = await race_providers(
+        ["slow", "fast"], call, ProviderLatencyTracker(), hedge_delay=0.02
+    )
+
+    assert outcome.winner == "fast"
+    assert outcome.hedges_launched == 1
+    assert cancelled == ["slow"]
+    assert outcome.hedge_spent_ms >= 20
+    assert {a.provider: a.status for a in outcome.attempts} == {
+        "fast": "success",
+        "slow": "cancelled",
+    }
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast():
+    """Test the next provider is not called before the hedge delay"""
+    call, _ = _provider_calls({"a": 0.005, "b": 0.005})
+
+    outcome = await race_providers(
+        ["a", "b"], call, ProviderLatencyTracker(), hedge_delay=0.5
+    )
+
+    assert outcome.winner == "a"
+    assert outcome.hedges_launched == 0
+    assert len(outcome.attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_failure_falls_through_immediately():
+    """Test a failed primary starts the next provider without waiting"""
+    call, _ = _provider_calls({"a": 0.0, "b": 0.0}, failures={"a"})
+
+    outcome = await race_providers(
+        ["a", "b"], call, ProviderLatencyTracker(), hedge_delay=10
+    )
+
+    assert outcome.winner == "b"
+    assert outcome.hedges_launched == 0
+    assert [a.status for a in outcome.attempts] == ["error", "success"]
+
+
+@pytest.mark.asyncio
+async def test_all_providers_fail():
+    """Test an outcome without winner when every provider fails"""
+    call, _ = _provider_calls({"a": 0.0, "b": 0.0}, failures={"a", "b"})
+
+    outcome = await race_providers(["a", "b"], call, ProviderLatencyTracker())
+
+    assert outcome.winner is None
+    assert [a.status for a in outcome.attempts] == ["error", "error"]
+
+
+@pytest.mark.asyncio
+async def test_overall_timeout_cancels_requests():
+    """Test the deadline cancels everything still in flight"""
+    call, cancelled = _provider_calls({"a": 1.0, "b": 1.0})
+
+    outcome = await race_providers(
+        ["a", "b"], call, ProviderLatencyTracker(), hedge_delay=0.01, timeout=0.05
+    )
+
+    assert outcome.winner is None
+    assert sorted(cancelled) == ["a", "b"]
+    assert {a.status for a in outcome.attempts} == {"timeout"}
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_observed_p95():
+    """Test hedge delays come from the rolling latency window"""
+    tracker = ProviderLatencyTracker(min_samples=5)
+    assert tracker.hedge_delay("a", default=3.0) == 3.0
+
+    for ms in (50, 50, 50, 50, 50, 50, 50, 50, 50, 80):
+        tracker.record("a", ms)
+    assert tracker.hedge_delay("a") == pytest.approx(0.08)
+    call, _ = _provider_calls({"a": 1.0, "b": 0.0})
+
+    outcome = await race_providers(["a", "b"], call, tracker)
+
+    assert outcome.winner == "b"
+    assert outcome.hedges_launched == 1
+
+
+@pytest.mark.asyncio
+async def test_router_generate_hedged(monkeypatch):
+    """Test amas.ai.router.generate reports the winner and hedge spend"""
+    from amas.ai import router
+
+    call, _ = _provider_calls({"slow": 1.0, "fast": 0.01})
+
+    async def adapter(name, messages, session, **kwargs):
+        return await call(name)
+
+    monkeypatch.setattr(router, "build_provider_priority", lambda: ["slow", "fast"])
+    for name in ("slow", "fast"):
+        monkeypatch.setitem(
+            router.PROVIDER_FUNCTIONS,
+            name,
+            lambda m, s, _name=name, **kw: adapter(_name, m, s, **kw),
+        )
+
+    result = await router.generate("hi", strategy="hedged", hedge_delay=0.02)
+
+    assert result["success"] is True
+    assert result["provider"] == "fast"
+    assert result["hedge"]["winner"] == "fast"
+    assert result["hedge"]["hedges_launched"] == 1
+    assert [a.hedge for a in result["attempts"]] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_enhanced_router_hedged(monkeypatch):
+    """Test enhanced_router_v2 races providers when strategy="race" """
+    from amas.ai import enhanced_router_v2
+
+    call, _ = _provider_calls({"slow": 1.0, "fast": 0.01})
+
+    async def call_provider(provider_id, config, *args):
+        return await call(provider_id)
+
+    monkeypatch.setattr(
+        enhanced_router_v2, "get_available_providers", lambda: ["slow", "fast"]
+    )
+    monkeypatch.setattr(
+        enhanced_router_v2,
+        "_resolve_provider_config",
+        lambda p: SimpleNamespace(provider_type="openai_compatible"),
+    )
+    monkeypatch.setattr(enhanced_router_v2, "_call_provider", call_provider)
+
+    result = await enhanced_router_v2.generate_with_fallback(
+        "hi", strategy="race", hedge_delay=0.02
+    )
+
+    assert result["provider"] == "fast"
+    assert result["hedge"]["hedges_launched"] == 1
+    assert {a["provider"]: a["status"] for a in result["attempts"]} == {
+        "fast": "success",
+        "slow": "cancelled",
+    }
+
+
+@pytest.mark.asyncio
+async def test_enhanced_router_keeps_sync_sdk_providers_out_of_races(monkeypatch):
+    """Test thread-backed providers are tried only after the race fails"""
+    from amas.ai import enhanced_router_v2
+
+    call, _ = _provider_calls({"sync": 0.01, "a": 0.01, "b": 0.01}, failures={"a", "b"})
+    started = []
+
+    async def call_provider(provider_id, config, *args):
+        started.append(provider_id)
+        return await call(provider_id)
+
+    types = {"sync": "cerebras", "a": "openai_compatible", "b": "openai_compatible"}
+    monkeypatch.setattr(
+        enhanced_router_v2, "get_available_providers", lambda: ["sync", "a", "b"]
+    )
+    monkeypatch.setattr(
+        enhanced_router_v2,
+        "_resolve_provider_config",
+        lambda p: SimpleNamespace(provider_type=types[p], model="m"),
+    )
+    monkeypatch.setattr(enhanced_router_v2, "_call_provider", call_provider)
+
+    result = await enhanced_router_v2.generate_with_fallback(
+        "hi", strategy="race", hedge_delay=0.001
+    )
+
+    assert result["provider"] == "sync"
+    assert result["strategy"] == "hedged"
+    assert started == ["a", "b", "sync"]
@@ -0,0 +1,130 @@
+"""
+Unit tests for adaptive provider ordering
+
+Tests EWMA scoring, rate-limit demotion, error decay, exploration,
+persistence and the router status surfaces.
+"""
+
+import random
+
+import pytest
+
+from amas.ai import provider_scoring
+from amas.ai.provider_scoring import ProviderScorer
+
+
+@pytest.fixture
+def scorer(monkeypatch):
+    scorer = ProviderScorer(epsilon=0)
+    monkeypatch.setattr(provider_scoring, "_provider_scorer", scorer)
+    return scorer
+
+
+def test_unseen_providers_keep_static_order(scorer):
+    """Test providers without data keep their configured order"""
+    assert scorer.order(["a", "b", "c"]) == ["a", "b", "c"]
+
+
+def test_failing_provider_is_demoted(scorer):
+    """Test a provider that keeps timing out stops being tried first"""
+    for _ in range(5):
+        scorer.record("a", success=False, latency_ms=30000, now=1000.0)
+        scorer.record("b", success=True, latency_ms=800, now=1000.0)
+
+    assert scorer.order(["a", "b"], now=1000.0) == ["b", "a"]
+
+
+def test_faster_provider_is_preferred(scorer):
+    """Test EWMA latency ordering"""
+    for _ in range(5):
+        scorer.record("slow", success=True, latency_ms=4000, now=1000.0)
+        scorer.record("fast", success=True, latency_ms=300, now=1000.0)
+
+    assert scorer.order(["slow", "fast"], now=1000.0) == ["fast", "slow"]
+    assert scorer.get_stats(now=1000.0)["fast"]["ewma_latency_ms"] == pytest.approx(300)
+
+
+def test_rate_limited_provider_goes_last_until_cooldown(scorer):
+    """Test 429s demote a provider for the cooldown window"""
+    scorer.record("fast", success=True, latency_ms=100, now=1000.0)
+    scorer.record("fast", success=False, latency_ms=50, rate_limited=True, now=1000.0)
+    scorer.record("slow", success=True, latency_ms=3000, now=1000.0)
+
+    assert scorer.order(["fast", "slow"], now=1010.0) == ["slow", "fast"]
+    assert scorer.get_stats(now=1010.0)["fast"]["rate_limited"] is True
+    assert scorer.order(["fast", "slow"], now=1000.0 + 3600)[0] == "fast"
+
+
+def test_error_rate_decays_when_idle(scorer):
+    """Test a failed provider recovers its score over time"""
+    for _ in range(10):
+        scorer.record("a", success=False, latency_ms=1000, now=0.0)
+
+    assert scorer.get_stats(now=0.0)["a"]["error_rate"] > 0.8
+    assert scorer.get_stats(now=6000.0)["a"]["error_rate"] < 0.01
+
+
+def test_exploration_moves_other_provider_first():
+    """Test epsilon-greedy exploration"""
+    scorer = ProviderScorer(epsilon=1.0, rng=random.Random(1))
+    scorer.record("best", success=True, latency_ms=10)
+
+    assert scorer.order(["best", "other"]) == ["other", "best"]
+
+
+def test_cost_penalty(scorer):
+    """Test cost per token is part of the score"""
+    scorer.costs_per_1k_tokens = {"pricey": 10.0}
+    for _ in range(5):
+        scorer.record("pricey", success=True, latency_ms=500, tokens_used=1000)
+        scorer.record("cheap", success=True, latency_ms=700, tokens_used=1000)
+
+    assert scorer.order(["pricey", "cheap"]) == ["cheap", "pricey"]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    """Test statistics survive a restart"""
+    path = str(tmp_path / "stats" / "providers.json")
+    scorer = ProviderScorer(stats_path=path)
+    scorer.record("a", success=True, latency_ms=250)
+    scorer.record("b", success=False, latency_ms=100, rate_limited=True)
+    assert scorer.save() is True
+
+    restored = ProviderScorer(stats_path=path)
+
+    assert restored.load() == 2
+    assert restored.get_stats()["a"]["ewma_latency_ms"] == pytest.approx(250)
+    assert restored.get_stats()["b"]["rate_limits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_router_generate_reorders_and_reports(scorer, monkeypatch):
+    """Test router.generate feeds and follows the scorer"""
+    from amas.ai import router
+
+    calls = []
+
+    def adapter(name, fails):
+        async def call(messages, session, **kwargs):
+            calls.append(name)
+            if fails:
+                raise router.ProviderError("timed out", name, "error")
+            return {"provider": name, "content": "ok", "tokens_used": 5}
+
+        return call
+
+    monkeypatch.setattr(router, "build_provider_priority", lambda: ["flaky", "good"])
+    monkeypatch.setitem(router.PROVIDER_FUNCTIONS, "flaky", adapter("flaky", True))
+    monkeypatch.setitem(router.PROVIDER_FUNCTIONS, "good", adapter("good", False))
+    monkeypatch.setattr(router, "_with_retries", lambda factory: factory())
+
+    await router.generate("hi")
+    calls.clear()
+    result = await router.generate("hi")
+
+    assert calls == ["good"]
+    assert result["provider"] == "good"
+
+    status = router.get_provider_status(include_stats=True)
+    assert status["cerebras"] == {"available": False, "stats": None}
+    assert router.get_provider_status()["cerebras"] is False
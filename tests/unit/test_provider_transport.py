@@ -0,0 +1,160 @@
+"""
+Unit tests for the shared AI provider transport
+
+Tests per-host pooling, connection reuse and that the routers pick up the
+process-wide pool.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from amas.ai.provider_transport import (
+    ProviderTransport,
+    TransportConfig,
+    get_provider_transport,
+)
+
+
+@pytest.fixture
+async def stub_server():
+    async def chat(request):
+        body = await request.json()
+        return web.json_response(
+            {
+                "choices": [{"message": {"content": f"echo {body['model']}"}}],
+                "usage": {"total_tokens": 3},
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def transport():
+    transport = ProviderTransport()
+    yield transport
+    await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(stub_server, transport):
+    """Test sequential requests share one keep-alive connection"""
+    for _ in range(5):
+        async with transport.session.post(
+            f"{stub_server}/v1/chat/completions", json={"model": "m"}
+        ) as resp:
+            assert resp.status == 200
+            await resp.json()
+
+    stats = transport.get_stats()
+    assert stats["requests"] == 5
+    assert stats["connections_created"] == 1
+    assert stats["handshakes_avoided"] == 4
+
+
+@pytest.mark.asyncio
+async def test_one_pool_per_host(transport):
+    """Test sessions are keyed by scheme and host"""
+    a = transport.session_for("https://openrouter.ai/api/v1/chat/completions")
+    b = transport.session_for("https://openrouter.ai/api/v1/models")
+    c = transport.session_for("https://api.groq.com/openai/v1/chat/completions")
+
+    assert a is b
+    assert a is not c
+    assert transport.get_stats()["open_pools"] == 2
+
+
+@pytest.mark.asyncio
+async def test_per_host_connection_limit():
+    """Test host_limits overrides the default per-host limit"""
+    transport = ProviderTransport(
+        TransportConfig(limit_per_host=8, host_limits={"openrouter.ai": 64})
+    )
+
+    openrouter = transport.session_for("https://openrouter.ai/x")
+    groq = transport.session_for("https://api.groq.com/x")
+
+    assert openrouter.connector.limit_per_host == 64
+    assert groq.connector.limit_per_host == 8
+    await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_router_generate_uses_shared_pool(stub_server, monkeypatch):
+    """Test amas.ai.router.generate no longer opens a session per call"""
+    from amas.ai import router
+
+    async def call_stub(messages, session, **kwargs):
+        async with session.post(
+            f"{stub_server}/v1/chat/completions", json={"model": "stub"}
+        ) as resp:
+            data = await resp.json()
+        content = data["choices"][0]["message"]["content"]
+        return {"provider": "stub", "content": content}
+
+    monkeypatch.setattr(router, "build_provider_priority", lambda: ["stub"])
+    monkeypatch.setitem(router.PROVIDER_FUNCTIONS, "stub", call_stub)
+
+    shared = get_provider_transport()
+    before = shared.get_stats()["connections_created"]
+    for _ in range(3):
+        result = await router.generate("hi")
+        assert result["success"] and result["content"] == "echo stub"
+
+    assert shared.get_stats()["connections_created"] - before == 1
+    await shared.close()
+
+
+@pytest.mark.asyncio
+async def test_sdk_clients_built_once_per_key(transport):
+    """Test SDK clients are cached per provider and key on pooled httpx clients"""
+    httpx = pytest.importorskip("httpx")
+    built = []
+
+    class FakeSDK:
+        def __init__(self, api_key, http_client=None):
+            self.api_key = api_key
+            self.http_client = http_client
+            built.append(self)
+
+    def client(provider, key):
+        return transport.sdk_client(
+            provider, key, lambda **kw: FakeSDK(key, **kw), base_url="https://api.groq.com"
+        )
+
+    first = client("groq", "k1")
+    assert client("groq", "k1") is first
+    assert client("groq", "k2") is not first
+    assert client("cerebras", "k1") is not first
+    assert len(built) == 3
+    assert isinstance(first.http_client, httpx.AsyncClient)
+
+    unpooled = transport.sdk_client("gemini", "k1", lambda: FakeSDK("k1"), pooled_http=False)
+    assert unpooled.http_client is None
+    assert transport.get_stats()["sdk_clients"] == 4
+
+
+def test_sessions_from_a_finished_loop_are_released():
+    """Test a new event loop releases the old loop's pooled connections"""
+    transport = ProviderTransport()
+
+    async def open_session():
+        return transport.session_for("https://api.groq.com/x")
+
+    old = asyncio.run(open_session())
+    connector = old.connector
+    new = asyncio.run(open_session())
+
+    assert new is not old
+    assert connector.closed
+    asyncio.run(transport.close())
@@ -0,0 +1,100 @@
+"""
+Unit tests for the shared rate limiting primitives
+
+Tests sliding-window expiry and retry hints, multi-window quotas, GCRA
+token buckets, LRU-bounded client tables and the limiters built on them.
+"""
+
+import pytest
+
+from amas.utils.rate_limit import (
+    GCRABucket,
+    LRUClientTable,
+    SlidingWindowCounter,
+    SlidingWindowQuota,
+)
+
+
+def test_counter_expires_old_buckets():
+    """Test counts drop as buckets leave the window, including long gaps"""
+    counter = SlidingWindowCounter(60, buckets=60)
+    counter.add(0.5, 3)
+    counter.add(30.2)
+
+    assert counter.count(59.9) == 4
+    assert counter.count(60.1) == 1  # Bucket [0, 1) expired
+    assert counter.count(90.5) == 0
+    counter.add(10_000.0)
+    assert counter.count(10_000.0) == 1
+
+
+def test_counter_retry_after_and_clock_skew():
+    """Test retry hints point at the bucket whose expiry frees room"""
+    counter = SlidingWindowCounter(60, buckets=60)
+    counter.add(1.0, 2)
+    counter.add(20.0, 2)
+
+    assert counter.retry_after(30.0, limit=4) == pytest.approx(31.0)  # Bucket [1, 2) leaves at t=61
+    assert counter.retry_after(30.0, limit=2) == pytest.approx(50.0)  # Bucket [20, 21) leaves at t=80
+    assert counter.retry_after(30.0, limit=10) == 0.0
+
+    counter.add(5.0)  # Earlier than the newest bucket: counted, not lost
+    assert counter.count(30.0) == 5
+
+
+def test_quota_counts_only_admitted_requests():
+    """Test a request denied by one window is not counted in the others"""
+    quota = SlidingWindowQuota([60, 3600])
+
+    decisions = [quota.acquire(float(i), limits=(3, 4)) for i in range(3)]
+    assert [d.remaining for d in decisions] == [2, 1, 0]
+
+    denied = quota.acquire(10.0, limits=(3, 4))
+    assert not denied.allowed and denied.remaining == 0
+    assert denied.retry_after == pytest.approx(50.0)
+    assert quota.counters[1].count(10.0) == 3
+
+    assert quota.acquire(61.0, limits=(3, 4)).allowed
+    hour_denied = quota.acquire(62.0, limits=(3, 4))
+    assert not hour_denied.allowed
+    assert hour_denied.reset_after == 3600
+
+
+def test_gcra_bucket_starts_full_and_refills_lazily():
+    """Test burst capacity, refill rate and retry hints"""
+    bucket = GCRABucket(rate=1.0, capacity=3)
+
+    assert [bucket.consume(100.0) for _ in range(4)] == [True, True, True, False]
+    assert bucket.tokens(100.0) == pytest.approx(0.0)
+    assert bucket.retry_after(100.0) == pytest.approx(1.0)
+    assert bucket.consume(101.0)
+    assert bucket.tokens(110.0) == pytest.approx(3.0)
+
+
+def test_lru_client_table_evicts_least_recent():
+    """Test the table stays bounded and keeps recently seen clients"""
+    table = LRUClientTable(lambda: SlidingWindowCounter(60), max_clients=2)
+    a = table.get("a")
+    table.get("b")
+    assert table.get("a") is a
+    table.get("c")
+
+    assert list(table) == ["a", "c"]
+    assert len(table) == 2
+
+
+def test_middleware_limits_and_headers():
+    """Test the API middleware admits a fresh client and reports the limit hit"""
+    pytest.importorskip("fastapi")
+    from src.middleware.rate_limiting import RateLimitConfig, RateLimitingMiddleware
+
+    middleware = RateLimitingMiddleware(
+        app=None, config=RateLimitConfig(requests_per_minute=3, burst_limit=10, max_clients=10)
+    )
+
+    results = [middleware._check_rate_limit("client") for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[2][1]["X-RateLimit-Remaining-Minute"] == "0"
+    assert results[3][1]["X-RateLimit-Exceeded"] == "per_minute"
+    assert middleware._check_rate_limit("other")[0]
@@ -0,0 +1,118 @@
+"""
+Unit tests for the Redis-backed distributed rate limiter
+
+Runs RateLimitingService's server-side sliding-window script against
+fakeredis (with its Lua engine) on a controlled clock: atomic multi-window
+checks, denied requests not being counted, batched endpoint checks and
+constant per-key memory.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("lupa")
+fakeredis = pytest.importorskip("fakeredis")
+
+from amas.services import rate_limiting_service
+from amas.services.rate_limiting_service import RateLimitConfig, RateLimitingService
+
+START = 1_700_000_040.0  # Start of a minute; mid-hour and mid-day
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=START)
+    monkeypatch.setattr(rate_limiting_service, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def service(clock):
+    service = RateLimitingService(default_config=RateLimitConfig(
+        requests_per_minute=3, requests_per_hour=5, requests_per_day=100
+    ))
+    service.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_denied_requests_are_not_counted(service):
+    """Test a request denied by the minute window leaves every window untouched"""
+    results = [await service.check_rate_limit("alice") for _ in range(5)]
+
+    assert [r.allowed for r in results] == [True, True, True, False, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0, 0]
+    assert results[3].retry_after == pytest.approx(80.0)  # Rollover, then 1/3 of a minute
+    stored = await service.redis_client.hgetall(service._redis_key("alice", "default"))
+    assert stored["1:c"] == stored["2:c"] == stored["3:c"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_previous_window_is_weighted_by_overlap(service, clock):
+    """Test the sliding estimate decays the previous window's count"""
+    for _ in range(3):
+        await service.check_rate_limit("alice")
+
+    clock.now = START + 60 + 30  # Half of the previous minute still overlaps
+    allowed = await service.check_rate_limit("alice")
+    denied = await service.check_rate_limit("alice")
+
+    assert allowed.allowed and allowed.remaining == 0  # 1.5 + 1 of 3
+    assert not denied.allowed
+    assert denied.retry_after == pytest.approx(10.0)  # Weight must fall from 1/2 to 1/3
+
+    clock.now = START + 2 * 60 + 1  # Hour limit of 5: 4 counted so far
+    assert (await service.check_rate_limit("alice")).allowed
+    hour_denied = await service.check_rate_limit("alice")
+    assert not hour_denied.allowed
+    assert hour_denied.reset_time == pytest.approx(clock.now + 3600)
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_endpoints_in_one_call(service, monkeypatch):
+    """Test a batch evaluates every endpoint in a single script invocation"""
+    calls = []
+    evalsha = service.redis_client.evalsha
+
+    async def counting_evalsha(*args):
+        calls.append(args)
+        return await evalsha(*args)
+
+    monkeypatch.setattr(service.redis_client, "evalsha", counting_evalsha)
+    for _ in range(3):
+        await service.check_rate_limit("alice", "search")
+
+    calls.clear()
+    results = await service.check_rate_limits("alice", ["search", "upload", "upload"])
+
+    assert len(calls) == 1
+    assert list(results) == ["search", "upload"]
+    assert not results["search"].allowed
+    assert results["upload"].allowed and results["upload"].remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_per_key_is_constant(clock):
+    """Test heavy traffic keeps a fixed number of hash fields per key"""
+    service = RateLimitingService(default_config=RateLimitConfig(10**6, 10**6, 10**6))
+    service.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    for i in range(500):
+        clock.now = START + i * 0.5
+        await service.check_rate_limit("heavy")
+
+    key = service._redis_key("heavy", "default")
+    assert await service.redis_client.hlen(key) == 9
+    assert 0 < await service.redis_client.ttl(key) <= 2 * 86400
+
+
+@pytest.mark.asyncio
+async def test_reset_user_limits_only_clears_that_user(service):
+    """Test reset removes a user's keys and no one else's"""
+    await service.check_rate_limits("alice", ["a", "b"])
+    await service.check_rate_limit("alice2")
+
+    await service.reset_user_limits("alice")
+
+    assert await service.redis_client.keys("*") == [service._redis_key("alice2", "default")]
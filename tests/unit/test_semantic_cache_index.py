@@ -0,0 +1,166 @@
+"""
+Unit tests for the semantic cache vector index
+
+Tests partitioned top-k search, TTL handling, eviction, the disk mirror and
+the SemanticCacheService integration.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.semantic_cache_index import SemanticCacheIndex
+from amas.services.semantic_cache_service import SemanticCacheService
+
+
+def _vec(seed: int, dim: int = 32) -> list:
+    return np.random.default_rng(seed).standard_normal(dim).tolist()
+
+
+class TestSemanticCacheIndex:
+    """Test the vector index itself"""
+
+    def test_search_returns_best_match_first(self):
+        """Test top-k ordering by cosine similarity"""
+        index = SemanticCacheIndex()
+        for i in range(50):
+            index.add(f"key:{i}", _vec(i))
+
+        results = index.search(_vec(7), top_k=3)
+
+        assert results[0][0] == "key:7"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert len(results) == 3
+        assert results[0][1] >= results[1][1] >= results[2][1]
+
+    def test_threshold_filters_candidates(self):
+        """Test that candidates below the threshold are dropped"""
+        index = SemanticCacheIndex()
+        index.add("a", [1.0, 0.0])
+        index.add("b", [0.0, 1.0])
+
+        results = index.search([1.0, 0.1], threshold=0.9)
+
+        assert [key for key, _ in results] == ["a"]
+
+    def test_partitions_are_isolated(self):
+        """Test per-agent partitions"""
+        index = SemanticCacheIndex()
+        index.add("research", [1.0, 0.0], agent_id="research")
+        index.add("osint", [1.0, 0.0], agent_id="osint")
+
+        results = index.search([1.0, 0.0], agent_id="osint")
+
+        assert [key for key, _ in results] == ["osint"]
+        assert index.search([1.0, 0.0], agent_id="missing") == []
+
+    def test_expired_entries_are_not_returned(self):
+        """Test TTL-aware search"""
+        index = SemanticCacheIndex()
+        index.add("short", [1.0, 0.0], ttl=10, now=1000.0)
+        index.add("long", [0.9, 0.1], ttl=100, now=1000.0)
+
+        results = index.search([1.0, 0.0], now=1050.0)
+
+        assert [key for key, _ in results] == ["long"]
+        assert index.purge_expired(now=1050.0) == ["short"]
+        assert "short" not in index
+
+    def test_eviction_reports_least_recently_used(self):
+        """Test LRU eviction when a partition is full"""
+        index = SemanticCacheIndex(max_entries_per_partition=3)
+        for i in range(3):
+            index.add(f"key:{i}", _vec(i), now=100.0 + i)
+        index.touch("key:0", now=200.0)
+
+        evicted = index.add("key:3", _vec(3), now=300.0)
+
+        assert evicted == ["key:1"]
+        assert "key:1" not in index
+        assert len(index) == 3
+
+    def test_remove_frees_row_for_reuse(self):
+        """Test removal and slot reuse"""
+        index = SemanticCacheIndex()
+        index.add("a", [1.0, 0.0])
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+
+        index.add("b", [0.0, 1.0])
+
+        assert index.search([1.0, 0.0], threshold=0.5) == []
+        assert index.search([0.0, 1.0])[0][0] == "b"
+
+    def test_ivf_search_finds_exact_match(self):
+        """Test that large partitions switch to IVF search"""
+        index = SemanticCacheIndex(ivf_threshold=500, nprobe=4)
+        vectors = np.random.default_rng(0).standard_normal((1000, 16))
+        for i, vector in enumerate(vectors):
+            index.add(f"key:{i}", vector)
+
+        assert index.get_stats()["ivf_partitions"] == 1
+        for i in (0, 321, 999):
+            results = index.search(vectors[i], top_k=1)
+            assert results[0][0] == f"key:{i}"
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """Test the on-disk mirror"""
+        index = SemanticCacheIndex(index_path=str(tmp_path))
+        index.add("a", [1.0, 0.0], agent_id="research", ttl=3600)
+        index.add("b", [0.0, 1.0])
+        assert index.save() is True
+
+        restored = SemanticCacheIndex(index_path=str(tmp_path))
+
+        assert restored.load() == 2
+        assert restored.search([1.0, 0.0], agent_id="research")[0][0] == "a"
+        assert restored.search([0.0, 1.0])[0][0] == "b"
+
+
+class TestSemanticCacheServiceIndex:
+    """Test SemanticCacheService lookups through the index"""
+
+    @pytest.fixture
+    def cache(self):
+        service = SemanticCacheService(enable_embeddings=False)
+        embeddings = {
+            "what is the weather": [1.0, 0.0, 0.0],
+            "tell me the weather": [0.98, 0.05, 0.0],
+            "unrelated question": [0.0, 0.0, 1.0],
+        }
+
+        async def fake_embedding(text):
+            return embeddings.get(text)
+
+        service.enable_embeddings = True
+        service._get_embedding = fake_embedding
+        return service
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit_within_agent_partition(self, cache):
+        """Test a similar query hits the cached value for the same agent"""
+        await cache.set("what is the weather", "sunny", agent_id="agent-1")
+
+        assert await cache.get("tell me the weather", agent_id="agent-1") == "sunny"
+        assert await cache.get("tell me the weather", agent_id="agent-2") is None
+        assert await cache.get("unrelated question", agent_id="agent-1") is None
+        assert cache.get_stats()["semantic_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_eviction_removes_backing_entry(self, cache):
+        """Test evicted index entries are deleted from the store"""
+        cache.index.max_entries_per_partition = 1
+        await cache.set("what is the weather", "sunny")
+        await cache.set("unrelated question", "42")
+
+        assert len(cache._memory_cache) == 1
+        assert cache.get_stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_index_entry_is_dropped(self, cache):
+        """Test an index entry whose value disappeared is cleaned up"""
+        await cache.set("what is the weather", "sunny")
+        cache._memory_cache.clear()
+
+        assert await cache.get("tell me the weather") is None
+        assert len(cache.index) == 0
@@ -0,0 +1,62 @@
+"""
+Unit tests for request coalescing
+
+Tests that concurrent callers share one load, that errors reach every
+caller, and that a cancelled caller does not cancel the shared load.
+"""
+
+import asyncio
+
+import pytest
+
+from amas.utils.single_flight import SingleFlight
+
+
+async def test_concurrent_callers_share_one_load():
+    """Test one loader call per key while it is in flight"""
+    flights = SingleFlight()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    results = await asyncio.gather(*(flights.do("k", loader) for _ in range(50)))
+
+    assert results == [1] * 50
+    assert flights.stats == {"loads": 1, "coalesced": 49}
+    assert len(flights) == 0
+    assert await flights.do("k", loader) == 2  # Finished loads are not reused
+
+
+async def test_errors_reach_every_caller():
+    """Test a failing load raises in all callers and is not remembered"""
+    flights = SingleFlight()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(*(flights.do("k", loader) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not flights.in_flight("k")
+
+
+async def test_cancelled_caller_does_not_cancel_load():
+    """Test the remaining callers still get the result"""
+    flights = SingleFlight()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    first = asyncio.ensure_future(flights.do("k", loader))
+    second = asyncio.ensure_future(flights.do("k", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,281 @@
+"""
+Unit tests for streaming AI generation
+
+Tests the SSE/NDJSON streaming adapters against a local stub server,
+fallback before the first chunk, and token delivery through the
+context-local token sink used by agents and WebSocket clients.
+"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from src.amas.ai import enhanced_router_v2, provider_scoring
+from src.amas.ai.enhanced_router_v2 import ProviderConfig, stream_with_fallback
+from src.amas.ai.streaming import emit_token, get_token_sink, token_sink
+
+
+@pytest.fixture(autouse=True)
+def static_provider_order(monkeypatch):
+    """Keep the static provider order for these tests"""
+    monkeypatch.setattr(
+        provider_scoring, "_provider_scorer", provider_scoring.ProviderScorer(epsilon=0)
+    )
+
+
+async def _write_chunks(request, chunks, content_type):
+    response = web.StreamResponse(headers={"Content-Type": content_type})
+    await response.prepare(request)
+    for chunk in chunks:
+        await response.write(chunk.encode())
+        await asyncio.sleep(0.005)
+    await response.write_eof()
+    return response
+
+
+async def openai_stream(request):
+    body = await request.json()
+    assert body["stream"] is True
+    assert body["stream_options"] == {"include_usage": True}
+    events = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": "Hel"}}]},
+        {"choices": [{"delta": {"content": "lo"}}]},
+        {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}},
+    ]
+    chunks = [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]
+    return await _write_chunks(request, chunks, "text/event-stream")
+
+
+async def anthropic_stream(request):
+    events = [
+        {"type": "message_start", "message": {"usage": {"input_tokens": 4}}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hi "}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "there"}},
+        {"type": "message_delta", "usage": {"output_tokens": 3}},
+        {"type": "message_stop"},
+    ]
+    chunks = [f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events]
+    return await _write_chunks(request, chunks, "text/event-stream")
+
+
+async def ollama_stream(request):
+    lines = [
+        {"message": {"content": "a"}, "done": False},
+        {"message": {"content": "b"}, "done": False},
+        {"message": {"content": ""}, "done": True, "prompt_eval_count": 6, "eval_count": 2},
+    ]
+    chunks = [json.dumps(line) + "\n" for line in lines]
+    return await _write_chunks(request, chunks, "application/x-ndjson")
+
+
+async def empty_stream(request):
+    return await _write_chunks(request, ["data: [DONE]\n\n"], "text/event-stream")
+
+
+async def failing(request):
+    return web.Response(status=503, text="overloaded")
+
+
+@pytest.fixture
+async def stub_server():
+    app = web.Application()
+    app.router.add_post("/openai/chat/completions", openai_stream)
+    app.router.add_post("/down/chat/completions", failing)
+    app.router.add_post("/empty/chat/completions", empty_stream)
+    app.router.add_post("/anthropic/messages", anthropic_stream)
+    app.router.add_post("/api/chat", ollama_stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+def _use_providers(monkeypatch, configs):
+    monkeypatch.setenv("STUB_API_KEY", "test-key")
+    monkeypatch.setattr(enhanced_router_v2, "get_available_providers", lambda: list(configs))
+    monkeypatch.setattr(enhanced_router_v2, "_resolve_provider_config", configs.get)
+
+
+def _config(provider_type, base_url):
+    return ProviderConfig(
+        name=provider_type,
+        api_key_env="STUB_API_KEY",
+        model="stub-model",
+        base_url=base_url,
+        provider_type=provider_type,
+    )
+
+
+async def _collect(**kwargs):
+    return [event async for event in stream_with_fallback("hi", **kwargs)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "provider_type,path,expected,tokens_used",
+    [
+        ("openai_compatible", "/openai", ["Hel", "lo"], 7),
+        ("anthropic", "/anthropic", ["Hi ", "there"], 7),
+        ("ollama", "", ["a", "b"], 8),
+    ],
+)
+async def test_stream_adapters(monkeypatch, stub_server, provider_type, path, expected, tokens_used):
+    """Test each wire format yields its deltas and a final done event with usage"""
+    _use_providers(monkeypatch, {"stub": _config(provider_type, stub_server + path)})
+
+    events = await _collect()
+
+    assert [e["content"] for e in events if e["type"] == "token"] == expected
+    assert events[-1]["type"] == "done"
+    assert events[-1]["content"] == "".join(expected)
+    assert events[-1]["attempts"][0]["first_token_ms"] >= 0
+    assert events[-1]["tokens_used"] == tokens_used
+
+
+@pytest.mark.asyncio
+async def test_usage_estimated_when_not_reported(monkeypatch):
+    """Test a stream without usage reports an estimate rather than zero"""
+    async def no_usage_stream(provider_id, *args):
+        yield "twelve chars"
+
+    monkeypatch.setattr(enhanced_router_v2, "_stream_provider", no_usage_stream)
+    _use_providers(monkeypatch, {"a": _config("openai_compatible", "")})
+
+    events = await _collect()
+
+    assert events[-1]["type"] == "done"
+    # "hi" -> 1 prompt token, "twelve chars" -> 3 completion tokens
+    assert events[-1]["tokens_used"] == 4
+
+
+@pytest.mark.asyncio
+async def test_empty_stream_falls_back(monkeypatch, stub_server):
+    """Test a stream that ends without output counts as a failed attempt"""
+    _use_providers(
+        monkeypatch,
+        {
+            "empty": _config("openai_compatible", stub_server + "/empty"),
+            "up": _config("openai_compatible", stub_server + "/openai"),
+        },
+    )
+
+    events = await _collect()
+
+    assert events[-1]["type"] == "done"
+    assert events[-1]["provider"] == "up"
+    assert [a["status"] for a in events[-1]["attempts"]] == ["empty", "success"]
+
+
+@pytest.mark.asyncio
+async def test_fallback_before_first_chunk(monkeypatch, stub_server):
+    """Test a provider failing before its first chunk falls back to the next"""
+    _use_providers(
+        monkeypatch,
+        {
+            "down": _config("openai_compatible", stub_server + "/down"),
+            "up": _config("openai_compatible", stub_server + "/openai"),
+        },
+    )
+
+    events = await _collect()
+
+    assert {e["provider"] for e in events if e["type"] == "token"} == {"up"}
+    assert [a["status"] for a in events[-1]["attempts"]] == ["error", "success"]
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_failure_does_not_fall_back(monkeypatch):
+    """Test a stream failing after its first chunk reports the partial content"""
+    async def broken_stream(provider_id, *args):
+        yield "partial"
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(enhanced_router_v2, "_stream_provider", broken_stream)
+    _use_providers(monkeypatch, {"a": _config("openai_compatible", ""), "b": None})
+
+    events = await _collect()
+
+    assert events[-1]["type"] == "error"
+    assert events[-1]["content"] == "partial"
+    assert [a["provider"] for a in events[-1]["attempts"]] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_token_sink_is_context_local():
+    """Test sinks nest, reset and tolerate failing callbacks"""
+    received = []
+
+    async def sink(event):
+        received.append(event)
+
+    def broken(event):
+        raise RuntimeError("client gone")
+
+    assert get_token_sink() is None
+    with token_sink(sink):
+        assert get_token_sink() is sink
+        await emit_token(get_token_sink(), {"delta": "x"})
+        with token_sink(broken):
+            await emit_token(get_token_sink(), {"delta": "y"})
+        assert get_token_sink() is sink
+    assert get_token_sink() is None
+    assert received == [{"delta": "x"}]
+
+
+@pytest.mark.asyncio
+async def test_router_streams_to_sink(monkeypatch, stub_server):
+    """Test EnhancedAIRouter forwards tokens when a sink is set"""
+    from src.amas.ai import enhanced_router_class
+
+    _use_providers(monkeypatch, {"stub": _config("openai_compatible", stub_server + "/openai")})
+    monkeypatch.setattr(enhanced_router_class, "get_available_providers", lambda: ["stub"])
+    router = enhanced_router_class.EnhancedAIRouter()
+    tokens = []
+
+    with token_sink(tokens.append):
+        response = await router.generate_with_fallback("hi")
+
+    assert response.content == "Hello"
+    assert response.provider == "stub"
+    assert tokens == [
+        {"provider": "stub", "delta": "Hel"},
+        {"provider": "stub", "delta": "lo"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_router_resets_sink_before_retrying(monkeypatch):
+    """Test a retry after a partially streamed attempt sends a reset first"""
+    from src.amas.ai import enhanced_router_class
+
+    calls = []
+
+    async def flaky_stream(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            yield {"type": "token", "provider": "a", "content": "par"}
+            yield {"type": "error", "success": False, "error": "interrupted"}
+        else:
+            yield {"type": "token", "provider": "b", "content": "full"}
+            yield {"type": "done", "success": True, "provider": "b", "content": "full", "tokens_used": 2}
+
+    monkeypatch.setattr(enhanced_router_v2, "stream_with_fallback", flaky_stream)
+    monkeypatch.setattr(enhanced_router_class, "get_available_providers", lambda: ["a", "b"])
+    router = enhanced_router_class.EnhancedAIRouter()
+    tokens = []
+
+    with token_sink(tokens.append):
+        response = await router.generate_with_fallback("hi")
+
+    assert response.content == "full"
+    assert tokens == [
+        {"provider": "a", "delta": "par"},
+        {"provider": "b", "delta": "", "reset": True},
+        {"provider": "b", "delta": "full"},
+    ]
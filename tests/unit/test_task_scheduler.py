@@ -0,0 +1,145 @@
+"""
+Unit tests for the timer-heap TaskScheduler core
+
+Tests on-time firing, early wakeup on new schedules, pause/resume,
+per-priority concurrency limits and batched persistence.
+"""
+
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("croniter")
+
+from src.amas.automation.task_scheduler import ScheduleType, TaskPriority, TaskScheduler
+
+
+def _at(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+@pytest.fixture
+async def scheduler(tmp_path):
+    scheduler = TaskScheduler(
+        db_path=str(tmp_path / "scheduler.db"),
+        priority_concurrency={TaskPriority.LOW: 1},
+        persist_interval=0.05,
+    )
+    scheduler.fired = []
+    scheduler.run_time = 0.0
+
+    async def execute(task):
+        scheduler.fired.append((task.id, time.time()))
+        await asyncio.sleep(scheduler.run_time)
+        task.record_execution(True, {}, scheduler.run_time)
+        scheduler._mark_dirty(task)
+        return {}
+
+    scheduler._execute_scheduled_task = execute
+    await asyncio.sleep(0)  # Let the initial load run
+    await scheduler.start_scheduler()
+    yield scheduler
+    await scheduler.stop_scheduler()
+
+
+async def _one_time(scheduler, seconds, priority=TaskPriority.NORMAL):
+    return await scheduler.schedule_task(
+        name="t", task_request="r", schedule_expression=_at(seconds),
+        schedule_type=ScheduleType.ONE_TIME, priority=priority,
+    )
+
+
+@pytest.mark.asyncio
+async def test_fires_at_next_execution(scheduler):
+    """Test a task fires at its due time, not on a polling tick"""
+    task_id = await _one_time(scheduler, 0.2)
+    due = scheduler.scheduled_tasks[task_id].next_execution.timestamp()
+
+    await asyncio.sleep(0.35)
+
+    assert [t for t, _ in scheduler.fired] == [task_id]
+    assert abs(scheduler.fired[0][1] - due) < 0.05
+
+
+@pytest.mark.asyncio
+async def test_new_earlier_schedule_wakes_loop(scheduler):
+    """Test adding a sooner task interrupts a long sleep"""
+    await _one_time(scheduler, 3600)
+    await asyncio.sleep(0.05)
+    soon = await _one_time(scheduler, 0.1)
+
+    await asyncio.sleep(0.25)
+
+    assert [t for t, _ in scheduler.fired] == [soon]
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume(scheduler):
+    """Test paused tasks do not fire and resumed interval tasks do"""
+    task_id = await scheduler.schedule_task(
+        name="t", task_request="r", schedule_expression="1s",
+        schedule_type=ScheduleType.INTERVAL,
+    )
+    await scheduler.pause_task(task_id)
+    await asyncio.sleep(1.2)
+    assert scheduler.fired == []
+
+    await scheduler.resume_task(task_id)
+    await asyncio.sleep(1.2)
+    assert [t for t, _ in scheduler.fired] == [task_id]
+
+
+@pytest.mark.asyncio
+async def test_priority_concurrency_limit(scheduler):
+    """Test LOW tasks queue behind the limit while others run freely"""
+    scheduler.run_time = 0.1
+    low = [await _one_time(scheduler, 0.05, TaskPriority.LOW) for _ in range(3)]
+    high = [await _one_time(scheduler, 0.05, TaskPriority.HIGH) for _ in range(3)]
+
+    await asyncio.sleep(0.2)
+    started = {t for t, _ in scheduler.fired}
+    assert set(high) <= started
+    assert len(started & set(low)) == 2  # One ran, the next took its slot
+
+    await asyncio.sleep(0.2)
+    assert {t for t, _ in scheduler.fired} == set(low + high)
+
+
+@pytest.mark.asyncio
+async def test_execution_updates_are_persisted_in_batches(scheduler, monkeypatch):
+    """Test execution results reach SQLite in one write per flush"""
+    flushed = []
+    original = scheduler._flush_dirty
+    monkeypatch.setattr(scheduler, "_flush_dirty", lambda: flushed.append(len(scheduler._dirty)) or original())
+
+    ids = [await _one_time(scheduler, 0.05) for _ in range(20)]
+    await asyncio.sleep(0.3)
+
+    with sqlite3.connect(scheduler.db_path) as conn:
+        rows = dict(conn.execute("SELECT id, execution_count FROM scheduled_tasks").fetchall())
+    assert all(rows[i] == 1 for i in ids)
+    assert sum(flushed) == 20
+    assert len(flushed) <= 3
+
+
+@pytest.mark.asyncio
+async def test_failed_start_record_does_not_refire(scheduler, monkeypatch):
+    """Test a task whose start cannot be recorded fails once instead of looping"""
+    del scheduler._execute_scheduled_task  # Use the real executor
+    starts = []
+
+    async def broken_start(execution_id, task_id):
+        starts.append(task_id)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(scheduler, "_record_execution_start", broken_start)
+    task_id = await _one_time(scheduler, 0.05)
+
+    await asyncio.sleep(0.3)
+
+    assert starts == [task_id]
+    assert scheduler.scheduled_tasks[task_id].next_execution is None
+    assert scheduler.failed_executions == 1
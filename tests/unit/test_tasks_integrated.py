@@ -19,6 +19,7 @@ from src.api.routes.tasks_integrated import (
     _log_error_with_context,
     _persist_task_to_db,
     _select_agents,
+    _task_token_callback,
 )
 
 
@@ -45,6 +46,12 @@ class TestGenerateTaskID:
 class TestGetMLPrediction:
     """Test ML prediction retrieval"""
     
+    @pytest.fixture(autouse=True)
+    def fresh_prediction_cache(self, monkeypatch):
+        """Start each test with an empty prediction cache"""
+        import src.amas.services.prediction_cache_service as prediction_cache
+        monkeypatch.setattr(prediction_cache, "_prediction_cache_service", None)
+    
     @pytest.mark.asyncio
     async def test_get_ml_prediction_success(self):
         """Test successful ML prediction"""
@@ -74,6 +81,36 @@ class TestGetMLPrediction:
             assert prediction["estimated_duration"] == 120.0
             assert prediction["confidence"] == 0.8
     
+    @pytest.mark.asyncio
+    async def test_get_ml_prediction_coalesces_identical_tasks(self):
+        """Test concurrent identical tasks share one model call, then hit the cache"""
+        import asyncio
+        
+        task_data = TaskCreate(
+            title="Test Task",
+            description="Test",
+            task_type="security_scan",
+            target="example.com"
+        )
+        
+        async def slow_prediction(**kwargs):
+            await asyncio.sleep(0.05)
+            return MagicMock(
+                success_probability=0.85, estimated_duration=120.0, quality_score_prediction=0.9,
+                confidence=0.8, risk_factors=[], optimization_suggestions=[]
+            )
+        
+        with patch('src.api.routes.tasks_integrated.get_predictive_engine') as mock_engine:
+            mock_engine.return_value.predict_task_outcome = AsyncMock(side_effect=slow_prediction)
+            
+            predictions = await asyncio.gather(
+                *(_get_ml_prediction(task_data, f"task_{i}", "user_123") for i in range(10))
+            )
+            await _get_ml_prediction(task_data, "task_later", "user_123")
+            
+            assert mock_engine.return_value.predict_task_outcome.await_count == 1
+            assert all(p["success_probability"] == 0.85 for p in predictions)
+    
     @pytest.mark.asyncio
     async def test_get_ml_prediction_fallback(self):
         """Test ML prediction fallback on error"""
@@ -217,17 +254,15 @@ class TestCacheTask:
         selected_agents = ["agent1"]
         
         # Clear cache first
-        from src.api.routes.tasks_integrated import (
-            _recently_accessed_tasks,
-            _recently_accessed_tasks_timestamps,
-        )
-        _recently_accessed_tasks.clear()
-        _recently_accessed_tasks_timestamps.clear()
+        from src.amas.services.task_cache_service import get_task_cache_service
+        task_cache_service = get_task_cache_service()
+        task_cache_service.tiered.l1.clear()
         
         await _cache_task("task_123", task_data, prediction, selected_agents, None, "user_123")
         
-        assert "task_123" in _recently_accessed_tasks
-        assert _recently_accessed_tasks["task_123"]["task_id"] == "task_123"
+        task, tier = await task_cache_service.get_cached_task("task_123")
+        assert tier == "memory"
+        assert task["task_id"] == "task_123"
     
     @pytest.mark.asyncio
     async def test_cache_task_redis(self):
@@ -297,6 +332,31 @@ class TestBroadcastTaskCreated:
             await _broadcast_task_created("task_123", task_data, prediction, selected_agents)
 
 
+class TestTaskTokenCallback:
+    """Test AI output streaming to task subscribers"""
+    
+    @pytest.mark.asyncio
+    async def test_token_and_reset_events(self):
+        """Test token chunks and resets are forwarded to the task's subscribers"""
+        with patch('src.api.routes.tasks_integrated.websocket_manager') as mock_ws:
+            mock_ws.send_to_task_subscribers = AsyncMock()
+            callback = _task_token_callback("task_123")
+            
+            await callback({"agent_id": "agent1", "provider": "openai", "delta": "Hel"})
+            await callback({"agent_id": "agent1", "reset": True})
+            
+            token_call, reset_call = mock_ws.send_to_task_subscribers.call_args_list
+            assert token_call[0] == ("task_123", {
+                "event": "task_token",
+                "task_id": "task_123",
+                "agent_id": "agent1",
+                "provider": "openai",
+                "delta": "Hel",
+            })
+            assert reset_call[0][1]["event"] == "task_token_reset"
+            assert reset_call[0][1]["delta"] == ""
+
+
 class TestErrorHandling:
     """Test error handling utilities"""
     
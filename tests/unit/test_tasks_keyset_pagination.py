@@ -0,0 +1,134 @@
+"""
+Unit tests for GET /tasks keyset pagination
+
+Runs list_tasks against an in-memory SQLite database (standing in for
+PostgreSQL) to check cursor paging, field projection and count modes.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.api.routes.tasks_integrated import (
+    _build_task_list_query,
+    _decode_task_cursor,
+    _encode_task_cursor,
+    list_tasks,
+)
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, description TEXT, "
+            "status TEXT, priority INTEGER, created_at TIMESTAMP, completed_at TIMESTAMP, "
+            "result TEXT)"
+        ))
+        base = datetime(2025, 1, 1)
+        for i in range(1, 26):
+            await conn.execute(
+                text("INSERT INTO tasks VALUES (:id, :title, '', :status, 5, :created_at, NULL, :result)"),
+                {
+                    "id": i,
+                    "title": f"task {i}",
+                    "status": "completed" if i % 2 else "pending",
+                    # Pairs of tasks share a timestamp so the id tie-breaker matters
+                    "created_at": base + timedelta(minutes=i // 2),
+                    "result": json.dumps({"summary": f"summary {i}", "output": {"agent_results": {"a": i}}}),
+                },
+            )
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+async def _list(db, **kwargs):
+    params = dict(skip=0, limit=10, status=None, task_type=None, db=db, redis=None, current_user=MagicMock())
+    params.update(kwargs)
+    return await list_tasks(**params)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_all_rows_once(db):
+    """Test following next_cursor visits every task once in order"""
+    seen, cursor = [], None
+    while True:
+        page = await _list(db, limit=7, cursor=cursor)
+        seen.extend(int(t.id) for t in page.tasks)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == list(range(25, 0, -1))
+    assert page.total == 25
+
+
+@pytest.mark.asyncio
+async def test_cursor_with_status_filter(db):
+    """Test keyset pages respect the status filter"""
+    first = await _list(db, limit=5, status="pending")
+    second = await _list(db, limit=5, status="pending", cursor=first.next_cursor)
+
+    ids = [int(t.id) for t in first.tasks + second.tasks]
+    assert ids == [24, 22, 20, 18, 16, 14, 12, 10, 8, 6]
+    assert first.total == 12
+
+
+@pytest.mark.asyncio
+async def test_offset_pagination_still_supported(db):
+    """Test skip/limit pages match the cursor pages"""
+    page = await _list(db, skip=10, limit=5)
+
+    assert [int(t.id) for t in page.tasks] == [15, 14, 13, 12, 11]
+
+
+@pytest.mark.asyncio
+async def test_projection_loads_result_only_when_requested(db):
+    """Test list views skip the JSON result unless a result field is requested"""
+    light = await _list(db, limit=1)
+    detailed = await _list(db, limit=1, fields="id,title,summary,agent_results")
+
+    assert light.tasks[0].summary is None
+    assert detailed.tasks[0].summary == "summary 25"
+    assert detailed.tasks[0].agent_results == {"a": 25}
+    assert detailed.tasks[0].result is None  # Not requested
+
+    query, _ = _build_task_list_query({"id", "status", "created_at"}, None, 10)
+    assert "result" not in query and "title" not in query
+
+
+@pytest.mark.asyncio
+async def test_estimate_count_falls_back_to_exact(db):
+    """Test count=estimate degrades to COUNT(*) without planner statistics"""
+    page = await _list(db, count="estimate")
+
+    assert page.total == 25
+    assert page.total_is_estimate is False
+
+
+@pytest.mark.asyncio
+async def test_invalid_paging_options_are_rejected(db):
+    """Test bad cursors, fields and count modes return 400"""
+    for kwargs in ({"cursor": "not-a-cursor"}, {"fields": "id,secret"}, {"count": "approx"}):
+        with pytest.raises(HTTPException) as exc:
+            await _list(db, **kwargs)
+        assert exc.value.status_code == 400
+
+
+def test_cursor_round_trip():
+    """Test cursors encode (created_at, id) opaquely and decode back"""
+    created = datetime(2025, 1, 21, 12, 0, 0, 123456)
+    cursor = _encode_task_cursor(created, 42)
+
+    assert "2025" not in cursor
+    assert _decode_task_cursor(cursor) == (created, 42)
@@ -0,0 +1,187 @@
+"""
+Unit tests for the two-level task/agent cache
+
+Tests L1/L2 read-through, generation-based group invalidation, cross-replica
+L1 invalidation over pub/sub and L1-only operation without Redis.
+"""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from amas.services.tiered_cache import TieredCache
+
+
+@pytest.fixture
+async def replicas():
+    server = fakeredis.FakeServer()
+    clients = [fakeredis.aioredis.FakeRedis(server=server, decode_responses=True) for _ in range(2)]
+    caches = [TieredCache("test", redis=client) for client in clients]
+    yield caches
+    for cache, client in zip(caches, clients):
+        await cache.close()
+        await client.aclose()
+
+
+async def _wait_listening(*caches):
+    for cache in caches:
+        cache._ensure_listener()
+    for _ in range(100):
+        if all(cache._listening for cache in caches):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("invalidation listener did not subscribe")
+
+
+async def test_reads_fall_through_l1_then_l2(replicas):
+    """Test a write is served from L1 locally and from L2 on another replica"""
+    a, b = replicas
+    await a.set("detail:1", {"id": "1"}, ttl=60)
+
+    assert await a.get_with_tier("detail:1") == ({"id": "1"}, "l1")
+    assert await b.get_with_tier("detail:1") == ({"id": "1"}, "l2")
+    assert await b.get_with_tier("detail:1") == ({"id": "1"}, "l1")
+    assert await b.get_with_tier("detail:2") == (None, None)
+
+
+async def test_get_or_load_calls_loader_once(replicas):
+    """Test the loader result is cached and falsy results are not"""
+    a, _ = replicas
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"total": 3}
+
+    assert await a.get_or_load("stats", loader, ttl=60) == {"total": 3}
+    assert await a.get_or_load("stats", loader, ttl=60) == {"total": 3}
+    assert len(calls) == 1
+
+    async def empty():
+        calls.append(1)
+        return []
+
+    await a.get_or_load("list", empty, ttl=60)
+    await a.get_or_load("list", empty, ttl=60)
+    assert len(calls) == 3
+
+
+async def test_group_invalidation_is_one_incr(replicas):
+    """Test invalidating a group bumps a counter instead of scanning keys"""
+    a, b = replicas
+    for i in range(50):
+        await a.set(f"list:{i}", [i], ttl=60, group="lists")
+    await a.set("detail:1", {"id": "1"}, ttl=60)
+
+    keys_before = await a.redis.dbsize()
+    assert await a.invalidate("lists") == 1
+    assert await a.redis.dbsize() == keys_before + 1  # Only the counter was written
+
+    for cache in (a, b):
+        assert await cache.get("list:0", group="lists") is None
+    assert await b.get("detail:1") == {"id": "1"}
+
+    await a.set("list:0", ["fresh"], ttl=60, group="lists")
+    assert await b.get("list:0", group="lists") == ["fresh"]
+
+
+async def test_replicas_drop_l1_on_remote_writes(replicas):
+    """Test set, delete and invalidate on one replica clear the other's L1"""
+    a, b = replicas
+    await _wait_listening(a, b)
+
+    await a.set("detail:1", {"status": "pending"}, ttl=60)
+    await a.set("list:all", ["old"], ttl=60, group="lists")
+    assert await b.get("detail:1") == {"status": "pending"}
+    assert await b.get("list:all", group="lists") == ["old"]
+
+    await a.set("detail:1", {"status": "completed"}, ttl=60)
+    await a.invalidate("lists")
+    await asyncio.sleep(0.05)
+    assert await b.get_with_tier("detail:1") == ({"status": "completed"}, "l2")
+    assert await b.get("list:all", group="lists") is None
+
+    await a.delete("detail:1")
+    await asyncio.sleep(0.05)
+    assert await b.get("detail:1") is None
+    assert b.stats["messages"] == 4  # Two detail writes, one invalidation, one delete
+
+
+async def test_l1_only_without_redis():
+    """Test the cache works in-process when Redis is unavailable"""
+    cache = TieredCache("test")
+
+    await cache.set("detail:1", {"id": "1"}, ttl=60)
+    await cache.set("list:all", ["a"], ttl=60, group="lists")
+    assert await cache.get_with_tier("detail:1") == ({"id": "1"}, "l1")
+
+    await cache.invalidate("lists")
+    assert await cache.get("list:all", group="lists") is None
+    await cache.delete("detail:1")
+    assert await cache.get("detail:1") is None
+
+
+async def test_stale_value_served_during_one_refresh():
+    """Test expired entries are returned while a single background refresh runs"""
+    cache = TieredCache("test", early_refresh_beta=0)
+    version = {"n": 0}
+
+    async def loader():
+        version["n"] += 1
+        await asyncio.sleep(0.02)
+        return {"version": version["n"]}
+
+    assert await cache.get_or_load("stats", loader, ttl=0.05, stale_ttl=5) == {"version": 1}
+    await asyncio.sleep(0.06)
+
+    stale = await asyncio.gather(*(cache.get_or_load("stats", loader, ttl=0.05, stale_ttl=5) for _ in range(10)))
+    assert stale == [{"version": 1}] * 10
+    assert await cache.get("stats") is None  # Plain reads never see stale values
+
+    await asyncio.sleep(0.05)
+    assert version["n"] == 2
+    assert await cache.get_or_load("stats", loader, ttl=0.05, stale_ttl=5) == {"version": 2}
+    assert cache.stats["stale_hits"] == 10
+
+
+async def test_slow_loads_refresh_before_expiry(monkeypatch):
+    """Test probabilistic early expiration refreshes a key close to expiry"""
+    monkeypatch.setattr("amas.services.tiered_cache.random.random", lambda: 0.5)
+    cache = TieredCache("test")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    await cache.get_or_load("top", loader, ttl=60)
+    full_key = await cache._versioned("top", None)
+    cached = cache.l1.get(full_key)
+    cache.l1.set(full_key, cached._replace(delta=120.0))  # As if the load took two minutes
+
+    assert await cache.get_or_load("top", loader, ttl=60) == {"n": 1}
+    await asyncio.sleep(0.01)
+    assert len(calls) == 2
+    assert cache.stats["early_refreshes"] == 1
+
+
+async def test_lock_coalesces_misses_across_replicas(replicas):
+    """Test only one replica runs the loader for a cold key"""
+    pytest.importorskip("lupa")  # Lock release is a Lua script
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"rows": 42}
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("stats", loader, ttl=60, lock=True) for cache in replicas for _ in range(5))
+    )
+
+    assert results == [{"rows": 42}] * 10
+    assert len(calls) == 1
+    assert sum(cache.stats["lock_waits"] for cache in replicas) == 1
+    assert not await replicas[0].redis.exists("test:stats:lock")
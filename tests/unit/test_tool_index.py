@@ -0,0 +1,154 @@
+"""
+Unit tests for the integration tool catalog index
+
+Tests indexed filters, BM25 text ranking with prefix matching,
+incremental updates and the ToolRegistry search paths built on them.
+"""
+
+import pytest
+
+from amas.integration.tool_index import ToolCatalogIndex, tokenize
+from amas.integration.tool_registry import (
+    AGENT_SPECIALTY_CATEGORIES,
+    ToolCapability,
+    ToolCategory,
+    ToolDefinition,
+    ToolRegistry,
+)
+
+
+def _tool(tool_id, name, description, category, capabilities=(), **kwargs):
+    return ToolDefinition(
+        id=tool_id, name=name, description=description, category=category,
+        capabilities=set(capabilities), **kwargs,
+    )
+
+
+@pytest.fixture
+async def registry():
+    registry = ToolRegistry(tool_directories=[])
+    for definition in (
+        _tool("scraper", "Web Scraper", "Extract content from web pages",
+              ToolCategory.WEB_SCRAPING, [ToolCapability.TEXT_OUTPUT, ToolCapability.RATE_LIMITED]),
+        _tool("crawler", "Site Crawler", "Follow links and scrape every web page",
+              ToolCategory.WEB_SCRAPING, [ToolCapability.BATCH_PROCESSING], quality_score=0.7),
+        _tool("charts", "Chart Builder", "Render data as charts",
+              ToolCategory.VISUALIZATION, [ToolCapability.VISUALIZATION_OUTPUT]),
+        _tool("stats", "Statistics", "Analyze data sets",
+              ToolCategory.ANALYTICS, [ToolCapability.BATCH_PROCESSING], cost_per_execution=0.05),
+    ):
+        await registry._register_tool_definition(definition)
+    return registry
+
+
+def test_tokenize():
+    """Test lowercase alphanumeric tokens"""
+    assert tokenize("Extract PDF-tables, v2!") == ["extract", "pdf", "tables", "v2"]
+
+
+def test_indexed_filters(registry):
+    """Test category, capability (any-of) and specialty filters"""
+    ids = lambda tools: sorted(t.id for t in tools)
+
+    assert ids(registry.search_tools(category=ToolCategory.WEB_SCRAPING)) == ["crawler", "scraper"]
+    assert ids(registry.search_tools(
+        capabilities=[ToolCapability.BATCH_PROCESSING, ToolCapability.RATE_LIMITED]
+    )) == ["crawler", "scraper", "stats"]
+    assert ids(registry.search_tools(agent_specialty="data_analyst")) == ["charts", "stats"]
+    assert ids(registry.search_tools(agent_specialty="data_analyst", max_cost=0.01)) == ["charts"]
+    assert registry.search_tools(agent_specialty="unknown") == []
+
+
+def test_text_search_ranks_by_relevance(registry):
+    """Test every token must match a word prefix and name hits rank higher"""
+    assert [t.id for t in registry.search_tools(query="scrap")] == ["scraper", "crawler"]
+    assert [t.id for t in registry.search_tools(query="web page")] == ["scraper", "crawler"]
+    assert [t.id for t in registry.search_tools(query="data")] == ["stats", "charts"]
+    assert registry.search_tools(query="web charts") == []
+
+
+def test_static_ranking_and_usage_updates(registry):
+    """Test quality/cost ranking and that recorded usage reorders results"""
+    # Ties keep registration order; crawler loses on quality, stats on cost
+    assert [t.id for t in registry.search_tools()] == ["scraper", "charts", "crawler", "stats"]
+
+    registry.update_tool_stats("crawler", quality_score=0.99, usage_count=50)
+
+    assert registry.tool_index.max_usage == 50
+    assert [t.id for t in registry.search_tools()][0] == "crawler"
+    with pytest.raises(ValueError):
+        registry.update_tool_stats("crawler", not_a_field=1)
+
+
+@pytest.mark.asyncio
+async def test_reregistration_replaces_index_entries(registry):
+    """Test re-registering an id drops its old terms and categories"""
+    await registry._register_tool_definition(
+        _tool("scraper", "PDF Reader", "Read documents", ToolCategory.FILE_OPERATIONS)
+    )
+    index = registry.tool_index
+
+    assert "scraper" not in index.by_category[ToolCategory.WEB_SCRAPING]
+    assert "web" in index.postings and "scraper" not in index.postings["web"]
+    assert "extract" not in index.vocabulary
+    assert [t.id for t in registry.search_tools(query="pdf")] == ["scraper"]
+
+
+def test_direct_registry_writes_are_reindexed(registry):
+    """Test tools added straight into registered_tools are still searchable"""
+    registry.registered_tools["mail"] = _tool(
+        "mail", "Mailer", "Send email", ToolCategory.COMMUNICATION
+    )
+
+    assert [t.id for t in registry.search_tools(query="email")] == ["mail"]
+
+
+def test_direct_replacements_and_mutations_are_reindexed(registry):
+    """Test replaced or mutated tools do not leave stale postings behind"""
+    registry.registered_tools["stats"] = _tool(
+        "stats", "Forecaster", "Predict trends", ToolCategory.ANALYTICS
+    )
+    registry.registered_tools["charts"].description = "Draw diagrams"
+    registry.registered_tools["charts"].category = ToolCategory.ANALYTICS
+
+    assert registry.search_tools(query="statistics") == []
+    assert registry.search_tools(query="render") == []
+    assert [t.id for t in registry.search_tools(query="trends")] == ["stats"]
+    assert [t.id for t in registry.search_tools(query="diagrams")] == ["charts"]
+    assert registry.search_tools(category=ToolCategory.VISUALIZATION) == []
+
+
+def test_index_remove_uses_terms_from_add_time():
+    """Test removing a tool mutated after indexing clears its old postings"""
+    index = ToolCatalogIndex(AGENT_SPECIALTY_CATEGORIES)
+    tool = _tool("a", "A", "alpha", ToolCategory.TESTING)
+    index.add(tool)
+    tool.description = "omega"
+    tool.category = ToolCategory.ANALYTICS
+
+    assert not index.is_current(tool)
+    index.remove("a")
+
+    assert "alpha" not in index.postings
+    assert index.vocabulary == []
+    assert index.by_category[ToolCategory.TESTING] == set()
+
+
+def test_recommendations_use_keyword_categories(registry):
+    """Test recommendations combine keyword categories with the specialty"""
+    recommended = registry.get_tool_recommendations("analyze the data and chart it", "data_analyst")
+
+    assert sorted(t.id for t in recommended) == ["charts", "stats"]
+
+
+def test_index_remove_recomputes_max_usage():
+    """Test removing the most used tool lowers the usage normaliser"""
+    index = ToolCatalogIndex(AGENT_SPECIALTY_CATEGORIES)
+    index.add(_tool("a", "A", "alpha", ToolCategory.TESTING, usage_count=10))
+    index.add(_tool("b", "B", "beta", ToolCategory.TESTING, usage_count=3))
+
+    index.remove("a")
+
+    assert index.max_usage == 3
+    assert index.text_scores("alpha") == {}
+    assert len(index) == 1
@@ -0,0 +1,157 @@
+"""
+Unit tests for configurable VectorService index types
+
+Tests IVF (flat and product-quantized) and HNSW construction, per-query
+search knobs, automatic IVF training, HNSW tombstones and metadata-filtered
+search through VectorService.
+"""
+
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+
+from amas.services.embedding_service import EmbeddingService
+from amas.services.vector_index import (
+    VectorIndexConfig,
+    benchmark_indexes,
+    build_index,
+    index_contents,
+    index_kind,
+    search_parameters,
+    synthetic_corpus,
+)
+from amas.services.vector_service import VectorService
+
+DIM = 16
+
+
+class HashModel:
+    """Stable pseudo-random embedding per text"""
+
+    def encode(self, texts, convert_to_numpy=True):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(t.encode())).standard_normal(DIM).astype(np.float32)
+            for t in texts
+        ])
+
+
+async def _service(path, **config):
+    service = VectorService({"index_path": str(path), **config})
+    service.dimension = DIM
+    await service._load_or_create_index()
+    service.embedding_service = EmbeddingService(model=HashModel())
+    return service
+
+
+def _docs(count, start=0):
+    return [
+        {"id": f"d{i}", "content": f"document {i}", "metadata": {"source": "feed" if i % 2 else "report", "n": i}}
+        for i in range(start, start + count)
+    ]
+
+
+def test_config_validation():
+    """Test unknown index types and PQ outside IVF are rejected"""
+    assert VectorIndexConfig.from_config({"index_type": "hnsw", "ef_search": 8, "other": 1}).ef_search == 8
+    with pytest.raises(ValueError):
+        VectorIndexConfig(index_type="lsh")
+    with pytest.raises(ValueError):
+        VectorIndexConfig(index_type="hnsw", pq_m=8)
+
+
+def test_index_types_and_search_knobs():
+    """Test each index type finds neighbours and knobs trade recall for work"""
+    corpus = synthetic_corpus(4000, DIM, clusters=16)
+    queries = corpus[:50]
+    rows = benchmark_indexes(corpus, queries, [
+        ("ivf", VectorIndexConfig(index_type="ivf", nlist=32), {"nprobe": 1}),
+        ("ivf", VectorIndexConfig(index_type="ivf", nlist=32), {"nprobe": 32}),
+        ("ivfpq", VectorIndexConfig(index_type="ivf", nlist=32, pq_m=4), {"nprobe": 32}),
+        ("hnsw", VectorIndexConfig(index_type="hnsw", hnsw_m=16), {"ef_search": 128}),
+    ], k=5)
+    recall = {(r["index"], r.get("nprobe")): r for r in rows}
+
+    assert recall[("ivf", 32)]["recall"] == pytest.approx(1.0)
+    assert recall[("ivf", 1)]["recall"] < recall[("ivf", 32)]["recall"]
+    assert recall[("hnsw", None)]["recall"] > 0.9
+    assert recall[("ivfpq", 32)]["memory_mb"] < recall[("ivf", 32)]["memory_mb"] / 2
+
+
+def test_ivf_contents_round_trip():
+    """Test ids and vectors can be read back out of an IVF index"""
+    corpus = synthetic_corpus(1000, DIM)
+    ids = np.arange(1000, dtype=np.int64) * 7
+    index = build_index(VectorIndexConfig(index_type="ivf", nlist=8), ids, corpus)
+    index.remove_ids(ids[:10])
+
+    found_ids, vectors = index_contents(index)
+    order = np.argsort(found_ids)
+
+    assert index_kind(index) == "ivf"
+    assert found_ids[order].tolist() == ids[10:].tolist()
+    assert np.allclose(vectors[order], corpus[10:])
+    assert isinstance(search_parameters(VectorIndexConfig(), index, nprobe=4), faiss.SearchParametersIVF)
+
+
+@pytest.mark.asyncio
+async def test_ivf_trains_once_corpus_crosses_threshold(tmp_path):
+    """Test a flat index is rebuilt as IVF in the background and snapshotted"""
+    service = await _service(tmp_path, index_type="ivf", train_threshold=400, nlist=4)
+    await service.add_documents(_docs(300))
+    assert index_kind(service.index) == "flat"
+
+    await service.add_documents(_docs(200, start=300))
+    await service._rebuild_task
+
+    assert index_kind(service.index) == "ivf"
+    assert service.store.snapshot_generation is not None
+    found = await service.search("document 42", top_k=1, threshold=0.9, nprobe=4)
+    assert found["results"][0]["id"] == "d42"
+    await service.close()
+
+    restarted = await _service(tmp_path, index_type="ivf", train_threshold=400, nlist=4)
+    assert index_kind(restarted.index) == "ivf"
+    assert restarted.document_count == 500
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_hnsw_deletes_are_tombstoned(tmp_path):
+    """Test deleted HNSW rows never come back, including after a restart"""
+    service = await _service(tmp_path, index_type="hnsw")
+    await service.add_documents(_docs(50))
+    await service.delete_documents(["d7"])
+
+    found = await service.search("document 7", top_k=3, threshold=-1.0)
+    assert "d7" not in [r["id"] for r in found["results"]]
+    assert service.document_count == 49
+    service.store.close()
+
+    restarted = await _service(tmp_path, index_type="hnsw")
+    assert restarted._tombstones == service._tombstones
+    await restarted.close()
+    assert (await _service(tmp_path, index_type="hnsw")).document_count == 49
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exact_filter_limit", [10_000, 0])
+async def test_filtered_search_only_returns_matching_rows(tmp_path, exact_filter_limit):
+    """Test metadata filters restrict the search itself, exact or via selector"""
+    service = await _service(
+        tmp_path, index_type="hnsw", filter_fields=["source"], exact_filter_limit=exact_filter_limit
+    )
+    await service.add_documents(_docs(200))
+
+    found = await service.search("document 10", top_k=5, threshold=-1.0, filters={"source": "feed"})
+    ids = [r["id"] for r in found["results"]]
+
+    assert len(ids) == 5
+    assert all(r["metadata"]["source"] == "feed" for r in found["results"])
+    assert "d10" not in ids
+    multi = await service.search("document 10", top_k=3, threshold=-1.0, filters={"n": [10, 11, 12]})
+    assert sorted(r["id"] for r in multi["results"]) == ["d10", "d11", "d12"]
+    assert multi["results"][0]["id"] == "d10"
+    await service.close()
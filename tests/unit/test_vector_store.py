@@ -0,0 +1,122 @@
+"""
+Unit tests for VectorService append-log persistence
+
+Tests VectorStore log replay, torn-record recovery, snapshot compaction
+and SQLite metadata upserts, plus VectorService add/update/delete across
+restarts when FAISS is installed.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from amas.services.vector_store import OP_ADD, OP_DELETE, VectorStore
+
+
+def _docs(*ids):
+    return [{"id": doc_id, "content": f"text {doc_id}", "metadata": {"tag": doc_id}} for doc_id in ids]
+
+
+def _open(path):
+    store = VectorStore(str(path))
+    snapshot, records = store.open()
+    return store, snapshot, [(op, rows.tolist()) for op, rows, _ in records]
+
+
+def test_log_replays_adds_and_deletes_in_order(tmp_path):
+    """Test a reopened store yields every record and continues row ids"""
+    store, _, _ = _open(tmp_path)
+    rows = store.allocate_rows(3)
+    store.append(rows, np.eye(3, dtype=np.float32), _docs("a", "b", "c"))
+    store.delete([1])
+    store.close()
+
+    store, snapshot, records = _open(tmp_path)
+
+    assert snapshot is None
+    assert records == [(OP_ADD, [0, 1, 2]), (OP_DELETE, [1])]
+    assert store.allocate_rows(1).tolist() == [3]
+    assert store.get([0, 1]) == {0: {"id": "a", "content": "text a", "metadata": {"tag": "a"}}}
+    store.close()
+
+
+def test_torn_final_record_is_truncated(tmp_path):
+    """Test a partially written record is dropped on open"""
+    store, _, _ = _open(tmp_path)
+    store.append(store.allocate_rows(2), np.ones((2, 4), dtype=np.float32), _docs("a", "b"))
+    store.close()
+    log = tmp_path / "vectors.000000.log"
+    intact = log.stat().st_size
+    with open(log, "ab") as f:
+        f.write(b"A\x05\x00\x00\x00\x04\x00\x00\x00partial")
+
+    store, _, records = _open(tmp_path)
+
+    assert records == [(OP_ADD, [0, 1])]
+    assert log.stat().st_size == intact
+    store.close()
+
+
+def test_snapshot_supersedes_older_logs(tmp_path):
+    """Test compaction rotates the log and recovery replays only what followed"""
+    store, _, _ = _open(tmp_path)
+    store.append(store.allocate_rows(2), np.ones((2, 2), dtype=np.float32), _docs("a", "b"))
+    generation = store.begin_snapshot()
+    store.append(store.allocate_rows(1), np.ones((1, 2), dtype=np.float32), _docs("c"))
+    store.commit_snapshot(generation, b"index-bytes")
+    store.close()
+
+    assert sorted(p.name for p in tmp_path.glob("vectors.*")) == ["vectors.000001.log"]
+
+    store, snapshot, records = _open(tmp_path)
+
+    assert snapshot.read_bytes() == b"index-bytes"
+    assert records == [(OP_ADD, [2])]
+    assert store.count() == 3
+    store.close()
+
+
+def test_metadata_upsert_replaces_previous_row(tmp_path):
+    """Test re-adding a document id moves it to the new row"""
+    store, _, _ = _open(tmp_path)
+    store.append(store.allocate_rows(2), np.ones((2, 2), dtype=np.float32), _docs("a", "b"))
+    store.append(store.allocate_rows(1), np.ones((1, 2), dtype=np.float32),
+                 [{"id": "a", "content": "new", "metadata": {}}])
+
+    assert store.rows_for(["a", "b", "missing"]) == {"a": 2, "b": 1}
+    assert store.get([0]) == {}
+    assert store.get([2])[2]["content"] == "new"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_vector_service_survives_restart(tmp_path):
+    """Test VectorService upserts and deletes persist without full rewrites"""
+    pytest.importorskip("faiss")
+    from amas.services.embedding_service import EmbeddingService
+    from amas.services.vector_service import VectorService
+
+    class Model:
+        def encode(self, texts, convert_to_numpy=True):
+            return np.array([[t.count(c) + 0.1 for c in "abcd"] for t in texts], dtype=np.float32)
+
+    async def start():
+        service = VectorService({"index_path": str(tmp_path)})
+        service.dimension = 4
+        await service._load_or_create_index()
+        service.embedding_service = EmbeddingService(model=Model())
+        return service
+
+    service = await start()
+    await service.add_documents(_docs("a", "b") + [{"id": "c", "content": "aaa"}])
+    await service.add_documents([{"id": "a", "content": "dddd"}])
+    await service.delete_documents(["b"])
+    service.store.close()  # Crash-like restart: nothing but the log on disk
+
+    service = await start()
+    found = await service.search("dddd", top_k=3, threshold=0.0)
+
+    assert service.index.ntotal == 2
+    assert [r["id"] for r in found["results"]] == ["a", "c"]
+    assert found["results"][0]["content"] == "dddd"
+    await service.close()
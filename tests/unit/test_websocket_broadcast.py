@@ -0,0 +1,190 @@
+"""
+Unit tests for WebSocket fan-out
+
+Tests serialize-once broadcast, per-connection writer isolation and the
+drop_oldest / coalesce / disconnect slow-consumer policies.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.api import websocket as ws_module
+from src.api.websocket import ConnectionManager
+
+
+class FakeWebSocket:
+    """Records sent text; ``blocked`` sockets stall on send until released"""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+async def _connect(manager, count, blocked=False, user_id=None):
+    sockets = []
+    for _ in range(count):
+        socket = FakeWebSocket(blocked)
+        await manager.connect(socket, f"c{len(manager.senders)}", user_id)
+        sockets.append(socket)
+    return sockets
+
+
+async def _drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once(monkeypatch):
+    """Test one json encode per broadcast regardless of connection count"""
+    calls = []
+    original = ws_module._serialize
+    monkeypatch.setattr(ws_module, "_serialize", lambda m: calls.append(m) or original(m))
+    manager = ConnectionManager()
+    sockets = await _connect(manager, 20)
+
+    await manager.broadcast({"event": "task_created", "task_id": "t1"})
+    await _drain()
+
+    assert len(calls) == 1
+    assert all(s.sent[0]["task_id"] == "t1" for s in sockets)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_stall_others():
+    """Test a stalled socket only backs up its own queue"""
+    manager = ConnectionManager(max_queue=4, slow_consumer_policy="drop_oldest")
+    slow = (await _connect(manager, 1, blocked=True))[0]
+    fast = await _connect(manager, 3)
+
+    for i in range(10):
+        await manager.broadcast({"event": "task_progress", "task_id": "t1", "n": i})
+        await _drain()
+
+    assert all([m["n"] for m in s.sent] == list(range(10)) for s in fast)
+    slow_sender = manager.senders["c0"]
+    # First message is in flight; the queue keeps the newest four
+    assert [json.loads(t)["n"] for _, t in slow_sender.queue] == [6, 7, 8, 9]
+    assert slow_sender.dropped == 5
+
+    slow.release.set()
+    await _drain()
+    assert [m["n"] for m in slow.sent] == [0, 6, 7, 8, 9]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_keeps_latest_progress_per_task():
+    """Test queued task_progress is replaced in place and tokens are kept"""
+    manager = ConnectionManager(max_queue=16, slow_consumer_policy="coalesce")
+    slow = (await _connect(manager, 1, blocked=True))[0]
+    manager.subscribe_to_task("c0", "t1")
+
+    await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": "a"})
+    for progress in (10, 20, 30):
+        await manager.send_to_task_subscribers("t1", {"event": "task_progress", "task_id": "t1", "progress": progress})
+        await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": str(progress)})
+    await manager.broadcast({"event": "task_progress", "task_id": "t2", "progress": 5})
+
+    slow.release.set()
+    await _drain()
+
+    assert [(m["event"], m.get("progress", m.get("delta"))) for m in slow.sent] == [
+        ("task_token", "a"),
+        ("task_progress", 30),
+        ("task_token", "10"),
+        ("task_token", "20"),
+        ("task_token", "30"),
+        ("task_progress", 5),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop_oldest", "coalesce"])
+async def test_streamed_tokens_are_never_dropped(policy):
+    """Test a queue full of tokens disconnects rather than losing a chunk"""
+    manager = ConnectionManager(max_queue=4, slow_consumer_policy=policy)
+    slow = (await _connect(manager, 1, blocked=True))[0]
+    manager.subscribe_to_task("c0", "t1")
+
+    await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": "in flight"})
+    await _drain()
+    await manager.send_to_task_subscribers("t1", {"event": "task_progress", "task_id": "t1", "progress": 10})
+    for delta in "abc":
+        await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": delta})
+
+    # Full: the progress update makes way for the next token
+    await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": "d"})
+    sender = manager.senders["c0"]
+    assert [json.loads(t)["delta"] for _, t in sender.queue] == ["a", "b", "c", "d"]
+    assert sender.dropped == 1
+
+    # Only tokens left: nothing can be dropped without a gap
+    await manager.send_to_task_subscribers("t1", {"event": "task_token", "task_id": "t1", "delta": "e"})
+    await _drain()
+    assert "c0" not in manager.active_connections
+    assert slow.closed == 1008
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_drops_slow_consumer():
+    """Test an overflowing client is unregistered and closed"""
+    manager = ConnectionManager(max_queue=2, slow_consumer_policy="disconnect")
+    slow = (await _connect(manager, 1, blocked=True))[0]
+    fast = (await _connect(manager, 1))[0]
+    manager.subscribe_to_task("c0", "t1")
+
+    for i in range(4):
+        await manager.broadcast({"event": "agent_update", "n": i})
+        await _drain()
+
+    assert "c0" not in manager.active_connections
+    assert "c0" not in manager.task_subscribers["t1"]
+    assert slow.closed == 1008
+    assert len(fast.sent) == 4
+
+
+@pytest.mark.asyncio
+async def test_targeted_sends_and_failed_writer():
+    """Test user/task targeting and cleanup when a send raises"""
+    manager = ConnectionManager()
+    alice = await _connect(manager, 2, user_id="alice")
+    bob = (await _connect(manager, 1, user_id="bob"))[0]
+    manager.subscribe_to_task("c2", "t1")
+
+    await manager.send_to_user("alice", {"event": "system_alert"})
+    await manager.send_to_task_subscribers("t1", {"event": "task_completed"})
+    await _drain()
+
+    assert [len(s.sent) for s in alice] == [1, 1]
+    assert [m["event"] for m in bob.sent] == ["task_completed"]
+
+    async def broken(text):
+        raise ConnectionResetError("gone")
+
+    bob.send_text = broken
+    await manager.broadcast({"event": "heartbeat"})
+    await _drain()
+
+    assert "c2" not in manager.active_connections
+    assert "c2" not in manager.user_connections["bob"]
+
+
+def test_unknown_policy_rejected():
+    """Test misconfigured policies fail fast"""
+    with pytest.raises(ValueError):
+        ConnectionManager(slow_consumer_policy="block")